@@ -34,6 +34,10 @@ a = Analysis(
         'requests', 'requests.adapters', 'requests.auth', 'requests.structures',
         'urllib3', 'urllib3.util', 'urllib3.util.retry',
         'charset_normalizer', 'certifi', 'idna',
+        # Backends PDFActions loads by name through its service registry
+        'src.pdf_engine.pdf_creator', 'src.pdf_engine.pdf_merger', 'src.pdf_engine.pdf_forms',
+        'src.pdf_engine.pdf_utilities', 'src.pdf_engine.pdf_converter',
+        'src.security.pdf_security', 'src.security.pdf_redaction', 'src.security.pdf_signature',
     ] + endesive_hiddenimports,
     hookspath=[],
     hooksconfig={},
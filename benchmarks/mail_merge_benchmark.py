@@ -0,0 +1,101 @@
+"""
+Mail merge throughput benchmark
+
+Generates a form template and a CSV data file, then measures rows/second
+for the per-document import_form_data approach and for PDFMailMerge.
+
+Usage:
+    python benchmarks/mail_merge_benchmark.py [--rows 1000] [--fields 40] [--workers N] [--flatten]
+"""
+
+import sys
+import csv
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitz  # PyMuPDF
+from src.pdf_engine.pdf_forms import PDFForms
+from src.pdf_engine.pdf_mail_merge import PDFMailMerge
+
+
+def build_template(path: Path, fields: int):
+    """Create a form with `fields` text fields spread over pages of 20"""
+    forms = PDFForms()
+    doc = fitz.open()
+    for i in range(fields):
+        if i % 20 == 0:
+            doc.new_page()
+        y = 60 + (i % 20) * 36
+        forms.create_text_field(doc, len(doc) - 1, f"field_{i}", (72, y, 400, y + 24))
+    doc.save(path)
+    doc.close()
+
+
+def build_data(path: Path, rows: int, fields: int):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([f"field_{i}" for i in range(fields)])
+        for r in range(rows):
+            writer.writerow([f"row {r} value {i}" for i in range(fields)])
+
+
+def reopen_per_row(template: Path, data: Path, output_dir: Path, flatten: bool) -> int:
+    """Baseline: open the template from disk and import_form_data for every row"""
+    forms = PDFForms()
+    merge = PDFMailMerge()
+    count = 0
+    for row in merge.iter_rows(str(data)):
+        count += 1
+        doc = fitz.open(template)
+        forms.import_form_data(doc, row)
+        if flatten:
+            doc.bake(annots=False, widgets=True)
+        doc.save(output_dir / f"baseline_{count:05d}.pdf", deflate=True)
+        doc.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--fields', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count, 0 = in-process)")
+    parser.add_argument('--flatten', action='store_true')
+    parser.add_argument('--skip-baseline', action='store_true')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        template = tmp / "template.pdf"
+        data = tmp / "data.csv"
+        build_template(template, args.fields)
+        build_data(data, args.rows, args.fields)
+        print(f"{args.rows} rows x {args.fields} fields, flatten={args.flatten}")
+
+        if not args.skip_baseline:
+            out = tmp / "baseline"
+            out.mkdir()
+            start = time.perf_counter()
+            rows = reopen_per_row(template, data, out, args.flatten)
+            seconds = time.perf_counter() - start
+            print(f"  reopen + import_form_data: {rows / seconds:8.1f} rows/s ({seconds:.1f}s)")
+
+        runs = [0] if args.workers == 0 else [0, args.workers]
+        for workers in runs:
+            result = PDFMailMerge().merge(str(template), str(data), str(tmp / f"merge_{workers}"),
+                                          flatten=args.flatten, workers=workers)
+            label = "in-process" if workers == 0 else f"{workers or 'auto'} workers"
+            print(f"  PDFMailMerge ({label}): {result['rows_per_second']:8.1f} rows/s "
+                  f"({result['seconds']:.1f}s, {len(result['failed'])} failed)")
+
+
+if __name__ == '__main__':
+    main()
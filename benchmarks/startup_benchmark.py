@@ -0,0 +1,132 @@
+"""
+Startup time benchmark and import-time budget
+
+Measures, each in a fresh interpreter:
+  - import time of the main window module (python -X importtime)
+  - time to first window (imports + QApplication + ConnectedMainWindow shown)
+  - time to first page rendered (first window + opening a PDF)
+
+Exits with status 1 when the import time is over budget or a heavy
+optional module (pytesseract, docx, PyKCS11, ...) is loaded before the
+first page is shown, so it can run as a regression check.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5] [--pdf FILE] [--budget-ms 300]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import fitz  # PyMuPDF
+
+# Import-time budget for the main window module, in milliseconds
+IMPORT_BUDGET_MS = 300
+
+# Modules that only specific tools need; none may load at startup
+HEAVY_MODULES = (
+    'pytesseract', 'docx', 'openpyxl', 'endesive', 'PyKCS11', 'win32com',
+    'pdf2docx', 'pikepdf', 'PIL', 'src.pdf_engine.pdf_converter', 'src.security.pdf_signature',
+)
+
+MAIN_MODULE = 'src.ui.main_window_connected'
+
+STARTUP_SCRIPT = r"""
+import sys, time, json
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from src.ui.main_window_connected import ConnectedMainWindow
+from src.utilities.config_manager import ConfigManager
+app = QApplication(sys.argv[:1])
+window = ConnectedMainWindow(ConfigManager())
+window.show()
+app.processEvents()
+first_window = time.perf_counter() - start
+window.load_pdf(sys.argv[1])
+app.processEvents()
+first_page = time.perf_counter() - start
+heavy = [name for name in HEAVY if name in sys.modules]
+print(json.dumps({'window': first_window, 'page': first_page, 'heavy': heavy}))
+"""
+
+
+def build_pdf(path: Path, pages: int = 50):
+    """A text PDF to open"""
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}", fontsize=24)
+    doc.save(path)
+    doc.close()
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of module in a fresh interpreter"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def startup_times(pdf: Path) -> dict:
+    """Time to first window and first page in a fresh interpreter"""
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    script = f"HEAVY = {HEAVY_MODULES!r}\n" + STARTUP_SCRIPT
+    result = subprocess.run([sys.executable, '-c', script, str(pdf)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--pdf', type=Path, default=None, help="PDF to open (default: generated)")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help=f"import-time budget for {MAIN_MODULE} (default {IMPORT_BUDGET_MS})")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = args.pdf
+        if pdf is None:
+            pdf = Path(tmp) / "startup.pdf"
+            build_pdf(pdf)
+
+        imports = [import_time_ms(MAIN_MODULE) for _ in range(args.runs)]
+        runs = [startup_times(pdf) for _ in range(args.runs)]
+
+    import_ms = statistics.median(imports)
+    window_ms = statistics.median(run['window'] for run in runs) * 1000
+    page_ms = statistics.median(run['page'] for run in runs) * 1000
+    heavy = sorted({name for run in runs for name in run['heavy']})
+
+    print(f"median of {args.runs} runs")
+    print(f"  import {MAIN_MODULE}: {import_ms:7.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"  first window:        {window_ms:7.1f} ms")
+    print(f"  first page rendered: {page_ms:7.1f} ms")
+    print(f"  heavy modules loaded at startup: {', '.join(heavy) or 'none'}")
+
+    failed = False
+    if import_ms > args.budget_ms:
+        print(f"FAIL: import time over budget by {import_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if heavy:
+        print("FAIL: heavy modules must be imported on first use")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Pure-Python Word to PDF benchmark
+
+Generates a large .docx fixture (headings, long paragraphs in all
+alignments and tables) and times PDFCreator._from_word_pure_python on it.
+
+Usage:
+    python benchmarks/word_to_pdf_benchmark.py [--paragraphs 6000] [--tables 60] [--docx FILE]
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitz  # PyMuPDF
+from src.pdf_engine.pdf_creator import PDFCreator
+
+WORDS = ("agreement party shall under terms notice period clause payment schedule "
+         "liability indemnity confidential obligation termination effective date").split()
+
+
+def build_fixture(path: Path, paragraphs: int, tables: int):
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    rng = random.Random(0)
+    alignments = [None, WD_ALIGN_PARAGRAPH.CENTER, WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.JUSTIFY]
+    table_every = max(1, paragraphs // max(1, tables))
+
+    doc = Document()
+    for i in range(paragraphs):
+        if i % 50 == 0:
+            doc.add_heading(f"Section {i // 50 + 1}", level=1 + (i // 50) % 3)
+        para = doc.add_paragraph(" ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 120))))
+        para.alignment = alignments[i % len(alignments)]
+        if tables and i % table_every == table_every - 1:
+            table = doc.add_table(rows=8, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 15)))
+    doc.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, default=6000)
+    parser.add_argument('--tables', type=int, default=60)
+    parser.add_argument('--docx', help="use an existing .docx instead of a generated fixture")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.docx:
+            fixture = Path(args.docx)
+        else:
+            fixture = tmp / "fixture.docx"
+            build_fixture(fixture, args.paragraphs, args.tables)
+            print(f"Fixture: {args.paragraphs} paragraphs, {args.tables} tables")
+
+        output = tmp / "output.pdf"
+        start = time.perf_counter()
+        PDFCreator()._from_word_pure_python(str(fixture), str(output))
+        seconds = time.perf_counter() - start
+
+        with fitz.open(output) as pdf:
+            pages = len(pdf)
+        print(f"  {pages} pages in {seconds:.2f}s ({pages / seconds:.1f} pages/s), "
+              f"{output.stat().st_size / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ Professional Desktop PDF Editor & Writer
 """
 
 import sys
+import multiprocessing
 import logging
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication
@@ -11,19 +12,20 @@ from PyQt6.QtCore import Qt
 from src.ui.main_window import MainWindow
 from src.utilities.logger import setup_logger
 from src.utilities.config_manager import ConfigManager
+from src.ui.startup_loader import StartupLoader, launch_file, FIRST_PAGE_WIDTH_RATIO
 
 
 def main():
     """Main entry point for NexPro PDF application"""
 
+    # Load configuration (it has the logging settings)
+    config = ConfigManager()
+
     # Setup logging
-    logger = setup_logger()
+    logger = setup_logger(config=config)
     logger.info("Starting NexPro PDF...")
 
     try:
-        # Load configuration
-        config = ConfigManager()
-
         # Create Qt Application
         app = QApplication(sys.argv)
         app.setApplicationName(config.get("app.name", "NexPro PDF"))
@@ -32,9 +34,19 @@ def main():
 
         # High DPI scaling is enabled by default in PyQt6
 
+        # Open a PDF passed on the command line while the window is built
+        startup_loader = None
+        startup_file = launch_file(sys.argv)
+        if startup_file:
+            screen_width = app.primaryScreen().availableGeometry().width()
+            startup_loader = StartupLoader(startup_file, int(screen_width * FIRST_PAGE_WIDTH_RATIO))
+            startup_loader.start()
+
         # Create and show main window
         window = MainWindow(config)
         window.show()
+        if startup_loader is not None:
+            window.open_startup_file(startup_loader)
 
         logger.info("NexPro PDF started successfully")
 
@@ -47,4 +59,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
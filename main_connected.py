@@ -5,6 +5,7 @@ This version uses the fully connected UI with all backend actions wired up
 """
 
 import sys
+import multiprocessing
 import logging
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QDialog
@@ -14,20 +15,21 @@ from src.utilities.logger import setup_logger
 from src.utilities.config_manager import ConfigManager
 from src.security.license_manager import LicenseManager
 from src.ui.license_dialog import TrialExpiredDialog
+from src.ui.startup_loader import StartupLoader, launch_file, FIRST_PAGE_WIDTH_RATIO
 from src.version import __version__, __app_name__, __publisher__
 
 
 def main():
     """Main entry point for NexPro PDF application (connected version)"""
 
+    # Load configuration (it has the logging settings)
+    config = ConfigManager()
+
     # Setup logging
-    logger = setup_logger()
+    logger = setup_logger(config=config)
     logger.info("Starting NexPro PDF (Connected Version)...")
 
     try:
-        # Load configuration
-        config = ConfigManager()
-
         # Create Qt Application
         app = QApplication(sys.argv)
         app.setApplicationName(__app_name__)
@@ -56,9 +58,20 @@ def main():
             # Show warning if trial is expiring soon
             logger.warning(f"Trial period expiring in {days_remaining} days")
 
+        # A PDF passed on the command line (double-clicked file) is opened
+        # and its first page rendered while the window is being built
+        startup_loader = None
+        startup_file = launch_file(sys.argv)
+        if startup_file:
+            screen_width = app.primaryScreen().availableGeometry().width()
+            startup_loader = StartupLoader(startup_file, int(screen_width * FIRST_PAGE_WIDTH_RATIO))
+            startup_loader.start()
+
         # Create and show main window (CONNECTED VERSION)
         window = ConnectedMainWindow(config, license_manager)
         window.showMaximized()  # Start maximized automatically
+        if startup_loader is not None:
+            window.open_startup_file(startup_loader)
 
         # Background check for updates (non-blocking)
         try:
@@ -79,4 +92,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
@@ -3,6 +3,13 @@ PDF Engine modules for NexPro PDF
 Uses PyMuPDF (fitz) and pikepdf for PDF operations
 """
 
-from src.pdf_engine.pdf_converter import PDFConverter
-
 __all__ = ['PDFConverter']
+
+
+def __getattr__(name):
+    # Imported on first access so that loading any engine module does not
+    # load the converter as well
+    if name == 'PDFConverter':
+        from src.pdf_engine.pdf_converter import PDFConverter
+        return PDFConverter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
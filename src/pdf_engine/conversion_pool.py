@@ -0,0 +1,223 @@
+"""
+Conversion Pool - Run file-to-PDF conversions in isolated worker processes
+"""
+
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+from src.utilities.logger import get_logger
+
+
+# Interval at which run() calls its cancelled callback while jobs are running
+CANCEL_POLL_SECONDS = 0.1
+
+
+@dataclass
+class ConversionJob:
+    """One conversion: a file (or a list of images) to one PDF"""
+    format_type: str
+    input_file: Union[str, List[str]]
+    output_file: str
+    attempts: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of a conversion job"""
+    input_file: Union[str, List[str]]
+    output_file: str
+    success: bool
+    error: Optional[str] = None
+    duration: float = 0.0
+    attempts: int = 1
+
+
+def convert_job(format_type: str, input_file, output_file: str) -> Tuple[bool, Optional[str]]:
+    """
+    Run a single conversion with a fresh PDFCreator
+
+    Returns:
+        (success, error message)
+    """
+    from src.pdf_engine.pdf_creator import PDFCreator
+
+    creator = PDFCreator()
+    if format_type == 'image':
+        ok = creator.from_images([input_file], output_file)
+    else:
+        ok = creator.conversion_method(format_type)(input_file, output_file)
+    if ok:
+        return True, None
+    return False, creator.last_error or f"{format_type} conversion failed"
+
+
+def _worker_main(conn):
+    """Worker process loop: receive jobs, send back (success, error)"""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        try:
+            result = convert_job(*job)
+        except Exception as e:
+            result = (False, str(e))
+        conn.send(result)
+    conn.close()
+
+
+class _Worker:
+    """A worker process with its own pipe and at most one running job"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job: Optional[ConversionJob] = None
+        self.started = 0.0
+        self.deadline = 0.0
+
+    def submit(self, job: ConversionJob, timeout: Optional[float]):
+        job.attempts += 1
+        self.job = job
+        self.started = time.perf_counter()
+        self.deadline = self.started + timeout if timeout else float('inf')
+        self.conn.send((job.format_type, job.input_file, job.output_file))
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(2)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(2)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+
+
+class ConversionPool:
+    """
+    Convert files in parallel, one job per worker process at a time
+
+    Each job runs in a long-lived worker process. A job that exceeds the
+    timeout, or whose worker crashes (e.g. a hung Office COM call or a
+    segfault in a native library), only costs that job: the worker is
+    killed and replaced and the job is retried up to `retries` times.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = 600,
+                 retries: int = 1):
+        """
+        Args:
+            workers: Worker processes (None = CPU count)
+            timeout: Seconds a single conversion may take (None = no limit)
+            retries: Extra attempts for a failed, timed-out or crashed job
+        """
+        self.logger = get_logger()
+        self.workers = workers or multiprocessing.cpu_count() or 1
+        self.timeout = timeout
+        self.retries = retries
+        # Spawned workers do not inherit the GUI's threads or COM state
+        self._context = multiprocessing.get_context("spawn")
+
+    def run(self, jobs: List[ConversionJob],
+            cancelled: Optional[Callable[[], bool]] = None) -> Iterator[ConversionResult]:
+        """
+        Run jobs and yield each result as soon as it is final
+
+        Args:
+            jobs: Jobs to run
+            cancelled: Called every CANCEL_POLL_SECONDS while jobs run (a GUI
+                can process its events there); when it returns True the
+                workers are stopped and the remaining jobs dropped
+
+        Yields:
+            ConversionResult per job, in completion order
+        """
+        queue = list(reversed(jobs))
+        workers: List[_Worker] = []
+        try:
+            for _ in range(min(self.workers, len(queue))):
+                workers.append(_Worker(self._context))
+
+            while queue or any(w.job for w in workers):
+                if cancelled and cancelled():
+                    unfinished = len(queue) + sum(1 for w in workers if w.job)
+                    self.logger.info(f"Conversion cancelled, {unfinished} job(s) not finished")
+                    return
+
+                for worker in workers:
+                    if worker.job is None and queue:
+                        worker.submit(queue.pop(), self.timeout)
+
+                busy = [w for w in workers if w.job]
+                now = time.perf_counter()
+                wait_for = max(0.0, min(w.deadline for w in busy) - now)
+                if cancelled:
+                    wait_for = min(wait_for, CANCEL_POLL_SECONDS)
+                ready = wait([w.conn for w in busy] + [w.process.sentinel for w in busy],
+                             timeout=None if wait_for == float('inf') else wait_for)
+
+                for index, worker in enumerate(workers):
+                    job = worker.job
+                    if job is None:
+                        continue
+
+                    error = None
+                    success = False
+                    replace = False
+                    if worker.conn in ready:
+                        try:
+                            success, error = worker.conn.recv()
+                        except (EOFError, OSError):
+                            error = f"worker exited with code {worker.process.exitcode}"
+                            replace = True
+                    elif worker.process.sentinel in ready:
+                        worker.process.join()
+                        error = f"worker exited with code {worker.process.exitcode}"
+                        replace = True
+                    elif time.perf_counter() >= worker.deadline:
+                        error = f"timed out after {self.timeout:g}s"
+                        replace = True
+                    else:
+                        continue
+
+                    job.duration += time.perf_counter() - worker.started
+                    worker.job = None
+                    if replace:
+                        worker.kill()
+                        workers[index] = _Worker(self._context)
+                        # Drop the partial output of the killed conversion
+                        Path(job.output_file).unlink(missing_ok=True)
+
+                    if not success and job.attempts <= self.retries:
+                        self.logger.warning(
+                            f"Conversion of {job.input_file} failed ({error}), retrying"
+                        )
+                        queue.append(job)
+                        continue
+
+                    yield ConversionResult(job.input_file, job.output_file, success,
+                                           error, job.duration, job.attempts)
+        finally:
+            for worker in workers:
+                if worker.job is None:
+                    worker.stop()
+                else:
+                    # Stopped early (e.g. the batch was cancelled)
+                    worker.kill()
+                    Path(worker.job.output_file).unlink(missing_ok=True)
@@ -0,0 +1,335 @@
+"""
+Document Session - the single open document shared by the viewer and all actions
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set
+from src.pdf_engine.pdf_core import PDFCore, DEFAULT_MAX_PAGES_MEMORY, DEFAULT_MAX_DISPLAY_LISTS
+from src.pdf_engine.undo_journal import UndoJournal, DEFAULT_UNDO_MEMORY_MB
+from src.utilities.logger import get_logger
+
+
+# Listener signature: (revision, changed pages or None when the page structure changed)
+SessionListener = Callable[[int, Optional[Set[int]]], None]
+
+
+class DocumentSession:
+    """
+    Owns the open fitz.Document
+
+    Actions change the document in memory through edit() instead of
+    re-opening and re-saving the file. Every edit bumps the revision and
+    records which pages changed, so views only re-render those pages.
+    Edits are journaled and can be undone page by page. The file on disk
+    is written by save() alone.
+    """
+
+    def __init__(self, max_pages_memory: int = DEFAULT_MAX_PAGES_MEMORY,
+                 undo_memory_mb: int = DEFAULT_UNDO_MEMORY_MB,
+                 max_display_lists: int = DEFAULT_MAX_DISPLAY_LISTS):
+        """
+        Args:
+            max_pages_memory: Page objects kept in memory at most
+            undo_memory_mb: Memory the undo history may use
+            max_display_lists: Page display lists kept in memory at most
+        """
+        self.logger = get_logger()
+        self.core = PDFCore(max_pages_memory=max_pages_memory,
+                            max_display_lists=max_display_lists)
+        self.journal = UndoJournal(max_bytes=undo_memory_mb * 1024 * 1024)
+        # revision counts changes (undo and redo included); state identifies
+        # the content, so undoing back to the saved state is not a change
+        self.revision = 0
+        self.state = 0
+        self.saved_state = 0
+        self.dirty_pages: Set[int] = set()
+        self.structure_changed = False
+        self._listeners: List[SessionListener] = []
+        self._snapshot: Optional[str] = None
+        self._snapshot_revision = -1
+
+    @property
+    def document(self):
+        """Open fitz.Document, or None"""
+        return self.core.document
+
+    @property
+    def file_path(self) -> Optional[str]:
+        """Path of the file on disk, or None"""
+        return str(self.core.file_path) if self.core.file_path else None
+
+    @property
+    def is_modified(self) -> bool:
+        """Whether there are changes that have not been saved"""
+        return self.document is not None and self.state != self.saved_state
+
+    def add_listener(self, listener: SessionListener):
+        """Call listener(revision, pages) after every change"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: SessionListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def open(self, file_path: str, large_file: Optional[bool] = None) -> bool:
+        """
+        Open a file, replacing the current document
+
+        Args:
+            file_path: Path to PDF file
+            large_file: Use large-file mode (None = decide by file size)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        self.close()
+        if not self.core.open(file_path, large_file=large_file):
+            return False
+        self._reset_state()
+        return True
+
+    def attach(self, document, file_path: str, large_file: Optional[bool] = None):
+        """
+        Take over a document opened elsewhere, replacing the current one
+
+        Args:
+            document: Open fitz.Document
+            file_path: Path the document was opened from
+            large_file: Use large-file mode (None = decide by file size)
+        """
+        self.close()
+        self.core.attach(document, file_path, large_file=large_file)
+        self._reset_state()
+
+    def close(self):
+        """Close the document, discarding unsaved changes"""
+        self.core.close()
+        self._drop_snapshot()
+        self._reset_state()
+
+    def reload(self) -> bool:
+        """
+        Re-open the file from disk, discarding every unsaved change
+
+        Returns:
+            True if successful, False otherwise (the document is then kept)
+        """
+        file_path = self.file_path
+        if self.document is None or file_path is None or self.document.needs_pass:
+            # A password-protected file would have to be unlocked again
+            return False
+        large_file = self.core.large_file
+        self.close()
+        if not self.core.open(file_path, large_file=large_file):
+            return False
+        self._notify(None)
+        return True
+
+    def _reset_state(self):
+        self.revision = 0
+        self.state = 0
+        self.saved_state = 0
+        self.dirty_pages.clear()
+        self.structure_changed = False
+        self.journal.clear()
+
+    def page(self, page_num: int):
+        """fitz.Page from the shared page cache"""
+        return self.core.get_page(page_num)
+
+    @contextmanager
+    def edit(self, pages: Optional[Iterable[int]] = None, label: str = "Edit"):
+        """
+        Change the document in place
+
+        Usage:
+            with session.edit([page_num], "Add text") as doc:
+                session.page(page_num).insert_text(...)
+
+        The change is recorded (and listeners notified) even if the block
+        raises, since part of it may already have been applied.
+
+        Args:
+            pages: Pages that change, or None when pages are inserted,
+                deleted or reordered
+            label: Name of the change for Undo/Redo
+
+        Yields:
+            The open fitz.Document
+        """
+        if self.document is None:
+            raise ValueError("No document is open")
+        changed = None if pages is None else set(pages)
+        entry = None
+        try:
+            entry = self.journal.begin(self.document, changed, label, self.state)
+        except Exception as e:
+            self.logger.warning(f"Undo snapshot failed, history cleared: {e}")
+            self.journal.clear()
+        try:
+            yield self.document
+        finally:
+            self._changed(changed, self.revision + 1)
+            if entry is not None:
+                try:
+                    self.journal.commit(self.document, entry, self.state)
+                except Exception as e:
+                    self.logger.warning(f"Undo snapshot failed, history cleared: {e}")
+                    self.journal.clear()
+            self._notify(changed)
+
+    def mark_changed(self, pages: Optional[Iterable[int]] = None):
+        """
+        Record a change made to the document outside edit() and notify listeners
+
+        Such a change is not journaled, so the undo history is cleared.
+
+        Args:
+            pages: Pages that changed, or None for a structural change
+        """
+        changed = None if pages is None else set(pages)
+        self.journal.clear()
+        self._changed(changed, self.revision + 1)
+        self._notify(changed)
+
+    def _changed(self, changed: Optional[Set[int]], state: int):
+        """Bump the revision, move to state and drop cached pages"""
+        self.revision += 1
+        self.state = state
+        if changed is None:
+            self.structure_changed = True
+            self.core.reset_pages()
+        else:
+            self.dirty_pages.update(changed)
+            self.core.forget_pages(changed)
+
+    def can_undo(self) -> bool:
+        return self.document is not None and self.journal.can_undo()
+
+    def can_redo(self) -> bool:
+        return self.document is not None and self.journal.can_redo()
+
+    def undo(self) -> Optional[str]:
+        """
+        Revert the last edit, touching only the pages it changed
+
+        Returns:
+            Label of the reverted edit, or None if there was nothing to undo
+        """
+        if self.document is None:
+            return None
+        entry = self.journal.undo(self.document)
+        if entry is None:
+            return None
+        self._changed(entry.pages, entry.state_before)
+        self._notify(entry.pages)
+        return entry.label
+
+    def redo(self) -> Optional[str]:
+        """
+        Re-apply the last undone edit
+
+        Returns:
+            Label of the re-applied edit, or None if there was nothing to redo
+        """
+        if self.document is None:
+            return None
+        entry = self.journal.redo(self.document)
+        if entry is None:
+            return None
+        self._changed(entry.pages, entry.state_after)
+        self._notify(entry.pages)
+        return entry.label
+
+    def _notify(self, changed: Optional[Set[int]]):
+        for listener in list(self._listeners):
+            try:
+                listener(self.revision, changed)
+            except Exception as e:
+                self.logger.error(f"Error in document change listener: {e}")
+
+    def save(self, file_path: Optional[str] = None) -> bool:
+        """
+        Write the document to disk
+
+        Saving to the open file appends the changes incrementally when the
+        document allows it; otherwise the file is rewritten through a
+        temporary file and re-opened.
+
+        Args:
+            file_path: Target path (None = the open file)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.document is None:
+            return False
+        try:
+            current = self.file_path
+            target = file_path or current
+            same_file = current is not None and os.path.abspath(target) == os.path.abspath(current)
+
+            reopened = False
+            if same_file and self.document.can_save_incrementally():
+                self.document.saveIncr()
+            elif same_file:
+                fd, temp_path = tempfile.mkstemp(suffix='.pdf', dir=os.path.dirname(os.path.abspath(target)))
+                os.close(fd)
+                self.document.save(temp_path, garbage=4, deflate=True, clean=True)
+                self._reopen_after(lambda: shutil.move(temp_path, target), target)
+                reopened = True
+            else:
+                self.document.save(target, garbage=4, deflate=True, clean=True)
+                self._reopen_after(None, target)
+                reopened = True
+
+            self.saved_state = self.state
+            self.dirty_pages.clear()
+            self.structure_changed = False
+            self.logger.info(f"Saved {target} (revision {self.revision})")
+            if reopened:
+                # Page objects belong to the new document now
+                self._notify(None)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving document: {e}")
+            return False
+
+    def _reopen_after(self, replace_file: Optional[Callable[[], None]], file_path: str):
+        """Close the document, run replace_file and open file_path"""
+        large_file = self.core.large_file
+        # Object numbers change when the file is rewritten
+        self.journal.clear()
+        self.core.close()
+        if replace_file is not None:
+            replace_file()
+        if not self.core.open(file_path, large_file=large_file):
+            raise IOError(f"Could not re-open {file_path}")
+
+    def input_file(self) -> Optional[str]:
+        """
+        A file with the current content, for tools that read from disk
+
+        Returns the open file when there are no unsaved changes, otherwise
+        a temporary copy of the current revision (written once per revision).
+        """
+        if not self.is_modified:
+            return self.file_path
+        if self._snapshot_revision != self.revision:
+            self._drop_snapshot()
+            # Same file name as the original, so derived output names match
+            snapshot_dir = tempfile.mkdtemp(prefix='nexpro_session_')
+            self._snapshot = os.path.join(snapshot_dir, Path(self.file_path or 'document.pdf').name)
+            self.document.save(self._snapshot, garbage=1, deflate=True)
+            self._snapshot_revision = self.revision
+        return self._snapshot
+
+    def _drop_snapshot(self):
+        if self._snapshot:
+            shutil.rmtree(os.path.dirname(self._snapshot), ignore_errors=True)
+        self._snapshot = None
+        self._snapshot_revision = -1
@@ -0,0 +1,182 @@
+"""
+Image Embedding - Prepare image files as PDF image XObjects
+
+JPEG and JPEG 2000 files are embedded as-is (DCTDecode / JPXDecode); only
+their headers are read. Other formats, and JPEGs that should be downscaled
+or recompressed, are decoded once and re-encoded.
+"""
+
+import io
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+from PIL import Image
+
+
+# Raw colour modes that map directly onto PDF colour spaces
+_COLOR_SPACES = {'L': 'DeviceGray', 'RGB': 'DeviceRGB', 'CMYK': 'DeviceCMYK'}
+
+# EXIF orientation -> (a, b, c, d) of the matrix that maps the unit square
+# of the stored image onto the upright unit square
+_ORIENTATIONS = {
+    1: (1, 0, 0, 1), 2: (-1, 0, 0, 1), 3: (-1, 0, 0, -1), 4: (1, 0, 0, -1),
+    5: (0, -1, -1, 0), 6: (0, -1, 1, 0), 7: (0, 1, 1, 0), 8: (0, 1, -1, 0),
+}
+
+
+@dataclass
+class ImageHeader:
+    """What is known about an image file without decoding it"""
+    path: str
+    format: Optional[str]
+    mode: str
+    width: int
+    height: int
+    orientation: int = 1
+    adobe_cmyk: bool = False
+
+    @property
+    def passthrough(self) -> bool:
+        """Whether the file can be embedded without decoding"""
+        if self.format == 'JPEG2000':
+            return True
+        return self.format == 'JPEG' and self.mode in _COLOR_SPACES
+
+    @property
+    def upright_size(self) -> Tuple[int, int]:
+        """Pixel size after applying the EXIF orientation"""
+        if self.orientation in (5, 6, 7, 8):
+            return self.height, self.width
+        return self.width, self.height
+
+
+@dataclass
+class EncodedImage:
+    """Image data ready to be written as an XObject"""
+    width: int
+    height: int
+    data: bytes
+    filter_name: Optional[str]
+    color_space: Optional[str]
+    decode: Optional[str] = None
+    alpha: Optional[bytes] = None  # Flate-compressed 8-bit soft mask
+    bits: int = 8
+    decode_parms: Optional[str] = None
+
+
+def read_image_header(path: str) -> ImageHeader:
+    """
+    Read size, mode and orientation of an image file
+
+    PIL only parses the header on open; pixel data is not decoded.
+
+    Args:
+        path: Image file path
+
+    Returns:
+        ImageHeader
+    """
+    with Image.open(path) as img:
+        orientation = 1
+        try:
+            orientation = img.getexif().get(0x0112, 1)
+        except Exception:
+            pass
+        if orientation not in _ORIENTATIONS:
+            orientation = 1
+        return ImageHeader(
+            path=str(path),
+            format=img.format,
+            mode=img.mode,
+            width=img.width,
+            height=img.height,
+            orientation=orientation,
+            adobe_cmyk=img.mode == 'CMYK' and 'adobe' in img.info,
+        )
+
+
+def passthrough_image(header: ImageHeader) -> EncodedImage:
+    """Embed a JPEG or JPEG 2000 file unchanged"""
+    data = Path(header.path).read_bytes()
+    if header.format == 'JPEG2000':
+        # Colour space and bit depth come from the JPX stream itself
+        return EncodedImage(header.width, header.height, data, "JPXDecode", None)
+
+    # Adobe CMYK JPEGs store inverted values
+    decode = "[1 0 1 0 1 0 1 0]" if header.adobe_cmyk else None
+    return EncodedImage(header.width, header.height, data, "DCTDecode",
+                        _COLOR_SPACES[header.mode], decode)
+
+
+def encode_image(path: str, max_pixels: Optional[int] = None,
+                 jpeg_quality: Optional[int] = None) -> EncodedImage:
+    """
+    Decode an image and encode it for embedding
+
+    Picklable, so it can run in a worker process.
+
+    Args:
+        path: Image file path
+        max_pixels: Downscale so that the longer side is at most this many pixels
+        jpeg_quality: Re-encode as JPEG with this quality; otherwise the
+            pixels are stored losslessly (Flate)
+
+    Returns:
+        EncodedImage
+    """
+    with Image.open(path) as img:
+        if max_pixels and img.format == 'JPEG':
+            # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while decoding
+            img.draft(img.mode, (max_pixels, max_pixels))
+
+        alpha = None
+        if img.mode == 'P' and 'transparency' in img.info:
+            img = img.convert('RGBA')
+        if img.mode in ('RGBA', 'LA', 'PA'):
+            alpha = img.getchannel('A')
+            img = img.convert('RGB' if img.mode != 'LA' else 'L')
+        elif img.mode not in _COLOR_SPACES:
+            img = img.convert('L' if img.mode in ('1', 'I', 'I;16', 'F') else 'RGB')
+
+        if max_pixels and max(img.size) > max_pixels:
+            img.thumbnail((max_pixels, max_pixels), Image.LANCZOS)
+            if alpha is not None:
+                alpha = alpha.resize(img.size, Image.LANCZOS)
+
+        width, height = img.size
+        color_space = _COLOR_SPACES[img.mode]
+        decode = None
+
+        if jpeg_quality:
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=jpeg_quality, optimize=True)
+            data, filter_name = buffer.getvalue(), "DCTDecode"
+            if img.mode == 'CMYK':
+                # PIL writes CMYK JPEGs with an Adobe marker (inverted values)
+                decode = "[1 0 1 0 1 0 1 0]"
+        else:
+            data, filter_name = zlib.compress(img.tobytes(), 6), "FlateDecode"
+
+        alpha_data = zlib.compress(alpha.tobytes(), 6) if alpha is not None else None
+        return EncodedImage(width, height, data, filter_name, color_space, decode, alpha_data)
+
+
+def placement_matrix(header: ImageHeader, x: float, y: float,
+                     width: float, height: float) -> Tuple[float, ...]:
+    """
+    Content-stream matrix drawing an image upright into a rectangle
+
+    Args:
+        header: Image header (for the EXIF orientation)
+        x, y: Lower-left corner of the rectangle in PDF user space
+        width, height: Rectangle size
+
+    Returns:
+        (a, b, c, d, e, f) for the `cm` operator
+    """
+    a, b, c, d = _ORIENTATIONS[header.orientation]
+    # Translate the flipped/rotated unit square back onto [0, 1] x [0, 1]
+    e = -min(0, a) - min(0, c)
+    f = -min(0, b) - min(0, d)
+    return (a * width, b * height, c * width, d * height, e * width + x, f * height + y)
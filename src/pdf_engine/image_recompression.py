@@ -0,0 +1,918 @@
+"""
+Image Recompression - Re-encode embedded PDF images, optionally to a target file size
+
+Each image gets the codec that suits its content, decided from the
+histogram of a small nearest-neighbour copy: CCITT G4 for black-and-white
+scans, lossless indexed Flate for line art with few colours, and JPEG
+(grayscale where the image has no colour) for photos.
+
+For a target size, a few representative images are decoded once and
+sample-encoded at candidate settings. The bytes per output pixel they
+produce predict the size of every other image, so quality and resolution
+are chosen by binary search on the model; the document itself is only
+re-encoded once, for the final pass.
+"""
+
+import io
+import os
+import time
+import zlib
+import random
+import tempfile
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
+import fitz  # PyMuPDF
+from PIL import Image, ImageChops
+from src.pdf_engine.image_embedding import EncodedImage
+from src.utilities.logger import get_logger
+from src.utilities.profiler import record_pages
+
+
+# Images below these sizes (icons, logos) are not worth recompressing
+MIN_IMAGE_PIXELS = 2500
+MIN_IMAGE_BYTES = 5000
+
+# Longer side of the copy the codec choice is made from
+ANALYSIS_SIZE = 256
+# Images with at most this many distinct colours (in the analysis copy) are line art
+LINE_ART_COLORS = 64
+# Share of pixels that must lie clearly on one side of the black/white
+# threshold, and minimum distance between the two levels, for a bilevel scan
+BILEVEL_SHARE = 0.9
+BILEVEL_MARGIN = 48
+BILEVEL_CONTRAST = 96
+# The share must also hold (less strictly) in every cell of a grid over
+# the analysis copy, so a photo on an otherwise white page is not thresholded
+BILEVEL_GRID = 8
+BILEVEL_CELL_SHARE = 0.75
+# Channel spread above which a pixel counts as coloured, and the share of
+# coloured pixels above which an image is not treated as grayscale
+CHROMA_THRESHOLD = 24
+COLOR_SHARE = 0.01
+
+# Codecs chosen by choose_codec()
+BILEVEL, LINE_ART, PHOTO = "bilevel", "line_art", "photo"
+
+# Representative images sample-encoded to build the size model
+SAMPLE_IMAGES = 8
+
+# Resolutions tried for a target size, best first (None = keep resolution)
+TARGET_MAX_SIZES = (None, 2400, 2000, 1600, 1400, 1200, 1000, 800, 600)
+# Quality kept while the resolution can still be lowered
+TARGET_MIN_QUALITY = 40
+TARGET_MAX_QUALITY = 90
+# Quality range once the lowest resolution is reached
+TARGET_LAST_RESORT_QUALITY = 10
+
+# Share of the target the prediction may use, so that a small model
+# error does not cost another pass
+TARGET_HEADROOM = 0.97
+# Re-encodes when the written file still misses the target
+MAX_PASSES = 3
+
+# Randomly chosen images / pages encoded for a compression preview
+PREVIEW_SAMPLE_IMAGES = 4
+PREVIEW_SAMPLE_PAGES = 4
+# Rough throughput for parsing, merging and saving the rest of the file
+PREVIEW_IO_BYTES_PER_SECOND = 40 * 1024 * 1024
+
+# Encoded image file data, or raw (mode, width, height, samples)
+ImageData = Union[bytes, Tuple[str, int, int, bytes]]
+
+
+def load_image(doc, xref: int) -> Optional[ImageData]:
+    """
+    Image data of an XObject, in the cheapest form to decode again
+
+    JPEG and JPEG 2000 streams without a /Decode array are returned as
+    they are stored; other images are decoded by MuPDF into raw samples
+    (extract_image() would encode them as PNG first).
+
+    Args:
+        doc: Open fitz.Document
+        xref: Image XObject
+
+    Returns:
+        Encoded file data or (mode, width, height, samples), or None
+    """
+    filters = doc.xref_get_key(xref, "Filter")[1]
+    # Other decoders ignore the PDF /Decode array (e.g. an inverted CMYK
+    # scan), so images that have one are decoded by MuPDF, which applies it
+    has_decode = doc.xref_get_key(xref, "Decode")[0] != "null"
+    if ("/DCTDecode" in filters or "/JPXDecode" in filters) and not has_decode:
+        base = doc.extract_image(xref)
+        return base["image"] if base and base.get("image") else None
+
+    pix = fitz.Pixmap(doc, xref)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return ('L' if pix.n == 1 else 'RGB', pix.width, pix.height, bytes(pix.samples))
+
+
+def prepare_image(image: ImageData,
+                  max_size: Optional[int] = None) -> Tuple[Image.Image, bool]:
+    """
+    Decode image data into a mode JPEG can store
+
+    Args:
+        image: Encoded file data or (mode, width, height, samples)
+        max_size: Pixel dimension the image will be downscaled to; JPEGs
+            are then decoded at the nearest larger 1/2, 1/4 or 1/8 scale
+
+    Returns:
+        (PIL image in 'RGB' or 'L' mode, whether it is grayscale)
+    """
+    if isinstance(image, tuple):
+        mode, width, height, samples = image
+        return Image.frombytes(mode, (width, height), samples), mode == 'L'
+
+    pil_img = Image.open(io.BytesIO(image))
+    if max_size and pil_img.format == 'JPEG':
+        pil_img.draft(pil_img.mode, (max_size, max_size))
+
+    # Convert palette/indexed/CMYK/RGBA to appropriate mode
+    if pil_img.mode in ('P', 'PA'):
+        return pil_img.convert('RGBA').convert('RGB'), False
+    if pil_img.mode in ('RGBA', 'LA'):
+        # Flatten alpha onto white background
+        bg = Image.new('RGB', pil_img.size, (255, 255, 255))
+        bg.paste(pil_img, mask=pil_img.split()[-1])
+        return bg, False
+    if pil_img.mode == 'L':
+        # Keep grayscale as-is for JPEG (saves space)
+        return pil_img, True
+    if pil_img.mode != 'RGB':
+        return pil_img.convert('RGB'), False
+    return pil_img, False
+
+
+def downscale(pil_img: Image.Image, max_size: Optional[int]) -> Image.Image:
+    """Shrink an image so its longer side is at most max_size pixels"""
+    max_dim = max(pil_img.width, pil_img.height)
+    if not max_size or max_dim <= max_size:
+        return pil_img
+    ratio = max_size / max_dim
+    new_w = max(1, int(pil_img.width * ratio))
+    new_h = max(1, int(pil_img.height * ratio))
+    return pil_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+
+def jpeg_bytes(pil_img: Image.Image, quality: int) -> bytes:
+    """Encode an image as JPEG"""
+    buf = io.BytesIO()
+    pil_img.save(buf, format='JPEG', quality=max(1, min(95, quality)), optimize=True)
+    return buf.getvalue()
+
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """Gray level that best separates a 256-bin histogram into two classes"""
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    best_level, best_variance = 127, -1.0
+    weight = weighted = 0
+    for level, count in enumerate(histogram):
+        weight += count
+        if not weight or weight == total:
+            continue
+        weighted += level * count
+        dark_mean = weighted / weight
+        light_mean = (weighted_total - weighted) / (total - weight)
+        variance = weight * (total - weight) * (dark_mean - light_mean) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def _clear_share(histogram: List[int], threshold: int) -> float:
+    """Share of pixels clearly on one side of the black/white threshold"""
+    total = sum(histogram)
+    clear = sum(histogram[:max(0, threshold - BILEVEL_MARGIN)]) + \
+        sum(histogram[threshold + BILEVEL_MARGIN:])
+    return clear / total if total else 1.0
+
+
+def _bilevel_cells(gray: Image.Image, threshold: int) -> bool:
+    """Whether every cell of a BILEVEL_GRID grid over the image is black and white"""
+    for row in range(BILEVEL_GRID):
+        for column in range(BILEVEL_GRID):
+            box = (gray.width * column // BILEVEL_GRID, gray.height * row // BILEVEL_GRID,
+                   gray.width * (column + 1) // BILEVEL_GRID, gray.height * (row + 1) // BILEVEL_GRID)
+            if box[2] > box[0] and box[3] > box[1] and \
+                    _clear_share(gray.crop(box).histogram(), threshold) < BILEVEL_CELL_SHARE:
+                return False
+    return True
+
+
+def choose_codec(pil_img: Image.Image) -> Tuple[str, bool, int]:
+    """
+    Pick a codec from the histogram of a downsampled copy
+
+    The copy is taken with nearest-neighbour sampling so it has exactly
+    the colours and gray levels of the original.
+
+    Args:
+        pil_img: Image in 'RGB' or 'L' mode
+
+    Returns:
+        (BILEVEL, LINE_ART or PHOTO, whether the image has no colour,
+        black/white threshold)
+    """
+    sample = pil_img
+    if max(pil_img.size) > ANALYSIS_SIZE:
+        scale = ANALYSIS_SIZE / max(pil_img.size)
+        sample = pil_img.resize((max(1, int(pil_img.width * scale)),
+                                 max(1, int(pil_img.height * scale))),
+                                Image.Resampling.NEAREST)
+    pixels = sample.width * sample.height
+
+    monochrome = sample.mode == 'L'
+    if not monochrome:
+        red, green, blue = sample.split()
+        spread = ImageChops.subtract(
+            ImageChops.lighter(ImageChops.lighter(red, green), blue),
+            ImageChops.darker(ImageChops.darker(red, green), blue),
+        )
+        colored = sum(spread.histogram()[CHROMA_THRESHOLD:])
+        monochrome = colored <= pixels * COLOR_SHARE
+
+    threshold = 127
+    if monochrome:
+        gray = sample.convert('L')
+        histogram = gray.histogram()
+        threshold = _otsu_threshold(histogram)
+        dark = histogram[:threshold + 1]
+        light = histogram[threshold + 1:]
+        if sum(dark) and sum(light):
+            dark_mean = sum(level * count for level, count in enumerate(dark)) / sum(dark)
+            light_mean = sum((threshold + 1 + level) * count
+                             for level, count in enumerate(light)) / sum(light)
+            if _clear_share(histogram, threshold) >= BILEVEL_SHARE and \
+                    light_mean - dark_mean >= BILEVEL_CONTRAST and _bilevel_cells(gray, threshold):
+                return BILEVEL, True, threshold
+
+    if sample.getcolors(LINE_ART_COLORS) is not None:
+        return LINE_ART, monochrome, threshold
+    return PHOTO, monochrome, threshold
+
+
+def encode_bilevel(gray: Image.Image, threshold: int) -> EncodedImage:
+    """
+    Threshold a grayscale image to black and white and encode it as CCITT G4
+
+    Falls back to 1-bit Flate when Pillow is built without libtiff.
+    """
+    bw = gray.point([0] * (threshold + 1) + [255] * (255 - threshold), '1')
+    width, height = bw.size
+    try:
+        buf = io.BytesIO()
+        # One strip: G4 strips cannot be concatenated
+        bw.save(buf, format='TIFF', compression='group4', tiffinfo={278: height})
+        tiff = Image.open(io.BytesIO(buf.getvalue()))
+        (offset,), (length,) = tiff.tag_v2[273], tiff.tag_v2[279]
+        data = buf.getvalue()[offset:offset + length]
+        # Pillow writes 1-bit images as min-is-black
+        black_is_1 = str(tiff.tag_v2.get(262, 1) == 1).lower()
+        return EncodedImage(width, height, data, "CCITTFaxDecode", "DeviceGray", bits=1,
+                            decode_parms=f"<</K -1/Columns {width}/Rows {height}"
+                                         f"/BlackIs1 {black_is_1}>>")
+    except Exception:
+        return EncodedImage(width, height, zlib.compress(bw.tobytes(), 9), "FlateDecode",
+                            "DeviceGray", bits=1)
+
+
+def encode_line_art(pil_img: Image.Image, max_size: Optional[int]) -> Optional[EncodedImage]:
+    """
+    Encode an image with few colours losslessly as an indexed Flate image
+
+    Returns:
+        EncodedImage, or None if the image has more than 256 colours
+    """
+    rgb = pil_img.convert('RGB')
+    colors = rgb.getcolors(256)
+    if colors is None:
+        return None
+    palette = b"".join(bytes(color) for _, color in colors)
+    palette_img = Image.new('P', (1, 1))
+    palette_img.putpalette(palette)
+
+    max_dim = max(rgb.width, rgb.height)
+    if max_size and max_dim > max_size:
+        ratio = max_size / max_dim
+        rgb = rgb.resize((max(1, int(rgb.width * ratio)), max(1, int(rgb.height * ratio))),
+                         Image.Resampling.BOX)
+    # Map every pixel back onto the original colours
+    indexed = rgb.quantize(palette=palette_img, dither=Image.Dither.NONE)
+    color_space = f"[/Indexed/DeviceRGB {len(colors) - 1}<{palette.hex()}>]"
+    return EncodedImage(indexed.width, indexed.height, zlib.compress(indexed.tobytes(), 9),
+                        "FlateDecode", color_space)
+
+
+def encode_photo(pil_img: Image.Image, monochrome: bool, quality: int,
+                 max_size: Optional[int]) -> EncodedImage:
+    """Downscale and encode an image as JPEG, in grayscale if it has no colour"""
+    if monochrome and pil_img.mode != 'L':
+        pil_img = pil_img.convert('L')
+    pil_img = downscale(pil_img, max_size)
+    color_space = "DeviceGray" if pil_img.mode == 'L' else "DeviceRGB"
+    return EncodedImage(pil_img.width, pil_img.height, jpeg_bytes(pil_img, quality),
+                        "DCTDecode", color_space)
+
+
+def encode_prepared(pil_img: Image.Image, quality: int, max_size: Optional[int],
+                    codec: Optional[Tuple[str, bool, int]] = None) -> EncodedImage:
+    """
+    Encode a decoded image with the codec that suits it
+
+    Args:
+        pil_img: Image in 'RGB' or 'L' mode
+        quality: JPEG quality for photos
+        max_size: Maximum pixel dimension (None = keep resolution)
+        codec: Result of choose_codec(), if already known
+
+    Returns:
+        EncodedImage
+    """
+    kind, monochrome, threshold = codec or choose_codec(pil_img)
+    if kind == BILEVEL:
+        # Downscale in gray so edges are smoothed before thresholding
+        return encode_bilevel(downscale(pil_img.convert('L'), max_size), threshold)
+    if kind == LINE_ART:
+        encoded = encode_line_art(pil_img, max_size)
+        if encoded is not None:
+            return encoded
+    return encode_photo(pil_img, monochrome, quality, max_size)
+
+
+def reencode_image(image: ImageData, current_bytes: int, quality: int,
+                   max_size: Optional[int]) -> Optional[EncodedImage]:
+    """
+    Re-encode one image with the codec that suits its content
+
+    Picklable, so it can run in a worker process.
+
+    Args:
+        image: Image data as returned by load_image()
+        current_bytes: Size of the stream the image is stored in now
+        quality: JPEG quality for photos
+        max_size: Maximum pixel dimension (None = keep resolution)
+
+    Returns:
+        EncodedImage, or None if the result is not smaller than the
+        current stream
+    """
+    pil_img, _ = prepare_image(image, max_size)
+    encoded = encode_prepared(pil_img, quality, max_size)
+    if len(encoded.data) >= current_bytes:
+        return None
+    return encoded
+
+
+def replace_image(doc, xref: int, encoded: EncodedImage):
+    """Write a re-encoded image into an image XObject"""
+    color_space = encoded.color_space
+    doc.update_stream(xref, encoded.data, compress=0)
+    doc.xref_set_key(xref, "Filter", "/" + encoded.filter_name)
+    doc.xref_set_key(xref, "ColorSpace",
+                     color_space if color_space.startswith("[") else "/" + color_space)
+    doc.xref_set_key(xref, "BitsPerComponent", str(encoded.bits))
+    doc.xref_set_key(xref, "Width", str(encoded.width))
+    doc.xref_set_key(xref, "Height", str(encoded.height))
+    doc.xref_set_key(xref, "DecodeParms", encoded.decode_parms or "null")
+    # load_image() decodes images with a /Decode array through MuPDF,
+    # which applies it, so the new data needs none
+    doc.xref_set_key(xref, "Decode", "null")
+
+
+def candidate_images(doc) -> List[Tuple[int, int, int, int]]:
+    """
+    Images worth recompressing: used by a page, not a stencil mask, not tiny
+
+    Returns:
+        (xref, width, height, current stream bytes) per image, each once
+    """
+    images = []
+    seen = set()
+    for page in doc:
+        for img_info in page.get_images(full=True):
+            xref = img_info[0]
+            if xref in seen:
+                continue
+            seen.add(xref)
+            if doc.xref_get_key(xref, "ImageMask")[1] == "true":
+                continue
+            width, height = img_info[2], img_info[3]
+            current = len(doc.xref_stream_raw(xref) or b"")
+            if width * height < MIN_IMAGE_PIXELS or current < MIN_IMAGE_BYTES:
+                continue
+            images.append((xref, width, height, current))
+    return images
+
+
+def reencode_images(doc, images: List[Tuple[int, int, int, int]], quality: int,
+                    max_size: Optional[int], workers: Optional[int] = None,
+                    logger=None) -> int:
+    """
+    Re-encode images in place, in parallel when there are several
+
+    Images are extracted one at a time and at most two per worker are in
+    flight, so memory stays bounded by the worker count.
+
+    Args:
+        doc: Open fitz.Document (modified in place)
+        images: Images to re-encode, as returned by candidate_images()
+        quality: JPEG quality
+        max_size: Maximum pixel dimension (None = keep resolution)
+        workers: Worker processes (None = CPU count, 0/1 = in this process)
+        logger: Logger for skipped images
+
+    Returns:
+        Number of images replaced
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1 and len(images) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    def loaded():
+        for xref, _, _, current in images:
+            try:
+                image = load_image(doc, xref)
+            except Exception as e:
+                if logger:
+                    logger.debug("Skipping image xref %s: %s", xref, e)
+                continue
+            if image:
+                yield xref, image, current
+
+    replaced = 0
+
+    def apply(xref, result):
+        nonlocal replaced
+        try:
+            encoded = result.result() if pool else result
+        except Exception as e:
+            if logger:
+                logger.debug(f"Skipping image xref {xref}: {e}")
+            return
+        if encoded:
+            replace_image(doc, xref, encoded)
+            replaced += 1
+
+    try:
+        pending = deque()
+        for xref, image, current in loaded():
+            if pool:
+                pending.append((xref, pool.submit(reencode_image, image, current,
+                                                  quality, max_size)))
+                while len(pending) > workers * 2:
+                    apply(*pending.popleft())
+            else:
+                try:
+                    apply(xref, reencode_image(image, current, quality, max_size))
+                except Exception as e:
+                    if logger:
+                        logger.debug("Skipping image xref %s: %s", xref, e)
+        while pending:
+            apply(*pending.popleft())
+    finally:
+        if pool:
+            pool.shutdown()
+    return replaced
+
+
+def output_pixels(width: int, height: int, max_size: Optional[int]) -> int:
+    """Pixel count after downscaling to max_size"""
+    max_dim = max(width, height)
+    if max_size and max_dim > max_size:
+        ratio = max_size / max_dim
+        return max(1, int(width * ratio)) * max(1, int(height * ratio))
+    return width * height
+
+
+def predict_image_bytes(images: List[Tuple[int, int, int]], bytes_per_pixel: float,
+                        max_size: Optional[int]) -> int:
+    """
+    Predicted size of re-encoded images
+
+    Args:
+        images: (width, height, current stream bytes) per image
+        bytes_per_pixel: Encoded bytes per output pixel measured on samples
+        max_size: Maximum pixel dimension (None = keep resolution)
+
+    Returns:
+        Total bytes; images that would not shrink keep their current size
+    """
+    return sum(min(current, int(bytes_per_pixel * output_pixels(width, height, max_size)))
+               for width, height, current in images)
+
+
+def render_page_jpeg(page, image_quality: int, max_image_size: int) -> bytes:
+    """
+    Render a page to a JPEG for the page-to-image compression mode
+
+    Args:
+        page: fitz.Page
+        image_quality: JPEG quality
+        max_image_size: Maximum pixel dimension at 72 DPI (scaled with the zoom)
+
+    Returns:
+        JPEG data
+    """
+    # DPI based on quality
+    if image_quality >= 30:
+        zoom = 1.5   # ~108 DPI
+    elif image_quality >= 20:
+        zoom = 1.2   # ~86 DPI
+    else:
+        zoom = 1.0   # 72 DPI
+
+    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=mat, alpha=False)
+    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+    # Downscale if exceeds max
+    img = downscale(img, int(max_image_size * zoom))
+    return jpeg_bytes(img, max(15, image_quality))
+
+
+class SizeModel:
+    """
+    Predicts the compressed file size for a quality / resolution setting
+
+    Each candidate image is predicted from the bytes per output pixel that
+    the sampled images reach at the same setting, each sample encoded with
+    the codec the real pass would pick. Images that would not shrink keep
+    their current size, as in the real pass.
+    """
+
+    def __init__(self, fixed_bytes: int, images: List[Tuple[int, int, int]],
+                 samples: List[Tuple[Image.Image, int]]):
+        """
+        Args:
+            fixed_bytes: File size that does not depend on the candidate images
+            images: (width, height, current stream bytes) per candidate image
+            samples: (decoded image, current stream bytes) per sample
+        """
+        self.fixed_bytes = fixed_bytes
+        self.images = images
+        self.samples = samples
+        self._codecs = [choose_codec(img) for img, _ in samples]
+        # Photos are resized once per resolution and JPEG-encoded per
+        # quality; bilevel and line-art sizes do not depend on quality
+        self._photos = [
+            img.convert('L') if codec[1] and img.mode != 'L' else img
+            for (img, _), codec in zip(samples, self._codecs) if codec[0] == PHOTO
+        ]
+        self._resized: Dict[Optional[int], List[Image.Image]] = {}
+        self._lossless: Dict[Optional[int], int] = {}
+        self._bpp: Dict[Tuple[int, Optional[int]], float] = {}
+
+    def bytes_per_pixel(self, quality: int, max_size: Optional[int]) -> float:
+        """Encoded bytes per output pixel of the samples at a setting"""
+        key = (quality, max_size)
+        if key not in self._bpp:
+            resized = self._resized.get(max_size)
+            if resized is None:
+                # Scale down from the smallest larger version already made
+                larger = [size for size in self._resized
+                          if size is None or (max_size and size > max_size)]
+                source = self._resized[min(larger, key=lambda size: size or float('inf'))] \
+                    if larger else self._photos
+                resized = self._resized[max_size] = [
+                    downscale(img, max_size) for img in source
+                ]
+            if max_size not in self._lossless:
+                self._lossless[max_size] = sum(
+                    len(encode_prepared(img, quality, max_size, codec).data)
+                    for (img, _), codec in zip(self.samples, self._codecs)
+                    if codec[0] != PHOTO
+                )
+            total_bytes = self._lossless[max_size] + \
+                sum(len(jpeg_bytes(img, quality)) for img in resized)
+            total_pixels = sum(output_pixels(img.width, img.height, max_size)
+                               for img, _ in self.samples)
+            self._bpp[key] = total_bytes / max(1, total_pixels)
+        return self._bpp[key]
+
+    def predict(self, quality: int, max_size: Optional[int]) -> int:
+        """Predicted file size at a setting"""
+        bpp = self.bytes_per_pixel(quality, max_size)
+        return self.fixed_bytes + predict_image_bytes(self.images, bpp, max_size)
+
+    def search(self, target_bytes: int) -> Tuple[int, Optional[int], bool]:
+        """
+        Best setting whose predicted size fits the target
+
+        Resolution is kept as long as a quality of at least
+        TARGET_MIN_QUALITY fits; below that, the next lower resolution is
+        tried. At the lowest resolution quality may drop further.
+
+        Returns:
+            (quality, max_size, whether the prediction fits)
+        """
+        for max_size in TARGET_MAX_SIZES:
+            quality = self._highest_quality(target_bytes, max_size,
+                                            TARGET_MIN_QUALITY, TARGET_MAX_QUALITY)
+            if quality is not None:
+                return quality, max_size, True
+
+        max_size = TARGET_MAX_SIZES[-1]
+        quality = self._highest_quality(target_bytes, max_size,
+                                        TARGET_LAST_RESORT_QUALITY, TARGET_MIN_QUALITY - 1)
+        if quality is not None:
+            return quality, max_size, True
+        return TARGET_LAST_RESORT_QUALITY, max_size, False
+
+    def _highest_quality(self, target_bytes: int, max_size: Optional[int],
+                         low: int, high: int) -> Optional[int]:
+        """Binary search for the highest quality in [low, high] that fits"""
+        if self.predict(low, max_size) > target_bytes:
+            return None
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.predict(middle, max_size) <= target_bytes:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+
+class TargetSizeCompressor:
+    """Compress a PDF to at most a given size by re-encoding its images"""
+
+    def __init__(self):
+        self.logger = get_logger()
+
+    def compress(self, input_file: str, output_file: str, target_bytes: int,
+                 workers: Optional[int] = None) -> Optional[Dict]:
+        """
+        Re-encode images with the best quality and resolution that fit
+
+        Args:
+            input_file: Input PDF path
+            output_file: Output PDF path
+            target_bytes: Maximum output size in bytes
+            workers: Worker processes for the final pass (None = CPU count)
+
+        Returns:
+            Report with 'original_size', 'target_size', 'compressed_size',
+            'predicted_size', 'quality', 'max_image_size' (None = kept),
+            'passes' and 'met', or None on error
+        """
+        from src.pdf_engine.pdf_optimizer import PDFOptimizer
+
+        baseline = None
+        try:
+            original_size = os.path.getsize(input_file)
+
+            # Merge duplicates first so every image is encoded only once, and
+            # measure everything but the images from a plain re-save
+            doc = fitz.open(input_file)
+            record_pages(len(doc))
+            optimizer = PDFOptimizer()
+            optimizer.deduplicate(doc)
+            optimizer.remove_unused_resources(doc)
+            fd, baseline = tempfile.mkstemp(suffix=".pdf",
+                                            dir=os.path.dirname(os.path.abspath(output_file)))
+            os.close(fd)
+            doc.save(baseline, garbage=2, deflate=True, deflate_images=True, deflate_fonts=True)
+            doc.close()
+
+            model = self._build_model(baseline)
+            quality, max_size, fits = model.search(int(target_bytes * TARGET_HEADROOM))
+            predicted = model.predict(quality, max_size)
+
+            passes = 0
+            compressed_size = 0
+            while True:
+                passes += 1
+                self.logger.info(
+                    f"Compressing to {target_bytes:,} bytes: quality {quality}, "
+                    f"max size {max_size or 'original'} (predicted {predicted:,} bytes)"
+                )
+                doc = fitz.open(baseline)
+                reencode_images(doc, candidate_images(doc), quality, max_size,
+                                workers, self.logger)
+                doc.save(output_file, garbage=2, deflate=True, deflate_images=True,
+                         deflate_fonts=True)
+                doc.close()
+                compressed_size = os.path.getsize(output_file)
+
+                if compressed_size <= target_bytes or passes >= MAX_PASSES or not fits:
+                    break
+                # Fold the prediction error into the model and search again
+                model.fixed_bytes += compressed_size - predicted
+                previous = (quality, max_size)
+                quality, max_size, fits = model.search(int(target_bytes * TARGET_HEADROOM))
+                if (quality, max_size) == previous:
+                    quality, max_size = self._step_down(quality, max_size)
+                predicted = model.predict(quality, max_size)
+
+            met = compressed_size <= target_bytes
+            self.logger.info(
+                f"PDF Compression: {original_size:,} bytes -> {compressed_size:,} bytes "
+                f"(target {target_bytes:,}, {'met' if met else 'not met'}, "
+                f"{passes} pass{'es' if passes > 1 else ''})"
+            )
+            return {
+                "original_size": original_size,
+                "target_size": target_bytes,
+                "compressed_size": compressed_size,
+                "predicted_size": predicted,
+                "quality": quality,
+                "max_image_size": max_size,
+                "passes": passes,
+                "met": met,
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error compressing PDF to target size: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return None
+        finally:
+            if baseline and os.path.exists(baseline):
+                os.remove(baseline)
+
+    def _build_model(self, pdf_file: str) -> SizeModel:
+        """Measure candidate images and decode the representative samples"""
+        with fitz.open(pdf_file) as doc:
+            images = candidate_images(doc)
+
+            fixed_bytes = os.path.getsize(pdf_file) - sum(image[3] for image in images)
+
+            # Samples at evenly spaced points of the cumulative image bytes,
+            # so the images that dominate the file size dominate the model
+            images.sort(key=lambda image: image[3])
+            total = sum(image[3] for image in images)
+            chosen = []
+            if images:
+                marks = [total * (2 * i + 1) / (2 * SAMPLE_IMAGES) for i in range(SAMPLE_IMAGES)]
+                cumulative = 0
+                for index, image in enumerate(images):
+                    cumulative += image[3]
+                    while marks and marks[0] <= cumulative:
+                        marks.pop(0)
+                        if not chosen or chosen[-1] != index:
+                            chosen.append(index)
+
+            samples = []
+            for index in chosen:
+                xref, _, _, current = images[index]
+                try:
+                    pil_img, _ = prepare_image(load_image(doc, xref))
+                    pil_img.load()
+                    samples.append((pil_img, current))
+                except Exception as e:
+                    self.logger.debug("Skipping sample image xref %s: %s", xref, e)
+
+        self.logger.info(
+            f"Size model: {len(images)} images ({total if images else 0:,} bytes), "
+            f"{len(samples)} samples, {fixed_bytes:,} bytes of other content"
+        )
+        if not samples:
+            # Nothing to recompress: every setting predicts the current size
+            fixed_bytes += sum(image[3] for image in images)
+            images = []
+        return SizeModel(fixed_bytes, [image[1:] for image in images], samples)
+
+    @staticmethod
+    def _step_down(quality: int, max_size: Optional[int]) -> Tuple[int, Optional[int]]:
+        """Next smaller setting after the search returned the same one"""
+        if quality - 5 >= TARGET_MIN_QUALITY:
+            return quality - 5, max_size
+        index = TARGET_MAX_SIZES.index(max_size)
+        if index + 1 < len(TARGET_MAX_SIZES):
+            return quality, TARGET_MAX_SIZES[index + 1]
+        return max(TARGET_LAST_RESORT_QUALITY, quality - 5), max_size
+
+
+class CompressionEstimator:
+    """
+    Preview of compress_pdf() results from a small random sample
+
+    The document stays open and the sampled images stay decoded, so each
+    further setting only costs encoding the samples. Results are cached
+    per setting. Not thread-safe: use one estimator from one thread.
+    """
+
+    def __init__(self, input_file: str, seed: int = 0):
+        """
+        Args:
+            input_file: PDF to be compressed
+            seed: Seed for choosing the sample
+        """
+        self.logger = get_logger()
+        self.input_file = input_file
+        self._random = random.Random(seed)
+        self._doc = None
+        self._images: List[Tuple[int, int, int]] = []
+        self._samples: List[Tuple[Image.Image, int, Tuple[str, bool, int]]] = []
+        self._decode_seconds_per_pixel = 0.0
+        self._fixed_bytes = 0
+        self._file_size = 0
+        self._cache: Dict[Tuple[int, int, bool], Dict] = {}
+
+    def estimate(self, image_quality: int, max_image_size: int,
+                 convert_to_images: bool = False) -> Dict:
+        """
+        Estimate output size and run time for compress_pdf() arguments
+
+        Args:
+            image_quality: JPEG quality for images (1-100, lower = smaller)
+            max_image_size: Maximum pixel dimension for images
+            convert_to_images: Estimate the page-to-image mode
+
+        Returns:
+            Dictionary with 'size' (bytes) and 'seconds'
+        """
+        key = (image_quality, max_image_size, convert_to_images)
+        if key not in self._cache:
+            if self._doc is None:
+                self._prepare()
+            if convert_to_images:
+                self._cache[key] = self._estimate_pages(image_quality, max_image_size)
+            else:
+                self._cache[key] = self._estimate_images(image_quality, max_image_size)
+        return self._cache[key]
+
+    def close(self):
+        """Close the document and drop the samples"""
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        self._samples = []
+
+    def _prepare(self):
+        """Open the document and decode the sampled images"""
+        from src.pdf_engine.pdf_optimizer import referenced_xrefs, stored_size
+
+        self._doc = fitz.open(self.input_file)
+        self._file_size = os.path.getsize(self.input_file)
+        images = candidate_images(self._doc)
+        self._images = [image[1:] for image in images]
+        # Unreferenced objects are dropped on save, so only count the rest
+        image_xrefs = {image[0] for image in images}
+        self._fixed_bytes = stored_size(
+            self._doc, referenced_xrefs(self._doc) - image_xrefs)
+
+        decoded_pixels = 0
+        started = time.perf_counter()
+        for xref, _, _, current in self._random.sample(
+                images, min(PREVIEW_SAMPLE_IMAGES, len(images))):
+            try:
+                pil_img, _ = prepare_image(load_image(self._doc, xref))
+                pil_img.load()
+            except Exception as e:
+                self.logger.debug("Skipping sample image xref %s: %s", xref, e)
+                continue
+            decoded_pixels += pil_img.width * pil_img.height
+            self._samples.append((pil_img, current, choose_codec(pil_img)))
+        if decoded_pixels:
+            self._decode_seconds_per_pixel = (time.perf_counter() - started) / decoded_pixels
+
+    def _estimate_images(self, image_quality: int, max_image_size: int) -> Dict:
+        """Extrapolate image re-encoding from the sampled images"""
+        quality = max(10, min(95, image_quality))
+        io_seconds = self._file_size / PREVIEW_IO_BYTES_PER_SECOND
+        if not self._samples:
+            return {"size": self._file_size, "seconds": io_seconds}
+
+        encoded_bytes = sample_pixels = encoded_pixels = 0
+        started = time.perf_counter()
+        for pil_img, _, codec in self._samples:
+            encoded_bytes += len(encode_prepared(pil_img, quality, max_image_size, codec).data)
+            sample_pixels += pil_img.width * pil_img.height
+            encoded_pixels += output_pixels(pil_img.width, pil_img.height, max_image_size)
+        seconds_per_pixel = (time.perf_counter() - started) / sample_pixels + \
+            self._decode_seconds_per_pixel
+
+        image_pixels = sum(width * height for width, height, _ in self._images)
+        size = self._fixed_bytes + predict_image_bytes(
+            self._images, encoded_bytes / encoded_pixels, max_image_size)
+        return {"size": size, "seconds": io_seconds + seconds_per_pixel * image_pixels}
+
+    def _estimate_pages(self, image_quality: int, max_image_size: int) -> Dict:
+        """Extrapolate the page-to-image mode from rendered sample pages"""
+        page_count = len(self._doc)
+        if not page_count:
+            return {"size": self._file_size, "seconds": 0.0}
+        # Evenly spaced pages from a random start cover the whole document
+        count = min(PREVIEW_SAMPLE_PAGES, page_count)
+        step = page_count / count
+        start = self._random.random() * step
+        pages = sorted({int(start + step * i) for i in range(count)})
+
+        total = 0
+        started = time.perf_counter()
+        for page_num in pages:
+            total += len(render_page_jpeg(self._doc[page_num], image_quality, max_image_size))
+        elapsed = time.perf_counter() - started
+        return {
+            "size": total * page_count // len(pages),
+            "seconds": elapsed * page_count / len(pages),
+        }
@@ -0,0 +1,498 @@
+"""
+PDF Archiver - PDF/A-2b conversion and a local conformance check
+"""
+
+import io
+import os
+import re
+from pathlib import Path
+from typing import Dict, List
+from src.utilities.logger import get_logger
+
+
+# Action types PDF/A-2 does not allow (ISO 19005-2, 6.5.1)
+FORBIDDEN_ACTIONS = {
+    "/Launch", "/Sound", "/Movie", "/ResetForm", "/ImportData", "/JavaScript",
+    "/Hide", "/SetOCGState", "/Rendition", "/Trans", "/GoTo3DView",
+}
+ALLOWED_NAMED_ACTIONS = {"/NextPage", "/PrevPage", "/FirstPage", "/LastPage"}
+
+# Annotation types PDF/A-2 does not allow (6.3.1); file attachments would
+# need the attached files to be PDF/A themselves
+FORBIDDEN_ANNOTATIONS = {"/Sound", "/Movie", "/Screen", "/3D", "/RichMedia", "/FileAttachment"}
+
+# Non-embedded font name (subset prefix removed) -> PyMuPDF built-in font.
+# The built-in fonts are metric-compatible with the base-14 fonts.
+STANDARD_FONTS = {
+    "Helvetica": "helv", "Helvetica-Bold": "hebo",
+    "Helvetica-Oblique": "heit", "Helvetica-BoldOblique": "hebi",
+    "Times-Roman": "tiro", "Times-Bold": "tibo",
+    "Times-Italic": "tiit", "Times-BoldItalic": "tibi",
+    "Courier": "cour", "Courier-Bold": "cobo",
+    "Courier-Oblique": "coit", "Courier-BoldOblique": "cobi",
+    "Symbol": "symb", "ZapfDingbats": "zadb",
+    # Common aliases of the same metrics
+    "Arial": "helv", "ArialMT": "helv", "Arial,Bold": "hebo", "Arial-BoldMT": "hebo",
+    "Arial,Italic": "heit", "Arial-ItalicMT": "heit",
+    "Arial,BoldItalic": "hebi", "Arial-BoldItalicMT": "hebi",
+    "TimesNewRoman": "tiro", "TimesNewRomanPSMT": "tiro",
+    "TimesNewRoman,Bold": "tibo", "TimesNewRomanPS-BoldMT": "tibo",
+    "TimesNewRoman,Italic": "tiit", "TimesNewRomanPS-ItalicMT": "tiit",
+    "TimesNewRoman,BoldItalic": "tibi", "TimesNewRomanPS-BoldItalicMT": "tibi",
+    "CourierNew": "cour", "CourierNewPSMT": "cour",
+    "CourierNew,Bold": "cobo", "CourierNewPS-BoldMT": "cobo",
+}
+
+_SUBSET_PREFIX_RE = re.compile(r"^[A-Z]{6}\+")
+
+# Windows ships an ICC v2 sRGB profile; elsewhere one is generated with LittleCMS
+_WINDOWS_SRGB = Path(os.environ.get("SystemRoot", r"C:\Windows")) / \
+    "System32" / "spool" / "drivers" / "color" / "sRGB Color Space Profile.icm"
+
+
+def srgb_profile() -> bytes:
+    """
+    ICC profile data for sRGB, usable as a PDF/A-2 output intent
+
+    Returns:
+        ICC profile bytes
+    """
+    if _WINDOWS_SRGB.exists():
+        return _WINDOWS_SRGB.read_bytes()
+
+    from PIL import ImageCms
+
+    data = bytearray(ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes())
+    # PDF/A-2 accepts ICC versions up to 4.2; LittleCMS stamps its own
+    # (newer) version on an otherwise 4.2-compatible profile
+    if data[8] > 4 or (data[8] == 4 and data[9] > 0x20):
+        data[8:12] = b"\x04\x20\x00\x00"
+        # The profile ID is an MD5 over the header; zero means "not computed"
+        data[84:100] = bytes(16)
+    return bytes(data)
+
+
+class PDFArchiver:
+    """Convert PDFs to PDF/A-2b and check them for common violations"""
+
+    def __init__(self):
+        self.logger = get_logger()
+        self.last_issues: List[str] = []
+
+    def convert(self, input_file: str, output_file: str, subset_fonts: bool = True) -> bool:
+        """
+        Convert a PDF to PDF/A-2b
+
+        Removes JavaScript and other forbidden actions, embeds non-embedded
+        standard fonts, fixes annotation flags and appearances, adds an sRGB
+        output intent and PDF/A identification in XMP metadata, and saves
+        without encryption. The result is checked with check(); anything
+        that could not be fixed is logged and kept in last_issues.
+
+        Args:
+            input_file: Input PDF file path
+            output_file: Output PDF/A file path
+            subset_fonts: Subset embedded fonts to the glyphs that are used
+
+        Returns:
+            True if the output was written (see last_issues for remaining
+            conformance problems)
+        """
+        import pikepdf
+
+        self.last_issues = []
+        try:
+            with pikepdf.open(input_file) as pdf:
+                self._remove_forbidden_content(pdf)
+                self._fix_annotations(pdf)
+                embedded = self._embed_standard_fonts(pdf, input_file)
+                self._add_output_intent(pdf)
+                self._write_xmp(pdf)
+
+                pdf.save(
+                    output_file,
+                    # PDF/A-2 is based on PDF 1.7
+                    force_version="1.7" if pdf.pdf_version > "1.7" else None,
+                    compress_streams=True,
+                    # Decodes LZW (not allowed) and re-compresses with Flate
+                    stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                )
+
+            if subset_fonts:
+                self._subset_fonts(output_file)
+
+            self.last_issues = self.check(output_file)
+            for issue in self.last_issues:
+                self.logger.warning(f"PDF/A: {issue}")
+
+            self.logger.info(
+                f"Converted to PDF/A-2b: {output_file} ({embedded} fonts embedded, "
+                f"{len(self.last_issues)} remaining issues)"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error converting to PDF/A: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return False
+
+    def check(self, pdf_file: str) -> List[str]:
+        """
+        Check a PDF for common PDF/A-2b violations
+
+        This is a quick local check of the rules the converter handles, not
+        a full validator.
+
+        Args:
+            pdf_file: PDF file path
+
+        Returns:
+            List of problems found (empty if none)
+        """
+        import pikepdf
+        from pikepdf import Name
+
+        issues = []
+        try:
+            with pikepdf.open(pdf_file) as pdf:
+                if pdf.is_encrypted:
+                    issues.append("Document is encrypted")
+                if pdf.pdf_version > "1.7":
+                    issues.append(f"PDF version {pdf.pdf_version} is newer than 1.7")
+                if "/ID" not in pdf.trailer:
+                    issues.append("Trailer has no file identifier (/ID)")
+
+                root = pdf.Root
+                meta = pdf.open_metadata()
+                if meta.get("pdfaid:part") != "2" or meta.get("pdfaid:conformance") != "B":
+                    issues.append("XMP metadata does not identify the file as PDF/A-2b")
+                if "/Metadata" in root and "/Filter" in root.Metadata:
+                    issues.append("XMP metadata stream is compressed")
+
+                intents = [i for i in root.get("/OutputIntents", [])
+                           if i.get("/S") == Name.GTS_PDFA1 and "/DestOutputProfile" in i]
+                if not intents:
+                    issues.append("No PDF/A output intent with an ICC profile")
+                if "/AA" in root:
+                    issues.append("Document has additional actions (/AA)")
+                if "/OpenAction" in root and not self._action_allowed(root.OpenAction):
+                    issues.append("Document open action is not allowed")
+                if "/Names" in root and "/JavaScript" in root.Names:
+                    issues.append("Document contains JavaScript")
+                if "/Names" in root and "/EmbeddedFiles" in root.Names:
+                    issues.append("Document has embedded files")
+                if "/AcroForm" in root:
+                    if "/XFA" in root.AcroForm:
+                        issues.append("Form contains XFA data")
+                    if root.AcroForm.get("/NeedAppearances") is True:
+                        issues.append("Form sets NeedAppearances")
+
+                fonts = set()
+                for obj in pdf.objects:
+                    if isinstance(obj, pikepdf.Stream):
+                        if obj.get("/Filter") == Name.LZWDecode or \
+                                (isinstance(obj.get("/Filter"), pikepdf.Array) and Name.LZWDecode in obj.Filter):
+                            issues.append(f"LZW-compressed stream (object {obj.objgen[0]})")
+                        if obj.get("/Subtype") == Name.Image and obj.get("/Interpolate") is True:
+                            issues.append(f"Image with /Interpolate (object {obj.objgen[0]})")
+                    if not isinstance(obj, pikepdf.Dictionary) or obj.get("/Type") != Name.Font:
+                        continue
+                    name = str(obj.get("/BaseFont", "?"))[1:]
+                    if name in fonts or obj.get("/Subtype") == Name.Type3:
+                        continue
+                    if not self._font_is_embedded(obj):
+                        fonts.add(name)
+                        issues.append(f"Font not embedded: {name}")
+
+                for page_num, page in enumerate(pdf.pages, 1):
+                    if "/AA" in page.obj:
+                        issues.append(f"Page {page_num} has additional actions (/AA)")
+                    for annot in page.obj.get("/Annots", []):
+                        subtype = annot.get("/Subtype")
+                        if subtype in FORBIDDEN_ANNOTATIONS:
+                            issues.append(f"Page {page_num}: {str(subtype)[1:]} annotation not allowed")
+                            continue
+                        if subtype == Name.Popup:
+                            continue
+                        flags = int(annot.get("/F", 0))
+                        if not flags & 4 or flags & 0x23:
+                            issues.append(f"Page {page_num}: annotation not set to print")
+                        if "/AA" in annot:
+                            issues.append(f"Page {page_num}: annotation has additional actions")
+                        action = annot.get("/A")
+                        if action is not None and not self._action_allowed(action):
+                            issues.append(f"Page {page_num}: annotation has a forbidden action")
+                        if subtype != Name.Link and "/AP" not in annot:
+                            rect = [float(v) for v in annot.get("/Rect", [0, 0, 0, 0])]
+                            if rect[2] != rect[0] and rect[3] != rect[1]:
+                                issues.append(f"Page {page_num}: annotation has no appearance")
+
+        except Exception as e:
+            issues.append(f"Cannot read file: {e}")
+
+        # Same problem on many pages/objects is reported once
+        return list(dict.fromkeys(issues))
+
+    def _remove_forbidden_content(self, pdf):
+        """Remove JavaScript, forbidden actions, embedded files and problematic stream keys"""
+        import pikepdf
+        from pikepdf import Name
+
+        root = pdf.Root
+        for key in ("/AA", "/NeedsRendering"):
+            if key in root:
+                del root[key]
+        if "/OpenAction" in root and not self._action_allowed(root.OpenAction):
+            del root.OpenAction
+
+        if "/Names" in root:
+            for key in ("/JavaScript", "/EmbeddedFiles"):
+                if key in root.Names:
+                    if key == "/EmbeddedFiles":
+                        self.logger.warning("PDF/A: removing embedded files")
+                    del root.Names[key]
+
+        if "/AcroForm" in root:
+            acroform = root.AcroForm
+            for key in ("/XFA", "/NeedAppearances"):
+                if key in acroform:
+                    del acroform[key]
+            try:
+                # Widgets need appearance streams once NeedAppearances is gone
+                pdf.generate_appearance_streams()
+            except Exception as e:
+                self.logger.warning(f"PDF/A: could not generate form appearances: {e}")
+
+        for obj in pdf.objects:
+            if not isinstance(obj, pikepdf.Dictionary):
+                continue
+
+            # Page, field and annotation additional actions
+            if "/AA" in obj:
+                del obj["/AA"]
+            if "/A" in obj and isinstance(obj.A, pikepdf.Dictionary) and not self._action_allowed(obj.A):
+                del obj["/A"]
+
+            if isinstance(obj, pikepdf.Stream):
+                for key in ("/F", "/FFilter", "/FDecodeParms"):
+                    if key in obj.stream_dict:
+                        del obj.stream_dict[key]
+                if obj.get("/Subtype") == Name.Image:
+                    if obj.get("/Interpolate") is True:
+                        obj.Interpolate = False
+                    for key in ("/Alternates", "/OPI"):
+                        if key in obj:
+                            del obj[key]
+                elif obj.get("/Subtype") == Name.Form and "/OPI" in obj:
+                    del obj["/OPI"]
+
+            if obj.get("/Type") == Name.ExtGState:
+                if "/TR" in obj:
+                    del obj["/TR"]
+                if "/TR2" in obj and obj.TR2 != Name.Default:
+                    obj.TR2 = Name.Default
+
+    def _fix_annotations(self, pdf):
+        """Drop forbidden annotations and make the rest printable"""
+        import pikepdf
+        from pikepdf import Name
+
+        for page in pdf.pages:
+            annots = page.obj.get("/Annots")
+            if annots is None:
+                continue
+
+            keep = pikepdf.Array()
+            for annot in annots:
+                subtype = annot.get("/Subtype")
+                if subtype in FORBIDDEN_ANNOTATIONS:
+                    continue
+                if subtype != Name.Popup:
+                    # Print on, Invisible/Hidden/NoView/ToggleNoView off
+                    annot.F = (int(annot.get("/F", 0)) | 4) & ~0x123
+                if "/AA" in annot:
+                    del annot["/AA"]
+                keep.append(annot)
+            page.obj.Annots = keep
+
+    def _embed_standard_fonts(self, pdf, input_file: str) -> int:
+        """
+        Embed non-embedded base-14 fonts (and their common aliases)
+
+        Widths are taken from MuPDF's view of the original font, which
+        applies the font's encoding (including Symbol/ZapfDingbats built-in
+        encodings), so text keeps its exact positions.
+
+        Returns:
+            Number of font dictionaries changed
+        """
+        import fitz  # PyMuPDF
+        import pikepdf
+        from pikepdf import Name
+
+        font_files: Dict[str, object] = {}
+        count = 0
+        source = None
+
+        try:
+            for obj in pdf.objects:
+                if not isinstance(obj, pikepdf.Dictionary) or obj.get("/Type") != Name.Font:
+                    continue
+                if obj.get("/Subtype") not in (Name.Type1, Name.TrueType, Name.MMType1):
+                    continue
+                if self._font_is_embedded(obj):
+                    continue
+
+                base_name = _SUBSET_PREFIX_RE.sub("", str(obj.get("/BaseFont", ""))[1:])
+                code = STANDARD_FONTS.get(base_name)
+                if code is None:
+                    continue
+
+                if source is None:
+                    source = fitz.open(input_file)
+                # Object numbers are unchanged since pikepdf opened the file
+                widths = _font_widths(source, obj.objgen[0])
+
+                font = fitz.Font(code)
+                if code not in font_files:
+                    font_files[code] = pdf.make_stream(font.buffer, Subtype=Name.Type1C)
+
+                bbox = font.bbox
+                flags = 4 if code in ("symb", "zadb") else 32
+                if "Oblique" in font.name or "Italic" in font.name:
+                    flags |= 64
+                descriptor = pdf.make_indirect(pikepdf.Dictionary(
+                    Type=Name.FontDescriptor,
+                    FontName=Name("/" + font.name),
+                    Flags=flags,
+                    FontBBox=[round(bbox.x0 * 1000), round(bbox.y0 * 1000),
+                              round(bbox.x1 * 1000), round(bbox.y1 * 1000)],
+                    ItalicAngle=-12 if flags & 64 else 0,
+                    Ascent=round(font.ascender * 1000),
+                    Descent=round(font.descender * 1000),
+                    CapHeight=round(font.ascender * 700),
+                    StemV=80,
+                    FontFile3=font_files[code],
+                ))
+
+                obj.Subtype = Name.Type1
+                obj.BaseFont = Name("/" + font.name)
+                obj.FirstChar = 0
+                obj.LastChar = 255
+                obj.Widths = widths
+                obj.FontDescriptor = descriptor
+                count += 1
+        finally:
+            if source is not None:
+                source.close()
+
+        return count
+
+    @staticmethod
+    def _font_is_embedded(font) -> bool:
+        from pikepdf import Name
+
+        if font.get("/Subtype") == Name.Type0:
+            descendants = font.get("/DescendantFonts", [])
+            return all(PDFArchiver._font_is_embedded(d) for d in descendants)
+        descriptor = font.get("/FontDescriptor")
+        if descriptor is None:
+            return False
+        return any(key in descriptor for key in ("/FontFile", "/FontFile2", "/FontFile3"))
+
+    @staticmethod
+    def _action_allowed(action) -> bool:
+        """Whether an action (and the actions chained after it) is allowed in PDF/A-2"""
+        import pikepdf
+        from pikepdf import Name
+
+        if not isinstance(action, pikepdf.Dictionary):
+            return True
+        kind = action.get("/S")
+        if kind in FORBIDDEN_ACTIONS:
+            return False
+        if kind == Name.Named and action.get("/N") not in ALLOWED_NAMED_ACTIONS:
+            return False
+        chained = action.get("/Next")
+        if chained is None:
+            return True
+        if isinstance(chained, pikepdf.Array):
+            return all(PDFArchiver._action_allowed(a) for a in chained)
+        return PDFArchiver._action_allowed(chained)
+
+    def _add_output_intent(self, pdf):
+        """Replace the output intents with an sRGB PDF/A intent"""
+        import pikepdf
+        from pikepdf import Name
+
+        profile = pdf.make_stream(srgb_profile(), N=3)
+        intent = pikepdf.Dictionary(
+            Type=Name.OutputIntent,
+            S=Name.GTS_PDFA1,
+            OutputConditionIdentifier=pikepdf.String("sRGB IEC61966-2.1"),
+            Info=pikepdf.String("sRGB IEC61966-2.1"),
+            DestOutputProfile=profile,
+        )
+        pdf.Root.OutputIntents = pikepdf.Array([pdf.make_indirect(intent)])
+
+    def _write_xmp(self, pdf):
+        """Write XMP metadata (synchronised with the Info dictionary) with the PDF/A-2b identification"""
+        with pdf.open_metadata(set_pikepdf_as_editor=False) as meta:
+            meta.load_from_docinfo(pdf.docinfo)
+            meta["pdfaid:part"] = "2"
+            meta["pdfaid:conformance"] = "B"
+            meta["xmp:CreatorTool"] = "NexPro PDF"
+
+    def _subset_fonts(self, pdf_file: str):
+        """Subset embedded fonts with MuPDF, keeping the PDF/A structure"""
+        import fitz  # PyMuPDF
+        import pikepdf
+
+        try:
+            doc = fitz.open(pdf_file)
+            doc.subset_fonts()
+            data = doc.tobytes(garbage=3, deflate=True)
+            doc.close()
+        except Exception as e:
+            self.logger.warning(f"PDF/A: font subsetting skipped: {e}")
+            return
+
+        # Re-save with pikepdf: keeps the metadata stream uncompressed and
+        # writes object streams
+        buffer = io.BytesIO()
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            pdf.save(buffer, compress_streams=True,
+                     object_stream_mode=pikepdf.ObjectStreamMode.generate)
+
+        # Fonts MuPDF cannot subset only gain the re-save overhead
+        if buffer.tell() < Path(pdf_file).stat().st_size:
+            Path(pdf_file).write_bytes(buffer.getvalue())
+
+
+def _font_widths(doc, xref: int) -> List[int]:
+    """
+    Advance widths (1/1000 em) of character codes 0-255 as MuPDF lays out a simple font
+
+    The codes are shown at 1000 pt on a scratch page (removed again) and
+    measured from the glyph origins, so the font's encoding and any
+    /Widths apply exactly as when the document is rendered.
+    """
+    page = doc.new_page(width=10, height=10)
+    page_num = doc.page_count - 1
+    try:
+        doc.xref_set_key(page.xref, "Resources", f"<</Font<</F0 {xref} 0 R>>>>")
+        content = doc.get_new_xref()
+        doc.update_object(content, "<<>>")
+        # One code past 255, so the advance of the last one can be measured
+        codes = bytes(range(256)) + b"\x00"
+        doc.update_stream(content, b"BT /F0 1000 Tf 0 0 Td <%s> Tj ET" % codes.hex().encode())
+        doc.xref_set_key(page.xref, "Contents", f"{content} 0 R")
+
+        origins = [char[2][0] for span in page.get_texttrace() for char in span["chars"]]
+        if len(origins) != len(codes):
+            raise ValueError(f"Could not measure the widths of font object {xref}")
+        return [round(end - start) for start, end in zip(origins, origins[1:])]
+    finally:
+        doc.delete_page(page_num)
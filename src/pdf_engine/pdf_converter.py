@@ -7,6 +7,7 @@ from pathlib import Path
 import sys
 import os
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled, record_pages
 
 
 def get_tesseract_path() -> Optional[str]:
@@ -98,8 +99,8 @@ class PDFConverter:
     def __init__(self):
         self.logger = get_logger()
         self.last_error = None
-        # Setup bundled Tesseract on initialization
-        setup_tesseract()
+        # Bundled Tesseract is set up on first OCR use: importing
+        # pytesseract and probing for the executable slows startup
 
     def detect_pdf_type(self, pdf_file: str) -> str:
         """
@@ -133,6 +134,7 @@ class PDFConverter:
             self.logger.error(f"Error detecting PDF type: {e}")
             return 'text'  # Default to text mode
 
+    @profiled("Convert to Word (text)", input_arg="pdf_file", output_arg="output_file")
     def to_word_text_mode(self, pdf_file: str, output_file: str,
                           include_images: bool = True,
                           progress_callback: Optional[Callable] = None) -> Tuple[bool, str]:
@@ -172,6 +174,7 @@ class PDFConverter:
             # Open PDF
             pdf = fitz.open(pdf_file)
             total_pages = len(pdf)
+            record_pages(total_pages)
 
             # Create Word document
             doc = Document()
@@ -274,6 +277,7 @@ class PDFConverter:
             self.logger.error(traceback.format_exc())
             return False, self.last_error
 
+    @profiled("Convert to Word (OCR)", input_arg="pdf_file", output_arg="output_file")
     def to_word_ocr_mode(self, pdf_file: str, output_file: str,
                          language: str = 'eng',
                          progress_callback: Optional[Callable] = None) -> Tuple[bool, str]:
@@ -328,6 +332,7 @@ class PDFConverter:
             # Open PDF
             pdf = fitz.open(pdf_file)
             total_pages = len(pdf)
+            record_pages(total_pages)
 
             # Create Word document
             doc = Document()
@@ -438,6 +443,7 @@ class PDFConverter:
         """Get list of available OCR languages"""
         try:
             import pytesseract
+            setup_tesseract()
             langs = pytesseract.get_languages()
             return [l for l in langs if l != 'osd']  # Remove 'osd' (orientation script detection)
         except Exception:
@@ -1,47 +1,372 @@
 """
-Core PDF engine using PyMuPDF and pikepdf
+Core PDF engine using PyMuPDF
 """
 
+import re
+import mmap
+import threading
+from collections import OrderedDict
 import fitz  # PyMuPDF
-import pikepdf
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from src.utilities.logger import get_logger
 
 
+# Files at least this large are opened in large-file mode
+LARGE_FILE_BYTES = 256 * 1024 * 1024
+
+# Default for the performance.max_pages_memory setting
+DEFAULT_MAX_PAGES_MEMORY = 500
+
+# Default for the performance.max_display_lists setting
+DEFAULT_MAX_DISPLAY_LISTS = 32
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_XREF_START_RE = re.compile(rb"\s*(?:xref|\d+\s+\d+\s+obj)")
+_BOX_RE = {
+    key: re.compile(rb"/" + key.encode() + rb"\s*(\[[^\]]*\]|\d+ 0 R)")
+    for key in ("MediaBox", "CropBox")
+}
+_ROTATE_RE = re.compile(rb"/Rotate\s+(-?\d+)")
+_PARENT_RE = re.compile(rb"/Parent\s+(\d+) 0 R")
+
+
+def xref_intact(file_path: str) -> bool:
+    """
+    Check that the file's startxref points at a cross-reference section
+
+    The file is memory-mapped, so only its tail and the xref position are
+    read. When this fails, opening the file makes MuPDF rebuild the xref by
+    scanning the whole file.
+
+    Args:
+        file_path: Path to PDF file
+
+    Returns:
+        True if the xref looks usable
+    """
+    try:
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            matches = _STARTXREF_RE.findall(data[max(0, len(data) - 4096):])
+            if not matches:
+                return False
+            offset = int(matches[-1])
+            return 0 < offset < len(data) and \
+                _XREF_START_RE.match(data, offset) is not None
+    except (OSError, ValueError):
+        return False
+
+
+class PageCache:
+    """
+    Least-recently-used fitz.Page objects of one document
+
+    Cached pages are dropped when the document's page or object count
+    changes, so pages are never served from before a structural edit or
+    an added annotation.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_MAX_PAGES_MEMORY):
+        self.capacity = max(1, capacity)
+        self._pages: "OrderedDict[int, fitz.Page]" = OrderedDict()
+        self._state = None
+
+    def get(self, document, page_num: int):
+        """Cached page, loading it (and evicting the oldest) if needed"""
+        state = (id(document), document.page_count, document.xref_length())
+        if state != self._state:
+            self._pages.clear()
+            self._state = state
+
+        page = self._pages.get(page_num)
+        if page is None:
+            page = document[page_num]
+            self._pages[page_num] = page
+            if len(self._pages) > self.capacity:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_num)
+        return page
+
+    def discard(self, page_num: int):
+        """Drop one page (its boxes or rotation changed through another Page object)"""
+        self._pages.pop(page_num, None)
+
+    def clear(self):
+        """Drop all cached pages"""
+        self._pages.clear()
+        self._state = None
+
+    def __len__(self):
+        return len(self._pages)
+
+
+class DisplayListCache:
+    """
+    Least-recently-used fitz.DisplayList objects of one document
+
+    A display list holds a page's interpreted content, so rendering the
+    page again (at another zoom, with a clip, as a thumbnail) skips
+    parsing its content stream. As with PageCache, all lists are dropped
+    when the document's page or object count changes; pages changed in
+    place are dropped with discard().
+    """
+
+    def __init__(self, capacity: int = DEFAULT_MAX_DISPLAY_LISTS):
+        self.capacity = max(1, capacity)
+        self._lists: "OrderedDict[int, fitz.DisplayList]" = OrderedDict()
+        self._state = None
+
+    def get(self, document, page_num: int, load_page):
+        """
+        Cached display list, building it (and evicting the oldest) if needed
+
+        Args:
+            document: fitz.Document the page belongs to
+            page_num: Page number (0-indexed)
+            load_page: Callable returning the fitz.Page for page_num
+        """
+        state = (id(document), document.page_count, document.xref_length())
+        if state != self._state:
+            self._lists.clear()
+            self._state = state
+
+        display_list = self._lists.get(page_num)
+        if display_list is None:
+            display_list = load_page(page_num).get_displaylist()
+            self._lists[page_num] = display_list
+            if len(self._lists) > self.capacity:
+                self._lists.popitem(last=False)
+        else:
+            self._lists.move_to_end(page_num)
+        return display_list
+
+    def discard(self, page_num: int):
+        """Drop one page's display list (its content changed)"""
+        self._lists.pop(page_num, None)
+
+    def clear(self):
+        """Drop all display lists"""
+        self._lists.clear()
+        self._state = None
+
+    def __len__(self):
+        return len(self._lists)
+
+
+class PageRectScanner(threading.Thread):
+    """
+    Reads all page sizes in the background, without loading pages
+
+    Only page dictionaries are parsed (with inherited MediaBox, CropBox and
+    Rotate), so no page objects are created for the scan.
+    """
+
+    def __init__(self, document, rects: List[Optional[fitz.Rect]]):
+        super().__init__(daemon=True)
+        self.document = document
+        self.rects = rects
+        self._stop_event = threading.Event()
+        self._inherited: Dict[int, Dict[str, Optional[bytes]]] = {}
+
+    def run(self):
+        try:
+            for page_num in range(len(self.rects)):
+                if self._stop_event.is_set():
+                    return
+                if self.rects[page_num] is None:
+                    self.rects[page_num] = page_rect(self.document, page_num, self._inherited)
+        except Exception as e:
+            # The document was closed or replaced; pages are measured on demand
+            get_logger().debug(f"Page rect scan stopped: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+
+def _resolve(document, value: bytes) -> bytes:
+    """Follow an indirect reference to the referenced object's source"""
+    if value.endswith(b" 0 R"):
+        return document.xref_object(int(value.split()[0]), compressed=True).encode()
+    return value
+
+
+def _page_attributes(document, xref: int,
+                     inherited: Dict[int, Dict[str, Optional[bytes]]]) -> Dict[str, Optional[bytes]]:
+    """MediaBox, CropBox and Rotate of a page tree node, including inherited values"""
+    if xref in inherited:
+        return inherited[xref]
+    source = document.xref_object(xref, compressed=True).encode()
+    values: Dict[str, Optional[bytes]] = {}
+    for key, pattern in _BOX_RE.items():
+        match = pattern.search(source)
+        values[key] = _resolve(document, match.group(1)) if match else None
+    match = _ROTATE_RE.search(source)
+    values["Rotate"] = match.group(1) if match else None
+
+    parent = _PARENT_RE.search(source)
+    if parent and None in values.values():
+        for key, value in _page_attributes(document, int(parent.group(1)), inherited).items():
+            if values[key] is None:
+                values[key] = value
+    if b"/Type/Pages" in source:
+        # Only intermediate nodes are shared between pages
+        inherited[xref] = values
+    return values
+
+
+def page_rect(document, page_num: int,
+              inherited: Optional[Dict[int, Dict[str, Optional[bytes]]]] = None) -> fitz.Rect:
+    """
+    Size of a page as fitz.Page.rect reports it, read from the page dictionary
+
+    Args:
+        document: Open fitz.Document
+        page_num: Page number
+        inherited: Cache of page tree node attributes shared across calls
+
+    Returns:
+        fitz.Rect with origin (0, 0), rotation applied
+    """
+    values = _page_attributes(document, document.page_xref(page_num),
+                              {} if inherited is None else inherited)
+
+    def box(value):
+        if not value:
+            return None
+        numbers = [float(n) for n in value.strip(b"[]").split()[:4]]
+        return fitz.Rect(numbers).normalize() if len(numbers) == 4 else None
+
+    mediabox = box(values["MediaBox"]) or fitz.Rect(0, 0, 612, 792)
+    cropbox = box(values["CropBox"])
+    if cropbox is not None:
+        cropbox = cropbox & mediabox
+    if cropbox is None or cropbox.is_empty:
+        cropbox = mediabox
+
+    width, height = cropbox.width, cropbox.height
+    if int(values["Rotate"] or 0) % 180 == 90:
+        width, height = height, width
+    return fitz.Rect(0, 0, width, height)
+
+
 class PDFCore:
     """Core PDF operations wrapper"""
 
-    def __init__(self):
+    def __init__(self, max_pages_memory: int = DEFAULT_MAX_PAGES_MEMORY,
+                 max_display_lists: int = DEFAULT_MAX_DISPLAY_LISTS):
+        """
+        Args:
+            max_pages_memory: Page objects kept in memory at most
+                (performance.max_pages_memory)
+            max_display_lists: Page display lists kept in memory at most
+                (performance.max_display_lists)
+        """
         self.logger = get_logger()
         self.document = None
         self.file_path = None
+        self.large_file = False
+        self.repaired = False
+        self.page_cache = PageCache(max_pages_memory)
+        self.display_lists = DisplayListCache(max_display_lists)
+        self.page_rects: List[Optional[fitz.Rect]] = []
+        # Attributes of page tree nodes, inherited by many pages
+        self._inherited: Dict[int, Dict[str, Optional[bytes]]] = {}
+        self._scanner: Optional[PageRectScanner] = None
+
+    @staticmethod
+    def is_large_file(file_path: str) -> bool:
+        """Whether a file is big enough for large-file mode"""
+        try:
+            return Path(file_path).stat().st_size >= LARGE_FILE_BYTES
+        except OSError:
+            return False
 
-    def open(self, file_path: str) -> bool:
+    def open(self, file_path: str, large_file: Optional[bool] = None) -> bool:
         """
         Open PDF file
 
+        In large-file mode the xref is probed through a memory map before
+        opening, and page sizes are read by a background scan instead of
+        loading pages. MuPDF itself reads the file lazily.
+
         Args:
             file_path: Path to PDF file
+            large_file: Use large-file mode (None = decide by file size)
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            self.file_path = Path(file_path)
-            self.document = fitz.open(str(file_path))
-            self.logger.info(f"Opened PDF: {file_path}")
+            if large_file is None:
+                large_file = self.is_large_file(file_path)
+            if large_file and not xref_intact(file_path):
+                self.logger.warning(f"Damaged xref in {file_path}, rebuilding it")
+
+            self.attach(fitz.open(str(file_path)), file_path, large_file)
             return True
         except Exception as e:
             self.logger.error(f"Error opening PDF: {e}")
             return False
 
+    def attach(self, document, file_path: str, large_file: Optional[bool] = None):
+        """
+        Use a document opened elsewhere (e.g. on a background thread) as if open() had opened it
+
+        Args:
+            document: Open fitz.Document
+            file_path: Path the document was opened from
+            large_file: Use large-file mode (None = decide by file size)
+        """
+        if large_file is None:
+            large_file = self.is_large_file(file_path)
+        self.large_file = large_file
+        self.repaired = document.is_repaired
+        self.set_document(document, file_path)
+        self.logger.info(
+            f"Opened PDF: {file_path} ({document.page_count} pages"
+            f"{', large-file mode' if large_file else ''}"
+            f"{', repaired' if self.repaired else ''})"
+        )
+
+    def set_document(self, document, file_path: Optional[str] = None):
+        """
+        Use an already open document (or None), resetting page caches
+
+        Args:
+            document: fitz.Document or None
+            file_path: Path the document was opened from
+        """
+        self._stop_scan()
+        self.page_cache.clear()
+        self.display_lists.clear()
+        self.document = document
+        if file_path is not None or document is None:
+            self.file_path = Path(file_path) if file_path else None
+        self.page_rects = [None] * document.page_count if document else []
+        self._inherited = {}
+        if document is not None and self.large_file and not document.needs_pass:
+            self._scanner = PageRectScanner(document, self.page_rects)
+            self._scanner.start()
+
+    def _stop_scan(self):
+        if self._scanner is not None:
+            self._scanner.stop()
+            self._scanner = None
+
     def close(self):
         """Close current PDF"""
         if self.document:
+            self._stop_scan()
+            self.page_cache.clear()
+            self.display_lists.clear()
             self.document.close()
             self.document = None
             self.file_path = None
+            self.page_rects = []
             self.logger.info("PDF closed")
 
     def save(self, output_path: Optional[str] = None, **kwargs) -> bool:
@@ -83,11 +408,53 @@ class PDFCore:
         return len(self.document) if self.document else 0
 
     def get_page(self, page_num: int):
-        """Get specific page"""
+        """Get specific page (at most max_pages_memory pages stay loaded)"""
+        if self.document and 0 <= page_num < len(self.document):
+            return self.page_cache.get(self.document, page_num)
+        return None
+
+    def get_display_list(self, page_num: int):
+        """Display list of a page (at most max_display_lists stay in memory)"""
         if self.document and 0 <= page_num < len(self.document):
-            return self.document[page_num]
+            return self.display_lists.get(self.document, page_num, self.get_page)
         return None
 
+    def render_page(self, page_num: int, matrix: fitz.Matrix,
+                    clip: Optional[fitz.Rect] = None) -> Optional[fitz.Pixmap]:
+        """
+        Render a page from its cached display list
+
+        Args:
+            page_num: Page number (0-indexed)
+            matrix: Transformation (zoom and rotation)
+            clip: Area to render, in page coordinates (None = whole page)
+
+        Returns:
+            RGB pixmap without alpha, or None if there is no such page
+        """
+        display_list = self.get_display_list(page_num)
+        if display_list is None:
+            return None
+        if clip is not None:
+            clip = clip & display_list.rect
+        return display_list.get_pixmap(matrix=matrix, alpha=False, clip=clip)
+
+    def get_page_rect(self, page_num: int) -> Optional[fitz.Rect]:
+        """
+        Page size without loading the page
+
+        Returns the background scan's result when available, otherwise
+        reads the page dictionary directly.
+        """
+        if not self.document or not 0 <= page_num < len(self.document):
+            return None
+        if page_num < len(self.page_rects) and self.page_rects[page_num] is not None:
+            return self.page_rects[page_num]
+        rect = page_rect(self.document, page_num, self._inherited)
+        if page_num < len(self.page_rects):
+            self.page_rects[page_num] = rect
+        return rect
+
     def get_metadata(self) -> Dict:
         """
         Get PDF metadata
@@ -185,6 +552,7 @@ class PDFCore:
                 raise ValueError("No PDF document open")
 
             self.document.insert_page(page_num, width=width, height=height)
+            self.reset_pages()
             self.logger.info(f"Inserted page at position {page_num}")
             return True
 
@@ -207,6 +575,7 @@ class PDFCore:
                 raise ValueError("No PDF document open")
 
             self.document.delete_page(page_num)
+            self.reset_pages()
             self.logger.info(f"Deleted page {page_num}")
             return True
 
@@ -230,6 +599,7 @@ class PDFCore:
                 raise ValueError("No PDF document open")
 
             self.document.move_page(from_page, to_page)
+            self.reset_pages()
             self.logger.info(f"Moved page {from_page} to {to_page}")
             return True
 
@@ -237,6 +607,18 @@ class PDFCore:
             self.logger.error(f"Error moving page: {e}")
             return False
 
+    def reset_pages(self):
+        """Reset page caches after pages were inserted, deleted or moved"""
+        self.set_document(self.document)
+
+    def forget_pages(self, pages):
+        """Drop cached page objects, display lists and sizes of pages that were changed"""
+        for page_num in pages:
+            self.page_cache.discard(page_num)
+            self.display_lists.discard(page_num)
+            if 0 <= page_num < len(self.page_rects):
+                self.page_rects[page_num] = None
+
     def rotate_page(self, page_num: int, rotation: int) -> bool:
         """
         Rotate page
@@ -254,6 +636,7 @@ class PDFCore:
 
             page = self.document[page_num]
             page.set_rotation(rotation)
+            self.forget_pages([page_num])
             self.logger.info(f"Rotated page {page_num} by {rotation} degrees")
             return True
 
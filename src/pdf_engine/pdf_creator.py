@@ -2,12 +2,27 @@
 PDF Creation - Convert from Word, Excel, PowerPoint, Images
 """
 
+import os
+import time
 import fitz  # PyMuPDF
+from collections import deque
 from pathlib import Path
-from typing import List, Optional
-from PIL import Image
-import io
+from typing import Callable, Iterator, List, Optional
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled, record_pages
+from src.pdf_engine.conversion_pool import ConversionJob, ConversionPool, ConversionResult, convert_job
+from src.pdf_engine.text_layout import BASE14_FONTS, font_metrics, pdf_literal, pdf_number, winansi
+
+
+# File extension -> conversion for batch_convert(format_type='auto')
+BATCH_FORMATS = {
+    '.docx': 'word', '.doc': 'word', '.rtf': 'word',
+    '.xlsx': 'excel', '.xlsm': 'excel', '.xls': 'excel',
+    '.pptx': 'powerpoint', '.ppt': 'powerpoint',
+    '.txt': 'text', '.log': 'text', '.csv': 'text', '.md': 'text',
+    '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.bmp': 'image',
+    '.gif': 'image', '.tif': 'image', '.tiff': 'image', '.webp': 'image',
+}
 
 
 class PDFCreator:
@@ -16,20 +31,40 @@ class PDFCreator:
     def __init__(self):
         self.logger = get_logger()
         self.last_error = None
+        self.last_batch_results: List[ConversionResult] = []
 
+    @profiled("Images to PDF", input_arg="image_files", output_arg="output_file")
     def from_images(self, image_files: List[str], output_file: str,
-                   page_size: str = "A4") -> bool:
+                   page_size: str = "A4", max_pixels: Optional[int] = None,
+                   jpeg_quality: Optional[int] = None,
+                   workers: Optional[int] = None) -> bool:
         """
         Create PDF from image files
 
+        Only image headers are read up front. JPEG and JPEG 2000 files are
+        embedded unchanged; other formats are decoded once and stored
+        losslessly. Pages are written to disk one at a time.
+
         Args:
             image_files: List of image file paths
             output_file: Output PDF file path
-            page_size: Page size ("A4", "Letter", "Legal")
+            page_size: Page size ("A4", "Letter", "Legal"; anything else =
+                image size at 96 DPI)
+            max_pixels: Downscale images whose longer side exceeds this
+            jpeg_quality: Re-encode every image as JPEG with this quality
+            workers: Processes for decoding/re-encoding (None = CPU count,
+                0 = in this process)
 
         Returns:
             True if successful
         """
+        from src.pdf_engine.pdf_stream_writer import PDFStreamWriter
+        from src.pdf_engine.image_embedding import (
+            encode_image, passthrough_image, placement_matrix, read_image_header
+        )
+
+        writer = None
+        pool = None
         try:
             # Page size presets (in points: 1 point = 1/72 inch)
             page_sizes = {
@@ -38,45 +73,90 @@ class PDFCreator:
                 "Legal": fitz.paper_rect("legal")
             }
 
-            pdf = fitz.open()
-
-            for img_file in image_files:
-                self.logger.info(f"Adding image: {img_file}")
+            headers = [read_image_header(img_file) for img_file in image_files]
 
-                # Open image to get dimensions
-                img = Image.open(img_file)
-                img_width, img_height = img.size
-
-                # Convert to RGB if necessary
-                if img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
+            def needs_encoding(header):
+                if jpeg_quality or not header.passthrough:
+                    return True
+                return bool(max_pixels) and max(header.width, header.height) > max_pixels
+
+            to_encode = sum(1 for header in headers if needs_encoding(header))
+            if workers is None:
+                workers = os.cpu_count() or 1
+            if to_encode > 1 and workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                pool = ProcessPoolExecutor(max_workers=workers)
+
+            def resolve(header, future):
+                if future is not None:
+                    return header, future.result()
+                if needs_encoding(header):
+                    return header, encode_image(header.path, max_pixels, jpeg_quality)
+                return header, passthrough_image(header)
+
+            def prepared():
+                # Yields (header, EncodedImage) in input order, keeping at
+                # most two encodings per worker in flight
+                pending = deque()
+                for header in headers:
+                    future = None
+                    if pool and needs_encoding(header):
+                        future = pool.submit(encode_image, header.path, max_pixels, jpeg_quality)
+                    pending.append((header, future))
+
+                    while pending and (len(pending) > workers * 2 or not pool):
+                        yield resolve(*pending.popleft())
+                while pending:
+                    yield resolve(*pending.popleft())
+
+            writer = PDFStreamWriter(output_file)
+
+            for header, image in prepared():
+                self.logger.debug("Adding image: %s", header.path)
+                img_width, img_height = header.upright_size
 
-                # Calculate page size based on image aspect ratio
                 if page_size in page_sizes:
                     page_rect = page_sizes[page_size]
+                    # Fit the image to the page, keeping its proportions
+                    scale = min(page_rect.width / img_width, page_rect.height / img_height)
                 else:
                     # Custom size based on image
                     page_rect = fitz.Rect(0, 0, img_width * 72 / 96, img_height * 72 / 96)
+                    scale = 72 / 96
 
-                # Create new page
-                page = pdf.new_page(width=page_rect.width, height=page_rect.height)
+                width, height = img_width * scale, img_height * scale
+                x = (page_rect.width - width) / 2
+                y = (page_rect.height - height) / 2
 
-                # Insert image to fit page
-                page.insert_image(page_rect, filename=img_file)
+                smask = None
+                if image.alpha:
+                    smask = writer.add_image(image.width, image.height, image.alpha,
+                                             "FlateDecode", "DeviceGray")
+                image_obj = writer.add_image(image.width, image.height, image.data,
+                                             image.filter_name, image.color_space,
+                                             decode=image.decode, smask=smask)
 
-                img.close()
+                matrix = b" ".join(pdf_number(v) for v in placement_matrix(header, x, y, width, height))
+                record_pages(1)
+                writer.add_page(page_rect.width, page_rect.height,
+                                b"q %s cm /Im0 Do Q" % matrix, images={"Im0": image_obj})
 
-            # Save PDF
-            pdf.save(output_file)
-            pdf.close()
+            writer.close()
 
             self.logger.info(f"Created PDF from {len(image_files)} images: {output_file}")
             return True
 
         except Exception as e:
+            if writer is not None:
+                writer.abort()
             self.logger.error(f"Error creating PDF from images: {e}")
             return False
 
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    @profiled("Word to PDF", input_arg="word_file", output_arg="output_file")
     def from_word(self, word_file: str, output_file: str) -> bool:
         """
         Create PDF from Word document
@@ -171,9 +251,13 @@ class PDFCreator:
         Convert Word document to PDF using pure Python (python-docx + PyMuPDF).
         This is a fallback when Microsoft Word is not installed.
         Preserves text content, basic formatting, and tables.
+
+        The body is walked once; paragraphs and tables are looked up through
+        element maps, and lines are broken with cached font metrics, so the
+        cost grows linearly with document size.
         """
         from docx import Document
-        from docx.shared import Pt, Inches, RGBColor, Emu
+        from docx.enum.style import WD_STYLE_TYPE
         from docx.enum.text import WD_ALIGN_PARAGRAPH
 
         self.logger.info("Using pure-Python Word to PDF conversion (MS Word not available)")
@@ -181,6 +265,14 @@ class PDFCreator:
         doc = Document(word_file)
         pdf = fitz.open()
 
+        # Body elements -> python-docx objects, built in one pass
+        paragraphs = {p._element: p for p in doc.paragraphs}
+        tables = {t._element: t for t in doc.tables}
+
+        # Paragraph.style scans the whole style list on every access
+        styles_by_id = {style.style_id: style for style in doc.styles}
+        default_style = doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)
+
         # A4 page dimensions in points
         page_width = 595.28
         page_height = 841.89
@@ -190,62 +282,84 @@ class PDFCreator:
         margin_bottom = 56.7
         usable_width = page_width - margin_left - margin_right
 
-        # Current position tracking
+        # Current position tracking. Each page gets one shape for borders and
+        # one text writer per color, written out when the page is complete
         page = pdf.new_page(width=page_width, height=page_height)
+        shape = page.new_shape()
+        writers = {}
         y_pos = margin_top
 
+        def finish_page():
+            shape.commit()
+            for color, writer in writers.items():
+                writer.write_text(page, color=color)
+            writers.clear()
+
         def new_page():
-            nonlocal page, y_pos
+            nonlocal page, shape, y_pos
+            finish_page()
             page = pdf.new_page(width=page_width, height=page_height)
+            shape = page.new_shape()
             y_pos = margin_top
 
         def check_space(needed):
-            nonlocal y_pos
             if y_pos + needed > page_height - margin_bottom:
                 new_page()
 
-        def get_font_size(paragraph):
+        def get_style(paragraph):
+            return styles_by_id.get(paragraph._p.style, default_style)
+
+        def get_font_size(paragraph, style):
             """Get font size from paragraph or its runs."""
             for run in paragraph.runs:
                 if run.font.size:
                     return run.font.size.pt
-            style = paragraph.style
             if style and style.font and style.font.size:
                 return style.font.size.pt
             return 11  # default
 
-        def get_alignment(paragraph):
-            """Map Word alignment to fitz alignment."""
-            align = paragraph.alignment
-            if align == WD_ALIGN_PARAGRAPH.CENTER:
-                return fitz.TEXT_ALIGN_CENTER
-            elif align == WD_ALIGN_PARAGRAPH.RIGHT:
-                return fitz.TEXT_ALIGN_RIGHT
-            elif align == WD_ALIGN_PARAGRAPH.JUSTIFY:
-                return fitz.TEXT_ALIGN_JUSTIFY
-            return fitz.TEXT_ALIGN_LEFT
-
-        def is_bold(paragraph):
+        def is_bold(paragraph, style):
             """Check if paragraph is bold (heading-like)."""
-            if paragraph.style and paragraph.style.name.startswith('Heading'):
+            if style and style.name.startswith('Heading'):
                 return True
             for run in paragraph.runs:
                 if run.bold:
                     return True
             return False
 
+        def insert_text(x, baseline, text, font_size, metrics, color):
+            writer = writers.get(color)
+            if writer is None:
+                writer = writers[color] = fitz.TextWriter(page.rect)
+            writer.append((x, baseline), text, font=metrics.font, fontsize=font_size)
+
+        def write_line(line, x0, width, font_size, metrics, color, align):
+            """Write one line at the current position"""
+            baseline = y_pos + font_size
+
+            if align == WD_ALIGN_PARAGRAPH.JUSTIFY and " " in line:
+                # Spread the words over the full width
+                words = line.split(" ")
+                gap = (width - metrics.text_length(line.replace(" ", ""), font_size)) / (len(words) - 1)
+                x = x0
+                for word in words:
+                    insert_text(x, baseline, word, font_size, metrics, color)
+                    x += metrics.text_length(word, font_size) + gap
+                return
+
+            if align == WD_ALIGN_PARAGRAPH.CENTER:
+                x0 += (width - metrics.text_length(line, font_size)) / 2
+            elif align == WD_ALIGN_PARAGRAPH.RIGHT:
+                x0 += width - metrics.text_length(line, font_size)
+
+            insert_text(x0, baseline, line, font_size, metrics, color)
+
         # Process document elements
         for element in doc.element.body:
             tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
 
             if tag == 'p':
-                # Find the paragraph object
-                para = None
-                for p in doc.paragraphs:
-                    if p._element is element:
-                        para = p
-                        break
-
+                para = paragraphs.get(element)
                 if para is None:
                     continue
 
@@ -255,12 +369,12 @@ class PDFCreator:
                     y_pos += 8
                     continue
 
-                font_size = get_font_size(para)
-                bold = is_bold(para)
-                alignment = get_alignment(para)
+                style = get_style(para)
+                font_size = get_font_size(para, style)
+                bold = is_bold(para, style)
 
                 # Adjust font size for headings
-                style_name = para.style.name if para.style else ''
+                style_name = style.name if style else ''
                 if style_name.startswith('Heading 1'):
                     font_size = max(font_size, 18)
                     bold = True
@@ -271,20 +385,8 @@ class PDFCreator:
                     font_size = max(font_size, 13)
                     bold = True
 
-                # Estimate text height
-                fontname = "hebo" if bold else "helv"
-                # Use textbox to handle wrapping
-                line_height = font_size * 1.4
-                estimated_chars_per_line = max(1, int(usable_width / (font_size * 0.5)))
-                estimated_lines = max(1, (len(text) + estimated_chars_per_line - 1) // estimated_chars_per_line)
-                text_height = estimated_lines * line_height + 4
-
-                check_space(text_height)
-
-                text_rect = fitz.Rect(
-                    margin_left, y_pos,
-                    page_width - margin_right, y_pos + text_height + 20
-                )
+                metrics = font_metrics("hebo" if bold else "helv")
+                line_height = font_size * 1.3
 
                 # Get font color from first run
                 color = (0, 0, 0)
@@ -292,28 +394,21 @@ class PDFCreator:
                     rgb = para.runs[0].font.color.rgb
                     color = (rgb[0] / 255, rgb[1] / 255, rgb[2] / 255)
 
-                rc = page.insert_textbox(
-                    text_rect, text,
-                    fontsize=font_size, fontname=fontname,
-                    color=color, align=alignment
-                )
-
-                # Advance y position (rc is negative remaining space or positive overflow)
-                if rc < 0:
-                    # Text fit - actual height used is rect height + rc (rc is negative)
-                    actual_height = text_height + 20 + rc
-                    y_pos += max(actual_height, line_height) + 2
-                else:
-                    y_pos += text_height + 4
+                lines = metrics.wrap(text, font_size, usable_width)
+                for i, line in enumerate(lines):
+                    check_space(line_height)
+                    align = para.alignment
+                    if align == WD_ALIGN_PARAGRAPH.JUSTIFY and i == len(lines) - 1:
+                        # The last line of a justified paragraph stays left-aligned
+                        align = None
+                    write_line(line, margin_left, usable_width, font_size,
+                               metrics, color, align)
+                    y_pos += line_height
 
-            elif tag == 'tbl':
-                # Process table
-                tbl = None
-                for t in doc.tables:
-                    if t._element is element:
-                        tbl = t
-                        break
+                y_pos += font_size * 0.3 + 2  # Space after paragraph
 
+            elif tag == 'tbl':
+                tbl = tables.get(element)
                 if tbl is None:
                     continue
 
@@ -322,45 +417,56 @@ class PDFCreator:
                     continue
 
                 col_width = usable_width / num_cols
-                row_height = 20
+                cell_font_size = 9
+                cell_line_height = cell_font_size * 1.3
+                metrics = font_metrics("helv")
+                # Cell lines that fit on an empty page
+                page_lines = int((page_height - margin_top - margin_bottom - 6) // cell_line_height)
 
                 for row in tbl.rows:
-                    # Estimate row height
-                    max_text_len = 0
-                    for cell in row.cells:
-                        max_text_len = max(max_text_len, len(cell.text))
-                    chars_per_col = max(1, int(col_width / 6))
-                    est_lines = max(1, (max_text_len + chars_per_col - 1) // chars_per_col)
-                    row_height = max(20, est_lines * 14 + 6)
-
-                    check_space(row_height)
-
-                    for col_idx, cell in enumerate(row.cells):
-                        cell_x = margin_left + col_idx * col_width
-                        cell_rect = fitz.Rect(
-                            cell_x, y_pos,
-                            cell_x + col_width, y_pos + row_height
-                        )
-                        # Draw cell border
-                        page.draw_rect(cell_rect, color=(0.6, 0.6, 0.6), width=0.5)
-
-                        # Insert cell text
-                        text_rect = fitz.Rect(
-                            cell_x + 3, y_pos + 2,
-                            cell_x + col_width - 3, y_pos + row_height - 2
-                        )
-                        cell_text = cell.text.strip()
-                        if cell_text:
-                            page.insert_textbox(
-                                text_rect, cell_text,
-                                fontsize=9, fontname="helv",
-                                color=(0, 0, 0), align=fitz.TEXT_ALIGN_LEFT
-                            )
-
-                    y_pos += row_height
+                    cells = [
+                        metrics.wrap(cell.text.strip(), cell_font_size, col_width - 6)
+                        for cell in row.cells
+                    ]
+
+                    while cells:
+                        if max(len(lines) for lines in cells) > page_lines:
+                            # Taller than a page: fill the rest of this page
+                            # and continue the row on the next
+                            fit = int((page_height - margin_bottom - y_pos - 6) // cell_line_height)
+                            if fit < 1:
+                                new_page()
+                                continue
+                            part = [lines[:fit] for lines in cells]
+                            cells = [lines[fit:] for lines in cells]
+                        else:
+                            part, cells = cells, []
+                        row_height = max(20, max(len(lines) for lines in part) * cell_line_height + 6)
+
+                        check_space(row_height)
+
+                        # Cell borders
+                        for col_idx in range(len(part)):
+                            cell_x = margin_left + col_idx * col_width
+                            shape.draw_rect(fitz.Rect(cell_x, y_pos, cell_x + col_width, y_pos + row_height))
+                        shape.finish(color=(0.6, 0.6, 0.6), width=0.5)
+
+                        # Cell text
+                        row_top = y_pos
+                        for col_idx, lines in enumerate(part):
+                            y_pos = row_top + 3
+                            for line in lines:
+                                if line:
+                                    write_line(line, margin_left + col_idx * col_width + 3, col_width - 6,
+                                               cell_font_size, metrics, (0, 0, 0), None)
+                                y_pos += cell_line_height
+
+                        y_pos = row_top + row_height
 
                 y_pos += 8  # Space after table
 
+        finish_page()
+
         # Save PDF
         pdf.save(output_file, garbage=4, deflate=True)
         pdf.close()
@@ -369,6 +475,7 @@ class PDFCreator:
         self.last_error = None
         return True
 
+    @profiled("Excel to PDF", input_arg="excel_file", output_arg="output_file")
     def from_excel(self, excel_file: str, output_file: str) -> bool:
         """
         Create PDF from Excel spreadsheet
@@ -431,6 +538,7 @@ class PDFCreator:
             self.logger.error(f"Error creating PDF from Excel: {e}")
             return False
 
+    @profiled("PowerPoint to PDF", input_arg="ppt_file", output_arg="output_file")
     def from_powerpoint(self, ppt_file: str, output_file: str) -> bool:
         """
         Create PDF from PowerPoint presentation
@@ -506,46 +614,114 @@ class PDFCreator:
             self.logger.error(f"Error creating PDF from PowerPoint: {e}")
             return False
 
+    @profiled("Text to PDF", input_arg="text_file", output_arg="output_file")
     def from_text(self, text_file: str, output_file: str,
-                 font_size: int = 12, font_name: str = "helv") -> bool:
+                 font_size: int = 12, font_name: str = "helv",
+                 monospace: bool = False, line_numbers: bool = False,
+                 header: Optional[str] = None) -> bool:
         """
         Create PDF from text file
 
+        The file is read line by line and every page is written to disk as
+        soon as it is full, so memory use does not depend on the file size.
+        Long lines wrap; form feeds start a new page.
+
         Args:
             text_file: Text file path
             output_file: Output PDF file path
             font_size: Font size
-            font_name: Font name
+            font_name: Font name (base-14 font code)
+            monospace: Use Courier regardless of font_name
+            line_numbers: Print source line numbers in a left gutter
+            header: Header printed on every page; may use {page} and {file}
 
         Returns:
             True if successful
         """
-        try:
-            # Read text file
-            with open(text_file, 'r', encoding='utf-8') as f:
-                text = f.read()
+        from src.pdf_engine.pdf_stream_writer import PDFStreamWriter
 
-            # Create PDF
-            pdf = fitz.open()
-            page = pdf.new_page(width=595, height=842)  # A4 size
-
-            # Insert text
-            text_rect = fitz.Rect(50, 50, 545, 792)  # Margins
-            page.insert_textbox(
-                text_rect,
-                text,
-                fontsize=font_size,
-                fontname=font_name,
-                align=fitz.TEXT_ALIGN_LEFT
-            )
-
-            pdf.save(output_file)
-            pdf.close()
-
-            self.logger.info(f"Created PDF from text: {output_file}")
+        writer = None
+        try:
+            fontname = "cour" if monospace else font_name
+            if fontname not in BASE14_FONTS:
+                fontname = "helv"
+            metrics = font_metrics(fontname)
+
+            # A4 with margins
+            page_width, page_height = 595, 842
+            margin = 50
+            line_height = font_size * 1.2
+            header_size = max(7, font_size - 2)
+            number_size = max(6, font_size - 2)
+
+            top = page_height - margin - (header_size * 2 if header else 0)
+            text_x = margin
+            if line_numbers:
+                text_x += font_metrics("cour").text_length("000000 ", number_size)
+            text_width = page_width - margin - text_x
+            lines_per_page = max(1, int((top - margin) / line_height))
+            file_name = Path(text_file).name
+
+            writer = PDFStreamWriter(output_file, {"F1": fontname, "F2": "cour", "F3": "helv"})
+            page_lines: List[bytes] = []
+            page_numbers: List[bytes] = []
+
+            def flush_page():
+                first = top - font_size
+                ops = [b"BT /F1 %s Tf %s TL %s %s Td" % (
+                    pdf_number(font_size), pdf_number(line_height), pdf_number(text_x), pdf_number(first))]
+                ops.append(b" T*\n".join(page_lines) + b"\nET")
+
+                if line_numbers:
+                    ops.append(b"0.5 g BT /F2 %s Tf %s TL %s %s Td" % (
+                        pdf_number(number_size), pdf_number(line_height), pdf_number(margin), pdf_number(first)))
+                    ops.append(b" T*\n".join(page_numbers) + b"\nET")
+
+                if header:
+                    # Only these two placeholders; other braces are printed as they are
+                    title = header.replace("{page}", str(writer.page_count + 1)).replace("{file}", file_name)
+                    ops.append(b"0 g BT /F3 %s Tf %s %s Td %s Tj ET" % (
+                        pdf_number(header_size), pdf_number(margin), pdf_number(page_height - margin - header_size),
+                        pdf_literal(title)))
+                    rule_y = pdf_number(page_height - margin - header_size * 1.5)
+                    ops.append(b"0.7 G 0.5 w %s %s m %s %s l S" % (
+                        pdf_number(margin), rule_y, pdf_number(page_width - margin), rule_y))
+
+                writer.add_page(page_width, page_height, b"\n".join(ops))
+                page_lines.clear()
+                page_numbers.clear()
+
+            def add_line(text, number):
+                if len(page_lines) >= lines_per_page:
+                    flush_page()
+                page_lines.append(pdf_literal(text) + b" Tj")
+                page_numbers.append(pdf_literal(number) + b" Tj")
+
+            with open(text_file, 'r', encoding='utf-8', errors='replace') as f:
+                for line_no, raw in enumerate(f, 1):
+                    segments = raw.rstrip("\r\n").split("\f")
+                    number = str(line_no).rjust(6)
+                    for i, segment in enumerate(segments):
+                        if i and page_lines:
+                            # Form feed - continue on a new page
+                            flush_page()
+                        if not segment and len(segments) > 1:
+                            continue
+                        for text in metrics.wrap(winansi(segment.expandtabs(4)), font_size, text_width):
+                            # Only the first wrapped segment carries the line number
+                            add_line(text, number)
+                            number = ""
+
+            if page_lines or writer.page_count == 0:
+                flush_page()
+            writer.close()
+
+            self.logger.info(f"Created PDF from text: {output_file} ({writer.page_count} pages)")
             return True
 
         except Exception as e:
+            if writer is not None:
+                writer.abort()
             self.logger.error(f"Error creating PDF from text: {e}")
             return False
 
@@ -579,98 +755,201 @@ class PDFCreator:
             self.logger.error(f"Error creating blank PDF: {e}")
             return False
 
+    @profiled("Convert to PDF/A", input_arg="input_file", output_arg="output_file")
     def convert_to_pdfa(self, input_file: str, output_file: str) -> bool:
         """
-        Convert PDF to PDF/A (archival format)
+        Convert PDF to PDF/A-2b (archival format)
 
         Args:
             input_file: Input PDF file path
             output_file: Output PDF/A file path
 
         Returns:
-            True if successful
+            True if successful (problems that could not be fixed are
+            reported in last_error)
         """
-        try:
-            pdf = fitz.open(input_file)
-
-            # Convert to PDF/A by setting metadata and removing incompatible features
-            metadata = {
-                'format': 'PDF/A-1b',
-                'title': pdf.metadata.get('title', ''),
-                'author': pdf.metadata.get('author', ''),
-                'subject': pdf.metadata.get('subject', ''),
-                'keywords': pdf.metadata.get('keywords', '')
-            }
+        from src.pdf_engine.pdf_archiver import PDFArchiver
 
-            pdf.set_metadata(metadata)
+        self.last_error = None
+        archiver = PDFArchiver()
+        if not archiver.convert(input_file, output_file):
+            self.last_error = "PDF/A conversion failed. See the log for details."
+            return False
 
-            # Save with PDF/A compatible settings
-            pdf.save(
-                output_file,
-                garbage=4,
-                deflate=True,
-                clean=True,
-                pretty=True
-            )
+        if archiver.last_issues:
+            self.last_error = "PDF/A conversion finished with remaining issues:\n\n" + \
+                "\n".join(archiver.last_issues)
+        return True
 
-            pdf.close()
+    def batch_convert_to_pdfa(self, input_files: List[str], output_dir: str,
+                              workers: Optional[int] = None,
+                              result_callback: Optional[Callable[[ConversionResult], None]] = None,
+                              cancelled: Optional[Callable[[], bool]] = None) -> List[str]:
+        """
+        Convert PDFs to PDF/A-2b in parallel worker processes
 
-            self.logger.info(f"Converted to PDF/A: {output_file}")
-            return True
+        Args:
+            input_files: List of input PDF paths
+            output_dir: Output directory (files keep their names)
+            workers: Worker processes (None = CPU count)
+            result_callback: Called with each ConversionResult as it completes
+            cancelled: Polled while files convert (see batch_convert());
+                when it returns True the remaining files are not converted
 
-        except Exception as e:
-            self.logger.error(f"Error converting to PDF/A: {e}")
-            return False
+        Returns:
+            List of created PDF/A files
+        """
+        return self.batch_convert(input_files, output_dir, 'pdfa', workers=workers,
+                                  result_callback=result_callback, cancelled=cancelled)
 
-    def batch_convert(self, input_files: List[str], output_dir: str,
-                     format_type: str) -> List[str]:
+    def conversion_method(self, format_type: str) -> Callable[[str, str], bool]:
         """
-        Batch convert files to PDF
+        Conversion method for a format type
 
         Args:
-            input_files: List of input file paths
-            output_dir: Output directory
-            format_type: Type of files ('images', 'word', 'excel', 'powerpoint')
+            format_type: 'images', 'word', 'excel', 'powerpoint', 'text' or 'pdfa'
 
         Returns:
-            List of created PDF files
+            Bound method taking (input, output_file)
         """
-        output_files = []
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
         conversion_methods = {
             'images': self.from_images,
             'word': self.from_word,
             'excel': self.from_excel,
             'powerpoint': self.from_powerpoint,
-            'text': self.from_text
+            'text': self.from_text,
+            'pdfa': self.convert_to_pdfa
         }
-
         if format_type not in conversion_methods:
-            self.logger.error(f"Unknown format type: {format_type}")
-            return []
+            raise ValueError(f"Unknown format type: {format_type}")
+        return conversion_methods[format_type]
 
-        try:
-            if format_type == 'images':
-                # Special handling for images - can combine multiple
-                output_file = output_path / "combined.pdf"
-                if self.from_images(input_files, str(output_file)):
-                    output_files.append(str(output_file))
-            else:
-                # Convert each file individually
-                method = conversion_methods[format_type]
+    def iter_batch_convert(self, input_files: List[str], output_dir: str,
+                           format_type: str = 'auto', workers: Optional[int] = None,
+                           timeout: Optional[float] = 600, retries: int = 1,
+                           cancelled: Optional[Callable[[], bool]] = None) -> Iterator[ConversionResult]:
+        """
+        Batch convert files to PDF, yielding each result as it completes
 
-                for input_file in input_files:
-                    input_path = Path(input_file)
-                    output_file = output_path / f"{input_path.stem}.pdf"
+        Every file is converted in a worker process, so a crashing or hung
+        conversion only fails that file. With workers=0 the files are
+        converted one after another in this process (no timeout).
 
-                    if method(input_file, str(output_file)):
-                        output_files.append(str(output_file))
+        Args:
+            input_files: List of input file paths
+            output_dir: Output directory
+            format_type: 'auto' (by file extension), 'images' (all files into
+                combined.pdf), 'word', 'excel', 'powerpoint', 'text' or 'pdfa'
+            workers: Worker processes (None = CPU count, 0 = in this process)
+            timeout: Seconds a single file may take (None = no limit)
+            retries: Extra attempts for a failed, timed-out or crashed file
+            cancelled: Polled while files convert (see ConversionPool.run());
+                when it returns True the remaining files are skipped
+
+        Yields:
+            ConversionResult per job, in completion order
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        if format_type == 'images':
+            # Special handling for images - combined into one PDF
+            jobs = [ConversionJob('images', list(input_files), str(output_path / "combined.pdf"))]
+        else:
+            if format_type != 'auto':
+                self.conversion_method(format_type)
+
+            jobs = []
+            used_names = set()
+            for input_file in input_files:
+                input_path = Path(input_file)
+                job_format = format_type
+                if job_format == 'auto':
+                    job_format = BATCH_FORMATS.get(input_path.suffix.lower())
+                    if job_format is None:
+                        yield ConversionResult(input_file, "", False,
+                                               f"Unsupported file type: {input_path.suffix}", 0.0, 0)
+                        continue
+
+                # report.docx and report.txt must not overwrite each other
+                name = f"{input_path.stem}.pdf"
+                if name.lower() in used_names:
+                    name = f"{input_path.stem}_{input_path.suffix.lstrip('.')}.pdf"
+                used_names.add(name.lower())
+                jobs.append(ConversionJob(job_format, input_file, str(output_path / name)))
+
+        if workers == 0 or not jobs:
+            for job in jobs:
+                if cancelled and cancelled():
+                    return
+                start = time.perf_counter()
+                try:
+                    success, error = convert_job(job.format_type, job.input_file, job.output_file)
+                except Exception as e:
+                    success, error = False, str(e)
+                yield ConversionResult(job.input_file, job.output_file, success, error,
+                                       time.perf_counter() - start, 1)
+            return
+
+        yield from ConversionPool(workers, timeout, retries).run(jobs, cancelled)
+
+    @profiled("Batch convert", input_arg="input_files")
+    def batch_convert(self, input_files: List[str], output_dir: str,
+                      format_type: str = 'auto', workers: Optional[int] = None,
+                      timeout: Optional[float] = 600, retries: int = 1,
+                      result_callback: Optional[Callable[[ConversionResult], None]] = None,
+                      cancelled: Optional[Callable[[], bool]] = None) -> List[str]:
+        """
+        Batch convert files to PDF
+
+        Args:
+            input_files: List of input file paths
+            output_dir: Output directory
+            format_type: 'auto' (by file extension), 'images' (combined),
+                'word', 'excel', 'powerpoint', 'text' or 'pdfa'
+            workers: Worker processes (None = CPU count, 0 = in this process)
+            timeout: Seconds a single file may take (None = no limit)
+            retries: Extra attempts for a failed, timed-out or crashed file
+            result_callback: Called with each ConversionResult as it completes
+            cancelled: Polled while files convert, every
+                CANCEL_POLL_SECONDS (a GUI can process its events there);
+                when it returns True the worker processes are stopped and
+                the remaining files skipped
 
-            self.logger.info(f"Batch converted {len(output_files)} files")
-            return output_files
+        Returns:
+            List of created PDF files. Per-file results (including durations
+            and errors) are kept in last_batch_results.
+        """
+        output_files = []
+        self.last_batch_results = []
+        start = time.perf_counter()
+
+        results = self.iter_batch_convert(input_files, output_dir, format_type,
+                                          workers, timeout, retries, cancelled)
+        try:
+            for result in results:
+                self.last_batch_results.append(result)
+                if result.success:
+                    output_files.append(result.output_file)
+                else:
+                    self.logger.warning(f"Failed to convert {result.input_file}: {result.error}")
+                if result_callback:
+                    result_callback(result)
 
         except Exception as e:
             self.logger.error(f"Error in batch conversion: {e}")
-            return output_files
+
+        finally:
+            # Stops the worker processes of an unfinished batch
+            results.close()
+
+        results = self.last_batch_results
+        if results:
+            slowest = max(results, key=lambda r: r.duration)
+            self.logger.info(
+                f"Batch converted {len(output_files)}/{len(results)} files in "
+                f"{time.perf_counter() - start:.1f}s (total conversion time "
+                f"{sum(r.duration for r in results):.1f}s, slowest {slowest.duration:.1f}s: "
+                f"{slowest.input_file})"
+            )
+        return output_files
@@ -7,6 +7,110 @@ import pikepdf
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled
+
+
+class FormIndex:
+    """
+    Form fields of a document indexed by field name
+
+    Built with a single pass over the widgets. Each field name maps to the
+    widgets carrying it, so filling a field loads exactly those widgets
+    instead of scanning every page. As with PageCache, the document is
+    identified by its id, page count and object count; changes that keep
+    those (undo, redo, filled values) must call invalidate_index().
+    """
+
+    def __init__(self, pdf_document):
+        self.page_count = len(pdf_document)
+        self.state = self._state(pdf_document)
+        self.fields: List[Dict] = []
+        self.by_name: Dict[str, List[Dict]] = {}
+
+        for page_num in range(self.page_count):
+            page = pdf_document[page_num]
+
+            for widget in page.widgets():
+                field_info = {
+                    'page': page_num,
+                    'xref': widget.xref,
+                    'name': widget.field_name,
+                    'type': widget.field_type_string,
+                    'value': widget.field_value,
+                    'rect': tuple(widget.rect)
+                }
+                self.fields.append(field_info)
+                self.by_name.setdefault(widget.field_name, []).append(field_info)
+
+    @staticmethod
+    def _state(pdf_document) -> Tuple[int, int, int]:
+        # Not the document itself, so a closed document can be freed
+        return id(pdf_document), pdf_document.page_count, pdf_document.xref_length()
+
+    def is_valid_for(self, pdf_document) -> bool:
+        """Check the index still describes the given document"""
+        return not pdf_document.is_closed and self._state(pdf_document) == self.state
+
+    def group_values(self, data: Dict) -> Tuple[Dict[int, List[Tuple[Dict, object]]], int]:
+        """
+        Group field values by the pages of their widgets
+
+        Args:
+            data: Dictionary of field_name: value pairs
+
+        Returns:
+            (page number -> [(field info, value)], number of fields found)
+        """
+        by_page: Dict[int, List[Tuple[Dict, object]]] = {}
+        found = 0
+        for field_name, value in data.items():
+            widgets = self.by_name.get(field_name)
+            if not widgets:
+                continue
+            found += 1
+            for field_info in widgets:
+                by_page.setdefault(field_info['page'], []).append((field_info, value))
+        return by_page, found
+
+    def locations(self, field_name: str) -> List[Tuple[int, int]]:
+        """
+        Widgets of a field
+
+        Args:
+            field_name: Field name
+
+        Returns:
+            List of (page number, widget xref)
+        """
+        return [(info['page'], info['xref']) for info in self.by_name.get(field_name, [])]
+
+
+def fill_widgets(pdf_document, by_page: Dict[int, List[Tuple[Dict, object]]]):
+    """
+    Set widget values page by page
+
+    Every page is loaded once and every widget regenerates its appearance
+    stream once. Works on any copy of the document the index was built
+    from, since widget xrefs are the same.
+
+    Args:
+        pdf_document: PyMuPDF document
+        by_page: Page number -> [(field info, value)] from FormIndex.group_values();
+            the field info 'value' entries are updated with the stored values
+    """
+    for page_num in sorted(by_page):
+        page = pdf_document[page_num]
+
+        for field_info, value in by_page[page_num]:
+            widget = page.load_widget(field_info['xref'])
+            widget.field_value = value
+            widget.update()
+
+            if widget.field_type in (fitz.PDF_WIDGET_TYPE_CHECKBOX,
+                                     fitz.PDF_WIDGET_TYPE_RADIOBUTTON):
+                # Stored as the on/off state name, not the value passed in
+                widget = page.load_widget(field_info['xref'])
+            field_info['value'] = widget.field_value
 
 
 class PDFForms:
@@ -14,6 +118,29 @@ class PDFForms:
 
     def __init__(self):
         self.logger = get_logger()
+        self._index: Optional[FormIndex] = None
+
+    def get_index(self, pdf_document) -> FormIndex:
+        """
+        Get the form index of a document, building it on first use
+
+        Args:
+            pdf_document: PyMuPDF document
+
+        Returns:
+            FormIndex for the document
+        """
+        if self._index is None or not self._index.is_valid_for(pdf_document):
+            self._index = FormIndex(pdf_document)
+            self.logger.debug(
+                f"Indexed {len(self._index.fields)} widgets "
+                f"({len(self._index.by_name)} fields)"
+            )
+        return self._index
+
+    def invalidate_index(self):
+        """Drop the cached form index (after any change to the document)"""
+        self._index = None
 
     def create_text_field(self, pdf_document, page_num: int, field_name: str,
                          rect: Tuple[float, float, float, float],
@@ -47,6 +174,7 @@ class PDFForms:
 
             # Add widget to page
             page.add_widget(widget)
+            self.invalidate_index()
 
             self.logger.info(f"Created text field '{field_name}' on page {page_num}")
             return True
@@ -83,6 +211,7 @@ class PDFForms:
 
             # Add widget to page
             page.add_widget(widget)
+            self.invalidate_index()
 
             self.logger.info(f"Created checkbox '{field_name}' on page {page_num}")
             return True
@@ -119,6 +248,7 @@ class PDFForms:
 
             # Add widget to page
             page.add_widget(widget)
+            self.invalidate_index()
 
             self.logger.info(f"Created radio button '{field_name}' on page {page_num}")
             return True
@@ -158,6 +288,7 @@ class PDFForms:
 
             # Add widget to page
             page.add_widget(widget)
+            self.invalidate_index()
 
             self.logger.info(f"Created dropdown '{field_name}' on page {page_num}")
             return True
@@ -176,22 +307,8 @@ class PDFForms:
         Returns:
             List of field dictionaries
         """
-        fields = []
-
         try:
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-
-                # Get widgets (form fields)
-                for widget in page.widgets():
-                    field_info = {
-                        'page': page_num,
-                        'name': widget.field_name,
-                        'type': widget.field_type_string,
-                        'value': widget.field_value,
-                        'rect': tuple(widget.rect)
-                    }
-                    fields.append(field_info)
+            fields = [dict(field_info) for field_info in self.get_index(pdf_document).fields]
 
             self.logger.info(f"Found {len(fields)} form fields")
             return fields
@@ -213,16 +330,7 @@ class PDFForms:
             True if successful
         """
         try:
-            filled = False
-
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-
-                for widget in page.widgets():
-                    if widget.field_name == field_name:
-                        widget.field_value = value
-                        widget.update()
-                        filled = True
+            filled = self.fill_form_fields(pdf_document, {field_name: value}) > 0
 
             if filled:
                 self.logger.info(f"Filled field '{field_name}' with value: {value}")
@@ -235,10 +343,35 @@ class PDFForms:
             self.logger.error(f"Error filling form field: {e}")
             return False
 
+    def fill_form_fields(self, pdf_document, data: Dict) -> int:
+        """
+        Fill many form fields at once
+
+        Widgets are looked up in the form index and updated page by page, so
+        every page is loaded once and every widget regenerates its
+        appearance stream once, however many fields are filled.
+
+        Args:
+            pdf_document: PyMuPDF document
+            data: Dictionary of field_name: value pairs
+
+        Returns:
+            Number of fields filled (names not found are skipped)
+        """
+        by_page, filled = self.get_index(pdf_document).group_values(data)
+        fill_widgets(pdf_document, by_page)
+        return filled
+
+    @profiled("Flatten form", input_arg="input_file", output_arg="output_file")
     def flatten_form(self, input_file: str, output_file: str) -> bool:
         """
         Flatten PDF form (make fields non-editable)
 
+        Each widget's normal appearance stream is placed on its page as a Form
+        XObject and the widget annotation is removed, so filled values stay
+        exactly as displayed. Pages are processed one at a time without
+        rasterizing; other annotations are kept.
+
         Args:
             input_file: Input PDF path
             output_file: Output PDF path
@@ -247,21 +380,127 @@ class PDFForms:
             True if successful
         """
         try:
-            with pikepdf.open(input_file) as pdf:
-                # Flatten form fields
+            with pikepdf.open(input_file, allow_overwriting_input=True) as pdf:
+                acroform = pdf.Root.get('/AcroForm')
+                if acroform is not None and acroform.get('/NeedAppearances', False):
+                    # Values were set without up-to-date appearance streams
+                    pdf.generate_appearance_streams()
+
+                flattened = 0
+                for page in pdf.pages:
+                    flattened += self._flatten_page_widgets(pdf, page)
+
                 if '/AcroForm' in pdf.Root:
                     # Remove interactive form
                     del pdf.Root['/AcroForm']
 
                 pdf.save(output_file)
 
-            self.logger.info(f"Flattened form: {output_file}")
+            self.logger.info(f"Flattened {flattened} form fields: {output_file}")
             return True
 
         except Exception as e:
             self.logger.error(f"Error flattening form: {e}")
             return False
 
+    def _flatten_page_widgets(self, pdf, page) -> int:
+        """
+        Draw the widgets of one page into its content and drop the annotations
+
+        Returns:
+            Number of widgets removed
+        """
+        annots = page.obj.get('/Annots')
+        if annots is None:
+            return 0
+
+        keep = []
+        ops = []
+        removed = 0
+        for annot in annots:
+            if annot.get('/Subtype') != pikepdf.Name.Widget:
+                keep.append(annot)
+                continue
+
+            removed += 1
+            appearance = self._widget_appearance(annot)
+            hidden = int(annot.get('/F', 0)) & 2
+            if appearance is None or hidden or '/Rect' not in annot:
+                continue
+
+            if '/Subtype' not in appearance:
+                appearance.Subtype = pikepdf.Name.Form
+            matrix = self._appearance_matrix(appearance, annot.Rect)
+            if matrix is None:
+                continue
+
+            name = page.add_resource(appearance, pikepdf.Name.XObject, prefix='Fx')
+            ops.append(f"q {matrix} cm {name} Do Q")
+
+        if not removed:
+            return 0
+
+        if keep:
+            page.obj.Annots = pikepdf.Array(keep)
+        else:
+            del page.obj['/Annots']
+
+        if ops:
+            # Isolate the existing content's graphics state from the fields
+            page.contents_add(pdf.make_stream(b"q\n"), prepend=True)
+            page.contents_add(pdf.make_stream(("Q\n" + "\n".join(ops) + "\n").encode()))
+
+        return removed
+
+    def _widget_appearance(self, annot):
+        """Normal appearance stream of a widget (for its current state), or None"""
+        ap = annot.get('/AP')
+        if ap is None:
+            return None
+
+        normal = ap.get('/N')
+        if isinstance(normal, pikepdf.Stream):
+            return normal
+
+        # Checkboxes and radio buttons: one stream per state, selected by /AS
+        if isinstance(normal, pikepdf.Dictionary):
+            state = annot.get('/AS')
+            if state is not None and state in normal:
+                return normal[state]
+        return None
+
+    def _appearance_matrix(self, appearance, rect) -> Optional[str]:
+        """
+        Matrix placing an appearance stream on the widget rectangle (PDF 32000-1, 12.5.5)
+
+        The bounding box, transformed by the form matrix, is mapped onto the
+        annotation rectangle.
+
+        Returns:
+            Matrix operands for "cm", or None for an empty box
+        """
+        bbox = [float(v) for v in appearance.get('/BBox', [0, 0, 0, 0])]
+        a, b, c, d, e, f = [float(v) for v in appearance.get('/Matrix', [1, 0, 0, 1, 0, 0])]
+
+        corners = [(x * a + y * c + e, x * b + y * d + f)
+                   for x in (bbox[0], bbox[2]) for y in (bbox[1], bbox[3])]
+        box_x0 = min(x for x, _ in corners)
+        box_x1 = max(x for x, _ in corners)
+        box_y0 = min(y for _, y in corners)
+        box_y1 = max(y for _, y in corners)
+
+        x0, y0, x1, y1 = [float(v) for v in rect]
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+
+        if box_x1 - box_x0 <= 0 or box_y1 - box_y0 <= 0:
+            return None
+
+        sx = (x1 - x0) / (box_x1 - box_x0)
+        sy = (y1 - y0) / (box_y1 - box_y0)
+        values = (sx, 0, 0, sy, x0 - box_x0 * sx, y0 - box_y0 * sy)
+        return " ".join(format(round(v, 4), "g") for v in values)
+
     def export_form_data(self, pdf_document, output_format: str = "dict") -> Optional[Dict]:
         """
         Export form data to dictionary or CSV
@@ -274,16 +513,11 @@ class PDFForms:
             Dictionary of form data or None
         """
         try:
-            form_data = {}
-
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-
-                for widget in page.widgets():
-                    field_name = widget.field_name
-                    field_value = widget.field_value
-
-                    form_data[field_name] = field_value
+            # Last widget wins when several widgets share a field name
+            form_data = {
+                field_name: widgets[-1]['value']
+                for field_name, widgets in self.get_index(pdf_document).by_name.items()
+            }
 
             self.logger.info(f"Exported {len(form_data)} form fields")
             return form_data
@@ -354,11 +588,7 @@ class PDFForms:
             True if successful
         """
         try:
-            filled_count = 0
-
-            for field_name, value in data.items():
-                if self.fill_form_field(pdf_document, field_name, value):
-                    filled_count += 1
+            filled_count = self.fill_form_fields(pdf_document, data)
 
             self.logger.info(f"Imported {filled_count}/{len(data)} form fields")
             return filled_count > 0
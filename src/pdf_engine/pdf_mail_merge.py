@@ -0,0 +1,267 @@
+"""
+PDF Mail Merge - Fill one form template for every row of a CSV/Excel data file
+"""
+
+import os
+import re
+import csv
+import time
+import fitz  # PyMuPDF
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled
+from src.pdf_engine.pdf_forms import FormIndex, fill_widgets
+
+
+# Characters not allowed in output file names (Windows is the strictest)
+_UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# Per-process template state, set up once by _init_worker
+_worker_template: Optional[bytes] = None
+_worker_index: Optional[FormIndex] = None
+
+
+class _FilenameRow(dict):
+    """Row values for the file name pattern; blank (omitted) cells format as ''"""
+
+    def __missing__(self, key):
+        return ''
+
+
+def _init_worker(template_bytes: Optional[bytes], index: Optional[FormIndex] = None):
+    """Parse the template once per worker process (None releases it)"""
+    global _worker_template, _worker_index
+    _worker_template = template_bytes
+    if template_bytes and index is None:
+        index = FormIndex(fitz.open("pdf", template_bytes))
+    _worker_index = index
+
+
+def _merge_batch(batch: List[Tuple[int, Dict, str]], flatten: bool) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Fill and write a batch of rows
+
+    Args:
+        batch: (row number, field values, output path) per row
+        flatten: Convert the filled fields to page content
+
+    Returns:
+        (documents written, [(row number, error message)])
+    """
+    written = 0
+    failed = []
+
+    for row_num, values, output_file in batch:
+        try:
+            # In-memory clone: widget xrefs match the index built from the template
+            pdf_document = fitz.open("pdf", _worker_template)
+            by_page, _ = _worker_index.group_values(values)
+            fill_widgets(pdf_document, by_page)
+
+            if flatten:
+                pdf_document.bake(annots=False, widgets=True)
+
+            pdf_document.save(output_file, deflate=True)
+            pdf_document.close()
+            written += 1
+
+        except Exception as e:
+            failed.append((row_num, str(e)))
+
+    return written, failed
+
+
+class PDFMailMerge:
+    """Generate filled copies of a PDF form from tabular data"""
+
+    def __init__(self):
+        self.logger = get_logger()
+
+    def iter_rows(self, data_file: str, sheet_name: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream rows of a CSV or Excel file as dictionaries
+
+        The first row holds the field names. Excel files are read in
+        read-only mode, so rows are not all loaded into memory.
+
+        Args:
+            data_file: Path to a .csv, .xlsx or .xlsm file
+            sheet_name: Worksheet to read (None = active sheet)
+
+        Yields:
+            Dictionary of column name: value per row (empty cells are omitted)
+        """
+        suffix = Path(data_file).suffix.lower()
+
+        if suffix == '.csv':
+            with open(data_file, newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f):
+                    yield {name: value for name, value in row.items() if name and value != ''}
+            return
+
+        if suffix not in ('.xlsx', '.xlsm'):
+            raise ValueError(f"Unsupported data file type: {suffix}")
+
+        import openpyxl
+
+        wb = openpyxl.load_workbook(data_file, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet_name] if sheet_name else wb.active
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            names = [str(name).strip() if name is not None else '' for name in header]
+
+            for row in rows:
+                values = {}
+                for name, value in zip(names, row):
+                    if not name or value is None:
+                        continue
+                    # Excel integers come back as floats
+                    if isinstance(value, float) and value.is_integer():
+                        value = int(value)
+                    values[name] = value if isinstance(value, bool) else str(value)
+                if values:
+                    yield values
+        finally:
+            wb.close()
+
+    @profiled("Mail merge", input_arg="template_file")
+    def merge(self, template_file: str, data_file: str, output_dir: str,
+              filename_pattern: str = "merged_{index:05d}.pdf",
+              flatten: bool = False, sheet_name: Optional[str] = None,
+              workers: Optional[int] = None, batch_size: int = 25,
+              progress_callback: Optional[Callable[[int], None]] = None) -> Optional[Dict]:
+        """
+        Fill the template once per data row and write one PDF per row
+
+        The template is read and indexed once (per worker process); every row
+        fills an in-memory clone. Rows are streamed from the data file and at
+        most two batches per worker are in flight, so memory stays flat for
+        any number of rows.
+
+        Args:
+            template_file: Form template PDF
+            data_file: CSV or Excel file, first row = field names
+            output_dir: Output directory
+            filename_pattern: Output name, formatted with `index` (1-based row
+                number) and `row` (e.g. "{row[Employee ID]}.pdf"); blank
+                cells format as empty text, and a name already used by an
+                earlier row gets a numeric suffix ("_2", "_3", ...)
+            flatten: Convert the filled fields to page content
+            sheet_name: Worksheet for Excel files (None = active sheet)
+            workers: Worker processes (None = CPU count, 0 = in this process)
+            batch_size: Rows handed to a worker at a time
+            progress_callback: Called with the number of rows processed so far
+
+        Returns:
+            Dictionary with 'rows', 'written', 'failed' ([(row, error)]),
+            'seconds' and 'rows_per_second', or None on error
+        """
+        try:
+            template_bytes = Path(template_file).read_bytes()
+            index = FormIndex(fitz.open("pdf", template_bytes))
+            if not index.fields:
+                self.logger.error(f"Template has no form fields: {template_file}")
+                return None
+
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+
+            if workers is None:
+                workers = os.cpu_count() or 1
+
+            start = time.perf_counter()
+            rows = 0
+            written = 0
+            failed: List[Tuple[int, str]] = []
+
+            used_names = set()
+
+            def output_name(row_num: int, row: Dict) -> str:
+                """File name for a row, numbered if an earlier row has the same one"""
+                name = _UNSAFE_FILENAME_RE.sub('_', filename_pattern.format(index=row_num,
+                                                                             row=_FilenameRow(row)))
+                stem, suffix = os.path.splitext(name)
+                if stem.startswith('.') and not suffix:
+                    stem, suffix = '', stem  # ".pdf": every cell of the name was blank
+                if not stem.strip():
+                    stem, suffix = f"merged_{row_num:05d}", suffix or ".pdf"
+                name = f"{stem}{suffix}"
+                number = 1
+                while name.lower() in used_names:
+                    number += 1
+                    name = f"{stem}_{number}{suffix}"
+                used_names.add(name.lower())
+                return name
+
+            def batches():
+                nonlocal rows
+                batch = []
+                for row in self.iter_rows(data_file, sheet_name):
+                    rows += 1
+                    try:
+                        name = output_name(rows, row)
+                    except (KeyError, IndexError, ValueError, AttributeError) as e:
+                        failed.append((rows, f"Invalid file name pattern: {e}"))
+                        continue
+                    batch.append((rows, row, str(output_path / name)))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+
+            def collect(result):
+                nonlocal written
+                batch_written, batch_failed = result
+                written += batch_written
+                failed.extend(batch_failed)
+                if progress_callback:
+                    progress_callback(written + len(failed))
+
+            if workers <= 1:
+                _init_worker(template_bytes, index)
+                try:
+                    for batch in batches():
+                        collect(_merge_batch(batch, flatten))
+                finally:
+                    _init_worker(None)
+            else:
+                from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(template_bytes,)) as pool:
+                    pending = set()
+                    for batch in batches():
+                        if len(pending) >= workers * 2:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                collect(future.result())
+                        pending.add(pool.submit(_merge_batch, batch, flatten))
+
+                    for future in pending:
+                        collect(future.result())
+
+            seconds = time.perf_counter() - start
+            for row_num, error in failed:
+                self.logger.warning(f"Mail merge row {row_num} failed: {error}")
+            self.logger.info(
+                f"Mail merge wrote {written}/{rows} documents in {seconds:.1f}s"
+            )
+
+            return {
+                'rows': rows,
+                'written': written,
+                'failed': failed,
+                'seconds': seconds,
+                'rows_per_second': rows / seconds if seconds else 0.0
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in mail merge: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return None
@@ -6,6 +6,7 @@ import fitz  # PyMuPDF
 from pathlib import Path
 from typing import List, Optional, Tuple
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled, record_pages
 
 
 class PDFMerger:
@@ -14,6 +15,7 @@ class PDFMerger:
     def __init__(self):
         self.logger = get_logger()
 
+    @profiled("Merge", input_arg="input_files", output_arg="output_file")
     def merge_pdfs(self, input_files: List[str], output_file: str) -> bool:
         """
         Merge multiple PDF files into one
@@ -29,9 +31,10 @@ class PDFMerger:
             result_pdf = fitz.open()
 
             for pdf_file in input_files:
-                self.logger.info(f"Merging: {pdf_file}")
+                self.logger.debug("Merging: %s", pdf_file)
                 with fitz.open(pdf_file) as pdf:
                     result_pdf.insert_pdf(pdf)
+                    record_pages(len(pdf))
 
             result_pdf.save(output_file)
             result_pdf.close()
@@ -43,6 +46,7 @@ class PDFMerger:
             self.logger.error(f"Error merging PDFs: {e}")
             return False
 
+    @profiled("Split by pages", input_arg="input_file")
     def split_by_pages(self, input_file: str, output_dir: str,
                        pages_per_file: int = 1) -> List[str]:
         """
@@ -88,6 +92,7 @@ class PDFMerger:
             self.logger.error(f"Error splitting PDF: {e}")
             return []
 
+    @profiled("Split by range", input_arg="input_file")
     def split_by_range(self, input_file: str, output_dir: str,
                        ranges: List[Tuple[int, int]]) -> List[str]:
         """
@@ -128,6 +133,7 @@ class PDFMerger:
             self.logger.error(f"Error splitting PDF by range: {e}")
             return []
 
+    @profiled("Split by size", input_arg="input_file")
     def split_by_size(self, input_file: str, output_dir: str,
                      max_size_mb: float) -> List[str]:
         """
@@ -203,6 +209,7 @@ class PDFMerger:
             self.logger.error(f"Error splitting PDF by size: {e}")
             return []
 
+    @profiled("Extract pages", input_arg="input_file", output_arg="output_file")
     def extract_pages(self, input_file: str, output_file: str,
                      pages: List[int]) -> bool:
         """
@@ -0,0 +1,452 @@
+"""
+PDF Optimizer - Merge duplicate images/fonts, subset fonts and drop unused resources
+"""
+
+import os
+import re
+import hashlib
+import fitz  # PyMuPDF
+from typing import Dict, List, Optional, Set, Tuple
+from src.utilities.logger import get_logger
+from src.utilities.profiler import record_pages
+
+
+# Report categories
+CATEGORIES = ("images", "fonts", "forms", "content", "other")
+
+_REF_RE = re.compile(rb"(\d+) 0 R\b")
+_NAME_RE = re.compile(rb"/([^\s/\[\]()<>{}%]+)")
+_LENGTH_RE = re.compile(rb"/Length \d+")
+_FILTER_RE = re.compile(rb"/(?:Filter|DecodeParms)\s*(?:\[[^\]]*\]|<<[^<>]*>>|/\w+|null|\d+ 0 R)")
+_FILTER_ONLY_RE = re.compile(rb"/Filter\s*(?:\[[^\]]*\]|/\w+|null|\d+ 0 R)")
+# Filters xref_stream() leaves in place: they are part of the image data
+_IMAGE_FILTERS = (b"/DCTDecode", b"/JPXDecode", b"/JBIG2Decode", b"/CCITTFaxDecode")
+
+# Objects whose identity matters (page tree, annotations, form fields,
+# outlines, structure, layers) are never merged
+_UNIQUE_MARKERS = (
+    b"/Type/Page", b"/Type/Catalog", b"/Type/Annot", b"/Type/Outlines",
+    b"/Type/Struct", b"/Type/Sig", b"/Type/OCG", b"/Type/ObjStm", b"/Type/XRef",
+    b"/Parent", b"/Kids", b"/Rect", b"/FT", b"/StructParent",
+)
+
+# Page resource categories whose entries are referenced by name in content
+_RESOURCE_KEYS = ("Font", "XObject", "ExtGState", "ColorSpace", "Pattern", "Shading")
+
+# Resource categories whose objects can have content of their own (forms,
+# tiling patterns, Type3 glyph procedures) using more resource names
+_NESTED_CONTENT_KEYS = ("XObject", "Pattern", "Font")
+
+
+def stream_category(obj_source: bytes) -> str:
+    """
+    Report category of a stream object from its dictionary
+
+    Args:
+        obj_source: Object source as returned by xref_object(compressed=True)
+
+    Returns:
+        One of CATEGORIES
+    """
+    if b"/Subtype/Image" in obj_source:
+        return "images"
+    if b"/Length1" in obj_source or b"/Length2" in obj_source or \
+            b"/Subtype/Type1C" in obj_source or b"/Subtype/CIDFontType0C" in obj_source or \
+            b"/Subtype/OpenType" in obj_source:
+        return "fonts"
+    if b"/Subtype/Form" in obj_source:
+        return "forms"
+    return "other"
+
+
+def stream_sizes(doc) -> Dict[str, int]:
+    """
+    Compressed stream bytes per category, one object at a time
+
+    Args:
+        doc: Open fitz.Document
+
+    Returns:
+        Dictionary of category: bytes
+    """
+    content_xrefs = set()
+    for page in doc:
+        content_xrefs.update(page.get_contents())
+
+    sizes = dict.fromkeys(CATEGORIES, 0)
+    for xref in range(1, doc.xref_length()):
+        if not doc.xref_is_stream(xref):
+            continue
+        source = doc.xref_object(xref, compressed=True).encode()
+        category = "content" if xref in content_xrefs else stream_category(source)
+        sizes[category] += len(doc.xref_stream_raw(xref) or b"")
+    return sizes
+
+
+def referenced_xrefs(doc) -> Set[int]:
+    """
+    Objects reachable from the trailer, i.e. the ones a garbage-collecting save keeps
+
+    Args:
+        doc: Open fitz.Document
+
+    Returns:
+        Set of xref numbers
+    """
+    xref_count = doc.xref_length()
+    pending = [int(ref) for ref in _REF_RE.findall(doc.pdf_trailer(compressed=True).encode())]
+    reached: Set[int] = set()
+    while pending:
+        xref = pending.pop()
+        if xref in reached or not 0 < xref < xref_count:
+            continue
+        reached.add(xref)
+        pending.extend(int(ref) for ref in
+                       _REF_RE.findall(doc.xref_object(xref, compressed=True).encode()))
+    return reached
+
+
+def stored_size(doc, xrefs) -> int:
+    """Approximate bytes the given objects take in a saved file"""
+    total = 0
+    for xref in xrefs:
+        total += len(doc.xref_object(xref, compressed=True)) + 20
+        if doc.xref_is_stream(xref):
+            total += len(doc.xref_stream_raw(xref) or b"")
+    return total
+
+
+class PDFOptimizer:
+    """
+    Structural PDF optimizer
+
+    Works over the xref table one object at a time: only hashes and the
+    duplicate -> original map are kept in memory, never the object graph.
+    """
+
+    def __init__(self):
+        self.logger = get_logger()
+
+    def optimize(self, input_file: str, output_file: str, subset_fonts: bool = True,
+                 remove_unused: bool = True) -> Optional[Dict]:
+        """
+        Merge duplicate objects, subset fonts, drop unused resources and save
+
+        Args:
+            input_file: Input PDF path
+            output_file: Output PDF path
+            subset_fonts: Subset embedded fonts to the glyphs that are used
+            remove_unused: Remove page resources the page content never uses
+
+        Returns:
+            Report dictionary with 'original_size', 'optimized_size',
+            'saved' (bytes per category and 'total'), 'duplicates' (merged
+            objects per category) and 'unused_resources', or None on error
+        """
+        try:
+            doc = fitz.open(input_file)
+            record_pages(len(doc))
+            original_size = os.path.getsize(input_file)
+            before = stream_sizes(doc)
+
+            duplicates = self.deduplicate(doc)
+            unused = self.remove_unused_resources(doc) if remove_unused else 0
+            if subset_fonts:
+                try:
+                    doc.subset_fonts()
+                except Exception as e:
+                    self.logger.warning(f"Font subsetting skipped: {e}")
+
+            # garbage=2 removes the now unreferenced duplicates; MuPDF's own
+            # duplicate search (garbage=3/4) compares objects pairwise
+            doc.save(output_file, garbage=2, deflate=True, use_objstms=1)
+            doc.close()
+
+            with fitz.open(output_file) as optimized:
+                after = stream_sizes(optimized)
+            optimized_size = os.path.getsize(output_file)
+
+            # A category can grow (e.g. objects moved into object streams);
+            # that is not a saving, so it is reported as 0
+            saved = {category: max(0, before[category] - after[category]) for category in CATEGORIES}
+            saved["total"] = max(0, original_size - optimized_size)
+            report = {
+                "original_size": original_size,
+                "optimized_size": optimized_size,
+                "saved": saved,
+                "duplicates": duplicates,
+                "unused_resources": unused,
+            }
+
+            self.logger.info(
+                f"Optimized {input_file}: {original_size:,} -> {optimized_size:,} bytes "
+                f"(images {saved['images']:,}, fonts {saved['fonts']:,}, "
+                f"forms {saved['forms']:,}, content {saved['content']:,}, "
+                f"{sum(duplicates.values())} duplicates merged, {unused} unused resources)"
+            )
+            return report
+
+        except Exception as e:
+            self.logger.error(f"Error optimizing PDF: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return None
+
+    def deduplicate(self, doc) -> Dict[str, int]:
+        """
+        Point every reference to a duplicate object at its first copy
+
+        Streams are compared by a hash of their dictionary and decoded
+        data (so the same image compressed differently still matches),
+        other objects by their source. Page tree, annotation, form field,
+        outline and structure objects are left alone. Runs until no more
+        duplicates appear, since merging e.g. font files makes the
+        descriptors that use them identical.
+
+        Args:
+            doc: Open fitz.Document (modified in place)
+
+        Returns:
+            Number of merged objects per category
+        """
+        merged = dict.fromkeys(CATEGORIES, 0)
+        replace: Dict[int, int] = {}
+        data_digests: Dict[int, Tuple[bytes, bool]] = {}  # xref -> (digest, decoded)
+        xref_count = doc.xref_length()
+
+        def resolve(match):
+            xref = int(match.group(1))
+            return b"%d 0 R" % replace.get(xref, xref)
+
+        while True:
+            seen: Dict[bytes, int] = {}
+            found = 0
+
+            for xref in range(1, xref_count):
+                if xref in replace:
+                    continue
+                source = doc.xref_object(xref, compressed=True).encode()
+                if any(marker in source for marker in _UNIQUE_MARKERS):
+                    continue
+                is_stream = doc.xref_is_stream(xref)
+
+                # Compare with references already redirected to their originals
+                key_source = _REF_RE.sub(resolve, source)
+                if is_stream:
+                    digest = data_digests.get(xref)
+                    if digest is None:
+                        try:
+                            data = doc.xref_stream(xref)
+                        except Exception:
+                            data = None
+                        # MuPDF returns no data for a stream it cannot decode
+                        decoded = bool(data)
+                        if not decoded:
+                            data = doc.xref_stream_raw(xref)
+                        digest = data_digests[xref] = (
+                            hashlib.blake2b(data or b"", digest_size=20).digest(), decoded)
+                    data_digest, decoded = digest
+                    key_source = _LENGTH_RE.sub(b"", key_source)
+                    image_filters = b"".join(f for f in _IMAGE_FILTERS if f in key_source)
+                    # Compare decoded data: the compression filter does not
+                    # matter. Data still encoded (image filters, or raw data
+                    # that failed to decode) keeps its parameters in the key:
+                    # CCITT /K and /Columns or JBIG2 globals say how it is read
+                    if decoded and image_filters:
+                        key_source = _FILTER_ONLY_RE.sub(b"", key_source) + image_filters
+                    elif decoded:
+                        key_source = _FILTER_RE.sub(b"", key_source)
+                    key_source += data_digest
+                key = hashlib.blake2b(key_source, digest_size=20).digest()
+
+                original = seen.get(key)
+                if original is None:
+                    seen[key] = xref
+                    continue
+
+                replace[xref] = original
+                found += 1
+                if is_stream:
+                    merged[stream_category(source)] += 1
+                elif b"/Type/Font" in source:
+                    merged["fonts"] += 1
+                else:
+                    merged["other"] += 1
+
+            if not found:
+                break
+
+        if replace:
+            self._redirect_references(doc, replace)
+        return merged
+
+    def _redirect_references(self, doc, replace: Dict[int, int]):
+        """Rewrite references to merged objects, one object at a time"""
+        def resolve(match):
+            xref = int(match.group(1))
+            return b"%d 0 R" % replace.get(xref, xref)
+
+        for xref in range(1, doc.xref_length()):
+            if xref in replace:
+                continue
+            source = doc.xref_object(xref, compressed=True).encode()
+            if b" 0 R" not in source:
+                continue
+            updated = _REF_RE.sub(resolve, source)
+            if updated != source:
+                doc.update_object(xref, updated.decode("latin-1"))
+
+    def remove_unused_resources(self, doc) -> int:
+        """
+        Remove page resources that no content on the page refers to
+
+        Names are collected from the page content and, recursively, from
+        the forms, tiling patterns and Type3 glyphs it uses and from its
+        annotation appearances. A resource dictionary is only pruned when
+        nothing but pages (or their /Resources objects) refers to it, so a
+        dictionary shared with a form XObject, an annotation or the page
+        tree is left alone. Shared by several pages, it keeps every entry
+        any of them uses.
+
+        Args:
+            doc: Open fitz.Document (modified in place)
+
+        Returns:
+            Number of resource entries removed
+        """
+        # Resources holder (resources xref, or page xref for inline
+        # resources) -> (key path prefix, names used)
+        holders: Dict[int, Tuple[str, Set[str]]] = {}
+        page_xrefs: Set[int] = set()
+
+        for page in doc:
+            page_xrefs.add(page.xref)
+            kind, value = doc.xref_get_key(page.xref, "Resources")
+            if kind == "xref":
+                holder, path = int(value.split()[0]), ""
+            elif kind == "dict":
+                holder, path = page.xref, "Resources/"
+            else:
+                continue  # Inherited from the page tree
+            names = holders.setdefault(holder, (path, set()))[1]
+            resources = [(holder, path)]
+            seen: Set[int] = set()
+            for content_xref in page.get_contents():
+                self._collect_names(doc, doc.xref_stream(content_xref) or b"",
+                                    resources, names, seen)
+            for annot_xref, _, _ in page.annot_xrefs():
+                for appearance in self._appearance_streams(doc, annot_xref):
+                    self._collect_object_names(doc, appearance, resources, names, seen)
+
+        # Category dictionaries to prune -> holders whose names apply
+        candidates: Dict[int, Set[int]] = {}
+        for holder, (path, _) in holders.items():
+            for category in _RESOURCE_KEYS:
+                kind, value = doc.xref_get_key(holder, path + category)
+                if kind == "dict":
+                    # Move inline dictionaries into their own object so
+                    # their keys can be listed and removed
+                    target = doc.get_new_xref()
+                    doc.update_object(target, value)
+                    doc.xref_set_key(holder, path + category, f"{target} 0 R")
+                elif kind == "xref":
+                    target = int(value.split()[0])
+                else:
+                    continue
+                candidates.setdefault(target, set()).add(holder)
+
+        # Only pages may refer to a resources object, and only resources
+        # holders to a category dictionary; anything else may use any entry
+        referrers = self._referrers(doc, set(holders) | set(candidates))
+        safe_holders = {holder for holder in holders
+                        if holder in page_xrefs or referrers.get(holder, set()) <= page_xrefs}
+
+        removed = 0
+        for target, users in candidates.items():
+            if not referrers.get(target, set()) <= users or not users <= safe_holders:
+                continue
+            names = set().union(*(holders[holder][1] for holder in users))
+            for key in doc.xref_get_keys(target):
+                if key not in names and doc.xref_get_key(target, key)[0] != "null":
+                    doc.xref_set_key(target, key, "null")
+                    removed += 1
+        return removed
+
+    def _collect_names(self, doc, data: bytes, resources: List[Tuple[int, str]],
+                       names: Set[str], seen: Set[int]):
+        """
+        Add the names used in a content stream, and those of the forms,
+        patterns and Type3 fonts it uses, to names
+
+        Args:
+            doc: Open fitz.Document
+            data: Decoded content stream
+            resources: (xref, key path prefix) of the resource dictionaries
+                the names may refer to, innermost first
+            names: Set to add to
+            seen: Objects already scanned
+        """
+        found = {name.decode("latin-1") for name in _NAME_RE.findall(data)}
+        names.update(found)
+        for holder, path in resources:
+            for category in _NESTED_CONTENT_KEYS:
+                for name in found:
+                    kind, value = doc.xref_get_key(holder, f"{path}{category}/{name}")
+                    if kind == "xref":
+                        self._collect_object_names(doc, int(value.split()[0]),
+                                                   resources, names, seen)
+
+    def _collect_object_names(self, doc, xref: int, resources: List[Tuple[int, str]],
+                              names: Set[str], seen: Set[int]):
+        """Add the names used by a form, tiling pattern or Type3 font object"""
+        if xref in seen or not 0 < xref < doc.xref_length():
+            return
+        seen.add(xref)
+        # Its own resources come first; the enclosing ones are kept too, for
+        # objects that (incorrectly but commonly) rely on them
+        own = [(xref, "Resources/")] if doc.xref_get_key(xref, "Resources")[0] != "null" else []
+
+        if doc.xref_is_stream(xref):
+            if doc.xref_get_key(xref, "Subtype")[1] == "/Form" or \
+                    doc.xref_get_key(xref, "PatternType")[1] == "1":
+                self._collect_names(doc, doc.xref_stream(xref) or b"", own + resources, names, seen)
+        elif doc.xref_get_key(xref, "Subtype")[1] == "/Type3":
+            kind, value = doc.xref_get_key(xref, "CharProcs")
+            procs = [int(ref) for ref in _REF_RE.findall(value.encode())] if kind == "dict" else []
+            if kind == "xref":
+                procs_xref = int(value.split()[0])
+                procs = [int(doc.xref_get_key(procs_xref, key)[1].split()[0])
+                         for key in doc.xref_get_keys(procs_xref)
+                         if doc.xref_get_key(procs_xref, key)[0] == "xref"]
+            for proc in procs:
+                self._collect_names(doc, doc.xref_stream(proc) or b"", own + resources, names, seen)
+
+    @staticmethod
+    def _appearance_streams(doc, annot_xref: int) -> List[int]:
+        """Normal, rollover and down appearance streams of an annotation"""
+        streams = []
+        for state in ("N", "R", "D"):
+            kind, value = doc.xref_get_key(annot_xref, f"AP/{state}")
+            if kind == "xref":
+                xref = int(value.split()[0])
+                if doc.xref_is_stream(xref):
+                    streams.append(xref)
+                    continue
+                value = doc.xref_object(xref, compressed=True)
+            elif kind != "dict":
+                continue
+            # A dictionary of appearance states, each a stream
+            streams.extend(int(ref) for ref in _REF_RE.findall(value.encode()))
+        return streams
+
+    @staticmethod
+    def _referrers(doc, xrefs: Set[int]) -> Dict[int, Set[int]]:
+        """Objects that refer to each of the given xrefs, one object at a time"""
+        referrers: Dict[int, Set[int]] = {}
+        for xref in range(1, doc.xref_length()):
+            source = doc.xref_object(xref, compressed=True).encode()
+            for ref in _REF_RE.findall(source):
+                target = int(ref)
+                if target in xrefs:
+                    referrers.setdefault(target, set()).add(xref)
+        return referrers
@@ -0,0 +1,183 @@
+"""
+PDF Stream Writer - Write generated pages straight to disk, one page at a time
+"""
+
+import os
+import uuid
+import zlib
+from array import array
+from typing import BinaryIO, Dict, Optional
+from src.pdf_engine.text_layout import base14_font_object, pdf_number
+
+
+class PDFStreamWriter:
+    """
+    Sequential PDF writer for generated pages
+
+    Each page is written to the file as soon as it is added; only object
+    offsets and page object numbers are kept (a few bytes per page). The
+    page tree, catalog and cross-reference table are written by close().
+    Pages go to a temporary file next to the output, which close() moves
+    into place, so a failed or aborted run leaves an existing output file
+    untouched and no partial PDF behind.
+
+    Pages use base-14 fonts (WinAnsiEncoding) registered up front under
+    resource names, and image XObjects written with add_image().
+    """
+
+    # Fixed object numbers: the page tree is referenced by every page
+    # before it is written
+    _CATALOG = 1
+    _PAGES = 2
+
+    def __init__(self, output_file: str, fonts: Optional[Dict[str, str]] = None,
+                 compress: bool = True):
+        """
+        Args:
+            output_file: Output PDF path
+            fonts: Resource name -> PyMuPDF base-14 font code, e.g. {"F1": "cour"}
+            compress: Deflate page content streams
+        """
+        self.compress = compress
+        self.output_file = output_file
+        self._temp_path = f"{output_file}.{uuid.uuid4().hex[:8]}.tmp"
+        # Created like open() would, so the umask applies (mkstemp makes it private)
+        fd = os.open(self._temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+                     0o666)
+        self._file: Optional[BinaryIO] = os.fdopen(fd, 'wb')
+        # Offsets of objects 3, 4, ... in creation order (written sequentially)
+        self._offsets = array('Q')
+        self._fixed_offsets: Dict[int, int] = {}
+        self._kids = array('Q')
+        self._next_obj = 3
+
+        self._file.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+        font_refs = []
+        for name, fontname in (fonts or {}).items():
+            font_obj = self._write_object(base14_font_object(fontname).encode())
+            font_refs.append(f"/{name} {font_obj} 0 R")
+        self._font_resources = f"/Font<<{''.join(font_refs)}>>".encode() if font_refs else b""
+
+    @property
+    def page_count(self) -> int:
+        return len(self._kids)
+
+    def add_image(self, width: int, height: int, data: bytes, filter_name: Optional[str],
+                  color_space: Optional[str] = "DeviceRGB", bits: int = 8,
+                  decode: Optional[str] = None, smask: Optional[int] = None) -> int:
+        """
+        Write an image XObject
+
+        Args:
+            width: Width in pixels
+            height: Height in pixels
+            data: Encoded image data, written as-is
+            filter_name: Filter of the data ("DCTDecode", "JPXDecode",
+                "FlateDecode") or None for raw samples
+            color_space: Colour space name (None for JPXDecode)
+            bits: Bits per component
+            decode: Decode array, e.g. "[1 0 1 0 1 0 1 0]" for Adobe CMYK JPEGs
+            smask: Object number of a soft mask image
+
+        Returns:
+            Object number, for add_page(images=...)
+        """
+        entries = [b"/Type/XObject/Subtype/Image/Width %d/Height %d/Length %d" % (width, height, len(data))]
+        if filter_name:
+            entries.append(b"/Filter/" + filter_name.encode())
+        if color_space:
+            entries.append(b"/ColorSpace/%s/BitsPerComponent %d" % (color_space.encode(), bits))
+        if decode:
+            entries.append(b"/Decode" + decode.encode())
+        if smask:
+            entries.append(b"/SMask %d 0 R" % smask)
+        return self._write_object(b"<<" + b"".join(entries) + b">>\nstream\n" + data + b"\nendstream")
+
+    def add_page(self, width: float, height: float, content: bytes,
+                 images: Optional[Dict[str, int]] = None):
+        """
+        Write a page
+
+        Args:
+            width: Page width in points
+            height: Page height in points
+            content: Page content stream (PDF operators)
+            images: Resource name -> object number from add_image()
+        """
+        if self.compress:
+            data = zlib.compress(content)
+            stream_dict = b"<</Length %d/Filter/FlateDecode>>" % len(data)
+        else:
+            data = content
+            stream_dict = b"<</Length %d>>" % len(data)
+        content_obj = self._write_object(stream_dict + b"\nstream\n" + data + b"\nendstream")
+
+        resources = self._font_resources
+        if images:
+            resources += b"/XObject<<%s>>" % b"".join(
+                b"/%s %d 0 R" % (name.encode(), obj) for name, obj in images.items()
+            )
+
+        page_obj = self._write_object(
+            b"<</Type/Page/Parent %d 0 R/MediaBox[0 0 %s %s]/Resources<<%s>>/Contents %d 0 R>>" % (
+                self._PAGES, pdf_number(width), pdf_number(height), resources, content_obj
+            )
+        )
+        self._kids.append(page_obj)
+
+    def close(self):
+        """Write the page tree, catalog and cross-reference table and move the file into place"""
+        if self._file is None:
+            return
+
+        kids = b" ".join(b"%d 0 R" % obj for obj in self._kids)
+        self._write_object(
+            b"<</Type/Pages/Count %d/Kids[%s]>>" % (len(self._kids), kids), self._PAGES
+        )
+        self._write_object(b"<</Type/Catalog/Pages %d 0 R>>" % self._PAGES, self._CATALOG)
+
+        size = self._next_obj
+        xref_offset = self._file.tell()
+        write = self._file.write
+        write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj in (self._CATALOG, self._PAGES):
+            write(b"%010d 00000 n \n" % self._fixed_offsets[obj])
+        for offset in self._offsets:
+            write(b"%010d 00000 n \n" % offset)
+        self._file.write(
+            b"trailer\n<</Size %d/Root %d 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (
+                size, self._CATALOG, xref_offset
+            )
+        )
+
+        self._file.close()
+        self._file = None
+        os.replace(self._temp_path, self.output_file)
+
+    def abort(self):
+        """Close and delete the unfinished file; the output path is not touched"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def _write_object(self, body: bytes, obj: Optional[int] = None) -> int:
+        if obj is None:
+            obj = self._next_obj
+            self._next_obj += 1
+            self._offsets.append(self._file.tell())
+        else:
+            self._fixed_offsets[obj] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % obj + body + b"\nendobj\n")
+        return obj
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -2,10 +2,129 @@
 PDF Utilities - Bates numbering, page numbering, headers/footers, bookmarks, hyperlinks
 """
 
+import os
 import fitz  # PyMuPDF
+from dataclasses import dataclass
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled, record_pages
+from src.pdf_engine.watermark_engine import WatermarkEngine
+from src.pdf_engine.text_layout import (
+    BASE14_FONTS, base14_font_object, font_metrics, pdf_literal, pdf_number, winansi
+)
+
+
+# Base-14 fonts usable in stamps: PyMuPDF code -> PDF BaseFont
+STAMP_FONTS = BASE14_FONTS
+
+# Documents with at least this many numbered pages are laid out in worker processes
+PARALLEL_STAMP_PAGES = 20000
+STAMP_CHUNK_PAGES = 5000
+
+STAMP_MARGIN = 20
+
+
+@dataclass
+class StampSpec:
+    """
+    One text element stamped on pages by PDFUtilities.apply_stamps()
+
+    Attributes:
+        text: Text to stamp. With `numbered`, a format string using {page}
+            (running number) and {total} (document page count)
+        position: "top_left", "top_center", "top_right", "bottom_left",
+            "bottom_center" or "bottom_right"
+        font_size: Font size
+        color: RGB color tuple (0-1 range)
+        fontname: Base-14 font code (see STAMP_FONTS)
+        numbered: Text changes per page
+        start_number: {page} value on the first stamped page
+        digits: Zero-pad {page} to this many digits (0 = no padding)
+        skip_first: Do not stamp the first page of the document
+        band_height: Height of a white band with a separator line drawn
+            behind the text, header/footer style (0 = no band)
+    """
+    text: str
+    position: str = "bottom_center"
+    font_size: float = 10
+    color: Tuple = (0, 0, 0)
+    fontname: str = "helv"
+    numbered: bool = False
+    start_number: int = 1
+    digits: int = 0
+    skip_first: bool = False
+    band_height: float = 0
+
+
+def _stamp_origin(spec: StampSpec, text_width: float, width: float, height: float) -> Tuple[float, float]:
+    """Baseline start of a stamp's text on a page of the given visible size"""
+    vertical, _, horizontal = spec.position.partition("_")
+
+    if horizontal == "left":
+        x = STAMP_MARGIN
+    elif horizontal == "right":
+        x = width - text_width - STAMP_MARGIN
+    else:  # center
+        x = (width - text_width) / 2
+
+    if spec.band_height:
+        # Vertically centered in the band
+        if vertical == "top":
+            y = (spec.band_height + spec.font_size) / 2
+        else:
+            y = height - (spec.band_height - spec.font_size) / 2 - 5
+    else:
+        y = STAMP_MARGIN if vertical == "top" else height - STAMP_MARGIN
+
+    return x, y
+
+
+def _render_numbered(specs: List[StampSpec], font_names: Dict[str, str], total: int,
+                     pages: List[Tuple]) -> List[bytes]:
+    """
+    Build the per-page content for numbered stamps
+
+    Pure computation on plain data, so large documents can be split into
+    chunks and laid out in worker processes.
+
+    Args:
+        specs: Numbered stamp specs
+        font_names: Font code -> resource name
+        total: Document page count
+        pages: (visible width, visible height, inverse transformation matrix,
+            [(spec index, number), ...]) per page
+
+    Returns:
+        PDF content operators per page
+    """
+    contents = []
+    for width, height, matrix, numbers in pages:
+        ops = []
+        for index, number in numbers:
+            spec = specs[index]
+            # An int unless padding is requested, so specs like {page:03d} work
+            page = str(number).zfill(spec.digits) if spec.digits else number
+            page_text = spec.text.format(page=page, total=total)
+            # Base-14 fonts are written with WinAnsiEncoding
+            page_text = winansi(page_text)
+
+            text_width = font_metrics(spec.fontname).text_length(page_text, spec.font_size)
+            x, y = _stamp_origin(spec, text_width, width, height)
+
+            # Text space -> visible page space (y down) -> PDF user space
+            tm = fitz.Matrix(1, 0, 0, -1, x, y) * fitz.Matrix(matrix)
+            ops.append(
+                b"BT /%s %s Tf %s rg %s Tm %s Tj ET" % (
+                    font_names[spec.fontname].encode(),
+                    pdf_number(spec.font_size),
+                    b" ".join(pdf_number(c) for c in spec.color),
+                    b" ".join(pdf_number(v) for v in tm),
+                    pdf_literal(page_text),
+                )
+            )
+        contents.append(b"\n".join(ops))
+    return contents
 
 
 class PDFUtilities:
@@ -13,6 +132,167 @@ class PDFUtilities:
 
     def __init__(self):
         self.logger = get_logger()
+        self.watermark_engine = WatermarkEngine()
+
+    @profiled("Stamp pages", document_arg="pdf_document")
+    def apply_stamps(self, pdf_document, specs: List[StampSpec],
+                     parallel: Optional[bool] = None) -> int:
+        """
+        Stamp headers, footers, page numbers and Bates numbers in one pass
+
+        Everything that is identical on every page (bands, separator lines,
+        fixed text) is drawn once per page geometry and shared as a Form
+        XObject. Numbered text is written with cached font metrics into a
+        single content stream per page, together with the XObject reference.
+
+        Args:
+            pdf_document: PyMuPDF document (modified in place)
+            specs: Stamps to apply
+            parallel: Lay out numbered text in worker processes
+                (None = only for very large documents)
+
+        Returns:
+            Number of pages stamped
+        """
+        engine = self.watermark_engine
+        page_count = len(pdf_document)
+        targets = engine.collect_pages(pdf_document)
+
+        def applies(spec, page_num):
+            return not (spec.skip_first and page_num == 0)
+
+        # Static artwork: grafted once per (set of static specs, page geometry)
+        static = [spec for spec in specs if spec.band_height or not spec.numbered]
+        placements: Dict[Tuple, Tuple[int, str]] = {}
+        page_forms: Dict[int, str] = {}
+        for page_num, _, key, rect, matrix in targets:
+            group = tuple(i for i, spec in enumerate(static) if applies(spec, page_num))
+            if not group:
+                continue
+            if (group, key) not in placements:
+                draw = self._static_artwork([static[i] for i in group])
+                placements[(group, key)] = engine.graft(pdf_document, rect, matrix, draw)
+            page_forms[page_num] = placements[(group, key)]
+
+        # Numbered text: running number per spec over the pages it is stamped on
+        numbered = [spec for spec in specs if spec.numbered]
+        font_xrefs: Dict[str, int] = {}
+        for spec in numbered:
+            if spec.fontname not in STAMP_FONTS:
+                raise ValueError(f"Unsupported stamp font: {spec.fontname}")
+            if spec.fontname not in font_xrefs:
+                font_xrefs[spec.fontname] = pdf_document.get_new_xref()
+                pdf_document.update_object(font_xrefs[spec.fontname], base14_font_object(spec.fontname))
+        font_names = {fontname: f"NxF{xref}" for fontname, xref in font_xrefs.items()}
+
+        counters = [spec.start_number for spec in numbered]
+        layout = []
+        for page_num, _, _, rect, matrix in targets:
+            numbers = []
+            for i, spec in enumerate(numbered):
+                if applies(spec, page_num):
+                    numbers.append((i, counters[i]))
+                    counters[i] += 1
+            layout.append((rect.width, rect.height, tuple(~matrix), numbers))
+
+        texts = self._layout_numbered(numbered, font_names, page_count, layout, parallel)
+
+        # Single pass over the page dictionaries
+        registered = set()
+        wrap_xref = engine.new_stream(pdf_document, b"q\n")
+        shared_streams: Dict[str, int] = {}
+        stamped = 0
+
+        for (page_num, page_xref, _, _, _), (_, _, _, numbers), text in zip(targets, layout, texts):
+            form = page_forms.get(page_num)
+            if not form and not numbers:
+                continue
+
+            ops = b"\nQ\n"
+            resources = []
+            if form:
+                form_xref, name = form
+                resources.append(("XObject", name, form_xref))
+                ops += f"q /{name} Do Q\n".encode()
+
+            for fontname in dict.fromkeys(numbered[i].fontname for i, _ in numbers):
+                resources.append(("Font", font_names[fontname], font_xrefs[fontname]))
+            engine.add_resources(pdf_document, page_xref, resources, registered)
+
+            if numbers:
+                stream_xref = engine.new_stream(pdf_document, ops + text + b"\n")
+            else:
+                # Pages with only static stamps share one content stream
+                if name not in shared_streams:
+                    shared_streams[name] = engine.new_stream(pdf_document, ops)
+                stream_xref = shared_streams[name]
+
+            engine.append_contents(pdf_document, page_xref, stream_xref, wrap_xref)
+            stamped += 1
+
+        self.logger.debug(
+            f"Applied {len(specs)} stamp(s) to {stamped} pages "
+            f"using {len(placements)} shared XObject(s)"
+        )
+        return stamped
+
+    def _static_artwork(self, specs: List[StampSpec]):
+        """Build a draw callback for the parts of stamps that are the same on every page"""
+
+        def draw(page):
+            rect = page.rect
+            for spec in specs:
+                if spec.band_height:
+                    if spec.position.startswith("top"):
+                        band = fitz.Rect(0, 0, rect.width, spec.band_height)
+                        line_y = spec.band_height - 2
+                    else:
+                        band = fitz.Rect(0, rect.height - spec.band_height, rect.width, rect.height)
+                        line_y = rect.height - spec.band_height + 2
+
+                    shape = page.new_shape()
+                    shape.draw_rect(band)
+                    shape.finish(color=(1, 1, 1), fill=(1, 1, 1))  # White background
+                    shape.draw_line((10, line_y), (rect.width - 10, line_y))
+                    shape.finish(color=(0.7, 0.7, 0.7), width=0.5)  # Light gray line
+                    shape.commit()
+
+                if not spec.numbered:
+                    text_width = font_metrics(spec.fontname).text_length(spec.text, spec.font_size)
+                    page.insert_text(
+                        _stamp_origin(spec, text_width, rect.width, rect.height),
+                        spec.text,
+                        fontsize=spec.font_size,
+                        fontname=spec.fontname,
+                        color=spec.color
+                    )
+
+        return draw
+
+    def _layout_numbered(self, specs: List[StampSpec], font_names: Dict[str, str],
+                         total: int, layout: List[Tuple],
+                         parallel: Optional[bool]) -> List[bytes]:
+        """Lay out numbered text, splitting large documents across processes"""
+        numbered_pages = sum(1 for page in layout if page[3])
+        if parallel is None:
+            parallel = numbered_pages >= PARALLEL_STAMP_PAGES and (os.cpu_count() or 1) > 1
+
+        if not parallel or not specs:
+            return _render_numbered(specs, font_names, total, layout)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [layout[i:i + STAMP_CHUNK_PAGES] for i in range(0, len(layout), STAMP_CHUNK_PAGES)]
+        workers = min(len(chunks), os.cpu_count() or 1)
+        self.logger.debug(f"Laying out {numbered_pages} numbered pages in {workers} processes")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                _render_numbered,
+                [specs] * len(chunks), [font_names] * len(chunks),
+                [total] * len(chunks), chunks
+            )
+            return [content for chunk in results for content in chunk]
 
     def add_bates_numbering(self, pdf_document, prefix: str = "", suffix: str = "",
                            start_number: int = 1, digits: int = 6,
@@ -35,36 +315,18 @@ class PDFUtilities:
             True if successful
         """
         try:
-            current_number = start_number
-
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-                page_rect = page.rect
-
-                # Format Bates number
-                bates_number = f"{prefix}{str(current_number).zfill(digits)}{suffix}"
-
-                # Calculate position
-                if position == "top_left":
-                    x, y = 20, 20
-                elif position == "top_right":
-                    x, y = page_rect.width - 100, 20
-                elif position == "bottom_left":
-                    x, y = 20, page_rect.height - 20
-                elif position == "bottom_right":
-                    x, y = page_rect.width - 100, page_rect.height - 20
-                else:
-                    x, y = page_rect.width - 100, page_rect.height - 20
-
-                # Insert Bates number
-                page.insert_text(
-                    (x, y),
-                    bates_number,
-                    fontsize=font_size,
-                    color=color
-                )
+            if position not in ("top_left", "top_right", "bottom_left", "bottom_right"):
+                position = "bottom_right"
 
-                current_number += 1
+            # Prefix/suffix are literal text around the running number
+            template = "{}{{page}}{}".format(
+                prefix.replace("{", "{{").replace("}", "}}"),
+                suffix.replace("{", "{{").replace("}", "}}")
+            )
+            self.apply_stamps(pdf_document, [
+                StampSpec(template, position=position, font_size=font_size, color=color,
+                          numbered=True, start_number=start_number, digits=digits)
+            ])
 
             self.logger.info(f"Added Bates numbering: {prefix}[numbers]{suffix}")
             return True
@@ -93,48 +355,10 @@ class PDFUtilities:
             True if successful
         """
         try:
-            total_pages = len(pdf_document)
-
-            for page_num in range(len(pdf_document)):
-                # Skip first page if requested
-                if exclude_first and page_num == 0:
-                    continue
-
-                page = pdf_document[page_num]
-                page_rect = page.rect
-
-                # Calculate page number
-                page_number = start_page + page_num - (1 if exclude_first else 0)
-
-                # Format page number string
-                page_text = format_string.format(
-                    page=page_number,
-                    total=total_pages
-                )
-
-                # Calculate position
-                if position == "top_left":
-                    x, y = 20, 20
-                elif position == "top_center":
-                    x, y = page_rect.width / 2 - 30, 20
-                elif position == "top_right":
-                    x, y = page_rect.width - 80, 20
-                elif position == "bottom_left":
-                    x, y = 20, page_rect.height - 20
-                elif position == "bottom_center":
-                    x, y = page_rect.width / 2 - 30, page_rect.height - 20
-                elif position == "bottom_right":
-                    x, y = page_rect.width - 80, page_rect.height - 20
-                else:
-                    x, y = page_rect.width / 2 - 30, page_rect.height - 20
-
-                # Insert page number
-                page.insert_text(
-                    (x, y),
-                    page_text,
-                    fontsize=font_size,
-                    color=color
-                )
+            self.apply_stamps(pdf_document, [
+                StampSpec(format_string, position=position, font_size=font_size, color=color,
+                          numbered=True, start_number=start_page, skip_first=exclude_first)
+            ])
 
             self.logger.info(f"Added page numbers to PDF")
             return True
@@ -143,6 +367,18 @@ class PDFUtilities:
             self.logger.error(f"Error adding page numbers: {e}")
             return False
 
+    def header_spec(self, text: str, position: str = "center", font_size: int = 12,
+                    color: Tuple = (0, 0, 0), exclude_first: bool = False) -> StampSpec:
+        """Stamp spec for a header with a white band and separator line"""
+        return StampSpec(text, position=f"top_{position}", font_size=font_size, color=color,
+                         skip_first=exclude_first, band_height=40)
+
+    def footer_spec(self, text: str, position: str = "center", font_size: int = 10,
+                    color: Tuple = (0, 0, 0), exclude_first: bool = False) -> StampSpec:
+        """Stamp spec for a footer with a white band and separator line"""
+        return StampSpec(text, position=f"bottom_{position}", font_size=font_size, color=color,
+                         skip_first=exclude_first, band_height=35)
+
     def add_header(self, pdf_document, text: str, position: str = "center",
                   font_size: int = 12, color: Tuple = (0, 0, 0),
                   exclude_first: bool = False) -> bool:
@@ -161,55 +397,9 @@ class PDFUtilities:
             True if successful
         """
         try:
-            import fitz
-
-            # Header area height (margin from top)
-            header_height = 40
-            header_margin = 10
-
-            for page_num in range(len(pdf_document)):
-                if exclude_first and page_num == 0:
-                    continue
-
-                page = pdf_document[page_num]
-                page_rect = page.rect
-
-                # Create white background rectangle for header area
-                header_rect = fitz.Rect(0, 0, page_rect.width, header_height)
-                shape = page.new_shape()
-                shape.draw_rect(header_rect)
-                shape.finish(color=(1, 1, 1), fill=(1, 1, 1))  # White background
-                shape.commit()
-
-                # Draw a subtle line below header
-                line_y = header_height - 2
-                shape = page.new_shape()
-                shape.draw_line((header_margin, line_y), (page_rect.width - header_margin, line_y))
-                shape.finish(color=(0.7, 0.7, 0.7), width=0.5)  # Light gray line
-                shape.commit()
-
-                # Calculate text position
-                font = fitz.Font("helv")
-                text_width = font.text_length(text, fontsize=font_size)
-
-                if position == "left":
-                    x = header_margin + 10
-                elif position == "right":
-                    x = page_rect.width - text_width - header_margin - 10
-                else:  # center
-                    x = (page_rect.width - text_width) / 2
-
-                # Text baseline position (vertically centered in header area)
-                y = (header_height + font_size) / 2
-
-                # Insert header text
-                page.insert_text(
-                    (x, y),
-                    text,
-                    fontsize=font_size,
-                    fontname="helv",
-                    color=color
-                )
+            self.apply_stamps(pdf_document, [
+                self.header_spec(text, position, font_size, color, exclude_first)
+            ])
 
             self.logger.info(f"Added header: {text}")
             return True
@@ -238,61 +428,48 @@ class PDFUtilities:
             True if successful
         """
         try:
-            import fitz
+            self.apply_stamps(pdf_document, [
+                self.footer_spec(text, position, font_size, color, exclude_first)
+            ])
 
-            # Footer area height (margin from bottom)
-            footer_height = 35
-            footer_margin = 10
+            self.logger.info(f"Added footer: {text}")
+            return True
 
-            for page_num in range(len(pdf_document)):
-                if exclude_first and page_num == 0:
-                    continue
+        except Exception as e:
+            self.logger.error(f"Error adding footer: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return False
 
-                page = pdf_document[page_num]
-                page_rect = page.rect
-
-                # Create white background rectangle for footer area
-                footer_rect = fitz.Rect(0, page_rect.height - footer_height, page_rect.width, page_rect.height)
-                shape = page.new_shape()
-                shape.draw_rect(footer_rect)
-                shape.finish(color=(1, 1, 1), fill=(1, 1, 1))  # White background
-                shape.commit()
-
-                # Draw a subtle line above footer
-                line_y = page_rect.height - footer_height + 2
-                shape = page.new_shape()
-                shape.draw_line((footer_margin, line_y), (page_rect.width - footer_margin, line_y))
-                shape.finish(color=(0.7, 0.7, 0.7), width=0.5)  # Light gray line
-                shape.commit()
-
-                # Calculate text position
-                font = fitz.Font("helv")
-                text_width = font.text_length(text, fontsize=font_size)
-
-                if position == "left":
-                    x = footer_margin + 10
-                elif position == "right":
-                    x = page_rect.width - text_width - footer_margin - 10
-                else:  # center
-                    x = (page_rect.width - text_width) / 2
-
-                # Text baseline position (vertically centered in footer area)
-                y = page_rect.height - (footer_height - font_size) / 2 - 5
-
-                # Insert footer text
-                page.insert_text(
-                    (x, y),
-                    text,
-                    fontsize=font_size,
-                    fontname="helv",
-                    color=color
-                )
+    def add_header_footer(self, pdf_document, header_text: str = "", footer_text: str = "",
+                          exclude_first: bool = False) -> bool:
+        """
+        Add header and footer in a single pass over the pages
 
-            self.logger.info(f"Added footer: {text}")
+        Args:
+            pdf_document: PyMuPDF document
+            header_text: Header text (empty = no header)
+            footer_text: Footer text (empty = no footer)
+            exclude_first: Exclude first page
+
+        Returns:
+            True if successful
+        """
+        try:
+            specs = []
+            if header_text:
+                specs.append(self.header_spec(header_text, exclude_first=exclude_first))
+            if footer_text:
+                specs.append(self.footer_spec(footer_text, exclude_first=exclude_first))
+
+            if specs:
+                self.apply_stamps(pdf_document, specs)
+
+            self.logger.info(f"Added header/footer: {header_text} / {footer_text}")
             return True
 
         except Exception as e:
-            self.logger.error(f"Error adding footer: {e}")
+            self.logger.error(f"Error adding header/footer: {e}")
             import traceback
             self.logger.error(traceback.format_exc())
             return False
@@ -403,6 +580,7 @@ class PDFUtilities:
             self.logger.error(f"Error creating bookmark: {e}")
             return False
 
+    @profiled("Add background", document_arg="pdf_document")
     def add_background(self, pdf_document, background_pdf: str,
                       pages: Optional[List[int]] = None) -> bool:
         """
@@ -467,35 +645,23 @@ class PDFUtilities:
             if not pages:
                 pages = range(len(pdf_document))
 
-            for page_num in pages:
-                if page_num >= len(pdf_document):
-                    continue
-
-                page = pdf_document[page_num]
-                page_rect = page.rect
-
-                # Calculate position
-                if position == "center":
-                    x, y = page_rect.width / 2, page_rect.height / 2
-                elif position == "top":
-                    x, y = page_rect.width / 2, 100
-                elif position == "bottom":
-                    x, y = page_rect.width / 2, page_rect.height - 100
-                else:  # diagonal
-                    x, y = page_rect.width / 2, page_rect.height / 2
-
-                # Create text writer for stamp
-                tw = fitz.TextWriter(page_rect)
-                tw.append(
-                    fitz.Point(x, y),
-                    stamp_text,
-                    fontsize=font_size,
-                    color=color,
-                    rotate=rotation
-                )
-
-                # Write with opacity
-                tw.write_text(page, opacity=opacity)
+            # Stamp centre for each page size
+            if position == "top":
+                center = lambda rect: fitz.Point(rect.width / 2, 100)
+            elif position == "bottom":
+                center = lambda rect: fitz.Point(rect.width / 2, rect.height - 100)
+            else:  # center / diagonal
+                center = None
+
+            draw = self.watermark_engine.text_artwork(
+                stamp_text,
+                font_size=font_size,
+                color=color,
+                opacity=opacity,
+                rotation=rotation,
+                center=center
+            )
+            self.watermark_engine.apply(pdf_document, draw, pages=pages)
 
             self.logger.info(f"Added stamp: {stamp_text}")
             return True
@@ -504,6 +670,7 @@ class PDFUtilities:
             self.logger.error(f"Error adding stamp: {e}")
             return False
 
+    @profiled("Compress", input_arg="input_file", output_arg="output_file")
     def compress_pdf(self, input_file: str, output_file: str,
                     image_quality: int = 50, max_image_size: int = 1200,
                     convert_to_images: bool = False) -> bool:
@@ -531,6 +698,7 @@ class PDFUtilities:
             import io
 
             pdf = fitz.open(input_file)
+            record_pages(len(pdf))
             original_size = os.path.getsize(input_file)
 
             if convert_to_images:
@@ -554,97 +722,74 @@ class PDFUtilities:
             self.logger.error(traceback.format_exc())
             return False
 
+    @profiled("Compress to size", input_arg="input_file", output_arg="output_file")
+    def compress_to_size(self, input_file: str, output_file: str, target_bytes: int,
+                         workers: Optional[int] = None) -> Optional[Dict]:
+        """
+        Compress PDF to at most target_bytes by re-encoding embedded images.
+
+        Picks the highest image quality and resolution that a size model,
+        built from a few sample-encoded images, predicts to fit; only the
+        final pass re-encodes every image (in worker processes).
+
+        Args:
+            input_file: Input PDF path
+            output_file: Output PDF path
+            target_bytes: Maximum output size in bytes
+            workers: Worker processes for the final pass (None = CPU count)
+
+        Returns:
+            Report with the chosen setting and achieved size (see
+            TargetSizeCompressor.compress), or None on error. 'met' is False
+            when even the smallest setting does not fit.
+        """
+        from src.pdf_engine.image_recompression import TargetSizeCompressor
+        return TargetSizeCompressor().compress(input_file, output_file, target_bytes, workers)
+
+    @profiled("Optimize", input_arg="input_file", output_arg="output_file")
+    def optimize_pdf(self, input_file: str, output_file: str,
+                     subset_fonts: bool = True, remove_unused: bool = True) -> Optional[Dict]:
+        """
+        Structural optimization without touching image quality
+
+        Merges duplicate images, fonts and other objects (e.g. the same logo
+        or font in every page of merged invoices), subsets fonts and removes
+        unused page resources.
+
+        Args:
+            input_file: Input PDF path
+            output_file: Output PDF path
+            subset_fonts: Subset embedded fonts to the glyphs that are used
+            remove_unused: Remove page resources the page content never uses
+
+        Returns:
+            Report with bytes saved per category (see PDFOptimizer.optimize),
+            or None on error
+        """
+        from src.pdf_engine.pdf_optimizer import PDFOptimizer
+        return PDFOptimizer().optimize(input_file, output_file, subset_fonts, remove_unused)
+
     def _compress_reencoding(self, pdf, output_file: str,
                              image_quality: int, max_image_size: int):
         """Re-encode embedded images in-place, preserving text and structure."""
-        from PIL import Image
-        import io
+        from src.pdf_engine.image_recompression import candidate_images, reencode_images
+        from src.pdf_engine.pdf_optimizer import PDFOptimizer
 
-        processed_xrefs = set()
-
-        for page_num in range(len(pdf)):
-            page = pdf[page_num]
-            images = page.get_images(full=True)
+        # Merge duplicates first so every image is re-encoded only once
+        optimizer = PDFOptimizer()
+        optimizer.deduplicate(pdf)
+        optimizer.remove_unused_resources(pdf)
 
-            for img_info in images:
-                xref = img_info[0]
-                if xref in processed_xrefs:
-                    continue
-                processed_xrefs.add(xref)
-
-                try:
-                    base = pdf.extract_image(xref)
-                    if not base or not base.get("image"):
-                        continue
-
-                    image_bytes = base["image"]
-                    img_w = base.get("width", 0)
-                    img_h = base.get("height", 0)
-                    orig_cs = base.get("colorspace", 0)  # colorspace component count
-
-                    # Skip very small images (icons, logos) - not worth recompressing
-                    if img_w * img_h < 2500 or len(image_bytes) < 5000:
-                        continue
-
-                    pil_img = Image.open(io.BytesIO(image_bytes))
-                    is_grayscale = pil_img.mode == 'L'
-
-                    # Convert palette/indexed/CMYK/RGBA to appropriate mode
-                    if pil_img.mode in ('P', 'PA'):
-                        pil_img = pil_img.convert('RGBA').convert('RGB')
-                        is_grayscale = False
-                    elif pil_img.mode == 'CMYK':
-                        pil_img = pil_img.convert('RGB')
-                        is_grayscale = False
-                    elif pil_img.mode in ('RGBA', 'LA'):
-                        # Flatten alpha onto white background
-                        bg = Image.new('RGB', pil_img.size, (255, 255, 255))
-                        bg.paste(pil_img, mask=pil_img.split()[-1])
-                        pil_img = bg
-                        is_grayscale = False
-                    elif pil_img.mode == 'L':
-                        # Keep grayscale as-is for JPEG (saves space)
-                        is_grayscale = True
-                    elif pil_img.mode != 'RGB':
-                        pil_img = pil_img.convert('RGB')
-                        is_grayscale = False
-
-                    # Downscale oversized images
-                    max_dim = max(pil_img.width, pil_img.height)
-                    if max_dim > max_image_size:
-                        ratio = max_image_size / max_dim
-                        new_w = max(1, int(pil_img.width * ratio))
-                        new_h = max(1, int(pil_img.height * ratio))
-                        pil_img = pil_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-                    # Re-encode as JPEG
-                    buf = io.BytesIO()
-                    jpeg_q = max(10, min(95, image_quality))
-                    pil_img.save(buf, format='JPEG', quality=jpeg_q, optimize=True)
-                    new_data = buf.getvalue()
-
-                    # Only replace if actually smaller
-                    if len(new_data) < len(image_bytes):
-                        pdf.update_stream(xref, new_data)
-                        pdf.xref_set_key(xref, "Filter", "/DCTDecode")
-                        if is_grayscale:
-                            pdf.xref_set_key(xref, "ColorSpace", "/DeviceGray")
-                        else:
-                            pdf.xref_set_key(xref, "ColorSpace", "/DeviceRGB")
-                        pdf.xref_set_key(xref, "BitsPerComponent", "8")
-                        pdf.xref_set_key(xref, "Width", str(pil_img.width))
-                        pdf.xref_set_key(xref, "Height", str(pil_img.height))
-                        pdf.xref_set_key(xref, "DecodeParms", "null")
-
-                except Exception as e:
-                    self.logger.debug(f"Skipping image xref {xref}: {e}")
-                    continue
+        reencode_images(pdf, candidate_images(pdf), max(10, min(95, image_quality)),
+                        max_image_size, logger=self.logger)
 
         # NOTE: Do NOT use clean=True here - it rebuilds the PDF structure
-        # and can discard valid content after manual stream/xref modifications
+        # and can discard valid content after manual stream/xref modifications.
+        # Duplicates are already merged, so garbage=2 (unused objects only)
+        # avoids MuPDF's pairwise duplicate search.
         pdf.save(
             output_file,
-            garbage=4,
+            garbage=2,
             deflate=True,
             deflate_images=True,
             deflate_fonts=True,
@@ -654,42 +799,17 @@ class PDFUtilities:
     def _compress_as_images(self, pdf, output_file: str,
                             image_quality: int, max_image_size: int):
         """Convert entire pages to images for maximum compression (loses text)."""
-        from PIL import Image
-        import io
+        from src.pdf_engine.image_recompression import render_page_jpeg
 
         temp_pdf = fitz.open()
 
         for page_num in range(len(pdf)):
             page = pdf[page_num]
             page_rect = page.rect
-
-            # DPI based on quality
-            if image_quality >= 30:
-                zoom = 1.5   # ~108 DPI
-            elif image_quality >= 20:
-                zoom = 1.2   # ~86 DPI
-            else:
-                zoom = 1.0   # 72 DPI
-
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-            # Downscale if exceeds max
-            max_dim = max(img.width, img.height)
-            target_max = int(max_image_size * zoom)
-            if max_dim > target_max:
-                ratio = target_max / max_dim
-                img = img.resize(
-                    (max(1, int(img.width * ratio)), max(1, int(img.height * ratio))),
-                    Image.Resampling.LANCZOS
-                )
-
-            buf = io.BytesIO()
-            img.save(buf, format='JPEG', quality=max(15, image_quality), optimize=True)
+            jpeg_data = render_page_jpeg(page, image_quality, max_image_size)
 
             new_page = temp_pdf.new_page(width=page_rect.width, height=page_rect.height)
-            new_page.insert_image(page_rect, stream=buf.getvalue())
+            new_page.insert_image(page_rect, stream=jpeg_data)
 
         pdf.close()
         temp_pdf.save(output_file, garbage=4, deflate=True, deflate_images=True, clean=True)
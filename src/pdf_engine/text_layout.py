@@ -0,0 +1,152 @@
+"""
+Text Layout - Cached font metrics and line breaking for generated pages
+"""
+
+import fitz  # PyMuPDF
+from typing import Dict, List
+
+
+# Base-14 fonts: PyMuPDF code -> PDF BaseFont
+BASE14_FONTS = {
+    "helv": "Helvetica", "hebo": "Helvetica-Bold",
+    "heit": "Helvetica-Oblique", "hebi": "Helvetica-BoldOblique",
+    "tiro": "Times-Roman", "tibo": "Times-Bold",
+    "tiit": "Times-Italic", "tibi": "Times-BoldItalic",
+    "cour": "Courier", "cobo": "Courier-Bold",
+    "coit": "Courier-Oblique", "cobi": "Courier-BoldOblique",
+}
+
+
+def winansi(text: str) -> str:
+    """Replace characters a base-14 font (WinAnsiEncoding) cannot show with '?'"""
+    return text.encode("cp1252", errors="replace").decode("cp1252")
+
+
+def pdf_literal(text: str) -> bytes:
+    """
+    Encode text as a PDF string literal for a base-14 font with WinAnsiEncoding
+
+    Args:
+        text: Text (characters outside WinAnsi become '?')
+
+    Returns:
+        Literal including the parentheses, e.g. b"(a\\(b\\))"
+    """
+    encoded = text.encode("cp1252", errors="replace")
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def pdf_number(value: float) -> bytes:
+    """Format a number for a content stream (at most 3 decimals, no trailing zeros)"""
+    return format(round(value, 3), "g").encode()
+
+
+def base14_font_object(fontname: str) -> str:
+    """PDF font dictionary for a base-14 font code"""
+    return f"<</Type/Font/Subtype/Type1/BaseFont/{BASE14_FONTS[fontname]}/Encoding/WinAnsiEncoding>>"
+
+
+class FontMetrics:
+    """Glyph advances of a font, cached per character"""
+
+    def __init__(self, fontname: str):
+        self.font = fitz.Font(fontname)
+        self.advances: Dict[str, float] = {}
+
+    def text_length(self, text: str, font_size: float) -> float:
+        """
+        Width of a text in points
+
+        Args:
+            text: Single-line text
+            font_size: Font size
+
+        Returns:
+            Width in points
+        """
+        advances = self.advances
+        width = 0.0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = self.font.glyph_advance(ord(char))
+            width += advance
+        return width * font_size
+
+    def wrap(self, text: str, font_size: float, width: float) -> List[str]:
+        """
+        Break text into lines that fit a width
+
+        Lines break at spaces; words wider than the line are split between
+        characters. Explicit newlines are kept.
+
+        Args:
+            text: Text to wrap
+            font_size: Font size
+            width: Available width in points
+
+        Returns:
+            List of lines (at least one, possibly empty)
+        """
+        lines = []
+        space = self.text_length(" ", font_size)
+
+        for paragraph in text.split("\n"):
+            line: List[str] = []
+            line_width = 0.0
+
+            for word in paragraph.split(" "):
+                word_width = self.text_length(word, font_size)
+
+                if line and line_width + space + word_width > width:
+                    lines.append(" ".join(line))
+                    line, line_width = [], 0.0
+
+                if word_width > width:
+                    # Split an over-long word between characters
+                    for piece in self._split_word(word, font_size, width):
+                        if line:
+                            lines.append(" ".join(line))
+                        line = [piece]
+                    line_width = self.text_length(line[0], font_size)
+                    continue
+
+                line_width += word_width + (space if line else 0)
+                line.append(word)
+
+            lines.append(" ".join(line))
+
+        return lines
+
+    def _split_word(self, word: str, font_size: float, width: float) -> List[str]:
+        pieces = []
+        piece = ""
+        piece_width = 0.0
+        for char in word:
+            char_width = self.text_length(char, font_size)
+            if piece and piece_width + char_width > width:
+                pieces.append(piece)
+                piece, piece_width = "", 0.0
+            piece += char
+            piece_width += char_width
+        pieces.append(piece)
+        return pieces
+
+
+_metrics_cache: Dict[str, FontMetrics] = {}
+
+
+def font_metrics(fontname: str) -> FontMetrics:
+    """
+    Shared metrics for a font
+
+    Args:
+        fontname: PyMuPDF font name (e.g. "helv", "hebo", "cour")
+
+    Returns:
+        FontMetrics instance, created on first use
+    """
+    metrics = _metrics_cache.get(fontname)
+    if metrics is None:
+        metrics = _metrics_cache[fontname] = FontMetrics(fontname)
+    return metrics
@@ -0,0 +1,257 @@
+"""
+Undo Journal - page-level undo/redo for in-memory document edits
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+import fitz  # PyMuPDF
+from src.pdf_engine.pdf_optimizer import stream_category
+from src.utilities.logger import get_logger
+
+
+# Default for the performance.undo_memory_mb setting
+DEFAULT_UNDO_MEMORY_MB = 64
+
+_REF_RE = re.compile(r"(\d+) 0 R\b")
+
+# Objects a page closure never enters: other pages, the page tree
+# (/Type/Pages) and the catalog
+_PAGE_MARKERS = ("/Type/Page", "/Type/Catalog")
+
+# Pseudo xref for the trailer's /Info entry (set_metadata may add an Info object)
+TRAILER_INFO = -1
+
+# Object xref -> (source, raw stream data or None to leave the data alone)
+ObjectStates = Dict[int, Tuple[str, Optional[bytes]]]
+
+
+@dataclass
+class JournalEntry:
+    """One undoable edit: object states before and after it"""
+    label: str
+    pages: Optional[Set[int]]  # None = pages were inserted, deleted or moved
+    state_before: int
+    state_after: int = 0
+    before: ObjectStates = field(default_factory=dict)
+    after: ObjectStates = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the entry"""
+        return sum(len(source) + len(data or b"")
+                   for states in (self.before, self.after)
+                   for source, data in states.values())
+
+
+def _ref_xrefs(value: str) -> List[int]:
+    return [int(ref) for ref in _REF_RE.findall(value)]
+
+
+def _key_refs(doc, xref: int, key: str) -> List[int]:
+    """Objects referenced by one key of an object (direct or inside an inline dict)"""
+    kind, value = doc.xref_get_key(xref, key)
+    return _ref_xrefs(value) if kind in ("xref", "dict", "array") else []
+
+
+def _closure(doc, start: Iterable[int], stop: Set[int]) -> Set[int]:
+    """
+    Objects reachable from start without entering other pages
+
+    Page tree nodes and the catalog are not entered (except the start
+    objects themselves), and image and font file streams are recorded but
+    not followed: edits add new ones instead of changing them.
+    """
+    xref_count = doc.xref_length()
+    start = list(start)
+    pending = list(start)
+    starts = set(start)
+    seen: Set[int] = set()
+    while pending:
+        xref = pending.pop()
+        if xref in seen or xref in stop or not 0 < xref < xref_count:
+            continue
+        source = doc.xref_object(xref, compressed=True)
+        if xref not in starts and any(marker in source for marker in _PAGE_MARKERS):
+            continue
+        seen.add(xref)
+        if doc.xref_is_stream(xref) and stream_category(source.encode()) in ("images", "fonts"):
+            continue
+        pending.extend(_ref_xrefs(source))
+    return seen
+
+
+def page_tree_xrefs(doc) -> Set[int]:
+    """Page tree nodes and page objects"""
+    catalog = doc.pdf_catalog()
+    pending = _key_refs(doc, catalog, "Pages")
+    nodes: Set[int] = set()
+    while pending:
+        xref = pending.pop()
+        if xref in nodes:
+            continue
+        nodes.add(xref)
+        pending.extend(_key_refs(doc, xref, "Kids"))
+    return nodes
+
+
+def document_xrefs(doc, outline: bool) -> Set[int]:
+    """Catalog, document info, form root and (optionally) the outline tree"""
+    catalog = doc.pdf_catalog()
+    xrefs = {catalog, TRAILER_INFO}
+    xrefs.update(_ref_xrefs(doc.xref_get_key(-1, "Info")[1]))
+    # Form root and field list, not the fields themselves
+    for xref in _key_refs(doc, catalog, "AcroForm"):
+        xrefs.add(xref)
+        xrefs.update(_key_refs(doc, xref, "Fields"))
+    if outline:
+        xrefs |= _closure(doc, _key_refs(doc, catalog, "Outlines"), {catalog})
+    return xrefs
+
+
+def capture(doc, xrefs: Iterable[int]) -> ObjectStates:
+    """Current source (and raw stream data) of objects"""
+    states: ObjectStates = {}
+    for xref in xrefs:
+        if xref == TRAILER_INFO:
+            states[xref] = (doc.xref_get_key(-1, "Info")[1], None)
+            continue
+        source = doc.xref_object(xref, compressed=True)
+        data = None
+        if doc.xref_is_stream(xref) and stream_category(source.encode()) not in ("images", "fonts"):
+            data = doc.xref_stream_raw(xref)
+        states[xref] = (source, data)
+    return states
+
+
+def restore(doc, states: ObjectStates):
+    """Put objects back into a captured state"""
+    for xref, (source, data) in states.items():
+        if xref == TRAILER_INFO:
+            doc.xref_set_key(-1, "Info", source)
+            continue
+        if data is not None:
+            # update_stream drops /Filter; the source below puts it back
+            doc.update_stream(xref, data, compress=0)
+        doc.update_object(xref, source)
+    # Page lookups go through a page map MuPDF builds once; rebuild it
+    fitz.mupdf.ll_pdf_drop_page_tree_internal(fitz._as_pdf_document(doc).m_internal)
+    # Refresh the metadata and outline PyMuPDF caches on the document
+    doc.init_doc()
+
+
+class UndoJournal:
+    """
+    Undo and redo stacks of object-level page snapshots
+
+    Before an edit, the objects of the touched pages (page dictionary,
+    content streams, resources, annotations and their appearances) are
+    copied; after it, the same objects plus any the edit added. Undo
+    writes back only those objects. Structural edits (inserting, deleting,
+    moving pages) copy the page tree instead. The oldest entries are
+    dropped when the stacks hold more than max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_UNDO_MEMORY_MB * 1024 * 1024):
+        self.logger = get_logger()
+        self.max_bytes = max_bytes
+        self._undo: Deque[JournalEntry] = deque()
+        self._redo: List[JournalEntry] = []
+        self._bytes = 0
+
+    @property
+    def memory_used(self) -> int:
+        """Bytes held by both stacks"""
+        return self._bytes
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    def clear(self):
+        """Forget all history (object numbers changed or an untracked edit happened)"""
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    def _xrefs(self, doc, pages: Optional[Set[int]]) -> Set[int]:
+        if pages is None:
+            return page_tree_xrefs(doc) | document_xrefs(doc, outline=True)
+        xrefs = document_xrefs(doc, outline=not pages)
+        page_xrefs = [doc.page_xref(page_num) for page_num in pages
+                      if 0 <= page_num < doc.page_count]
+        return xrefs | _closure(doc, page_xrefs, xrefs)
+
+    def begin(self, doc, pages: Optional[Set[int]], label: str, state: int) -> JournalEntry:
+        """
+        Copy the objects an edit of pages can change
+
+        Args:
+            doc: Open fitz.Document
+            pages: Pages that will change (empty = document-level change,
+                None = pages will be inserted, deleted or moved)
+            label: Name shown for Undo/Redo
+            state: Document state before the edit
+
+        Returns:
+            Entry to pass to commit() once the edit is done
+        """
+        entry = JournalEntry(label=label, pages=pages, state_before=state)
+        entry.before = capture(doc, self._xrefs(doc, pages))
+        return entry
+
+    def commit(self, doc, entry: JournalEntry, state: int):
+        """
+        Record a finished edit; clears the redo stack
+
+        Args:
+            doc: Open fitz.Document
+            entry: Entry from begin()
+            state: Document state after the edit
+        """
+        entry.state_after = state
+        after_xrefs = set(entry.before) | self._xrefs(doc, entry.pages)
+        # Objects added by the edit (new content streams, annotations, fonts)
+        # are only reachable from the after state, so they are copied here
+        entry.after = capture(doc, after_xrefs)
+
+        for dropped in self._redo:
+            self._bytes -= dropped.size
+        self._redo.clear()
+
+        size = entry.size
+        if size > self.max_bytes:
+            self.logger.info(f"'{entry.label}' is too large to undo ({size:,} bytes)")
+            self.clear()
+            return
+        self._undo.append(entry)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._bytes -= self._undo.popleft().size
+
+    def undo(self, doc) -> Optional[JournalEntry]:
+        """Revert the last edit; returns its entry, or None if there is none"""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        restore(doc, entry.before)
+        self._redo.append(entry)
+        return entry
+
+    def redo(self, doc) -> Optional[JournalEntry]:
+        """Re-apply the last undone edit; returns its entry, or None if there is none"""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        restore(doc, entry.after)
+        self._undo.append(entry)
+        return entry
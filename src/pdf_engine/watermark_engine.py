@@ -0,0 +1,351 @@
+"""
+Watermark Engine - build stamp artwork once and place it on pages by reference
+"""
+
+import io
+import re
+import fitz  # PyMuPDF
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.utilities.logger import get_logger
+
+
+# Top-level /Contents entry of a page dictionary (single reference or array of references)
+_CONTENTS_RE = re.compile(r"/Contents\s*(\d+\s+\d+\s+R|\[[^\]]*\])")
+
+
+def position_rect(page_rect, width: float, height: float, position: str,
+                  margin: float = 20) -> fitz.Rect:
+    """
+    Compute the placement rectangle for an object of a given size
+
+    Args:
+        page_rect: Visible page rectangle
+        width: Object width in points
+        height: Object height in points
+        position: "center", "topleft", "topright", "bottomleft" or "bottomright"
+            (spaces and underscores are ignored)
+        margin: Distance from the page edge for corner positions
+
+    Returns:
+        Placement rectangle
+    """
+    pos = position.lower().replace(" ", "").replace("_", "")
+
+    if pos == "topleft":
+        x, y = margin, margin
+    elif pos == "topright":
+        x, y = page_rect.width - width - margin, margin
+    elif pos == "bottomleft":
+        x, y = margin, page_rect.height - height - margin
+    elif pos == "bottomright":
+        x, y = page_rect.width - width - margin, page_rect.height - height - margin
+    else:  # center
+        x, y = (page_rect.width - width) / 2, (page_rect.height - height) / 2
+
+    return fitz.Rect(x, y, x + width, y + height)
+
+
+class WatermarkEngine:
+    """
+    Stamp the same artwork on many pages without duplicating it.
+
+    The artwork is drawn once per distinct page geometry (mediabox, cropbox,
+    rotation) on a scratch page and grafted into the target document as a
+    Form XObject. Every other page of that geometry only receives a resource
+    entry and a reference to shared content streams, so the work per page is
+    a dictionary update and the output size does not grow with page count.
+    """
+
+    def __init__(self):
+        self.logger = get_logger()
+
+    def apply(self, pdf_document, draw: Callable[[fitz.Page], None],
+              pages: Optional[Iterable[int]] = None, overlay: bool = True) -> int:
+        """
+        Stamp artwork on pages of a document
+
+        Args:
+            pdf_document: PyMuPDF document (modified in place)
+            draw: Callable that paints the artwork on a blank page whose size
+                equals the visible size of the target page
+            pages: Page numbers to stamp (None = all pages)
+            overlay: Put the artwork in front of (True) or behind (False) page content
+
+        Returns:
+            Number of pages stamped
+        """
+        targets = self.collect_pages(pdf_document, pages)
+
+        placements: Dict[Tuple, Tuple[int, str]] = {}
+        for _, _, key, rect, matrix in targets:
+            if key not in placements:
+                placements[key] = self.graft(pdf_document, rect, matrix, draw)
+
+        # One content stream per XObject, shared by every page of that geometry
+        stamps: Dict[str, int] = {}
+        for form_xref, name in placements.values():
+            stamp = f"\nQ\nq /{name} Do Q\n" if overlay else f"q /{name} Do Q\n"
+            stamps[name] = self.new_stream(pdf_document, stamp.encode())
+
+        registered = set()
+        wrap_xref = self.new_stream(pdf_document, b"q\n") if overlay else 0
+
+        for page_num, page_xref, key, _, _ in targets:
+            form_xref, name = placements[key]
+            self.add_resources(pdf_document, page_xref, [("XObject", name, form_xref)], registered)
+            self.append_contents(pdf_document, page_xref, stamps[name], wrap_xref)
+
+        self.logger.debug(
+            f"Stamped {len(targets)} pages using {len(placements)} shared XObject(s)"
+        )
+        return len(targets)
+
+    def collect_pages(self, pdf_document, pages: Optional[Iterable[int]] = None) -> List[Tuple]:
+        """
+        Collect the geometry of pages before their dictionaries are rewritten
+
+        Loading pages in between page dictionary updates would rebuild the
+        page map every time, so everything needed later is read up front.
+
+        Args:
+            pdf_document: PyMuPDF document
+            pages: Page numbers (None = all pages); out-of-range numbers are skipped
+
+        Returns:
+            List of (page number, page xref, geometry key, visible rect,
+            matrix from PDF user space to visible page space) tuples
+        """
+        page_count = len(pdf_document)
+        if pages is None:
+            pages = range(page_count)
+
+        targets = []
+        for page_num in pages:
+            if not 0 <= page_num < page_count:
+                continue
+            page = pdf_document[page_num]
+            mediabox, cropbox = page.mediabox, page.cropbox
+            key = (tuple(mediabox), tuple(cropbox), page.rotation)
+            # page.cropbox is top-down relative to the mediabox top; map the
+            # cropbox corner to the origin, then apply the page rotation
+            matrix = fitz.Matrix(1, 0, 0, -1, -cropbox.x0, mediabox.y1 - cropbox.y0)
+            targets.append((page_num, page.xref, key, page.rect, matrix * page.rotation_matrix))
+        return targets
+
+    def text_artwork(self, text: str, font_size: float = 50,
+                     color: tuple = (0.7, 0.7, 0.7), opacity: float = 0.3,
+                     rotation: float = 45, fontname: str = "helv",
+                     center: Optional[Callable[[fitz.Rect], fitz.Point]] = None
+                     ) -> Callable[[fitz.Page], None]:
+        """
+        Build a draw callback for rotated text centred on a point
+
+        Args:
+            text: Text to draw
+            font_size: Font size
+            color: RGB color tuple (0-1 range)
+            opacity: Opacity (0.0 - 1.0)
+            rotation: Rotation angle in degrees
+            fontname: Base-14 font name
+            center: Callable returning the text centre for a page rect
+                (None = page centre)
+
+        Returns:
+            Draw callback for apply()
+        """
+        # Measured once - the same text and font are used for every page size
+        text_width = fitz.Font(fontname).text_length(text, fontsize=font_size)
+
+        def draw(page):
+            rect = page.rect
+            pivot = center(rect) if center else fitz.Point(rect.width / 2, rect.height / 2)
+            page.insert_text(
+                fitz.Point(pivot.x - text_width / 2, pivot.y),
+                text,
+                fontsize=font_size,
+                fontname=fontname,
+                color=color,
+                fill_opacity=opacity,
+                stroke_opacity=opacity,
+                morph=(pivot, fitz.Matrix(rotation))
+            )
+
+        return draw
+
+    def image_artwork(self, image_path: str, opacity: float = 0.3,
+                      position: str = "center", max_size: int = 200
+                      ) -> Callable[[fitz.Page], None]:
+        """
+        Build a draw callback for a semi-transparent image
+
+        The image is decoded, scaled and given its alpha channel once; every
+        page geometry reuses the same encoded bytes.
+
+        Args:
+            image_path: Path to image file
+            opacity: Opacity (0.0 - 1.0)
+            position: Position ("center", "topleft", "topright", "bottomleft", "bottomright")
+            max_size: Maximum width/height of the image in points
+
+        Returns:
+            Draw callback for apply()
+        """
+        from PIL import Image
+
+        with Image.open(image_path) as pil_img:
+            img_width, img_height = pil_img.size
+            if img_width > max_size or img_height > max_size:
+                scale = max_size / max(img_width, img_height)
+                img_width = int(img_width * scale)
+                img_height = int(img_height * scale)
+                pil_img = pil_img.resize((img_width, img_height), Image.Resampling.LANCZOS)
+
+            # Apply opacity via alpha channel
+            rgba_img = pil_img.convert('RGBA')
+
+        alpha_channel = rgba_img.split()[3]
+        alpha_channel = alpha_channel.point(lambda p: int(p * opacity))
+        rgba_img.putalpha(alpha_channel)
+
+        buf = io.BytesIO()
+        rgba_img.save(buf, format='PNG')
+        image_bytes = buf.getvalue()
+
+        def draw(page):
+            rect = position_rect(page.rect, img_width, img_height, position)
+            page.insert_image(rect, stream=image_bytes, overlay=True)
+
+        return draw
+
+    def _template(self, rect, draw) -> fitz.Document:
+        """Create a one-page document holding the artwork for a page size"""
+        template = fitz.open()
+        page = template.new_page(width=rect.width, height=rect.height)
+        draw(page)
+        return template
+
+    def graft(self, pdf_document, rect, matrix, draw: Callable[[fitz.Page], None]) -> Tuple[int, str]:
+        """
+        Embed the artwork for one page geometry as a Form XObject
+
+        Args:
+            pdf_document: PyMuPDF document
+            rect: Visible page rectangle
+            matrix: Matrix from PDF user space to visible page space
+            draw: Draw callback
+
+        Returns:
+            (form xref, resource name)
+        """
+        # The artwork is grafted from an unrotated scratch page of the visible
+        # size; the form matrix then maps it onto the target page, which takes
+        # care of rotation and cropbox offsets
+        scratch = pdf_document.new_page(-1, width=rect.width, height=rect.height)
+        template = self._template(scratch.rect, draw)
+        scratch.show_pdf_page(scratch.rect, template, 0, overlay=True)
+        template.close()
+
+        form_xref = next(
+            xref for xref, name, invoker, _ in scratch.get_xobjects()
+            if invoker == 0 and name.startswith("fzFrm")
+        )
+        pdf_document.delete_page(scratch.number)
+
+        form_matrix = fitz.Matrix(1, 0, 0, -1, 0, rect.height) * ~fitz.Matrix(matrix)
+        pdf_document.xref_set_key(
+            form_xref, "Matrix", "[%s]" % " ".join(format(round(v, 4), "g") for v in form_matrix)
+        )
+
+        return form_xref, f"NxWm{form_xref}"
+
+    def new_stream(self, pdf_document, data: bytes) -> int:
+        """Create a new stream object and return its xref"""
+        xref = pdf_document.get_new_xref()
+        pdf_document.update_object(xref, "<<>>")
+        pdf_document.update_stream(xref, data)
+        return xref
+
+    def add_resources(self, pdf_document, page_xref: int,
+                      entries: Iterable[Tuple[str, str, int]], registered: set):
+        """
+        Make objects available to a page's content under resource names
+
+        Resources inherited from the page tree are extended where they are
+        defined; an extra entry is harmless for pages that do not use it.
+
+        Args:
+            pdf_document: PyMuPDF document
+            page_xref: Page object xref
+            entries: (category, name, object xref) - category is "XObject", "Font", ...
+            registered: Set of (xref, path, name) already written - shared
+                resource dictionaries are only updated once
+        """
+        holder, path = self._resources_location(pdf_document, page_xref)
+
+        for category, name, obj_xref in entries:
+            if (holder, path, name) in registered:
+                continue
+
+            ref = f"{obj_xref} 0 R"
+            cat_type, cat_value = pdf_document.xref_get_key(holder, f"{path}{category}")
+            if cat_type == "xref":
+                pdf_document.xref_set_key(int(cat_value.split()[0]), name, ref)
+            else:
+                pdf_document.xref_set_key(holder, f"{path}{category}/{name}", ref)
+
+            registered.add((holder, path, name))
+
+    def _resources_location(self, pdf_document, page_xref: int) -> Tuple[int, str]:
+        """
+        Locate the resource dictionary used by a page
+
+        Returns:
+            (xref, key path prefix) - the path is empty when the resources
+            are an indirect object of their own
+        """
+        xref = page_xref
+        while xref:
+            res_type, res_value = pdf_document.xref_get_key(xref, "Resources")
+            if res_type == "xref":
+                return int(res_value.split()[0]), ""
+            if res_type == "dict":
+                return xref, "Resources/"
+            parent_type, parent_value = pdf_document.xref_get_key(xref, "Parent")
+            xref = int(parent_value.split()[0]) if parent_type == "xref" else 0
+
+        pdf_document.xref_set_key(page_xref, "Resources", "<<>>")
+        return page_xref, "Resources/"
+
+    def append_contents(self, pdf_document, page_xref: int, stream_xref: int,
+                        wrap_xref: int = 0):
+        """
+        Add a content stream to a page's /Contents array
+
+        Args:
+            pdf_document: PyMuPDF document
+            page_xref: Page object xref
+            stream_xref: Stream to add
+            wrap_xref: Stream holding "q" - when given, the existing content is
+                wrapped in q ... and `stream_xref` (which must start with Q) is
+                painted on top; when 0, the stream is painted underneath
+        """
+        page_obj = pdf_document.xref_object(page_xref, compressed=True)
+        match = _CONTENTS_RE.search(page_obj)
+
+        original = ""
+        if match:
+            original = match.group(1)
+            if original.startswith("["):
+                original = original[1:-1].strip()
+
+        if wrap_xref:
+            contents = f"/Contents[{wrap_xref} 0 R {original} {stream_xref} 0 R]"
+        else:
+            contents = f"/Contents[{stream_xref} 0 R {original}]"
+
+        if match:
+            page_obj = page_obj[:match.start()] + contents + page_obj[match.end():]
+        else:
+            page_obj = page_obj.rstrip()[:-2] + contents + ">>"
+
+        pdf_document.update_object(page_xref, page_obj)
@@ -7,6 +7,7 @@ import fitz  # PyMuPDF
 import re
 from typing import List, Tuple, Optional, Dict
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled
 
 
 class PDFRedaction:
@@ -23,6 +24,7 @@ class PDFRedaction:
     def __init__(self):
         self.logger = get_logger()
 
+    @profiled("Redact area", document_arg="pdf_document")
     def redact_area(self, pdf_document, page_num: int, rect: Tuple[float, float, float, float],
                    fill_color: Tuple = (0, 0, 0)) -> bool:
         """
@@ -54,6 +56,7 @@ class PDFRedaction:
             self.logger.error(f"Error redacting area: {e}")
             return False
 
+    @profiled("Redact text", document_arg="pdf_document")
     def redact_text(self, pdf_document, text_to_redact: str,
                    pages: Optional[List[int]] = None,
                    fill_color: Tuple = (0, 0, 0)) -> int:
@@ -98,6 +101,7 @@ class PDFRedaction:
             self.logger.error(f"Error redacting text: {e}")
             return 0
 
+    @profiled("Redact pattern", document_arg="pdf_document")
     def redact_pattern(self, pdf_document, pattern_type: str,
                       pages: Optional[List[int]] = None,
                       fill_color: Tuple = (0, 0, 0)) -> int:
@@ -171,6 +175,7 @@ class PDFRedaction:
         """Redact bank account numbers"""
         return self.redact_pattern(pdf_document, 'BANK_ACCOUNT', pages)
 
+    @profiled("Remove metadata", document_arg="pdf_document")
     def remove_metadata(self, pdf_document) -> bool:
         """
         Remove all PDF metadata
@@ -203,6 +208,7 @@ class PDFRedaction:
             self.logger.error(f"Error removing metadata: {e}")
             return False
 
+    @profiled("Search and redact", document_arg="pdf_document")
     def search_and_redact(self, pdf_document, search_terms: List[str],
                          pages: Optional[List[int]] = None,
                          fill_color: Tuple = (0, 0, 0)) -> Dict:
@@ -251,6 +257,7 @@ class PDFRedaction:
             self.logger.error(f"Error in search and redact: {e}")
             return results
 
+    @profiled("Flatten", document_arg="pdf_document")
     def flatten_pdf(self, pdf_document) -> bool:
         """
         Flatten PDF to make redactions irreversible
@@ -7,6 +7,8 @@ import pikepdf
 from pathlib import Path
 from typing import Optional, Dict
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled
+from src.pdf_engine.watermark_engine import WatermarkEngine
 
 
 class PDFSecurity:
@@ -14,7 +16,9 @@ class PDFSecurity:
 
     def __init__(self):
         self.logger = get_logger()
+        self.watermark_engine = WatermarkEngine()
 
+    @profiled("Encrypt", input_arg="input_file", output_arg="output_file")
     def encrypt_pdf(self, input_file: str, output_file: str,
                    user_password: str = "", owner_password: str = "",
                    permissions: Optional[Dict] = None) -> bool:
@@ -114,6 +118,7 @@ class PDFSecurity:
             self.logger.error(f"Error setting password: {e}")
             return False
 
+    @profiled("Remove password", input_arg="input_file", output_arg="output_file")
     def remove_password(self, input_file: str, output_file: str, password: str) -> bool:
         """
         Remove password protection from PDF
@@ -137,6 +142,7 @@ class PDFSecurity:
             self.logger.error(f"Error removing password: {e}")
             return False
 
+    @profiled("Set permissions", input_arg="input_file", output_arg="output_file")
     def set_permissions(self, input_file: str, output_file: str,
                        permissions: Dict, owner_password: str = "") -> bool:
         """
@@ -232,6 +238,7 @@ class PDFSecurity:
         except:
             return {}
 
+    @profiled("Text watermark", input_arg="input_file", output_arg="output_file")
     def add_watermark(self, input_file: str, output_file: str,
                      watermark_text: str, opacity: float = 0.3,
                      font_size: int = 50, color: tuple = (0.7, 0.7, 0.7),
@@ -254,48 +261,17 @@ class PDFSecurity:
         try:
             pdf = fitz.open(input_file)
 
-            for page_num in range(len(pdf)):
-                page = pdf[page_num]
-                page_rect = page.rect
-
-                # Calculate center position
-                center_x = page_rect.width / 2
-                center_y = page_rect.height / 2
-
-                # Get text dimensions for centering
-                font = fitz.Font("helv")
-                text_width = font.text_length(watermark_text, fontsize=font_size)
-
-                # Calculate starting point (centered)
-                start_x = center_x - text_width / 2
-                start_y = center_y
-
-                # Create rotation matrix for morph
-                pivot = fitz.Point(center_x, center_y)
-                import math
-                rad = math.radians(rotation)
-                rot_matrix = fitz.Matrix(
-                    math.cos(rad), math.sin(rad),
-                    -math.sin(rad), math.cos(rad),
-                    0, 0
-                )
-
-                # Insert watermark text with rotation using morph
-                rc = page.insert_text(
-                    fitz.Point(start_x, start_y),
-                    watermark_text,
-                    fontsize=font_size,
-                    fontname="helv",
-                    color=color,
-                    fill_opacity=opacity,
-                    stroke_opacity=opacity,
-                    morph=(pivot, rot_matrix)
-                )
-
-                if rc < 0:
-                    self.logger.warning(f"insert_text returned {rc} for page {page_num}")
-
-            pdf.save(output_file)
+            # Artwork is built once per page size and shared by reference
+            draw = self.watermark_engine.text_artwork(
+                watermark_text,
+                font_size=font_size,
+                color=color,
+                opacity=opacity,
+                rotation=rotation
+            )
+            self.watermark_engine.apply(pdf, draw)
+
+            pdf.save(output_file, garbage=1, deflate=True)
             pdf.close()
 
             self.logger.info(f"Watermark added: {output_file}")
@@ -307,6 +283,7 @@ class PDFSecurity:
             self.logger.error(traceback.format_exc())
             return False
 
+    @profiled("Image watermark", input_arg="input_file", output_arg="output_file")
     def add_image_watermark(self, input_file: str, output_file: str,
                            watermark_image: str, opacity: float = 0.3,
                            position: str = "center") -> bool:
@@ -324,65 +301,12 @@ class PDFSecurity:
             True if successful
         """
         try:
-            from PIL import Image
-
             pdf = fitz.open(input_file)
 
-            import io
-
-            # Get image and apply opacity using PIL
-            pil_img = Image.open(watermark_image)
-
-            # Scale down large images to fit reasonably on page
-            img_width, img_height = pil_img.size
-            max_watermark_size = 200
-            if img_width > max_watermark_size or img_height > max_watermark_size:
-                scale = max_watermark_size / max(img_width, img_height)
-                img_width = int(img_width * scale)
-                img_height = int(img_height * scale)
-                pil_img = pil_img.resize((img_width, img_height), Image.Resampling.LANCZOS)
-
-            # Apply opacity via alpha channel
-            rgba_img = pil_img.convert('RGBA')
-            alpha_channel = rgba_img.split()[3]
-            alpha_channel = alpha_channel.point(lambda p: int(p * opacity))
-            rgba_img.putalpha(alpha_channel)
-
-            buf = io.BytesIO()
-            rgba_img.save(buf, format='PNG')
-            watermark_bytes = buf.getvalue()
-            pil_img.close()
-
-            for page_num in range(len(pdf)):
-                page = pdf[page_num]
-                page_rect = page.rect
-
-                # Convert position string to lowercase for comparison
-                pos = position.lower().replace(" ", "")
-
-                # Calculate position
-                if pos == "center":
-                    x = (page_rect.width - img_width) / 2
-                    y = (page_rect.height - img_height) / 2
-                elif pos == "topleft":
-                    x, y = 20, 20
-                elif pos == "topright":
-                    x = page_rect.width - img_width - 20
-                    y = 20
-                elif pos == "bottomleft":
-                    x = 20
-                    y = page_rect.height - img_height - 20
-                elif pos == "bottomright":
-                    x = page_rect.width - img_width - 20
-                    y = page_rect.height - img_height - 20
-                else:
-                    x = (page_rect.width - img_width) / 2
-                    y = (page_rect.height - img_height) / 2
-
-                rect = fitz.Rect(x, y, x + img_width, y + img_height)
-                page.insert_image(rect, stream=watermark_bytes, overlay=True)
-
-            pdf.save(output_file)
+            draw = self.watermark_engine.image_artwork(watermark_image, opacity, position)
+            self.watermark_engine.apply(pdf, draw)
+
+            pdf.save(output_file, garbage=1, deflate=True)
             pdf.close()
 
             self.logger.info(f"Image watermark added: {output_file}")
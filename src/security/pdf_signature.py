@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Optional, Dict, Tuple, List
 from pathlib import Path
 from src.utilities.logger import get_logger
+from src.utilities.profiler import profiled
 
 
 class PDFSignature:
@@ -52,7 +53,14 @@ class PDFSignature:
         self.logger = get_logger()
         self._pkcs11_lib = None
         self._available_tokens = []
-        self._pykcs11_available = self._check_pykcs11()
+        self._pykcs11_checked: Optional[bool] = None
+
+    @property
+    def _pykcs11_available(self) -> bool:
+        """Whether PyKCS11 can be imported (checked on first use; it loads a native library)"""
+        if self._pykcs11_checked is None:
+            self._pykcs11_checked = self._check_pykcs11()
+        return self._pykcs11_checked
 
     def _check_pykcs11(self) -> bool:
         """Check if PyKCS11 is available."""
@@ -420,6 +428,7 @@ class PDFSignature:
                 'is_valid': False
             }
 
+    @profiled("Sign (USB token)", input_arg="input_file", output_arg="output_file")
     def sign_pdf_with_token(self, input_file: str, output_file: str,
                            dll_path: str, slot: int, pin: str,
                            token_label: str = "",
@@ -585,6 +594,7 @@ class PDFSignature:
         self.logger.info(f"PDF signed successfully by {signer_name}: {output_file}")
         return True, f"PDF signed successfully by: {signer_name}"
 
+    @profiled("Sign (PFX)", input_arg="input_file", output_arg="output_file")
     def sign_pdf_with_pfx(self, input_file: str, output_file: str,
                           pfx_path: str, pfx_password: str,
                           reason: str = "Digitally Signed",
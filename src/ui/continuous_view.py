@@ -0,0 +1,389 @@
+"""
+Continuous Page View - scrolling page list for the continuous and two-page view modes
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Set, Tuple
+from PyQt6.QtWidgets import QAbstractScrollArea, QFrame, QLabel
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from src.ui.progressive_render import ZOOM_SETTLE_MS
+from src.utilities.logger import get_logger
+
+
+# Pixels between pages and around the page list
+PAGE_GAP = 12
+
+# Viewport heights rendered ahead, above and below the visible pages
+PREFETCH_SCREENS = 1.0
+
+# Page sizes read per idle step while the layout is refined
+MEASURE_CHUNK = 500
+
+_PLACEHOLDER_STYLE = "QLabel { background-color: white; color: #9E9E9E; font-size: 14px; }"
+
+
+class ContinuousPageView(QAbstractScrollArea):
+    """
+    Virtualized page list: every page has a slot, only visible pages have widgets
+
+    The layout is a list of row offsets computed from page sizes (one or
+    two pages per row); no widget or pixmap exists for a page outside the
+    viewport. Scrolling moves a small pool of labels to the pages that come
+    into view and recycles the ones that leave it, so widget count and
+    memory stay the same for 50 or 50,000 pages. Visible pages are rendered
+    one per event loop pass (scrolling stays responsive), followed by the
+    pages within PREFETCH_SCREENS of the viewport, which go into the
+    viewer's shared pixmap cache.
+
+    Pages whose size has not been read yet are laid out at the size of the
+    nearest measured page before them; the rest are measured in the
+    background and the layout is corrected, keeping the current page in
+    place.
+    """
+
+    current_page_changed = pyqtSignal(int)  # Page at the top of the viewport scrolled in
+
+    def __init__(self, viewer, parent=None):
+        """
+        Args:
+            viewer: PDFViewer whose document, zoom and pixmap cache are shown
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.logger = get_logger()
+        self.viewer = viewer
+        self.columns = 1
+        self.current_page = 0
+        self._document = None
+        self._zoom = 1.0
+        self._rotation = 0
+        self._sizes: List[Tuple[float, float]] = []  # Points, view rotation not applied
+        self._measured = 0  # Pages before this one have their real size
+        self._row_tops: List[int] = []
+        self._row_heights: List[int] = []
+        self._layout_columns = 1  # Columns the row offsets were computed for
+        self._content_width = 0
+        self._content_height = 0
+        self._shown: Dict[int, QLabel] = {}
+        self._spare: List[QLabel] = []
+        self._rendered: Set[int] = set()  # Shown pages displaying a pixmap at the current zoom
+        self._render_queue: List[int] = []
+        self._scrolling_to = False
+
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.verticalScrollBar().setSingleStep(40)
+        self.horizontalScrollBar().setSingleStep(40)
+
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.timeout.connect(self._render_next)
+        self._measure_timer = QTimer(self)
+        self._measure_timer.setSingleShot(True)
+        self._measure_timer.timeout.connect(self._measure_next)
+
+    # Layout
+
+    def show_page(self, page_num: int, zoom: float, rotation: int, columns: int):
+        """
+        Show the document from page_num at zoom
+
+        Re-lays out the pages if the document, zoom, rotation or number of
+        columns changed, and scrolls to page_num unless it is already the
+        current page.
+        """
+        document = self.viewer.pdf_document
+        if document is None:
+            self.clear()
+            return
+        if document is not self._document or len(self._sizes) != document.page_count:
+            self._load_sizes(document)
+            self.current_page = -1
+        zoomed = (zoom, rotation, columns) != (self._zoom, self._rotation, self.columns)
+        if zoomed:
+            self._zoom, self._rotation, self.columns = zoom, rotation, columns
+            self._relayout(anchor=self.current_page)
+        elif not self._row_tops:
+            self._relayout()
+        if page_num != self.current_page:
+            self.scroll_to(page_num)
+        self._update_visible()
+        if zoomed and self._render_queue:
+            # Shown pages stretch to the new size at once; render sharp ones
+            # only when zooming pauses
+            self._render_timer.start(ZOOM_SETTLE_MS)
+
+    def pages_changed(self, pages: Optional[Set[int]]):
+        """
+        The document changed: re-read page sizes and re-render changed pages
+
+        Args:
+            pages: Changed pages, or None when pages were inserted, deleted or moved
+        """
+        document = self.viewer.pdf_document
+        if document is None:
+            return
+        if pages is None or len(self._sizes) != document.page_count:
+            anchor = self.current_page
+            self._load_sizes(document)
+            self._relayout(anchor=anchor)
+        else:
+            resized = False
+            for page_num in pages:
+                if 0 <= page_num < len(self._sizes):
+                    rect = self.viewer.pdf_core.get_page_rect(page_num)
+                    size = (rect.width, rect.height)
+                    resized |= size != self._sizes[page_num]
+                    self._sizes[page_num] = size
+            self._rendered.difference_update(pages)
+            if resized:
+                self._relayout(anchor=self.current_page)
+        self._update_visible()
+
+    def _load_sizes(self, document):
+        """Sizes of all pages: measured ones from the core, estimates for the rest"""
+        self._document = document
+        self._recycle_all()
+        page_rects = self.viewer.pdf_core.page_rects
+        known = None
+        self._sizes = []
+        for page_num in range(document.page_count):
+            rect = page_rects[page_num] if page_num < len(page_rects) else None
+            if rect is None and known is None:
+                rect = self.viewer.pdf_core.get_page_rect(page_num)
+            if rect is not None:
+                known = (rect.width, rect.height)
+            self._sizes.append(known)
+        self._measured = 0
+        self._measure_timer.start(0)
+
+    def _measure_next(self):
+        """Read the next chunk of page sizes; re-lay out if an estimate was wrong"""
+        document = self.viewer.pdf_document
+        if document is None or document is not self._document:
+            return
+        end = min(self._measured + MEASURE_CHUNK, len(self._sizes))
+        changed = False
+        for page_num in range(self._measured, end):
+            rect = self.viewer.pdf_core.get_page_rect(page_num)
+            size = (rect.width, rect.height)
+            if size != self._sizes[page_num]:
+                self._sizes[page_num] = size
+                changed = True
+        self._measured = end
+        if changed:
+            self._relayout(anchor=self.current_page)
+            self._update_visible()
+        if self._measured < len(self._sizes):
+            self._measure_timer.start(0)
+
+    def _scaled_size(self, page_num: int) -> Tuple[int, int]:
+        """Page size in pixels at the current zoom and view rotation"""
+        width, height = self._sizes[page_num]
+        if self._rotation % 180 == 90:
+            width, height = height, width
+        return max(1, int(width * self._zoom)), max(1, int(height * self._zoom))
+
+    def _row_pages(self, row: int) -> range:
+        return range(row * self.columns, min((row + 1) * self.columns, len(self._sizes)))
+
+    def _row_width(self, row: int) -> int:
+        pages = self._row_pages(row)
+        return sum(self._scaled_size(page_num)[0] for page_num in pages) + PAGE_GAP * (len(pages) - 1)
+
+    def _relayout(self, anchor: Optional[int] = None):
+        """
+        Recompute row offsets and scroll ranges
+
+        Args:
+            anchor: Page to keep at the same place in the viewport
+        """
+        offset = 0.0
+        if anchor is not None and 0 <= anchor < len(self._sizes) and self._row_tops:
+            old_row = min(anchor // self._layout_columns, len(self._row_tops) - 1)
+            offset = (self.verticalScrollBar().value() - self._row_tops[old_row]) \
+                / max(1, self._row_heights[old_row])
+
+        self._row_tops = []
+        self._row_heights = []
+        top = PAGE_GAP
+        width = 0
+        for row in range((len(self._sizes) + self.columns - 1) // self.columns):
+            pages = self._row_pages(row)
+            heights = [self._scaled_size(page_num)[1] for page_num in pages]
+            self._row_tops.append(top)
+            self._row_heights.append(max(heights))
+            top += max(heights) + PAGE_GAP
+            width = max(width, self._row_width(row))
+        self._content_width = width + 2 * PAGE_GAP
+        self._content_height = top
+        self._layout_columns = self.columns
+        self._rendered.clear()
+        self._update_scrollbars()
+
+        if anchor is not None and 0 <= anchor < len(self._sizes):
+            row = anchor // self.columns
+            self._set_scroll(int(self._row_tops[row] + offset * self._row_heights[row]))
+
+    def _update_scrollbars(self):
+        viewport = self.viewport().size()
+        self.verticalScrollBar().setRange(0, max(0, self._content_height - viewport.height()))
+        self.verticalScrollBar().setPageStep(viewport.height())
+        self.horizontalScrollBar().setRange(0, max(0, self._content_width - viewport.width()))
+        self.horizontalScrollBar().setPageStep(viewport.width())
+
+    def _page_geometry(self, page_num: int) -> Tuple[int, int, int, int]:
+        """Page position and size in content coordinates"""
+        row = page_num // self.columns
+        content_width = max(self._content_width, self.viewport().width())
+        x = (content_width - self._row_width(row)) // 2
+        for other in self._row_pages(row):
+            if other == page_num:
+                break
+            x += self._scaled_size(other)[0] + PAGE_GAP
+        width, height = self._scaled_size(page_num)
+        y = self._row_tops[row] + (self._row_heights[row] - height) // 2
+        return x, y, width, height
+
+    def _pages_between(self, top: int, bottom: int) -> range:
+        """Pages of the rows intersecting [top, bottom)"""
+        if not self._row_tops:
+            return range(0)
+        first_row = max(0, bisect_right(self._row_tops, top) - 1)
+        if self._row_tops[first_row] + self._row_heights[first_row] <= top:
+            first_row += 1  # Only the gap below it is in range
+        last_row = bisect_left(self._row_tops, bottom)
+        return range(first_row * self.columns, min(last_row * self.columns, len(self._sizes)))
+
+    # Scrolling
+
+    def scroll_to(self, page_num: int):
+        """Scroll so page_num is at the top of the viewport"""
+        if not self._row_tops or not 0 <= page_num < len(self._sizes):
+            return
+        self.current_page = page_num
+        self._scrolling_to = True
+        try:
+            self._set_scroll(self._row_tops[page_num // self.columns] - PAGE_GAP)
+        finally:
+            self._scrolling_to = False
+
+    def _set_scroll(self, value: int):
+        self.verticalScrollBar().setValue(max(0, value))
+
+    def scrollContentsBy(self, dx: int, dy: int):
+        self._update_visible()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+        self._update_visible()
+
+    # Page widgets
+
+    def _update_visible(self):
+        """Give the visible pages a label, recycle the others and queue rendering"""
+        if self._document is None or not self._row_tops:
+            return
+        top = self.verticalScrollBar().value()
+        left = self.horizontalScrollBar().value()
+        height = self.viewport().height()
+        visible = self._pages_between(top, top + height)
+
+        for page_num in [page_num for page_num in self._shown if page_num not in visible]:
+            self._recycle(page_num)
+
+        missing = []
+        for page_num in visible:
+            label = self._shown.get(page_num)
+            if label is None:
+                label = self._take_label(page_num)
+            x, y, width, page_height = self._page_geometry(page_num)
+            label.setGeometry(x - left, y - top, width, page_height)
+            if page_num not in self._rendered:
+                pixmap = self.viewer.cached_page_pixmap(page_num)
+                if pixmap is not None:
+                    self._set_page_pixmap(page_num, pixmap)
+                else:
+                    missing.append(page_num)
+
+        # Visible pages first, then the prefetch margin (only worth it with a cache)
+        self._render_queue = missing
+        if self.viewer.pixmap_cache is not None:
+            margin = int(height * PREFETCH_SCREENS)
+            self._render_queue += [
+                page_num for page_num in self._pages_between(top - margin, top + height + margin)
+                if page_num not in visible and self.viewer.cached_page_pixmap(page_num) is None
+            ]
+        if self._render_queue:
+            self._render_timer.start(0)
+
+        if not self._scrolling_to:
+            self._update_current_page(top + height // 3)
+
+    def _update_current_page(self, y: int):
+        """The current page is the first page of the row a third of the way down the viewport"""
+        row = max(0, bisect_right(self._row_tops, y) - 1)
+        page_num = min(row * self.columns, len(self._sizes) - 1)
+        if page_num != self.current_page:
+            self.current_page = page_num
+            self.current_page_changed.emit(page_num)
+
+    def _render_next(self):
+        """Render one queued page, then yield to the event loop"""
+        while self._render_queue:
+            page_num = self._render_queue.pop(0)
+            if self._document is None or page_num >= len(self._sizes):
+                continue
+            if page_num in self._shown and page_num in self._rendered:
+                continue
+            pixmap = self.viewer.page_pixmap(page_num)
+            if pixmap is not None and page_num in self._shown:
+                self._set_page_pixmap(page_num, pixmap)
+            break
+        if self._render_queue:
+            self._render_timer.start(0)
+
+    def _set_page_pixmap(self, page_num: int, pixmap: QPixmap):
+        label = self._shown[page_num]
+        label.setStyleSheet("")
+        label.setPixmap(pixmap)
+        self._rendered.add(page_num)
+
+    def _take_label(self, page_num: int) -> QLabel:
+        """A label for page_num, from the spare pool if possible"""
+        if self._spare:
+            label = self._spare.pop()
+        else:
+            label = QLabel(self.viewport())
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            # A stale pixmap stretches to the new size until the page is re-rendered
+            label.setScaledContents(True)
+        label.setStyleSheet(_PLACEHOLDER_STYLE)
+        label.setText(str(page_num + 1))
+        label.show()
+        self._shown[page_num] = label
+        return label
+
+    def _recycle(self, page_num: int):
+        label = self._shown.pop(page_num)
+        label.hide()
+        label.clear()
+        self._spare.append(label)
+        self._rendered.discard(page_num)
+
+    def _recycle_all(self):
+        for page_num in list(self._shown):
+            self._recycle(page_num)
+        self._render_queue = []
+
+    def clear(self):
+        """Drop all page widgets and pending work (document closed or view hidden)"""
+        self._recycle_all()
+        self._render_timer.stop()
+        self._measure_timer.stop()
+        self._document = None
+        self._sizes = []
+        self._row_tops = []
+        self._row_heights = []
+        self.current_page = 0
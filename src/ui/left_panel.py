@@ -7,15 +7,26 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QTabWidget, QListWidget,
     QListWidgetItem, QLabel, QScrollArea
 )
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QPixmap, QIcon, QImage
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap, QIcon, QImage, QColor
 
 
 class LeftPanel(QWidget):
     """Left sidebar panel with tabs"""
 
+    page_selected = pyqtSignal(int)  # 0-based page number of a clicked thumbnail
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._thumbnail_document = None
+        self._thumbnail_core = None
+        self._rendered_thumbnails = set()
+        # Thumbnails are rendered when they scroll into view, after the
+        # event loop has handled pending paints
+        self._thumbnail_timer = QTimer(self)
+        self._thumbnail_timer.setSingleShot(True)
+        self._thumbnail_timer.setInterval(0)
+        self._thumbnail_timer.timeout.connect(self._render_visible_thumbnails)
         self._setup_ui()
 
     def _setup_ui(self):
@@ -43,6 +54,7 @@ class LeftPanel(QWidget):
         self.attachments_widget = self._create_attachments_tab()
         self.tab_widget.addTab(self.attachments_widget, "Attachments")
 
+        self.tab_widget.currentChanged.connect(self._schedule_thumbnails)
         layout.addWidget(self.tab_widget)
 
         # Apply styling
@@ -80,6 +92,9 @@ class LeftPanel(QWidget):
         self.thumbnails_list.setIconSize(QSize(120, 150))
         self.thumbnails_list.setSpacing(10)
         self.thumbnails_list.setResizeMode(QListWidget.ResizeMode.Adjust)
+        self.thumbnails_list.setUniformItemSizes(True)
+        self.thumbnails_list.verticalScrollBar().valueChanged.connect(self._schedule_thumbnails)
+        self.thumbnails_list.itemClicked.connect(self._on_thumbnail_clicked)
 
         # Placeholder
         placeholder = QListWidgetItem("No pages to display")
@@ -140,38 +155,101 @@ class LeftPanel(QWidget):
 
         return widget
 
-    def load_thumbnails(self, pdf_document):
-        """Load PDF page thumbnails"""
+    def load_thumbnails(self, pdf_document, pdf_core=None):
+        """
+        Load PDF page thumbnails
+
+        Every page gets an entry at once; its thumbnail is rendered when
+        the entry scrolls into view, so large documents open quickly.
+
+        Args:
+            pdf_document: fitz.Document, or None to clear the list
+            pdf_core: PDFCore of the document, to render from its cached
+                display lists (the page view reuses them)
+        """
         self.thumbnails_list.clear()
+        self._thumbnail_document = pdf_document
+        self._thumbnail_core = pdf_core
+        self._rendered_thumbnails = set()
+
+        if pdf_document is None:
+            self.thumbnails_list.addItem(QListWidgetItem("No pages to display"))
+            return
+
+        blank = QPixmap(self.thumbnails_list.iconSize())
+        blank.fill(QColor("white"))
+        blank_icon = QIcon(blank)
+        for page_num in range(pdf_document.page_count):
+            item = QListWidgetItem(blank_icon, f"Page {page_num + 1}")
+            item.setData(Qt.ItemDataRole.UserRole, page_num)
+            self.thumbnails_list.addItem(item)
+        self._thumbnail_timer.start()
+
+    def refresh_thumbnails(self, pages):
+        """Render the thumbnails of changed pages again"""
+        self._rendered_thumbnails.difference_update(pages)
+        self._thumbnail_timer.start()
+
+    def _schedule_thumbnails(self, *args):
+        # The signals' int arguments must not reach QTimer.start(msec)
+        self._thumbnail_timer.start()
+
+    def _render_visible_thumbnails(self):
+        """Render thumbnails of the entries in view that do not have one yet"""
+        document = self._thumbnail_document
+        if document is None:
+            return
+        viewport = self.thumbnails_list.viewport().rect()
+        first = self.thumbnails_list.indexAt(viewport.topLeft()).row()
 
         try:
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
+            if document.is_closed or self.thumbnails_list.count() != document.page_count:
+                return
+            for page_num in range(max(first, 0), document.page_count):
+                item = self.thumbnails_list.item(page_num)
+                rect = self.thumbnails_list.visualItemRect(item)
+                if rect.top() > viewport.bottom():
+                    break
+                if page_num in self._rendered_thumbnails or not rect.intersects(viewport):
+                    continue
 
                 # Render small thumbnail
                 zoom = 0.2  # 20% size for thumbnail
-                mat = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                if self._thumbnail_core is not None:
+                    mat = self._thumbnail_core.render_page(page_num, fitz.Matrix(zoom, zoom))
+                else:
+                    mat = document[page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
 
                 # Convert to QPixmap
-                from PyQt6.QtGui import QImage
                 img = QImage(mat.samples, mat.width, mat.height,
-                           mat.stride, QImage.Format.Format_RGB888)
-                pixmap = QPixmap.fromImage(img)
-
-                # Add to list
-                item = QListWidgetItem(QIcon(pixmap), f"Page {page_num + 1}")
-                self.thumbnails_list.addItem(item)
+                             mat.stride, QImage.Format.Format_RGB888)
+                item.setIcon(QIcon(QPixmap.fromImage(img)))
+                self._rendered_thumbnails.add(page_num)
 
         except Exception as e:
             placeholder = QListWidgetItem(f"Error loading thumbnails: {e}")
             self.thumbnails_list.addItem(placeholder)
+            self._thumbnail_document = None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._thumbnail_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._thumbnail_timer.start()
+
+    def _on_thumbnail_clicked(self, item: QListWidgetItem):
+        page_num = item.data(Qt.ItemDataRole.UserRole)
+        if page_num is not None:
+            self.page_selected.emit(page_num)
 
     def load_bookmarks(self, pdf_document):
         """Load PDF bookmarks"""
         self.bookmarks_list.clear()
 
         try:
-            toc = pdf_document.get_toc()
+            toc = pdf_document.get_toc() if pdf_document is not None else []
             if not toc:
                 placeholder = QListWidgetItem("No bookmarks")
                 self.bookmarks_list.addItem(placeholder)
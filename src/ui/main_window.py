@@ -2,15 +2,21 @@
 Main application window for NexPro PDF
 """
 
+import os
+from functools import partial
+from typing import List
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QSplitter, QStatusBar, QToolBar, QMenuBar, QMenu,
-    QTabWidget, QLabel, QMessageBox, QPushButton, QFrame
+    QTabWidget, QTabBar, QStackedWidget, QLabel, QMessageBox, QPushButton, QFrame
 )
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer, QThreadPool
 from PyQt6.QtGui import QAction, QIcon, QKeySequence
 from src.utilities.logger import get_logger
+from src.utilities.profiler import get_profiler, DEFAULT_MAX_SPANS
 from src.ui.pdf_viewer import PDFViewer
+from src.ui.render_cache import PixmapCache, DEFAULT_CACHE_SIZE_MB
+from src.ui.startup_loader import BackgroundOpen
 from src.ui.left_panel import LeftPanel
 from src.ui.right_panel import RightPanel
 from src.ui.ribbon import RibbonBar
@@ -34,6 +40,16 @@ class MainWindow(QMainWindow):
         self.current_file = None
         self._first_show = True  # Flag to center window on first show
 
+        # Shared by all open tabs: one pixmap budget and one worker pool
+        cache_mb = self.config.get('performance.cache_size_mb', DEFAULT_CACHE_SIZE_MB)
+        self.pixmap_cache = PixmapCache(max_bytes=cache_mb * 1024 * 1024)
+        self.render_workers = QThreadPool(self)
+        self.render_workers.setMaxThreadCount(max(1, self.config.get('performance.worker_threads', 4)))
+        self._background_opens: List[BackgroundOpen] = []
+        get_profiler().configure(
+            enabled=bool(self.config.get('performance.profiling', False)),
+            max_spans=self.config.get('performance.profiler_spans', DEFAULT_MAX_SPANS))
+
         # Setup UI
         self._setup_window()
         self._create_menu_bar()
@@ -164,16 +180,20 @@ class MainWindow(QMainWindow):
     def _add_edit_menu_actions(self, menu: QMenu):
         """Add Edit menu actions"""
         # Undo
-        undo_action = QAction("&Undo", self)
-        undo_action.setShortcut(QKeySequence.StandardKey.Undo)
-        undo_action.setStatusTip("Undo last action")
-        menu.addAction(undo_action)
+        self.undo_action = QAction("&Undo", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.setStatusTip("Undo last action")
+        self.undo_action.triggered.connect(self.undo)
+        self.undo_action.setEnabled(False)
+        menu.addAction(self.undo_action)
 
         # Redo
-        redo_action = QAction("&Redo", self)
-        redo_action.setShortcut(QKeySequence.StandardKey.Redo)
-        redo_action.setStatusTip("Redo last action")
-        menu.addAction(redo_action)
+        self.redo_action = QAction("&Redo", self)
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_action.setStatusTip("Redo last action")
+        self.redo_action.triggered.connect(self.redo)
+        self.redo_action.setEnabled(False)
+        menu.addAction(self.redo_action)
 
         menu.addSeparator()
 
@@ -302,10 +322,13 @@ class MainWindow(QMainWindow):
         ]
         self.left_sidebar = CollapsibleSidebar(self.left_panel, left_icons, "left", self)
 
-        # Center panel (PDF viewer)
-        self.pdf_viewer = PDFViewer(self)
+        # Center panel (one PDF viewer per open file, the active one in front)
+        self.viewer_stack = QStackedWidget()
+        self.pdf_viewer = self._create_viewer()
+        self.pixmap_cache.set_active(self.pdf_viewer)
+        self.left_panel.page_selected.connect(lambda page: self.pdf_viewer.go_to_page(page))
 
-        # Right panel (properties, formatting, security)
+        # Right panel (properties, formatting, security, performance)
         self.right_panel = RightPanel(self)
 
         # Right sidebar icons: (icon, tooltip, tab_index)
@@ -313,12 +336,13 @@ class MainWindow(QMainWindow):
             ("P", "Properties (Shift+F4)", 0),
             ("F", "Format", 1),
             ("S", "Security", 2),
+            ("T", "Performance", 3),
         ]
         self.right_sidebar = CollapsibleSidebar(self.right_panel, right_icons, "right", self)
 
         # Add widgets to content layout
         content_layout.addWidget(self.left_sidebar)
-        content_layout.addWidget(self.pdf_viewer, 1)  # PDF viewer takes remaining space
+        content_layout.addWidget(self.viewer_stack, 1)  # PDF viewer takes remaining space
         content_layout.addWidget(self.right_sidebar)
 
         outer_layout.addLayout(content_layout)
@@ -338,21 +362,35 @@ class MainWindow(QMainWindow):
         tab_layout.setContentsMargins(10, 4, 10, 4)
         tab_layout.setSpacing(0)
 
-        # File tab widget (shows current file with close button)
-        self.file_tab_widget = QFrame()
-        self.file_tab_widget.setStyleSheet(f"""
-            QFrame {{
-                background-color: {ModernTheme.SURFACE};
+        # One tab per open file, each with a close button
+        self.file_tabs = QTabBar()
+        self.file_tabs.setTabsClosable(True)
+        self.file_tabs.setExpanding(False)
+        self.file_tabs.setDocumentMode(True)
+        self.file_tabs.setUsesScrollButtons(True)
+        self.file_tabs.setElideMode(Qt.TextElideMode.ElideMiddle)
+        self.file_tabs.setStyleSheet(f"""
+            QTabBar::tab {{
+                background-color: {ModernTheme.BACKGROUND};
+                color: {ModernTheme.TEXT_SECONDARY};
                 border: 1px solid {ModernTheme.BORDER};
                 border-bottom: none;
                 border-radius: 6px 6px 0 0;
-                padding: 0px;
-                margin: 0px;
+                font-size: 12px;
+                font-weight: 500;
+                padding: 2px 8px 2px 12px;
+                margin-right: 2px;
+                max-width: 240px;
+            }}
+            QTabBar::tab:selected {{
+                background-color: {ModernTheme.SURFACE};
+                color: {ModernTheme.TEXT_PRIMARY};
             }}
         """)
-        file_tab_inner_layout = QHBoxLayout(self.file_tab_widget)
-        file_tab_inner_layout.setContentsMargins(12, 4, 6, 4)
-        file_tab_inner_layout.setSpacing(8)
+        self.file_tabs.currentChanged.connect(self._on_tab_changed)
+        self.file_tabs.tabCloseRequested.connect(self._close_tab)
+        self.file_tabs.hide()  # Shown once a file is open
+        tab_layout.addWidget(self.file_tabs)
 
         self.file_name_label = QLabel("No file open")
         self.file_name_label.setStyleSheet(f"""
@@ -364,32 +402,93 @@ class MainWindow(QMainWindow):
                 background: transparent;
             }}
         """)
-        file_tab_inner_layout.addWidget(self.file_name_label)
-
-        self.file_close_btn = QPushButton("✕")
-        self.file_close_btn.setFixedSize(20, 20)
-        self.file_close_btn.setToolTip("Close file (Ctrl+W)")
-        self.file_close_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.file_close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: none;
-                border-radius: 10px;
-                font-size: 12px;
-                font-weight: bold;
-                color: #888888;
-            }
-            QPushButton:hover {
-                background-color: #E74C3C;
-                color: white;
-            }
-        """)
-        self.file_close_btn.clicked.connect(self.close_file)
-        self.file_close_btn.hide()  # Hidden when no file is open
-        file_tab_inner_layout.addWidget(self.file_close_btn)
-
-        tab_layout.addWidget(self.file_tab_widget)
-        tab_layout.addStretch()  # Push tab to the left
+        tab_layout.addWidget(self.file_name_label)
+        tab_layout.addStretch()  # Push tabs to the left
+
+    def _create_viewer(self) -> PDFViewer:
+        """Viewer for one open file"""
+        viewer = PDFViewer(self)
+        viewer.session.add_listener(partial(self._on_document_changed, viewer))
+        self.viewer_stack.addWidget(viewer)
+        return viewer
+
+    def _viewer_for_new_file(self) -> PDFViewer:
+        """Viewer to open a file in: the empty one if nothing is open, otherwise a new one"""
+        if self.file_tabs.count() == 0:
+            return self.viewer_stack.widget(0)
+        return self._create_viewer()
+
+    def _tab_for_file(self, file_path: str) -> int:
+        """Index of the tab file_path is open in, or -1"""
+        key = os.path.normcase(os.path.abspath(file_path))
+        for index in range(self.file_tabs.count()):
+            if os.path.normcase(os.path.abspath(self.file_tabs.tabData(index))) == key:
+                return index
+        return -1
+
+    def _activate(self, viewer: PDFViewer):
+        """Bring a viewer to the front; the previous one moves to the background"""
+        if viewer is self.pdf_viewer:
+            return
+        self.pdf_viewer.set_active(False)
+        self.viewer_stack.setCurrentWidget(viewer)
+        self.pdf_viewer = viewer
+        self.pixmap_cache.set_active(viewer)
+        viewer.set_active(True)
+
+    def _show_tab(self, viewer: PDFViewer, file_path: str, select: bool = True):
+        """Give a viewer that has opened file_path its tab"""
+        index = self.viewer_stack.indexOf(viewer)
+        if index >= self.file_tabs.count():
+            index = self.file_tabs.insertTab(index, os.path.basename(file_path))
+        self.file_tabs.setTabData(index, file_path)
+        self._update_tab(viewer)
+        self.file_name_label.hide()
+        self.file_tabs.show()
+        if select:
+            self.file_tabs.setCurrentIndex(index)
+
+    def _update_tab(self, viewer: PDFViewer):
+        """Tab name (marked with * when modified) and full path as tooltip"""
+        index = self.viewer_stack.indexOf(viewer)
+        if not 0 <= index < self.file_tabs.count():
+            return
+        file_path = self.file_tabs.tabData(index)
+        modified = "*" if viewer.session.is_modified else ""
+        self.file_tabs.setTabText(index, f"{os.path.basename(file_path)}{modified}")
+        self.file_tabs.setTabToolTip(index, file_path)
+
+    def _on_tab_changed(self, index: int):
+        """Another tab was selected"""
+        if index < 0 or self.viewer_stack.widget(index) is self.pdf_viewer:
+            return
+        self._activate(self.viewer_stack.widget(index))
+        self._tab_shown()
+
+    def _tab_shown(self):
+        """Show the active tab's file in the title, actions and side panels"""
+        index = self.file_tabs.currentIndex()
+        self.current_file = self.file_tabs.tabData(index) if index >= 0 else None
+        self._update_title()
+        self._update_undo_actions()
+        self._fill_side_panels()
+
+    def _close_tab(self, index: int):
+        """Close button of a tab"""
+        self.file_tabs.setCurrentIndex(index)
+        self.close_file()
+
+    def _remove_viewer(self, viewer: PDFViewer):
+        """Drop a viewer (and its tab); the tab next to it becomes active"""
+        index = self.viewer_stack.indexOf(viewer)
+        has_tab = index < self.file_tabs.count()
+        # The stack goes first so tab indexes keep matching stack indexes
+        self.viewer_stack.removeWidget(viewer)
+        if has_tab:
+            self.file_tabs.removeTab(index)
+        self._activate(self.viewer_stack.widget(max(0, self.file_tabs.currentIndex())))
+        viewer.zoom_renderer.stop()
+        viewer.deleteLater()
 
     def _create_status_bar(self):
         """Create status bar"""
@@ -446,70 +545,281 @@ class MainWindow(QMainWindow):
         """Open existing PDF"""
         self.logger.info("Open file requested")
         from PyQt6.QtWidgets import QFileDialog
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "Open PDF",
             "",
             "PDF Files (*.pdf);;All Files (*)"
         )
-        if file_path:
-            self.load_pdf(file_path)
+        if len(file_paths) == 1:
+            self.load_pdf(file_paths[0])
+        elif file_paths:
+            self.open_files(file_paths)
+
+    def _update_title(self):
+        """Window title with the current file, marked with * when modified"""
+        title = self.config.get("ui.window_title", "NexPro PDF")
+        if self.current_file:
+            modified = "*" if self.pdf_viewer.session.is_modified else ""
+            title = f"{title} - {self.current_file}{modified}"
+        self.setWindowTitle(title)
+
+    def set_current_file(self, file_path: str):
+        """The active document now lives in file_path (after Save As)"""
+        self.current_file = file_path
+        index = self.viewer_stack.indexOf(self.pdf_viewer)
+        if index < self.file_tabs.count():
+            self.file_tabs.setTabData(index, file_path)
+        self._update_tab(self.pdf_viewer)
+        self._update_title()
+
+    def _on_document_changed(self, viewer: PDFViewer, revision: int, pages):
+        """Session changed: mark the window as modified and update the side panels"""
+        self._update_tab(viewer)
+        if viewer is not self.pdf_viewer:
+            return
+        self._update_title()
+        self._update_undo_actions()
+        if pages is None:
+            self._fill_side_panels()
+        elif pages:
+            self.left_panel.refresh_thumbnails(pages)
+        else:
+            # Document-level change (bookmarks, metadata)
+            self._fill_side_panels(thumbnails=False)
+
+    def _fill_side_panels(self, thumbnails: bool = True):
+        """Show the active document's thumbnails, bookmarks and properties"""
+        document = self.pdf_viewer.pdf_document
+        if document is None:
+            self.left_panel.load_thumbnails(None)
+            self.left_panel.load_bookmarks(None)
+            return
+        try:
+            if thumbnails:
+                self.left_panel.load_thumbnails(document, self.pdf_viewer.pdf_core)
+            self.left_panel.load_bookmarks(document)
+
+            metadata = self.pdf_viewer.pdf_core.get_metadata()
+            file_size = os.path.getsize(self.current_file) if self.current_file else 0
+            self.right_panel.update_properties({
+                'title': metadata.get('title', ''),
+                'author': metadata.get('author', ''),
+                'subject': metadata.get('subject', ''),
+                'keywords': metadata.get('keywords', ''),
+                'file_size': f"{file_size / (1024 * 1024):.2f} MB",
+                'page_count': document.page_count,
+                'created': self._format_pdf_date(metadata.get('creationDate', '')),
+                'modified': self._format_pdf_date(metadata.get('modDate', '')),
+            })
+            import fitz
+            permissions = document.permissions
+            self.right_panel.update_security_status(bool(metadata.get('encryption')), {
+                'print': bool(permissions & fitz.PDF_PERM_PRINT),
+                'copy': bool(permissions & fitz.PDF_PERM_COPY),
+                'modify': bool(permissions & fitz.PDF_PERM_MODIFY),
+                'assemble': bool(permissions & fitz.PDF_PERM_ASSEMBLE),
+            })
+        except Exception as e:
+            self.logger.error(f"Error updating side panels: {e}")
+
+    @staticmethod
+    def _format_pdf_date(value: str) -> str:
+        """'D:20240131120000+05'30' -> '2024-01-31 12:00'"""
+        digits = value[2:] if value.startswith('D:') else value
+        if len(digits) < 8 or not digits[:8].isdigit():
+            return '—'
+        date = f"{digits[0:4]}-{digits[4:6]}-{digits[6:8]}"
+        if len(digits) >= 12 and digits[8:12].isdigit():
+            date += f" {digits[8:10]}:{digits[10:12]}"
+        return date
+
+    def _update_undo_actions(self):
+        """Enable Undo/Redo and name the edit they apply to"""
+        if not hasattr(self, 'undo_action') or not hasattr(self, 'pdf_viewer'):
+            return
+        journal = self.pdf_viewer.session.journal
+        can_undo = self.pdf_viewer.session.can_undo()
+        can_redo = self.pdf_viewer.session.can_redo()
+        self.undo_action.setEnabled(can_undo)
+        self.undo_action.setText(f"&Undo {journal.undo_label()}" if can_undo else "&Undo")
+        self.redo_action.setEnabled(can_redo)
+        self.redo_action.setText(f"&Redo {journal.redo_label()}" if can_redo else "&Redo")
+
+    def undo(self):
+        """Undo the last edit"""
+        if not hasattr(self, 'pdf_viewer'):
+            return
+        label = self.pdf_viewer.session.undo()
+        self.status_label.setText(f"Undone: {label}" if label else "Nothing to undo")
+
+    def redo(self):
+        """Redo the last undone edit"""
+        if not hasattr(self, 'pdf_viewer'):
+            return
+        label = self.pdf_viewer.session.redo()
+        self.status_label.setText(f"Redone: {label}" if label else "Nothing to redo")
+
+    def _confirm_unsaved_changes(self) -> bool:
+        """
+        Ask what to do with unsaved changes before they would be lost
+
+        Returns:
+            True if it is fine to continue (saved or discarded)
+        """
+        if not hasattr(self, 'pdf_viewer') or not self.pdf_viewer.session.is_modified:
+            return True
+        reply = QMessageBox.question(
+            self,
+            "Unsaved Changes",
+            f"{self.current_file} has unsaved changes.\n\nSave them now?",
+            QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard
+            | QMessageBox.StandardButton.Cancel
+        )
+        if reply == QMessageBox.StandardButton.Save:
+            self.save_file()
+            return not self.pdf_viewer.session.is_modified
+        return reply == QMessageBox.StandardButton.Discard
 
     def close_file(self):
-        """Close current PDF file"""
+        """Close the active PDF file (and its tab)"""
         if not self.current_file:
             return
+        if not self._confirm_unsaved_changes():
+            return
 
         self.logger.info(f"Closing file: {self.current_file}")
 
         # Close the PDF in the viewer
         self.pdf_viewer.close_pdf()
+        if self.file_tabs.count() > 1:
+            closed = self.current_file
+            self._remove_viewer(self.pdf_viewer)
+            self._tab_shown()
+            self.status_label.setText(f"Closed: {closed}")
+            return
+        self._update_undo_actions()
+        self._fill_side_panels()
 
-        # Reset state
+        # Reset state; the empty viewer stays for the next file
         self.current_file = None
         self.setWindowTitle(self.config.get("ui.window_title", "NexPro PDF"))
         self.status_label.setText("Ready - No file open")
 
-        # Update file tab - show "No file open" and hide close button
-        self.file_name_label.setText("No file open")
-        self.file_name_label.setStyleSheet(f"""
-            QLabel {{
-                color: {ModernTheme.TEXT_SECONDARY};
-                font-size: 12px;
-                font-weight: 500;
-                border: none;
-                background: transparent;
-            }}
-        """)
-        self.file_close_btn.hide()
+        # Remove the last tab and show "No file open"
+        self.file_tabs.removeTab(0)
+        self.file_tabs.hide()
+        self.file_name_label.show()
 
     def load_pdf(self, file_path: str):
-        """Load PDF file"""
+        """
+        Load PDF file in a new tab
+
+        A file that is already open is reloaded in its own tab.
+        """
+        index = self._tab_for_file(file_path)
+        if index >= 0:
+            self.file_tabs.setCurrentIndex(index)
+            if not self._confirm_unsaved_changes():
+                return
+        previous = self.pdf_viewer
+        viewer = self.pdf_viewer if index >= 0 else self._viewer_for_new_file()
+        self._activate(viewer)
         try:
             self.logger.info(f"Loading PDF: {file_path}")
             self.current_file = file_path
-            self.pdf_viewer.load_pdf(file_path)
-            self.setWindowTitle(f"{self.config.get('ui.window_title')} - {file_path}")
-            self.status_label.setText(f"Loaded: {file_path}")
-
-            # Update file tab with file name and show close button
-            import os
-            file_name = os.path.basename(file_path)
-            self.file_name_label.setText(file_name)
-            self.file_name_label.setStyleSheet(f"""
-                QLabel {{
-                    color: {ModernTheme.TEXT_PRIMARY};
-                    font-size: 12px;
-                    font-weight: 500;
-                    border: none;
-                    background: transparent;
-                }}
-            """)
-            self.file_close_btn.show()
+            viewer.load_pdf(file_path)
+            self._show_tab(viewer, file_path)
+            self._file_loaded(file_path)
         except Exception as e:
             self.logger.error(f"Error loading PDF: {e}")
+            if viewer is not previous and self.viewer_stack.indexOf(viewer) >= self.file_tabs.count() > 0:
+                # A tab that never opened goes away again
+                self._remove_viewer(viewer)
+                self._tab_shown()
             QMessageBox.critical(self, "Error", f"Failed to load PDF: {e}")
 
+    def open_files(self, file_paths: List[str]):
+        """
+        Open several files at once, each in its own tab
+
+        The files are parsed on the shared worker pool while the active tab
+        stays usable; each gets its tab when it is ready, in the
+        background except for the first one.
+
+        Args:
+            file_paths: PDFs to open
+        """
+        target_width = int(self.pdf_viewer.scroll_area.viewport().width() * 0.95)
+        for position, file_path in enumerate(file_paths):
+            if self._tab_for_file(file_path) >= 0:
+                continue
+            task = BackgroundOpen(file_path, target_width)
+            task.finished.connect(partial(self._background_open_finished, task, position == 0))
+            self._background_opens.append(task)
+            self.render_workers.start(task)
+        self.status_label.setText(f"Opening {len(self._background_opens)} file(s)...")
+
+    def _background_open_finished(self, task: BackgroundOpen, select: bool):
+        if task in self._background_opens:
+            self._background_opens.remove(task)
+        self._adopt_opened_file(task, select)
+
+    def open_startup_file(self, loader):
+        """
+        Show the file a StartupLoader opened while the window was built
+
+        Args:
+            loader: StartupLoader (started before the window was created)
+        """
+        loader.finished.connect(lambda: self._adopt_opened_file(loader))
+        if loader.isFinished():
+            self._adopt_opened_file(loader)
+
+    def _adopt_opened_file(self, loader, select: bool = True):
+        """
+        Show a document opened in the background in a tab of its own
+
+        Args:
+            loader: StartupLoader or BackgroundOpen that has finished
+            select: Make the tab active (otherwise it opens in the background,
+                unless no other file is open)
+        """
+        if loader.taken:
+            return
+        document = loader.take_document()
+        if document is None or document.needs_pass or loader.first_page is None:
+            # Password prompt and error reporting go through the normal path
+            if document is not None:
+                document.close()
+            self.load_pdf(loader.file_path)
+            return
+        if self._tab_for_file(loader.file_path) >= 0:
+            document.close()
+            return
+        select = select or self.file_tabs.count() == 0
+        viewer = self._viewer_for_new_file()
+        if select:
+            self._activate(viewer)
+            self.current_file = loader.file_path
+        viewer.show_opened_document(loader.file_path, document, loader.first_page, loader.zoom)
+        if not select:
+            viewer.set_active(False)
+        self._show_tab(viewer, loader.file_path, select=select)
+        if select:
+            self._file_loaded(loader.file_path)
+        else:
+            self.status_label.setText(f"Opened in a new tab: {loader.file_path}")
+
+    def _file_loaded(self, file_path: str):
+        """Update the window for a newly opened file; side panels fill in afterwards"""
+        self._update_title()
+        self._update_undo_actions()
+        self.status_label.setText(f"Loaded: {file_path}")
+
+        # After the page has been painted
+        QTimer.singleShot(0, self._fill_side_panels)
+
     def save_file(self):
         """Save current PDF"""
         # Check if edit text mode is active - if so, delegate to edit text save
@@ -519,29 +829,14 @@ class MainWindow(QMainWindow):
             return
 
         if self.current_file and hasattr(self, 'pdf_viewer') and self.pdf_viewer.pdf_document:
-            try:
-                self.logger.info(f"Saving file: {self.current_file}")
-                import tempfile, shutil
-
-                # Save to temp file first, then replace original
-                temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-                import os
-                os.close(temp_fd)
-
-                self.pdf_viewer.pdf_document.save(temp_path, garbage=4, deflate=True, clean=True)
-
-                # Close current document, replace file, reopen
-                self.pdf_viewer.pdf_document.close()
-                shutil.move(temp_path, self.current_file)
-                self.pdf_viewer.pdf_document = __import__('fitz').open(self.current_file)
-                self.pdf_viewer.render_current_page()
-
+            self.logger.info(f"Saving file: {self.current_file}")
+            # Appends the changes when possible, otherwise rewrites via a temp file
+            if self.pdf_viewer.session.save():
+                self._update_title()
                 self.status_label.setText("File saved successfully")
                 self.logger.info("File saved successfully")
-            except Exception as e:
-                self.logger.error(f"Error saving file: {e}")
-                from PyQt6.QtWidgets import QMessageBox
-                QMessageBox.critical(self, "Save Error", f"Failed to save file: {e}")
+            else:
+                QMessageBox.critical(self, "Save Error", "Failed to save file, see the log for details")
         else:
             self.save_file_as()
 
@@ -560,17 +855,13 @@ class MainWindow(QMainWindow):
             "PDF Files (*.pdf)"
         )
         if file_path:
-            try:
-                self.logger.info(f"Saving file as: {file_path}")
-                self.pdf_viewer.pdf_document.save(file_path, garbage=4, deflate=True, clean=True)
-                self.current_file = file_path
+            self.logger.info(f"Saving file as: {file_path}")
+            # The session continues on the new file
+            if self.pdf_viewer.session.save(file_path):
+                self.set_current_file(file_path)
                 self.status_label.setText(f"Saved as: {file_path}")
-
-                # Reload from the new file
-                self.load_pdf(file_path)
-            except Exception as e:
-                self.logger.error(f"Error saving file: {e}")
-                QMessageBox.critical(self, "Save Error", f"Failed to save file: {e}")
+            else:
+                QMessageBox.critical(self, "Save Error", "Failed to save file, see the log for details")
 
     def save_all_edits(self):
         """Save all pending text edits to PDF"""
@@ -606,5 +897,11 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Handle window close event"""
+        for index in range(self.file_tabs.count()):
+            if self.viewer_stack.widget(index).session.is_modified:
+                self.file_tabs.setCurrentIndex(index)
+                if not self._confirm_unsaved_changes():
+                    event.ignore()
+                    return
         self.logger.info("Application closing")
         event.accept()
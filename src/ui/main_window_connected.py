@@ -38,6 +38,12 @@ class ConnectedMainWindow(BaseMainWindow):
         self.ribbon = ConnectedRibbonBar(self, self.actions)
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, self.ribbon)
 
+    def _on_document_changed(self, viewer, revision: int, pages):
+        """Override to let the actions drop what they cached about the document"""
+        super()._on_document_changed(viewer, revision, pages)
+        if self.actions:
+            self.actions.document_changed()
+
     def _add_help_menu_actions(self, menu: QMenu):
         """Override to add license info and update check menu items"""
         super()._add_help_menu_actions(menu)
@@ -7,17 +7,10 @@ from PyQt6.QtWidgets import (QFileDialog, QMessageBox, QProgressDialog, QInputDi
                              QApplication)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from pathlib import Path
-from typing import Optional, List
+from threading import Lock
+from typing import Optional, List, Tuple
 from src.utilities.logger import get_logger
-from src.pdf_engine.pdf_core import PDFCore
-from src.pdf_engine.pdf_creator import PDFCreator
-from src.pdf_engine.pdf_merger import PDFMerger
-from src.pdf_engine.pdf_forms import PDFForms
-from src.pdf_engine.pdf_utilities import PDFUtilities
-from src.pdf_engine.pdf_converter import PDFConverter
-from src.security.pdf_security import PDFSecurity
-from src.security.pdf_redaction import PDFRedaction
-from src.security.pdf_signature import PDFSignature
+from src.utilities.service_registry import ServiceRegistry, LazyService
 from src.ui.dialogs import *
 
 
@@ -40,26 +33,121 @@ class PDFWorker(QThread):
             self.finished.emit(False, str(e))
 
 
+class CompressionEstimateWorker(QThread):
+    """
+    Estimates compression results for slider positions in the background
+
+    Only the most recently requested position is estimated next, so
+    dragging the slider does not queue up work.
+    """
+    estimated = pyqtSignal(int, object)  # slider position, {'size', 'seconds'} or None
+
+    def __init__(self, estimator, settings_for):
+        """
+        Args:
+            estimator: CompressionEstimator for the file
+            settings_for: Maps a slider position to compress_pdf() arguments
+                (image_quality, max_image_size, convert_to_images)
+        """
+        super().__init__()
+        self.estimator = estimator
+        self.settings_for = settings_for
+        self._pending = None
+        self._lock = Lock()
+        # A request made while run() was returning is picked up here
+        self.finished.connect(self._restart_if_pending)
+
+    def request(self, position: int):
+        with self._lock:
+            self._pending = position
+        if not self.isRunning():
+            self.start()
+
+    def _restart_if_pending(self):
+        with self._lock:
+            pending = self._pending is not None
+        if pending and not self.isInterruptionRequested():
+            self.start()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._lock:
+                position, self._pending = self._pending, None
+            if position is None:
+                return
+            try:
+                result = self.estimator.estimate(*self.settings_for(position))
+            except Exception as e:
+                get_logger().warning(f"Compression estimate failed: {e}")
+                result = None
+            self.estimated.emit(position, result)
+
+    def stop(self):
+        """Stop after the running estimate and release the estimator"""
+        self.requestInterruption()
+        self.wait()
+        self.estimator.close()
+
+
 class PDFActions:
     """PDF operations controller"""
 
+    # Backends are imported and created on first use
+    pdf_creator = LazyService()
+    pdf_merger = LazyService()
+    pdf_forms = LazyService()
+    pdf_utilities = LazyService()
+    pdf_security = LazyService()
+    pdf_redaction = LazyService()
+    pdf_signature = LazyService()
+    pdf_converter = LazyService()
+
     def __init__(self, main_window):
         self.main_window = main_window
         self.logger = get_logger()
 
-        # Initialize backends
-        self.pdf_core = PDFCore()
-        self.pdf_creator = PDFCreator()
-        self.pdf_merger = PDFMerger()
-        self.pdf_forms = PDFForms()
-        self.pdf_utilities = PDFUtilities()
-        self.pdf_security = PDFSecurity()
-        self.pdf_redaction = PDFRedaction()
-        self.pdf_signature = PDFSignature()
-        self.pdf_converter = PDFConverter()
+        # Register backends
+        self.services = ServiceRegistry()
+        self.services.register('pdf_creator', 'src.pdf_engine.pdf_creator:PDFCreator')
+        self.services.register('pdf_merger', 'src.pdf_engine.pdf_merger:PDFMerger')
+        self.services.register('pdf_forms', 'src.pdf_engine.pdf_forms:PDFForms')
+        self.services.register('pdf_utilities', 'src.pdf_engine.pdf_utilities:PDFUtilities')
+        self.services.register('pdf_security', 'src.security.pdf_security:PDFSecurity')
+        self.services.register('pdf_redaction', 'src.security.pdf_redaction:PDFRedaction')
+        self.services.register('pdf_signature', 'src.security.pdf_signature:PDFSignature')
+        self.services.register('pdf_converter', 'src.pdf_engine.pdf_converter:PDFConverter')
 
         self.current_pdf_document = None
 
+    def document_changed(self):
+        """A session changed its document: drop state derived from it"""
+        if self.services.is_loaded('pdf_forms'):
+            self.pdf_forms.invalidate_index()
+
+    @property
+    def session(self):
+        """Session of the open document (shared with the viewer)"""
+        return self.main_window.pdf_viewer.session
+
+    @property
+    def pdf_core(self):
+        """Core engine of the open document"""
+        return self.session.core
+
+    def _all_pages(self) -> range:
+        """Page numbers of the open document"""
+        return range(self.session.document.page_count)
+
+    def _input_file(self) -> Optional[str]:
+        """File for tools that read from disk, including changes not saved yet"""
+        if self.main_window.current_file and self.session.document:
+            return self.session.input_file()
+        return self.main_window.current_file
+
+    def _document_edited(self, message: str):
+        """Report an in-memory change; it reaches the file with Save"""
+        self.main_window.status_label.setText(f"{message} (not saved yet)")
+
     # File Operations
     def create_from_word(self):
         """Create PDF from Word document"""
@@ -211,7 +299,7 @@ class PDFActions:
     def convert_to_word(self):
         """Convert PDF to Word document with options dialog"""
         # Check if a PDF is open, if not ask to select one
-        pdf_file = self.main_window.current_file
+        pdf_file = self._input_file()
 
         if not pdf_file:
             pdf_file, _ = QFileDialog.getOpenFileName(
@@ -245,8 +333,9 @@ class PDFActions:
         settings = dialog.get_settings()
 
         # Get output file location
-        default_name = Path(pdf_file).stem + ".docx"
-        default_path = str(Path(pdf_file).parent / default_name)
+        source_file = self.main_window.current_file or pdf_file
+        default_name = Path(source_file).stem + ".docx"
+        default_path = str(Path(source_file).parent / default_name)
 
         output_file, _ = QFileDialog.getSaveFileName(
             self.main_window,
@@ -390,7 +479,7 @@ class PDFActions:
         if not output_dir:
             return
 
-        input_file = self.main_window.current_file
+        input_file = self._input_file()
 
         if method == "By Page Range":
             # Simple split: one page per file
@@ -458,7 +547,7 @@ class PDFActions:
                 return
 
             if self.pdf_security.set_password(
-                self.main_window.current_file,
+                self._input_file(),
                 output_file,
                 passwords['user_password'],
                 passwords['owner_password']
@@ -502,7 +591,7 @@ class PDFActions:
                 return
 
             if self.pdf_security.encrypt_pdf(
-                self.main_window.current_file,
+                self._input_file(),
                 output_file,
                 settings['user_password'],
                 settings['owner_password'],
@@ -554,7 +643,7 @@ class PDFActions:
             }
 
             if self.pdf_security.set_permissions(
-                self.main_window.current_file,
+                self._input_file(),
                 output_file,
                 permissions,
                 settings['owner_password']
@@ -599,7 +688,7 @@ class PDFActions:
 
             if settings['type'] == 'text':
                 success = self.pdf_security.add_watermark(
-                    self.main_window.current_file,
+                    self._input_file(),
                     output_file,
                     settings['text'],
                     settings['opacity'],
@@ -609,7 +698,7 @@ class PDFActions:
                 )
             else:
                 success = self.pdf_security.add_image_watermark(
-                    self.main_window.current_file,
+                    self._input_file(),
                     output_file,
                     settings['image_path'],
                     settings['opacity'],
@@ -650,7 +739,7 @@ class PDFActions:
     def _redact_pattern(self, pattern_type: str, display_name: str):
         """Helper method for pattern-based redaction"""
         # If no file is open, allow user to select a PDF file directly
-        input_file = self.main_window.current_file
+        input_file = self._input_file()
         if not input_file:
             input_file, _ = QFileDialog.getOpenFileName(
                 self.main_window,
@@ -724,37 +813,20 @@ class PDFActions:
         if dialog.exec() == QDialog.DialogCode.Accepted:
             settings = dialog.get_settings()
 
-            import fitz
-            pdf_doc = fitz.open(self.main_window.current_file)
-
-            if self.pdf_utilities.add_bates_numbering(
-                pdf_doc,
-                settings['prefix'],
-                settings['suffix'],
-                settings['start_number'],
-                settings['digits'],
-                settings['position'],
-                settings['font_size']
-            ):
-                output_file, _ = QFileDialog.getSaveFileName(
-                    self.main_window,
-                    "Save PDF As",
-                    "",
-                    "PDF Files (*.pdf)"
+            with self.session.edit(self._all_pages(), "Bates Numbering") as pdf_doc:
+                added = self.pdf_utilities.add_bates_numbering(
+                    pdf_doc,
+                    settings['prefix'],
+                    settings['suffix'],
+                    settings['start_number'],
+                    settings['digits'],
+                    settings['position'],
+                    settings['font_size']
                 )
 
-                if output_file:
-                    pdf_doc.save(output_file)
-                    pdf_doc.close()
-
-                    QMessageBox.information(
-                        self.main_window,
-                        "Success",
-                        "Bates numbering added successfully"
-                    )
-                    self.main_window.load_pdf(output_file)
+            if added:
+                self._document_edited("Bates numbering added")
             else:
-                pdf_doc.close()
                 QMessageBox.critical(
                     self.main_window,
                     "Error",
@@ -824,6 +896,14 @@ class PDFActions:
         self.main_window.pdf_viewer.show_find_replace_dialog()
         self.main_window.status_label.setText("Find & Replace: Search for text and replace it")
 
+    def undo(self):
+        """Undo the last edit"""
+        self.main_window.undo()
+
+    def redo(self):
+        """Redo the last undone edit"""
+        self.main_window.redo()
+
     def save_all_edits(self):
         """Save all pending text edits to PDF"""
         if not self.main_window.current_file:
@@ -972,51 +1052,28 @@ class PDFActions:
         import fitz
 
         try:
-            # Use the viewer's existing document to avoid resource conflicts
-            pdf_doc = self.main_window.pdf_viewer.pdf_document
-            if not pdf_doc:
+            if not self.session.document:
                 QMessageBox.warning(self.main_window, "Error", "No PDF document loaded")
                 return
 
             current_page_num = self.main_window.pdf_viewer.current_page
-            page = pdf_doc[current_page_num]
-
-            # Create rectangle for text box
-            rect = fitz.Rect(x0, y0, x1, y1)
-
-            # Insert text with alignment
-            page.insert_textbox(
-                rect,
-                text,
-                fontsize=font_size,
-                fontname="helv",
-                color=(0, 0, 0),
-                align=align  # 0=Left, 1=Center, 2=Right, 3=Justify
-            )
+            with self.session.edit([current_page_num], "Add Text"):
+                page = self.session.page(current_page_num)
 
-            # Save to a new file (incremental save to same file not safe while open)
-            output_file, _ = QFileDialog.getSaveFileName(
-                self.main_window,
-                "Save PDF As",
-                self.main_window.current_file,
-                "PDF Files (*.pdf)"
-            )
+                # Create rectangle for text box
+                rect = fitz.Rect(x0, y0, x1, y1)
 
-            if output_file:
-                pdf_doc.save(output_file, garbage=4, deflate=True, clean=True)
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    "Text added successfully!"
+                # Insert text with alignment
+                page.insert_textbox(
+                    rect,
+                    text,
+                    fontsize=font_size,
+                    fontname="helv",
+                    color=(0, 0, 0),
+                    align=align  # 0=Left, 1=Center, 2=Right, 3=Justify
                 )
-                # Reload the saved file
-                self.main_window.load_pdf(output_file)
-                self.main_window.status_label.setText("Text added successfully")
-            else:
-                # User cancelled - undo the text insertion by reloading
-                current_file = self.main_window.current_file
-                self.main_window.load_pdf(current_file)
-                self.main_window.status_label.setText("Text addition cancelled")
+
+            self._document_edited("Text added")
         except Exception as e:
             self.main_window.status_label.setText(f"Error adding text: {e}")
             QMessageBox.critical(self.main_window, "Error", f"Failed to add text: {e}")
@@ -1100,39 +1157,22 @@ class PDFActions:
         delattr(self, '_pending_image_path')
 
         import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
 
         # Get current page
         current_page_num = self.main_window.pdf_viewer.current_page
-        page = pdf_doc[current_page_num]
+        try:
+            with self.session.edit([current_page_num], "Add Image"):
+                page = self.session.page(current_page_num)
 
-        # Create image rectangle from selection
-        rect = fitz.Rect(x0, y0, x1, y1)
+                # Create image rectangle from selection
+                rect = fitz.Rect(x0, y0, x1, y1)
 
-        # Insert image (it will be scaled to fit the rectangle)
-        page.insert_image(rect, filename=image_path)
+                # Insert image (it will be scaled to fit the rectangle)
+                page.insert_image(rect, filename=image_path)
 
-        # Save
-        output_file, _ = QFileDialog.getSaveFileName(
-            self.main_window,
-            "Save PDF As",
-            "",
-            "PDF Files (*.pdf)"
-        )
-
-        if output_file:
-            pdf_doc.save(output_file)
-            pdf_doc.close()
-            QMessageBox.information(
-                self.main_window,
-                "Success",
-                "Image added successfully!"
-            )
-            self.main_window.load_pdf(output_file)
-            self.main_window.status_label.setText("Image added successfully")
-        else:
-            pdf_doc.close()
-            self.main_window.status_label.setText("Save cancelled")
+            self._document_edited("Image added")
+        except Exception as e:
+            QMessageBox.critical(self.main_window, "Error", f"Failed to add image: {e}")
 
     # Page Operations
     def insert_pages(self):
@@ -1166,30 +1206,13 @@ class PDFActions:
             return
 
         import fitz
-        target_doc = fitz.open(self.main_window.current_file)
         source_doc = fitz.open(source_file)
-
-        target_doc.insert_pdf(source_doc, start_at=position - 1)
-        source_doc.close()
-
-        output_file, _ = QFileDialog.getSaveFileName(
-            self.main_window,
-            "Save PDF As",
-            "",
-            "PDF Files (*.pdf)"
-        )
-
-        if output_file:
-            target_doc.save(output_file)
-            target_doc.close()
-            QMessageBox.information(
-                self.main_window,
-                "Success",
-                "Pages inserted successfully"
-            )
-            self.main_window.load_pdf(output_file)
-        else:
-            target_doc.close()
+        try:
+            with self.session.edit(None, "Insert Pages") as target_doc:
+                target_doc.insert_pdf(source_doc, start_at=position - 1)
+            self._document_edited(f"Inserted {len(source_doc)} pages")
+        finally:
+            source_doc.close()
 
     def delete_pages(self):
         """Delete pages from PDF"""
@@ -1201,9 +1224,7 @@ class PDFActions:
             )
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
-        total_pages = len(pdf_doc)
+        total_pages = self.session.document.page_count
 
         pages_str, ok = QInputDialog.getText(
             self.main_window,
@@ -1212,7 +1233,6 @@ class PDFActions:
         )
 
         if not ok or not pages_str:
-            pdf_doc.close()
             return
 
         # Parse page numbers
@@ -1224,29 +1244,15 @@ class PDFActions:
             else:
                 pages_to_delete.append(int(part) - 1)
 
-        # Delete in reverse order
-        for page_num in sorted(pages_to_delete, reverse=True):
-            if 0 <= page_num < total_pages:
-                pdf_doc.delete_page(page_num)
+        pages_to_delete = sorted(p for p in set(pages_to_delete) if 0 <= p < total_pages)
+        if len(pages_to_delete) == total_pages:
+            QMessageBox.warning(self.main_window, "Delete Pages", "A PDF must keep at least one page")
+            return
 
-        output_file, _ = QFileDialog.getSaveFileName(
-            self.main_window,
-            "Save PDF As",
-            "",
-            "PDF Files (*.pdf)"
-        )
+        with self.session.edit(None, "Delete Pages") as pdf_doc:
+            pdf_doc.delete_pages(pages_to_delete)
 
-        if output_file:
-            pdf_doc.save(output_file)
-            pdf_doc.close()
-            QMessageBox.information(
-                self.main_window,
-                "Success",
-                f"Deleted {len(pages_to_delete)} pages"
-            )
-            self.main_window.load_pdf(output_file)
-        else:
-            pdf_doc.close()
+        self._document_edited(f"Deleted {len(pages_to_delete)} pages")
 
     def rotate_pages(self):
         """Rotate pages in PDF"""
@@ -1271,30 +1277,11 @@ class PDFActions:
         if not ok:
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
-
-        for page in pdf_doc:
-            page.set_rotation(int(angle))
-
-        output_file, _ = QFileDialog.getSaveFileName(
-            self.main_window,
-            "Save PDF As",
-            "",
-            "PDF Files (*.pdf)"
-        )
+        with self.session.edit(self._all_pages(), "Rotate Pages") as pdf_doc:
+            for page in pdf_doc:
+                page.set_rotation(int(angle))
 
-        if output_file:
-            pdf_doc.save(output_file)
-            pdf_doc.close()
-            QMessageBox.information(
-                self.main_window,
-                "Success",
-                f"Rotated all pages by {angle} degrees"
-            )
-            self.main_window.load_pdf(output_file)
-        else:
-            pdf_doc.close()
+        self._document_edited(f"Rotated all pages by {angle} degrees")
 
     def crop_pages(self):
         """Crop pages in PDF"""
@@ -1318,36 +1305,20 @@ class PDFActions:
             return
 
         import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
-
-        for page in pdf_doc:
-            rect = page.rect
-            new_rect = fitz.Rect(
-                rect.x0 + margin,
-                rect.y0 + margin,
-                rect.x1 - margin,
-                rect.y1 - margin
-            )
-            page.set_cropbox(new_rect)
-
-        output_file, _ = QFileDialog.getSaveFileName(
-            self.main_window,
-            "Save PDF As",
-            "",
-            "PDF Files (*.pdf)"
-        )
-
-        if output_file:
-            pdf_doc.save(output_file)
-            pdf_doc.close()
-            QMessageBox.information(
-                self.main_window,
-                "Success",
-                "Pages cropped successfully"
-            )
-            self.main_window.load_pdf(output_file)
-        else:
-            pdf_doc.close()
+        try:
+            with self.session.edit(self._all_pages(), "Crop Pages") as pdf_doc:
+                for page in pdf_doc:
+                    rect = page.rect
+                    new_rect = fitz.Rect(
+                        rect.x0 + margin,
+                        rect.y0 + margin,
+                        rect.x1 - margin,
+                        rect.y1 - margin
+                    )
+                    page.set_cropbox(new_rect)
+            self._document_edited("Pages cropped")
+        except Exception as e:
+            QMessageBox.critical(self.main_window, "Error", f"Failed to crop pages: {e}")
 
     # Redaction Operations (additional)
     def manual_redaction(self):
@@ -1446,14 +1417,15 @@ class PDFActions:
                     "",
                     "PDF Files (*.pdf)"
                 )
-                if output_file:
-                    self.main_window.pdf_viewer.pdf_document.save(output_file)
+                if output_file and self.session.save(output_file):
+                    self.main_window.set_current_file(output_file)
                     QMessageBox.information(
                         self.main_window,
                         "Success",
                         f"Redactions applied and saved successfully!\n\n{message}"
                     )
-                    self.main_window.load_pdf(output_file)
+                elif not output_file:
+                    self._document_edited("Redactions applied")
 
                 self.main_window.pdf_viewer.disable_redaction_mode()
                 self.main_window.status_label.setText("Ready")
@@ -1489,7 +1461,7 @@ class PDFActions:
     def text_redaction(self):
         """Redact specific text"""
         # If no file is open, allow user to select a PDF file directly
-        input_file = self.main_window.current_file
+        input_file = self._input_file()
         if not input_file:
             input_file, _ = QFileDialog.getOpenFileName(
                 self.main_window,
@@ -1552,34 +1524,28 @@ class PDFActions:
             )
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
+        output_file, _ = QFileDialog.getSaveFileName(
+            self.main_window,
+            "Save PDF As",
+            "",
+            "PDF Files (*.pdf)"
+        )
 
-        if self.pdf_forms.flatten_form(pdf_doc):
-            output_file, _ = QFileDialog.getSaveFileName(
+        if not output_file:
+            return
+
+        if self.pdf_forms.flatten_form(self._input_file(), output_file):
+            QMessageBox.information(
                 self.main_window,
-                "Save PDF As",
-                "",
-                "PDF Files (*.pdf)"
+                "Success",
+                "Form fields flattened successfully"
             )
-
-            if output_file:
-                pdf_doc.save(output_file)
-                pdf_doc.close()
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    "Form fields flattened successfully"
-                )
-                self.main_window.load_pdf(output_file)
-            else:
-                pdf_doc.close()
+            self.main_window.load_pdf(output_file)
         else:
-            pdf_doc.close()
-            QMessageBox.information(
+            QMessageBox.critical(
                 self.main_window,
-                "No Forms",
-                "No form fields found in document"
+                "Error",
+                "Failed to flatten form fields"
             )
 
     def export_form_data(self):
@@ -1602,18 +1568,13 @@ class PDFActions:
         if not output_file:
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
-
-        if self.pdf_forms.export_to_excel(pdf_doc, output_file):
-            pdf_doc.close()
+        if self.pdf_forms.export_to_excel(self.session.document, output_file):
             QMessageBox.information(
                 self.main_window,
                 "Success",
                 f"Form data exported to:\n{output_file}"
             )
         else:
-            pdf_doc.close()
             QMessageBox.warning(
                 self.main_window,
                 "No Data",
@@ -1860,7 +1821,7 @@ class PDFActions:
 
         # Sign the PDF
         success, message = self.pdf_signature.sign_pdf_with_token(
-            self.main_window.current_file,
+            self._input_file(),
             output_file,
             selected_token['dll_path'],
             selected_token['slot'],
@@ -1951,11 +1912,7 @@ class PDFActions:
             )
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
-
-        signatures = self.pdf_signature.get_signature_info(pdf_doc)
-        pdf_doc.close()
+        signatures = self.pdf_signature.get_signature_info(self.session.document)
 
         if signatures:
             sig_info = "\n\n".join([
@@ -2067,30 +2024,13 @@ class PDFActions:
         if not ok:
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
+        with self.session.edit(self._all_pages(), "Page Numbers") as pdf_doc:
+            added = self.pdf_utilities.add_page_numbers(
+                pdf_doc, position=position.lower().replace(" ", "_"))
 
-        if self.pdf_utilities.add_page_numbers(pdf_doc, position.lower().replace(" ", "_")):
-            output_file, _ = QFileDialog.getSaveFileName(
-                self.main_window,
-                "Save PDF As",
-                "",
-                "PDF Files (*.pdf)"
-            )
-
-            if output_file:
-                pdf_doc.save(output_file)
-                pdf_doc.close()
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    "Page numbers added successfully"
-                )
-                self.main_window.load_pdf(output_file)
-            else:
-                pdf_doc.close()
+        if added:
+            self._document_edited("Page numbers added")
         else:
-            pdf_doc.close()
             QMessageBox.critical(
                 self.main_window,
                 "Error",
@@ -2122,41 +2062,19 @@ class PDFActions:
         if not (ok1 or ok2):
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
-
-        if header_text:
-            self.pdf_utilities.add_header(pdf_doc, header_text)
+        with self.session.edit(self._all_pages(), "Header & Footer") as pdf_doc:
+            self.pdf_utilities.add_header_footer(pdf_doc, header_text, footer_text)
 
-        if footer_text:
-            self.pdf_utilities.add_footer(pdf_doc, footer_text)
-
-        output_file, _ = QFileDialog.getSaveFileName(
-            self.main_window,
-            "Save PDF As",
-            "",
-            "PDF Files (*.pdf)"
-        )
-
-        if output_file:
-            pdf_doc.save(output_file)
-            pdf_doc.close()
-            QMessageBox.information(
-                self.main_window,
-                "Success",
-                "Header/Footer added successfully"
-            )
-            self.main_window.load_pdf(output_file)
-        else:
-            pdf_doc.close()
+        self._document_edited("Header/Footer added")
 
     def compress_pdf(self):
         """Compress PDF file with slider-based compression control (like 11zon)"""
-        from PyQt6.QtWidgets import QSlider, QFrame, QGridLayout, QGroupBox
+        from PyQt6.QtWidgets import (QSlider, QFrame, QGridLayout, QGroupBox, QCheckBox,
+                                     QDoubleSpinBox)
         from PyQt6.QtCore import Qt as QtCore_Qt
 
         # If no file is open, allow user to select a PDF file directly
-        input_file = self.main_window.current_file
+        input_file = self._input_file()
         if not input_file:
             input_file, _ = QFileDialog.getOpenFileName(
                 self.main_window,
@@ -2172,7 +2090,7 @@ class PDFActions:
         # Create compression dialog
         dialog = QDialog(self.main_window)
         dialog.setWindowTitle("PDF Compression - Like 11zon")
-        dialog.setFixedSize(500, 400)
+        dialog.setFixedSize(500, 470)
         dialog.setStyleSheet("""
             QDialog {
                 background-color: #f5f5f5;
@@ -2313,6 +2231,27 @@ class PDFActions:
 
         main_layout.addWidget(compression_group)
 
+        # Target size: quality and resolution are chosen automatically
+        target_group = QGroupBox("Target Size")
+        target_layout = QHBoxLayout(target_group)
+        target_check = QCheckBox("Compress to at most")
+        target_spin = QDoubleSpinBox()
+        target_spin.setDecimals(1)
+        target_spin.setRange(0.1, max(0.1, round(original_size / (1024 * 1024), 1)))
+        target_spin.setSingleStep(0.5)
+        target_spin.setSuffix(" MB")
+        target_spin.setValue(max(0.1, round(original_size / (1024 * 1024) / 2, 1)))
+        target_spin.setEnabled(False)
+        target_layout.addWidget(target_check)
+        target_layout.addWidget(target_spin)
+        target_layout.addStretch()
+        main_layout.addWidget(target_group)
+
+        def toggle_target(checked):
+            target_spin.setEnabled(checked)
+            compression_group.setEnabled(not checked)
+            warning_label.setVisible(not checked and compression_slider.value() >= 90)
+
         # Quality note (dynamic)
         note_label = QLabel(
             "💡 <b>Tip:</b> Images in the PDF are re-encoded at lower quality. "
@@ -2367,25 +2306,44 @@ class PDFActions:
         btn_layout.addWidget(cancel_btn)
         main_layout.addLayout(btn_layout)
 
+        # Sampled estimates, computed in the background and kept per slider position
+        from src.pdf_engine.image_recompression import CompressionEstimator
+        estimates = {}
+        estimate_worker = CompressionEstimateWorker(CompressionEstimator(input_file),
+                                                    self._compression_settings)
+
+        def show_estimate(value):
+            estimate = estimates[value]
+            reduction = (1 - estimate["size"] / original_size) * 100 if original_size else 0
+            estimated_size_label.setText(f"~{estimate['size'] / 1024:.0f} KB")
+            reduction_label.setText(
+                f"(~{reduction:.0f}% reduction, ~{max(1, round(estimate['seconds']))} s)"
+            )
+
+        def on_estimated(value, estimate):
+            if estimate is None:
+                return
+            estimates[value] = estimate
+            # Positions with the same settings share the estimate
+            settings = self._compression_settings(value)
+            for position in range(compression_slider.minimum(), compression_slider.maximum() + 1):
+                if self._compression_settings(position) == settings:
+                    estimates[position] = estimate
+            if compression_slider.value() in estimates:
+                show_estimate(compression_slider.value())
+
+        estimate_worker.estimated.connect(on_estimated)
+        dialog.finished.connect(lambda _: estimate_worker.stop())
+
         # Update functions
         def update_display(value):
             compression_value_label.setText(f"{value}%")
 
-            # Estimate - actual results depend on image content in the PDF
-            if value <= 30:
-                reduction_factor = 0.20 + (value / 100) * 0.3    # 20-29%
-            elif value <= 50:
-                reduction_factor = 0.30 + ((value - 30) / 20) * 0.25  # 30-55%
-            elif value <= 70:
-                reduction_factor = 0.55 + ((value - 50) / 20) * 0.2   # 55-75%
-            elif value <= 85:
-                reduction_factor = 0.70 + ((value - 70) / 15) * 0.1   # 70-80%
+            if value in estimates:
+                show_estimate(value)
             else:
-                reduction_factor = 0.80 + ((value - 85) / 10) * 0.1   # 80-90%
-
-            estimated = original_size * (1 - reduction_factor)
-            estimated_size_label.setText(f"~{estimated / 1024:.0f} KB")
-            reduction_label.setText(f"(~{reduction_factor * 100:.0f}% reduction)")
+                show_rough_estimate(value)
+                estimate_worker.request(value)
 
             # Update color based on compression level
             if value <= 30:
@@ -2402,11 +2360,30 @@ class PDFActions:
             # Show warning only for page-to-image conversion threshold
             warning_label.setVisible(value >= 90)
 
+        def show_rough_estimate(value):
+            # Shown until the sampled estimate arrives - actual results
+            # depend on image content in the PDF
+            if value <= 30:
+                reduction_factor = 0.20 + (value / 100) * 0.3    # 20-29%
+            elif value <= 50:
+                reduction_factor = 0.30 + ((value - 30) / 20) * 0.25  # 30-55%
+            elif value <= 70:
+                reduction_factor = 0.55 + ((value - 50) / 20) * 0.2   # 55-75%
+            elif value <= 85:
+                reduction_factor = 0.70 + ((value - 70) / 15) * 0.1   # 70-80%
+            else:
+                reduction_factor = 0.80 + ((value - 85) / 10) * 0.1   # 80-90%
+
+            estimated = original_size * (1 - reduction_factor)
+            estimated_size_label.setText(f"~{estimated / 1024:.0f} KB")
+            reduction_label.setText(f"(~{reduction_factor * 100:.0f}% reduction, estimating...)")
+
         def set_preset(value):
             compression_slider.setValue(value)
             update_display(value)
 
         # Connect signals
+        target_check.toggled.connect(toggle_target)
         compression_slider.valueChanged.connect(update_display)
         for btn, value in preset_buttons:
             btn.clicked.connect(lambda checked, v=value: set_preset(v))
@@ -2414,11 +2391,13 @@ class PDFActions:
         # Initialize display
         update_display(50)
 
-        result = {"proceed": False, "compression": 50}
+        result = {"proceed": False, "compression": 50, "target_bytes": None}
 
         def on_compress():
             result["proceed"] = True
             result["compression"] = compression_slider.value()
+            if target_check.isChecked():
+                result["target_bytes"] = int(target_spin.value() * 1024 * 1024)
             dialog.accept()
 
         compress_btn.clicked.connect(on_compress)
@@ -2428,27 +2407,8 @@ class PDFActions:
             return
 
         compression_level = result["compression"]
-
-        # Map slider % to JPEG quality and max image dimension.
-        # All levels up to 85% re-encode images in-place (text preserved).
-        # 90%+ converts entire pages to images (maximum compression, loses text).
-        convert_to_images = False
-        if compression_level <= 30:
-            quality = 80   # Light: mild re-encoding
-            max_size = 2400
-        elif compression_level <= 50:
-            quality = 55   # Medium: noticeable reduction
-            max_size = 1800
-        elif compression_level <= 70:
-            quality = 35   # High: strong re-encoding + downscale
-            max_size = 1400
-        elif compression_level <= 85:
-            quality = 20   # Very High: aggressive re-encoding + downscale
-            max_size = 1000
-        else:  # 90-95%: Maximum compression
-            quality = 15   # Maximum: converts pages to images
-            max_size = 800
-            convert_to_images = True
+        target_bytes = result["target_bytes"]
+        quality, max_size, convert_to_images = self._compression_settings(compression_level)
 
         output_file, _ = QFileDialog.getSaveFileName(
             self.main_window,
@@ -2473,12 +2433,19 @@ class PDFActions:
         QApplication.processEvents()
 
         # Perform compression
-        if self.pdf_utilities.compress_pdf(
-            input_file, output_file,
-            image_quality=quality,
-            max_image_size=max_size,
-            convert_to_images=convert_to_images,
-        ):
+        if target_bytes:
+            report = self.pdf_utilities.compress_to_size(input_file, output_file, target_bytes)
+            success = report is not None
+        else:
+            report = None
+            success = self.pdf_utilities.compress_pdf(
+                input_file, output_file,
+                image_quality=quality,
+                max_image_size=max_size,
+                convert_to_images=convert_to_images,
+            )
+
+        if success:
             progress.setValue(90)
             QApplication.processEvents()
 
@@ -2488,6 +2455,17 @@ class PDFActions:
             progress.setValue(100)
             self.main_window.statusBar().showMessage("Compression complete!", 3000)
 
+            if report:
+                resolution = report["max_image_size"]
+                details = (
+                    f"Target: {target_bytes / (1024 * 1024):.1f} MB "
+                    f"({'reached' if report['met'] else 'not reachable by re-encoding images'})\n"
+                    f"Image quality: {report['quality']}, "
+                    f"max size: {f'{resolution} px' if resolution else 'original'}"
+                )
+            else:
+                details = f"Compression Level: {compression_level}%"
+
             QMessageBox.information(
                 self.main_window,
                 "Compression Complete",
@@ -2495,7 +2473,7 @@ class PDFActions:
                 f"📁 Original: {original_size / 1024:.1f} KB\n"
                 f"📦 Compressed: {compressed_size / 1024:.1f} KB\n"
                 f"📉 Reduction: {reduction:.1f}%\n\n"
-                f"Compression Level: {compression_level}%"
+                f"{details}"
             )
             self.main_window.load_pdf(output_file)
         else:
@@ -2507,6 +2485,28 @@ class PDFActions:
                 "Failed to compress PDF. The file may be protected or corrupted."
             )
 
+    @staticmethod
+    def _compression_settings(compression_level: int) -> Tuple[int, int, bool]:
+        """
+        Map the compression slider % to compress_pdf() settings
+
+        All levels up to 85% re-encode images in-place (text preserved).
+        90%+ converts entire pages to images (maximum compression, loses text).
+
+        Returns:
+            (JPEG quality, max image dimension, convert_to_images)
+        """
+        if compression_level <= 30:
+            return 80, 2400, False   # Light: mild re-encoding
+        elif compression_level <= 50:
+            return 55, 1800, False   # Medium: noticeable reduction
+        elif compression_level <= 70:
+            return 35, 1400, False   # High: strong re-encoding + downscale
+        elif compression_level <= 85:
+            return 20, 1000, False   # Very High: aggressive re-encoding + downscale
+        else:  # 90-95%: Maximum compression
+            return 15, 800, True     # Maximum: converts pages to images
+
     def add_ca_branding(self):
         """Add CA Himanshu Majithiya branding to all pages"""
         if not self.main_window.current_file:
@@ -2530,55 +2530,35 @@ class PDFActions:
             return
 
         import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
 
         try:
             branding_text = "Prepared by CA Himanshu Majithiya"
             font_size = 10
             text_color = (0.3, 0.3, 0.3)  # Dark gray
+            text_width = fitz.get_text_length(branding_text, fontname="helv", fontsize=font_size)
 
             # Add branding to all pages
-            for page_num in range(len(pdf_doc)):
-                page = pdf_doc[page_num]
-                page_rect = page.rect
-
-                # Position at bottom right
-                text_width = fitz.get_text_length(branding_text, fontname="helv", fontsize=font_size)
-                x = page_rect.width - text_width - 30  # 30px from right
-                y = page_rect.height - 20  # 20px from bottom
-
-                # Insert text with professional styling
-                point = fitz.Point(x, y)
-                page.insert_text(
-                    point,
-                    branding_text,
-                    fontsize=font_size,
-                    fontname="helv",
-                    color=text_color
-                )
-
-            # Save the PDF
-            output_file, _ = QFileDialog.getSaveFileName(
-                self.main_window,
-                "Save Branded PDF As",
-                "",
-                "PDF Files (*.pdf)"
-            )
+            with self.session.edit(self._all_pages(), "CA Branding") as pdf_doc:
+                for page in pdf_doc:
+                    page_rect = page.rect
+
+                    # Position at bottom right
+                    x = page_rect.width - text_width - 30  # 30px from right
+                    y = page_rect.height - 20  # 20px from bottom
+
+                    # Insert text with professional styling
+                    point = fitz.Point(x, y)
+                    page.insert_text(
+                        point,
+                        branding_text,
+                        fontsize=font_size,
+                        fontname="helv",
+                        color=text_color
+                    )
 
-            if output_file:
-                pdf_doc.save(output_file)
-                pdf_doc.close()
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    f"CA branding added to all {len(pdf_doc)} pages successfully!"
-                )
-                self.main_window.load_pdf(output_file)
-            else:
-                pdf_doc.close()
+            self._document_edited(f"CA branding added to all {len(pdf_doc)} pages")
 
         except Exception as e:
-            pdf_doc.close()
             QMessageBox.critical(
                 self.main_window,
                 "Error",
@@ -2603,7 +2583,7 @@ class PDFActions:
             settings = dialog.get_settings()
 
             import fitz
-            pdf_doc = fitz.open(self.main_window.current_file)
+            pdf_doc = self.session.document
 
             try:
                 page_idx = settings['page'] - 1
@@ -2613,10 +2593,8 @@ class PDFActions:
                         "Invalid Page",
                         f"Page {settings['page']} does not exist"
                     )
-                    pdf_doc.close()
                     return
 
-                page = pdf_doc[page_idx]
                 rect = fitz.Rect(
                     settings['x'],
                     settings['y'],
@@ -2624,59 +2602,42 @@ class PDFActions:
                     settings['y'] + settings['height']
                 )
 
-                field_type = settings['type']
-                if field_type == "Text Field":
-                    self.pdf_forms.create_text_field(
-                        pdf_doc,
-                        page_idx,
-                        settings['name'],
-                        rect,
-                        settings['value']
-                    )
-                elif field_type == "Checkbox":
-                    self.pdf_forms.create_checkbox(
-                        pdf_doc,
-                        page_idx,
-                        settings['name'],
-                        rect,
-                        settings['value'] == 'True'
-                    )
-                elif field_type == "Radio Button":
-                    self.pdf_forms.create_radio_button(
-                        pdf_doc,
-                        page_idx,
-                        settings['name'],
-                        rect
-                    )
-                elif field_type == "Dropdown List":
-                    self.pdf_forms.create_dropdown(
-                        pdf_doc,
-                        page_idx,
-                        settings['name'],
-                        rect,
-                        settings.get('options', [])
-                    )
-
-                output_file, _ = QFileDialog.getSaveFileName(
-                    self.main_window,
-                    "Save PDF As",
-                    "",
-                    "PDF Files (*.pdf)"
-                )
+                with self.session.edit([page_idx], "Form Field"):
+                    field_type = settings['type']
+                    if field_type == "Text Field":
+                        self.pdf_forms.create_text_field(
+                            pdf_doc,
+                            page_idx,
+                            settings['name'],
+                            rect,
+                            settings['value']
+                        )
+                    elif field_type == "Checkbox":
+                        self.pdf_forms.create_checkbox(
+                            pdf_doc,
+                            page_idx,
+                            settings['name'],
+                            rect,
+                            settings['value'] == 'True'
+                        )
+                    elif field_type == "Radio Button":
+                        self.pdf_forms.create_radio_button(
+                            pdf_doc,
+                            page_idx,
+                            settings['name'],
+                            rect
+                        )
+                    elif field_type == "Dropdown List":
+                        self.pdf_forms.create_dropdown(
+                            pdf_doc,
+                            page_idx,
+                            settings['name'],
+                            rect,
+                            settings.get('options', [])
+                        )
 
-                if output_file:
-                    pdf_doc.save(output_file)
-                    pdf_doc.close()
-                    QMessageBox.information(
-                        self.main_window,
-                        "Success",
-                        f"Form field '{settings['name']}' created successfully"
-                    )
-                    self.main_window.load_pdf(output_file)
-                else:
-                    pdf_doc.close()
+                self._document_edited(f"Form field '{settings['name']}' created")
             except Exception as e:
-                pdf_doc.close()
                 QMessageBox.critical(
                     self.main_window,
                     "Error",
@@ -2695,8 +2656,8 @@ class PDFActions:
 
         import fitz
 
-        # Use the viewer's document to read current bookmarks
-        viewer_doc = self.main_window.pdf_viewer.pdf_document
+        # Bookmarks are read from and written to the open document
+        viewer_doc = self.session.document
         if not viewer_doc:
             QMessageBox.warning(self.main_window, "Error", "No PDF document loaded")
             return
@@ -2729,28 +2690,11 @@ class PDFActions:
                 toc.append([1, bookmark['title'], bookmark['page'] + 1])
 
             try:
-                # Set the TOC on the viewer's document
-                viewer_doc.set_toc(toc)
-
-                # Save directly to the current file using temp file approach
-                import tempfile, shutil, os
-                temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-                os.close(temp_fd)
-
-                viewer_doc.save(temp_path, garbage=4, deflate=True)
-                viewer_doc.close()
+                # The outline is not part of any page: nothing to re-render
+                with self.session.edit([], "Bookmarks"):
+                    viewer_doc.set_toc(toc)
 
-                current_file = self.main_window.current_file
-                shutil.move(temp_path, current_file)
-
-                # Reload the PDF
-                self.main_window.load_pdf(current_file)
-
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    f"Bookmarks updated successfully ({len(bookmarks)} bookmarks)"
-                )
+                self._document_edited(f"Bookmarks updated ({len(bookmarks)} bookmarks)")
             except Exception as e:
                 QMessageBox.critical(
                     self.main_window,
@@ -2768,8 +2712,7 @@ class PDFActions:
             )
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
+        pdf_doc = self.session.document
 
         # Get current metadata
         current_metadata = {
@@ -2787,28 +2730,10 @@ class PDFActions:
         if dialog.exec() == QDialog.DialogCode.Accepted:
             metadata = dialog.get_metadata()
 
-            pdf_doc.set_metadata(metadata)
+            with self.session.edit([], "Metadata"):
+                pdf_doc.set_metadata(metadata)
 
-            output_file, _ = QFileDialog.getSaveFileName(
-                self.main_window,
-                "Save PDF As",
-                "",
-                "PDF Files (*.pdf)"
-            )
-
-            if output_file:
-                pdf_doc.save(output_file)
-                pdf_doc.close()
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    "Metadata updated successfully"
-                )
-                self.main_window.load_pdf(output_file)
-            else:
-                pdf_doc.close()
-        else:
-            pdf_doc.close()
+            self._document_edited("Metadata updated")
 
     def extract_pages(self):
         """Extract pages to new PDF"""
@@ -2821,7 +2746,7 @@ class PDFActions:
             return
 
         import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
+        pdf_doc = self.session.document
         total_pages = len(pdf_doc)
 
         from src.ui.dialogs import ExtractPagesDialog
@@ -2838,8 +2763,6 @@ class PDFActions:
                     if 0 <= page_idx < total_pages:
                         new_pdf.insert_pdf(pdf_doc, from_page=page_idx, to_page=page_idx)
 
-                pdf_doc.close()
-
                 output_file = settings['output_file']
                 new_pdf.save(output_file)
                 new_pdf.close()
@@ -2852,14 +2775,11 @@ class PDFActions:
                 self.main_window.load_pdf(output_file)
 
             except Exception as e:
-                pdf_doc.close()
                 QMessageBox.critical(
                     self.main_window,
                     "Error",
                     f"Failed to extract pages: {str(e)}"
                 )
-        else:
-            pdf_doc.close()
 
     def add_comment(self):
         """Add comment/annotation to PDF by selecting area first"""
@@ -2975,55 +2895,34 @@ class PDFActions:
                                comment_type: str, author: str):
         """Save comment to the selected area in PDF"""
         import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
 
         try:
             # Get current page
             current_page_num = self.main_window.pdf_viewer.current_page
-            page = pdf_doc[current_page_num]
-
-            # Add annotation based on type
-            if comment_type == "Sticky Note":
-                # Add sticky note at the center-top of selected area
-                point = fitz.Point((x0 + x1) / 2, y0)
-                annot = page.add_text_annot(point, text)
-            else:
-                # Add freetext annotation in the selected rectangle
-                rect = fitz.Rect(x0, y0, x1, y1)
-                annot = page.add_freetext_annot(
-                    rect,
-                    text,
-                    fontsize=10
-                )
+            with self.session.edit([current_page_num], "Add Comment"):
+                page = self.session.page(current_page_num)
+
+                # Add annotation based on type
+                if comment_type == "Sticky Note":
+                    # Add sticky note at the center-top of selected area
+                    point = fitz.Point((x0 + x1) / 2, y0)
+                    annot = page.add_text_annot(point, text)
+                else:
+                    # Add freetext annotation in the selected rectangle
+                    rect = fitz.Rect(x0, y0, x1, y1)
+                    annot = page.add_freetext_annot(
+                        rect,
+                        text,
+                        fontsize=10
+                    )
 
-            # Set author
-            annot.set_info(title=author)
-            annot.update()
+                # Set author
+                annot.set_info(title=author)
+                annot.update()
 
-            # Save
-            output_file, _ = QFileDialog.getSaveFileName(
-                self.main_window,
-                "Save PDF As",
-                "",
-                "PDF Files (*.pdf)"
-            )
-
-            if output_file:
-                pdf_doc.save(output_file)
-                pdf_doc.close()
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    "Comment added successfully!"
-                )
-                self.main_window.load_pdf(output_file)
-                self.main_window.status_label.setText("Comment added successfully")
-            else:
-                pdf_doc.close()
-                self.main_window.status_label.setText("Save cancelled")
+            self._document_edited("Comment added")
 
         except Exception as e:
-            pdf_doc.close()
             QMessageBox.critical(
                 self.main_window,
                 "Error",
@@ -3040,14 +2939,12 @@ class PDFActions:
             )
             return
 
-        import fitz
-        pdf_doc = fitz.open(self.main_window.current_file)
+        pdf_doc = self.session.document
 
         # Get form fields
         form_fields = self.pdf_forms.get_form_fields(pdf_doc)
 
         if not form_fields:
-            pdf_doc.close()
             QMessageBox.information(
                 self.main_window,
                 "No Forms",
@@ -3061,30 +2958,11 @@ class PDFActions:
         if dialog.exec() == QDialog.DialogCode.Accepted:
             values = dialog.get_values()
 
-            # Fill each field
-            for field_name, value in values.items():
-                self.pdf_forms.fill_form_field(pdf_doc, field_name, value)
+            # Fill all fields in one pass; widgets can be on any page
+            with self.session.edit(self._all_pages(), "Fill Form"):
+                self.pdf_forms.import_form_data(pdf_doc, values)
 
-            output_file, _ = QFileDialog.getSaveFileName(
-                self.main_window,
-                "Save Filled Form As",
-                "",
-                "PDF Files (*.pdf)"
-            )
-
-            if output_file:
-                pdf_doc.save(output_file)
-                pdf_doc.close()
-                QMessageBox.information(
-                    self.main_window,
-                    "Success",
-                    "Form filled successfully"
-                )
-                self.main_window.load_pdf(output_file)
-            else:
-                pdf_doc.close()
-        else:
-            pdf_doc.close()
+            self._document_edited("Form filled")
 
     def batch_process(self):
         """Batch process multiple PDFs"""
@@ -3108,9 +2986,31 @@ class PDFActions:
             progress.setWindowModality(Qt.WindowModality.WindowModal)
 
             success_count = 0
+            sequential_files = files
             import fitz
 
-            for i, file_path in enumerate(files):
+            if operation == "Convert to PDF/A":
+                # Converted in parallel worker processes; results arrive as each file finishes
+                done = 0
+
+                def on_result(result):
+                    nonlocal done
+                    done += 1
+                    progress.setValue(done)
+                    progress.setLabelText(f"Converted: {Path(result.input_file).name}")
+
+                def cancelled():
+                    # Polled while files convert: keeps the window painting
+                    # and lets the Cancel click arrive
+                    QApplication.processEvents()
+                    return progress.wasCanceled()
+
+                success_count = len(self.pdf_creator.batch_convert_to_pdfa(
+                    files, output_dir, result_callback=on_result, cancelled=cancelled
+                ))
+                sequential_files = []
+
+            for i, file_path in enumerate(sequential_files):
                 if progress.wasCanceled():
                     break
 
@@ -3118,7 +3018,6 @@ class PDFActions:
                 progress.setLabelText(f"Processing: {Path(file_path).name}")
 
                 try:
-                    pdf_doc = fitz.open(file_path)
                     output_file = Path(output_dir) / Path(file_path).name
 
                     if operation == "Add Watermark":
@@ -3128,19 +3027,14 @@ class PDFActions:
                             "CONFIDENTIAL",
                             0.3
                         )
-                        pdf_doc.close()
                     elif operation == "Compress Files":
-                        pdf_doc.close()
                         self.pdf_utilities.compress_pdf(file_path, str(output_file), image_quality=50, max_image_size=1400)
-                    elif operation == "Convert to PDF/A":
-                        pdf_doc.close()
-                        self.pdf_creator.convert_to_pdfa(file_path, str(output_file))
                     elif operation == "Add Page Numbers":
-                        self.pdf_utilities.add_page_numbers(pdf_doc, "bottom_center")
-                        pdf_doc.save(str(output_file))
-                        pdf_doc.close()
+                        # The only operation that needs the file parsed here
+                        with fitz.open(file_path) as pdf_doc:
+                            self.pdf_utilities.add_page_numbers(pdf_doc, position="bottom_center")
+                            pdf_doc.save(str(output_file))
                     elif operation == "Merge All into One":
-                        pdf_doc.close()
                         # Handle merging separately
                         continue
 
@@ -3148,10 +3042,6 @@ class PDFActions:
 
                 except Exception as e:
                     self.logger.error(f"Error processing {file_path}: {e}")
-                    try:
-                        pdf_doc.close()
-                    except:
-                        pass
 
             progress.setValue(len(files))
 
@@ -3,17 +3,40 @@ PDF Viewer component for NexPro PDF
 """
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QScrollArea,
+    QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QStackedWidget,
     QLabel, QPushButton, QSlider, QComboBox, QToolBar, QTextEdit, QLineEdit,
     QMessageBox, QFileDialog, QDialog, QFormLayout, QCheckBox, QSpinBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPoint, QRect, QEvent
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPoint, QRect, QEvent, QThread, QEventLoop, QTimer
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QCursor, QMouseEvent, QFont, QKeyEvent
+from typing import Optional
 from src.utilities.logger import get_logger
 from src.ui.modern_theme import ModernTheme
+from src.ui.continuous_view import ContinuousPageView
+from src.ui.progressive_render import PageRenderWorker, RenderRequest, ZOOM_SETTLE_MS
+from src.pdf_engine.pdf_core import PDFCore, DEFAULT_MAX_PAGES_MEMORY, DEFAULT_MAX_DISPLAY_LISTS, xref_intact
+from src.pdf_engine.document_session import DocumentSession
+from src.pdf_engine.undo_journal import DEFAULT_UNDO_MEMORY_MB
 import fitz  # PyMuPDF
 
 
+# Zoom change per Ctrl+wheel notch
+WHEEL_ZOOM_FACTOR = 1.1
+
+
+class DocumentOpenWorker(QThread):
+    """Opens a document off the UI thread (xref repair of a large file can take a while)"""
+
+    def __init__(self, session: DocumentSession, file_path: str):
+        super().__init__()
+        self.session = session
+        self.file_path = file_path
+        self.success = False
+
+    def run(self):
+        self.success = self.session.open(self.file_path, large_file=True)
+
+
 class FindReplaceDialog(QDialog):
     """Simple Find & Replace dialog for PDF text editing"""
 
@@ -461,25 +484,27 @@ class FindReplaceDialog(QDialog):
 
             # Log if font size was adjusted
             if final_font_size != original_font_size:
-                self.logger.info(f"Font size adjusted from {original_font_size}pt to {final_font_size}pt to fit text")
+                self.logger.debug("Font size adjusted from %spt to %spt to fit text",
+                                  original_font_size, final_font_size)
 
-            # Redact the old text
-            page.add_redact_annot(rect, fill=(1, 1, 1))  # White fill
-            page.apply_redactions()
+            with self.pdf_viewer.session.edit([page_num], "Replace Text"):
+                # Redact the old text
+                page.add_redact_annot(rect, fill=(1, 1, 1))  # White fill
+                page.apply_redactions()
 
-            # Insert new text at the same position
-            # Calculate baseline position (approximately 85% down from top of rect)
-            baseline_y = rect.y0 + (final_font_size * 0.85)
-
-            page.insert_text(
-                (rect.x0, baseline_y),
-                new_text,
-                fontsize=final_font_size,
-                fontname=font_name,
-                color=(0, 0, 0)
-            )
+                # Insert new text at the same position
+                # Calculate baseline position (approximately 85% down from top of rect)
+                baseline_y = rect.y0 + (final_font_size * 0.85)
 
-            self.logger.info(f"Replaced '{old_text}' with '{new_text}' at page {page_num + 1}")
+                page.insert_text(
+                    (rect.x0, baseline_y),
+                    new_text,
+                    fontsize=final_font_size,
+                    fontname=font_name,
+                    color=(0, 0, 0)
+                )
+
+            self.logger.debug("Replaced '%s' with '%s' at page %d", old_text, new_text, page_num + 1)
 
             # Re-render the page to show the change
             self.pdf_viewer.render_current_page()
@@ -956,29 +981,79 @@ class PDFViewer(QWidget):
         super().__init__(parent)
         self.logger = get_logger()
         self.main_window = parent  # Reference to main window
-        self.pdf_document = None
+        config = getattr(parent, 'config', None)
+        max_pages = config.get('performance.max_pages_memory', DEFAULT_MAX_PAGES_MEMORY) \
+            if config else DEFAULT_MAX_PAGES_MEMORY
+        undo_memory = config.get('performance.undo_memory_mb', DEFAULT_UNDO_MEMORY_MB) \
+            if config else DEFAULT_UNDO_MEMORY_MB
+        max_display_lists = config.get('performance.max_display_lists', DEFAULT_MAX_DISPLAY_LISTS) \
+            if config else DEFAULT_MAX_DISPLAY_LISTS
+        self.session = DocumentSession(max_pages_memory=max_pages, undo_memory_mb=undo_memory,
+                                       max_display_lists=max_display_lists)
+        self.pdf_core = self.session.core
+        self.session.add_listener(self._on_document_changed)
+        # Rendered pages, shared with the other tabs (None = no caching)
+        self.pixmap_cache = getattr(parent, 'pixmap_cache', None)
+        self.is_active = True
         self.current_page = 0
         self.zoom_level = 1.0
         self.total_pages = 0
         self.edit_mode_active = False
         self.text_box = None
-        self.view_mode = "single"  # "single" or "continuous"
+        self.view_mode = "single"  # "single", "continuous" or "two_page"
         self.page_rotation = 0  # 0, 90, 180, 270 degrees
 
+        # Progressive zoom: the shown pixmap is scaled at once, a sharp
+        # render follows from the worker when zooming pauses
+        self._displayed_page = None  # (page, rotation) of the pixmap on pdf_label
+        self._sharp_pixmap: Optional[QPixmap] = None  # Last full-quality render shown
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(ZOOM_SETTLE_MS)
+        self._zoom_timer.timeout.connect(self._render_sharp)
+        self.zoom_renderer = PageRenderWorker()
+        self.zoom_renderer.rendered.connect(self._on_sharp_render)
+        from PyQt6.QtWidgets import QApplication
+        if QApplication.instance() is not None:
+            QApplication.instance().aboutToQuit.connect(self.zoom_renderer.stop)
+
         # Edit text mode (Adobe-like)
         self.edit_text_mode = False
         self.text_blocks = []  # List of text blocks with bounding boxes
         self.selected_text_block = None  # Currently selected text block
         self.text_edit_box = None  # Editable text box for editing
-        self.pending_edits = []  # List of pending edits to apply when saving
-        self.temp_pdf_document = None  # Temporary PDF with live edits
-        self.original_pdf_path = None  # Path to original PDF for reset
+        self.pending_edits = []  # Edits made since edit text mode was entered
+        self._edit_start_state = None  # Session state to undo back to on discard
 
         # Enable keyboard focus for shortcuts
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
 
         self._setup_ui()
 
+    @property
+    def pdf_document(self):
+        """Open fitz.Document (owned by the session)"""
+        return self.session.document
+
+    def _on_document_changed(self, revision: int, pages):
+        """Re-render after a session change, if it affects the shown page"""
+        if self.pixmap_cache is not None:
+            self.pixmap_cache.discard(self, pages)
+        if pages is None:
+            self.total_pages = self.session.document.page_count if self.session.document else 0
+            self.current_page = max(0, min(self.current_page, self.total_pages - 1))
+        if self.view_mode != "single":
+            if self.pdf_document and self.is_active:
+                self.page_view.pages_changed(pages)
+                self._update_page_info()
+            return
+        if pages is not None and self.current_page not in pages:
+            return
+        if self.pdf_document:
+            self.render_current_page()
+            if self.edit_text_mode:
+                self._extract_text_blocks()
+
     def _setup_ui(self):
         """Setup PDF viewer UI"""
         layout = QVBoxLayout(self)
@@ -1017,7 +1092,18 @@ class PDFViewer(QWidget):
         self.pdf_label.area_selected.connect(self._on_area_selected)
 
         self.scroll_area.setWidget(self.pdf_label)
-        layout.addWidget(self.scroll_area)
+
+        # Continuous and two-page modes: virtualized page list
+        self.page_view = ContinuousPageView(self)
+        self.page_view.current_page_changed.connect(self._on_page_scrolled_in)
+
+        self.scroll_area.viewport().installEventFilter(self)
+        self.page_view.viewport().installEventFilter(self)
+
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.scroll_area)
+        self.view_stack.addWidget(self.page_view)
+        layout.addWidget(self.view_stack)
 
         # Create floating text box (hidden by default)
         # Parent is pdf_label so it positions correctly relative to click position
@@ -1213,7 +1299,7 @@ class PDFViewer(QWidget):
 
         # View mode selector
         self.view_mode_combo = QComboBox()
-        self.view_mode_combo.addItems(["Single Page", "Continuous"])
+        self.view_mode_combo.addItems(["Single Page", "Continuous", "Two Pages"])
         self.view_mode_combo.setCurrentText("Single Page")
         self.view_mode_combo.currentTextChanged.connect(self.on_view_mode_changed)
         self.view_mode_combo.setStyleSheet(f"""
@@ -1239,7 +1325,16 @@ class PDFViewer(QWidget):
             self.logger.info(f"Loading PDF: {file_path}")
 
             # Open PDF with PyMuPDF
-            self.pdf_document = fitz.open(file_path)
+            self._cancel_zoom_render()
+            self._drop_cached_pages()
+            if self.pdf_document:
+                self.session.close()
+            if PDFCore.is_large_file(file_path) and not xref_intact(file_path):
+                opened = self._open_with_repair(file_path)
+            else:
+                opened = self.session.open(file_path)
+            if not opened:
+                raise Exception("The file could not be opened as a PDF")
 
             # Check if PDF is password protected
             if self.pdf_document.needs_pass:
@@ -1259,8 +1354,7 @@ class PDFViewer(QWidget):
 
                     if not ok:
                         # User cancelled
-                        self.pdf_document.close()
-                        self.pdf_document = None
+                        self.session.close()
                         raise Exception("Password entry cancelled by user")
 
                     if self.pdf_document.authenticate(password):
@@ -1278,8 +1372,7 @@ class PDFViewer(QWidget):
                             )
 
                 if not authenticated:
-                    self.pdf_document.close()
-                    self.pdf_document = None
+                    self.session.close()
                     raise Exception("Failed to authenticate PDF after 3 attempts")
 
             self.total_pages = len(self.pdf_document)
@@ -1299,52 +1392,173 @@ class PDFViewer(QWidget):
             self.pdf_label.setText(f"Error loading PDF:\n{str(e)}")
             raise
 
+    def _open_with_repair(self, file_path: str) -> bool:
+        """Open a large file with a damaged xref, keeping the UI responsive during repair"""
+        from PyQt6.QtWidgets import QProgressDialog
+        progress = QProgressDialog("Repairing damaged PDF structure...", None, 0, 0, self)
+        progress.setWindowTitle("Opening Large PDF")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.show()
+
+        worker = DocumentOpenWorker(self.session, file_path)
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        worker.start()
+        loop.exec()
+        worker.wait()
+        progress.close()
+        return worker.success
+
     def render_current_page(self):
         """Render current page to display"""
         if not self.pdf_document:
             return
 
-        try:
-            # Get current page
-            page = self.pdf_document[self.current_page]
+        if self.view_mode != "single":
+            self.page_view.show_page(self.current_page, self.zoom_level, self.page_rotation,
+                                     2 if self.view_mode == "two_page" else 1)
+            self.pdf_label.zoom_level = self.zoom_level
+            self._update_page_info()
+            self.page_changed.emit(self.current_page + 1)
+            return
 
+        self._zoom_timer.stop()
+        pixmap = self.page_pixmap(self.current_page)
+        if pixmap is None:
+            self.pdf_label.setText(f"Error rendering page {self.current_page + 1}, see the log for details")
+        else:
+            self._show_page_pixmap(pixmap)
+
+    def cached_page_pixmap(self, page_num: int) -> Optional[QPixmap]:
+        """Page rendered at the current zoom and rotation, if it is in the cache"""
+        if self.pixmap_cache is None:
+            return None
+        return self.pixmap_cache.get(self, (page_num, round(self.zoom_level, 4), self.page_rotation))
+
+    def page_pixmap(self, page_num: int) -> Optional[QPixmap]:
+        """
+        Page rendered at the current zoom and rotation, from the cache if possible
+
+        Returns:
+            QPixmap, or None if the page could not be rendered
+        """
+        pixmap = self.cached_page_pixmap(page_num)
+        if pixmap is not None:
+            return pixmap
+        try:
             # Calculate zoom matrix with rotation
             zoom_matrix = fitz.Matrix(self.zoom_level, self.zoom_level)
             if self.page_rotation != 0:
                 zoom_matrix = zoom_matrix.prerotate(self.page_rotation)
 
-            # Render page to pixmap
-            pix = page.get_pixmap(matrix=zoom_matrix, alpha=False)
+            # Render page to pixmap (from its cached display list)
+            pix = self.pdf_core.render_page(page_num, zoom_matrix)
 
             # Convert to QImage
             img_format = QImage.Format.Format_RGB888
             qimage = QImage(pix.samples, pix.width, pix.height,
                           pix.stride, img_format)
 
-            # Display in label
             pixmap = QPixmap.fromImage(qimage)
-            self.pdf_label.setPixmap(pixmap)
-            self.pdf_label.setFixedSize(pixmap.size())
-
-            # Remove padding/styling when displaying PDF
-            self.pdf_label.setStyleSheet("QLabel { padding: 0px; margin: 0px; border: none; }")
+            if self.pixmap_cache is not None:
+                self.pixmap_cache.put(self, (page_num, round(self.zoom_level, 4), self.page_rotation), pixmap)
+            return pixmap
 
-            # Update page info
-            self.page_info.setText(f"Page: {self.current_page + 1} / {self.total_pages}")
-
-            # Update navigation buttons
-            self.prev_btn.setEnabled(self.current_page > 0)
-            self.next_btn.setEnabled(self.current_page < self.total_pages - 1)
-
-            # Update zoom level in interactive label
-            self.pdf_label.zoom_level = self.zoom_level
+        except Exception as e:
+            self.logger.error(f"Error rendering page {page_num + 1}: {e}")
+            return None
+
+    def _show_page_pixmap(self, pixmap: QPixmap, sharp: bool = True):
+        """
+        Display a rendered current page
+
+        Args:
+            pixmap: The page at the current zoom level
+            sharp: False for a scaled preview waiting for its sharp render
+        """
+        self._displayed_page = (self.current_page, self.page_rotation)
+        if sharp:
+            self._sharp_pixmap = pixmap
+        self.pdf_label.setPixmap(pixmap)
+        self.pdf_label.setFixedSize(pixmap.size())
 
-            # Emit signal
-            self.page_changed.emit(self.current_page + 1)
+        # Remove padding/styling when displaying PDF
+        self.pdf_label.setStyleSheet("QLabel { padding: 0px; margin: 0px; border: none; }")
+
+        self._update_page_info()
+
+        # Update zoom level in interactive label
+        self.pdf_label.zoom_level = self.zoom_level
+
+        # Emit signal
+        self.page_changed.emit(self.current_page + 1)
+
+    def _update_page_info(self):
+        """Page number and navigation buttons for the current page"""
+        self.page_info.setText(f"Page: {self.current_page + 1} / {self.total_pages}")
+        self.prev_btn.setEnabled(self.current_page > 0)
+        self.next_btn.setEnabled(self.current_page < self.total_pages - 1)
+
+    def _on_page_scrolled_in(self, page_num: int):
+        """Continuous modes: another page reached the top of the viewport"""
+        self.current_page = page_num
+        self._update_page_info()
+        self.page_changed.emit(page_num + 1)
+
+    def _viewport_size(self):
+        """Size of the area pages are shown in, for the current view mode"""
+        if self.view_mode == "single":
+            return self.scroll_area.viewport().size()
+        return self.page_view.viewport().size()
+
+    def _columns(self) -> int:
+        return 2 if self.view_mode == "two_page" else 1
+
+    def show_opened_document(self, file_path: str, document, first_page: Optional[QImage] = None,
+                             zoom: float = 1.0):
+        """
+        Show a document opened by the startup loader
+
+        The pre-rendered first page is displayed right away; it is rendered
+        again at the fit-width zoom if the viewport turns out to be a
+        different width.
+
+        Args:
+            file_path: Path the document was opened from
+            document: Open fitz.Document (the session takes ownership)
+            first_page: Page 1 rendered at zoom, or None to render it here
+            zoom: Zoom first_page was rendered at
+        """
+        self.logger.info(f"Loading PDF: {file_path} (opened in the background)")
+        self._cancel_zoom_render()
+        self._drop_cached_pages()
+        self.session.attach(document, file_path)
+        self.total_pages = document.page_count
+        self.current_page = 0
+        self.page_rotation = 0
+        self.prev_btn.setEnabled(True)
+        self.next_btn.setEnabled(True)
 
-        except Exception as e:
-            self.logger.error(f"Error rendering page: {e}")
-            self.pdf_label.setText(f"Error rendering page: {str(e)}")
+        if first_page is None:
+            self.fit_width()
+        else:
+            self.zoom_level = zoom
+            pixmap = QPixmap.fromImage(first_page)
+            if self.pixmap_cache is not None:
+                self.pixmap_cache.put(self, (0, round(zoom, 4), 0), pixmap)
+            self._show_page_pixmap(pixmap)
+            QTimer.singleShot(0, self._refit_first_page)
+        self.logger.info(f"PDF loaded successfully: {self.total_pages} pages")
+
+    def _refit_first_page(self):
+        """Fit the width once the window has its final size, unless the startup render already fits"""
+        if not self.pdf_document or not self.is_active:
+            return
+        page_rect = self.pdf_core.get_page_rect(self.current_page)
+        zoom = (self._viewport_size().width() / (page_rect.width * self._columns())) * 0.95
+        if abs(zoom - self.zoom_level) > 0.02 * self.zoom_level:
+            self.fit_width()
 
     def previous_page(self):
         """Go to previous page"""
@@ -1368,14 +1582,14 @@ class PDFViewer(QWidget):
         """Zoom in"""
         self.zoom_level = min(self.zoom_level + 0.25, 4.0)
         self._update_zoom_combo()
-        self.render_current_page()
+        self._show_zoom()
         self.zoom_changed.emit(self.zoom_level)
 
     def zoom_out(self):
         """Zoom out"""
         self.zoom_level = max(self.zoom_level - 0.25, 0.25)
         self._update_zoom_combo()
-        self.render_current_page()
+        self._show_zoom()
         self.zoom_changed.emit(self.zoom_level)
 
     def on_zoom_changed(self, zoom_text: str):
@@ -1389,7 +1603,7 @@ class PDFViewer(QWidget):
                 # Extract percentage
                 zoom_percent = int(zoom_text.rstrip('%'))
                 self.zoom_level = zoom_percent / 100.0
-                self.render_current_page()
+                self._show_zoom()
                 self.zoom_changed.emit(self.zoom_level)
             except ValueError:
                 pass
@@ -1399,42 +1613,40 @@ class PDFViewer(QWidget):
         if not self.pdf_document:
             return
 
-        page = self.pdf_document[self.current_page]
-        page_rect = page.rect
+        page_rect = self.pdf_core.get_page_rect(self.current_page)
 
         # Get viewport dimensions
-        viewport_width = self.scroll_area.viewport().width()
-        viewport_height = self.scroll_area.viewport().height()
+        viewport_width = self._viewport_size().width()
+        viewport_height = self._viewport_size().height()
 
         # Calculate zoom ratios for width and height
-        zoom_w = viewport_width / page_rect.width
+        zoom_w = viewport_width / (page_rect.width * self._columns())
         zoom_h = viewport_height / page_rect.height
 
         # Use the smaller zoom to ensure entire page fits
         # Apply 0.98 multiplier to account for potential scrollbar
         self.zoom_level = min(zoom_w, zoom_h) * 0.98
         self._update_zoom_combo()
-        self.render_current_page()
+        self._show_zoom()
 
     def fit_width(self):
         """Fit page width in view"""
         if not self.pdf_document:
             return
 
-        page = self.pdf_document[self.current_page]
-        page_rect = page.rect
+        page_rect = self.pdf_core.get_page_rect(self.current_page)
 
         # Get the viewport width
-        viewport_width = self.scroll_area.viewport().width()
+        viewport_width = self._viewport_size().width()
 
         # According to PyMuPDF best practices:
         # zoom = viewport_width / page_width
         # Apply 0.95 multiplier to ensure content doesn't get cut off
         # (accounts for vertical scrollbar and any padding/margins)
-        self.zoom_level = (viewport_width / page_rect.width) * 0.95
+        self.zoom_level = (viewport_width / (page_rect.width * self._columns())) * 0.95
 
         self._update_zoom_combo()
-        self.render_current_page()
+        self._show_zoom()
 
     def _update_zoom_combo(self):
         """Update zoom combo box text"""
@@ -1445,6 +1657,86 @@ class PDFViewer(QWidget):
             self.zoom_combo.setCurrentText(zoom_text)
         # Otherwise leave it showing the last valid selection
 
+    def _set_zoom(self, zoom: float):
+        """Zoom to a level between 25% and 400%"""
+        self.zoom_level = max(0.25, min(zoom, 4.0))
+        self._update_zoom_combo()
+        self._show_zoom()
+        self.zoom_changed.emit(self.zoom_level)
+
+    def _show_zoom(self):
+        """
+        Show the current page at a new zoom level without waiting for a render
+
+        A cached render is shown directly. Otherwise the last sharp pixmap
+        of the page is scaled to the new size at once, and the sharp
+        render is requested once no further zoom step has come for
+        ZOOM_SETTLE_MS; a later step supersedes it.
+        """
+        if self.view_mode != "single" or not self.pdf_document:
+            self.render_current_page()
+            return
+        if (self.cached_page_pixmap(self.current_page) is not None or self._sharp_pixmap is None
+                or self._displayed_page != (self.current_page, self.page_rotation)):
+            self.render_current_page()
+            return
+        page_rect = self.pdf_core.get_page_rect(self.current_page)
+        width, height = page_rect.width, page_rect.height
+        if self.page_rotation % 180 == 90:
+            width, height = height, width
+        preview = self._sharp_pixmap.scaled(
+            QSize(max(1, int(width * self.zoom_level)), max(1, int(height * self.zoom_level))),
+            Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation)
+        self._show_page_pixmap(preview, sharp=False)
+        self._zoom_timer.start()
+
+    def _render_sharp(self):
+        """Zooming paused: render the current page at the current zoom in the background"""
+        if self.view_mode != "single" or not self.pdf_document:
+            return
+        if self.cached_page_pixmap(self.current_page) is not None:
+            self.render_current_page()
+            return
+        try:
+            page_num, revision = self.current_page, self.session.revision
+            display_list = self.pdf_core.get_display_list(page_num)
+            matrix = fitz.Matrix(self.zoom_level, self.zoom_level)
+            if self.page_rotation != 0:
+                matrix = matrix.prerotate(self.page_rotation)
+            self.zoom_renderer.request(RenderRequest(
+                key=(page_num, round(self.zoom_level, 4), self.page_rotation),
+                revision=revision, display_list=display_list, matrix=matrix))
+        except Exception as e:
+            self.logger.error(f"Error preparing zoom render: {e}")
+            self.render_current_page()
+
+    def _on_sharp_render(self, request: RenderRequest, image: QImage):
+        """Swap in a finished background render, unless the view has moved on"""
+        key = (self.current_page, round(self.zoom_level, 4), self.page_rotation)
+        if request.key != key or request.revision != self.session.revision or not self.pdf_document:
+            return
+        pixmap = QPixmap.fromImage(image)
+        if self.pixmap_cache is not None:
+            self.pixmap_cache.put(self, key, pixmap)
+        if self.view_mode == "single":
+            self._show_page_pixmap(pixmap)
+
+    def _cancel_zoom_render(self):
+        """Forget pending zoom renders and the displayed page (document replaced or closed)"""
+        self._zoom_timer.stop()
+        self.zoom_renderer.cancel()
+        self._displayed_page = None
+        self._sharp_pixmap = None
+
+    def eventFilter(self, obj, event):
+        """Ctrl+wheel zooms around the current page"""
+        if event.type() == QEvent.Type.Wheel and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            steps = event.angleDelta().y() / 120
+            if steps and self.pdf_document:
+                self._set_zoom(self.zoom_level * WHEEL_ZOOM_FACTOR ** steps)
+            return True
+        return super().eventFilter(obj, event)
+
     def rotate_cw(self):
         """Rotate page clockwise (90 degrees)"""
         self.page_rotation = (self.page_rotation + 90) % 360
@@ -1459,20 +1751,60 @@ class PDFViewer(QWidget):
 
     def on_view_mode_changed(self, mode_text: str):
         """Handle view mode change"""
-        if mode_text == "Single Page":
-            self.view_mode = "single"
-        elif mode_text == "Continuous":
-            self.view_mode = "continuous"
+        modes = {"Single Page": "single", "Continuous": "continuous", "Two Pages": "two_page"}
+        was_single = self.view_mode == "single"
+        self.view_mode = modes.get(mode_text, self.view_mode)
 
         self.logger.info(f"View mode changed to: {self.view_mode}")
+        if self.view_mode == "single":
+            self.page_view.clear()
+            self.view_stack.setCurrentWidget(self.scroll_area)
+        else:
+            self.view_stack.setCurrentWidget(self.page_view)
+            if was_single:
+                # The page list shows the pages; free the single page's pixmap
+                self._cancel_zoom_render()
+                self.pdf_label.setPixmap(QPixmap())
         if self.pdf_document:
             self.render_current_page()
 
+    def _use_single_page(self):
+        """Interactive tools (editing, redaction, area selection) work on the single page view"""
+        if self.view_mode != "single":
+            self.view_mode_combo.setCurrentText("Single Page")
+
+    def set_active(self, active: bool):
+        """
+        Tab brought to the front or moved to the background
+
+        A background tab lets go of its displayed pixmap and loaded pages;
+        only the shared cache keeps its rendered pages, and evicts them
+        before those of the active tab.
+        """
+        if active == self.is_active:
+            return
+        self.is_active = active
+        if active:
+            if self.pdf_document:
+                self.render_current_page()
+        elif self.pdf_document:
+            self._cancel_zoom_render()
+            self.pdf_label.setPixmap(QPixmap())
+            self.page_view.clear()
+            self.pdf_core.page_cache.clear()
+
+    def _drop_cached_pages(self):
+        """Forget this tab's rendered pages"""
+        if self.pixmap_cache is not None:
+            self.pixmap_cache.discard(self)
+
     def close_pdf(self):
         """Close current PDF"""
+        self._cancel_zoom_render()
+        self._drop_cached_pages()
+        self.page_view.clear()
         if self.pdf_document:
-            self.pdf_document.close()
-            self.pdf_document = None
+            self.session.close()
             self.current_page = 0
             self.total_pages = 0
             self.page_rotation = 0  # Reset rotation
@@ -1493,6 +1825,7 @@ class PDFViewer(QWidget):
 
     def enable_edit_mode(self, mode_type: str = 'text', font_size: int = 12, text_width: int = 300):
         """Enable interactive edit mode"""
+        self._use_single_page()
         self.edit_mode_active = True
         self.edit_mode_type = mode_type
         self.edit_font_size = font_size
@@ -1512,6 +1845,7 @@ class PDFViewer(QWidget):
         """Enable redaction mode for drawing redaction rectangles"""
         if not self.pdf_document:
             return False
+        self._use_single_page()
         self.pdf_label.set_redaction_mode(True)
         self.logger.info("Redaction mode enabled - Draw rectangles to mark areas for redaction")
         return True
@@ -1533,6 +1867,7 @@ class PDFViewer(QWidget):
         """Enable area selection mode for placing text/image/comment"""
         if not self.pdf_document:
             return False
+        self._use_single_page()
         self.pdf_label.set_selection_mode(True, mode_type)
         self.logger.info(f"Selection mode enabled ({mode_type}) - Draw rectangle to select area")
         return True
@@ -1565,19 +1900,20 @@ class PDFViewer(QWidget):
             return False, "No redaction areas marked"
 
         try:
-            page = self.pdf_document[self.current_page]
+            # The session re-renders the page once the edit is recorded
+            with self.session.edit([self.current_page], "Apply Redactions"):
+                page = self.session.page(self.current_page)
 
-            # Add redaction annotations for each rectangle
-            for rect_tuple in redaction_rects:
-                rect = fitz.Rect(rect_tuple)
-                page.add_redact_annot(rect, fill=(0, 0, 0))  # Black fill for redaction
+                # Add redaction annotations for each rectangle
+                for rect_tuple in redaction_rects:
+                    rect = fitz.Rect(rect_tuple)
+                    page.add_redact_annot(rect, fill=(0, 0, 0))  # Black fill for redaction
 
-            # Apply all redactions
-            page.apply_redactions()
+                # Apply all redactions
+                page.apply_redactions()
 
-            # Clear the rectangles and re-render
-            self.clear_redaction_rects()
-            self.render_current_page()
+                # Clear the rectangles
+                self.clear_redaction_rects()
 
             self.logger.info(f"Applied {len(redaction_rects)} redactions to page {self.current_page + 1}")
             return True, f"Applied {len(redaction_rects)} redactions"
@@ -1648,14 +1984,14 @@ class PDFViewer(QWidget):
         """Enable Adobe-like edit text mode"""
         if not self.pdf_document:
             return
+        self._use_single_page()
 
         self.edit_text_mode = True
         self.pdf_label.set_edit_text_mode(True)
 
-        # Store original PDF path and create working copy
-        self.original_pdf_path = self.main_window.current_file
-        # Create a fresh copy of the PDF for editing
-        self.temp_pdf_document = fitz.open(self.original_pdf_path)
+        # Edits go straight into the session document; discarding them
+        # undoes back to this state instead of re-opening the file
+        self._edit_start_state = self.session.state
 
         # Extract text blocks from current page
         self._extract_text_blocks()
@@ -1684,19 +2020,16 @@ class PDFViewer(QWidget):
         self.pdf_label.set_edit_text_mode(False)
         self.text_blocks = []
         self.selected_text_block = None
-        self.pending_edits = []  # Clear pending edits
-
-        # Close temp document if exists
-        if self.temp_pdf_document:
-            self.temp_pdf_document.close()
-            self.temp_pdf_document = None
 
-        # Reload original PDF if we discarded changes
-        if self.original_pdf_path and not force:
-            # Reload to discard unsaved changes
-            self.main_window.load_pdf(self.original_pdf_path)
+        # Undo the discarded edits (only the pages they touched change)
+        if self.pending_edits and not force:
+            while self.session.state != self._edit_start_state and self.session.undo():
+                pass
+            if self.session.state != self._edit_start_state:
+                self._discard_edits_from_disk()
 
-        self.original_pdf_path = None
+        self.pending_edits = []
+        self._edit_start_state = None
 
         # Close any open text editor
         if self.text_edit_box:
@@ -1710,12 +2043,34 @@ class PDFViewer(QWidget):
         self.main_window.status_label.setText("Edit mode exited")
         self.logger.info("Edit text mode disabled")
 
+    def _discard_edits_from_disk(self):
+        """
+        Edits that could not be undone: the undo history was trimmed to
+        undo_memory_mb or cleared, so offer to reload the file instead
+        """
+        reply = QMessageBox.warning(
+            self.main_window,
+            "Discard Edits",
+            "Some of the discarded edits could not be undone because the undo "
+            "history ran out of memory, so they are still in the document.\n\n"
+            "Reload the file from disk to remove them? Other unsaved changes "
+            "are lost as well.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            self.logger.warning("Discarded text edits kept in the document (undo history exhausted)")
+            return
+        if not self.session.reload():
+            QMessageBox.critical(self.main_window, "Error",
+                                 "The file could not be reloaded; the edits are still in the document.")
+
     def _extract_text_blocks(self):
         """Extract text blocks from current page with bounding boxes"""
         if not self.pdf_document:
             return
 
-        page = self.pdf_document[self.current_page]
+        page = self.session.page(self.current_page)
 
         # Get text with detailed structure
         text_dict = page.get_text("dict")
@@ -1882,31 +2237,23 @@ class PDFViewer(QWidget):
             self.pending_edits.append(edit)
             self.logger.info(f"Edit added. Total pending edits: {len(self.pending_edits)}")
 
-        # Apply edit to temp document immediately for live preview
-        self._apply_single_edit_to_temp(edit)
-
         # Hide editor
         self.text_edit_box.hide()
         if hasattr(self, 'edit_instructions'):
             self.edit_instructions.hide()
 
-        # Re-render the page to show the change immediately
-        self._render_from_temp_document()
+        # Apply the edit to the document; the session re-renders the page
+        # and re-extracts its text blocks
+        with self.session.edit([edit['page']], "Edit text"):
+            self._apply_single_edit(self.session.page(edit['page']), edit)
 
         # Update status bar
         self.main_window.status_label.setText(
             f"Edit applied ({len(self.pending_edits)} changes). Click more text to edit, or Ctrl+Shift+S to save PDF."
         )
 
-        # Re-extract text blocks from the modified document
-        self._extract_text_blocks_from_temp()
-
-    def _apply_single_edit_to_temp(self, edit):
+    def _apply_single_edit(self, page, edit):
         """Apply a single edit using text search and replace for better formatting preservation"""
-        if not self.temp_pdf_document:
-            return
-
-        page = self.temp_pdf_document[edit['page']]
         old_text = edit['old_text']
         new_text = edit['new_text']
         font_info = edit.get('font_info', {})
@@ -2021,72 +2368,8 @@ class PDFViewer(QWidget):
                     fontname=font_name,
                     color=(0, 0, 0)
                 )
-                self.logger.info(f"Replaced line: '{old_line[:20]}...' -> '{new_line[:20]}...'")
-            self.logger.info(f"Inserted text at ({rect.x0}, {baseline_y})")
-
-    def _render_from_temp_document(self):
-        """Render the current page from the temporary edited document"""
-        if not self.temp_pdf_document:
-            return
-
-        page = self.temp_pdf_document[self.current_page]
-
-        # Apply rotation
-        rotation_matrix = fitz.Matrix(1, 1).prerotate(self.page_rotation)
-        zoom_matrix = fitz.Matrix(self.zoom_level, self.zoom_level)
-        matrix = zoom_matrix * rotation_matrix
-
-        # Render page
-        pix = page.get_pixmap(matrix=matrix)
-
-        # Convert to QImage
-        img = QImage(pix.samples, pix.width, pix.height,
-                     pix.stride, QImage.Format.Format_RGB888)
-
-        # Update display
-        pixmap = QPixmap.fromImage(img)
-        self.pdf_label.setPixmap(pixmap)
-        self.pdf_label.setFixedSize(pixmap.size())
-
-        self.logger.info(f"Rendered page {self.current_page + 1} from temp document")
-
-    def _extract_text_blocks_from_temp(self):
-        """Extract text blocks from the temporary edited document"""
-        if not self.temp_pdf_document:
-            return
-
-        page = self.temp_pdf_document[self.current_page]
-        text_dict = page.get_text("dict")
-
-        self.text_blocks = []
-
-        for block in text_dict["blocks"]:
-            if block["type"] == 0:  # Text block
-                bbox = block["bbox"]
-                text_lines = []
-                font_info = {}
-
-                for line in block.get("lines", []):
-                    line_text = ""
-                    for span in line.get("spans", []):
-                        line_text += span.get("text", "")
-                        if not font_info:
-                            font_info = {
-                                "font": span.get("font", "helv"),
-                                "size": span.get("size", 12),
-                                "color": span.get("color", 0)
-                            }
-                    text_lines.append(line_text)
-
-                self.text_blocks.append({
-                    "bbox": bbox,
-                    "text": "\n".join(text_lines),
-                    "font_info": font_info,
-                    "block_data": block
-                })
-
-        self.pdf_label.set_text_blocks(self.text_blocks, self.zoom_level)
-        self.logger.info(f"Extracted {len(self.text_blocks)} text blocks from temp document")
+                self.logger.debug("Replaced line: '%.20s...' -> '%.20s...'", old_line, new_line)
+            self.logger.debug("Inserted text at (%s, %s)", rect.x0, baseline_y)
 
     def show_find_replace_dialog(self):
         """Show the Find & Replace dialog for simple text editing"""
@@ -2109,10 +2392,10 @@ class PDFViewer(QWidget):
         self.logger.info("Find & Replace dialog opened")
 
     def save_all_edits(self):
-        """Save the edited PDF (edits are already applied to temp document)"""
+        """Save the edited PDF (edits are already applied to the document)"""
         import os
 
-        if not self.pending_edits or not self.temp_pdf_document:
+        if not self.pending_edits:
             QMessageBox.information(
                 self.main_window,
                 "No Edits",
@@ -2124,7 +2407,7 @@ class PDFViewer(QWidget):
 
         try:
             # Generate default output filename
-            base_name = os.path.splitext(self.original_pdf_path)[0]
+            base_name = os.path.splitext(self.main_window.current_file)[0]
             default_output = f"{base_name}_edited.pdf"
 
             # Show save dialog
@@ -2138,20 +2421,13 @@ class PDFViewer(QWidget):
 
             if output_file:
                 self.logger.info(f"Saving to: {output_file}")
-                # Save the temp document which already has all edits applied
-                self.temp_pdf_document.save(output_file, garbage=4, deflate=True, clean=True)
-
-                # Close temp document
-                self.temp_pdf_document.close()
-                self.temp_pdf_document = None
+                if not self.session.save(output_file):
+                    raise IOError(f"Could not write {output_file}")
+                self.main_window.set_current_file(output_file)
 
                 # Clear pending edits
                 self.pending_edits = []
 
-                # Reload the saved PDF
-                self.logger.info("Reloading PDF")
-                self.main_window.load_pdf(output_file)
-
                 QMessageBox.information(
                     self.main_window,
                     "Success",
@@ -0,0 +1,119 @@
+"""
+Progressive Render - sharp page renders for a new zoom level, off the UI thread
+"""
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Optional, Tuple
+import fitz  # PyMuPDF
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+from src.utilities.logger import get_logger
+
+
+# Quiet time after the last zoom step before the sharp render starts
+ZOOM_SETTLE_MS = 120
+
+# Device pixels rasterized per step (a band of full-width rows); the UI
+# thread runs and a newer request is picked up between steps
+BAND_PIXELS = 150_000
+
+
+@dataclass
+class RenderRequest:
+    """A page to rasterize from its display list"""
+    key: Tuple[int, float, int]  # (page, zoom, rotation), as used by the pixmap cache
+    revision: int  # Session revision the display list was built at
+    display_list: Any  # fitz.DisplayList
+    matrix: Any  # fitz.Matrix
+
+
+def render_bands(request: RenderRequest, superseded) -> Optional[QImage]:
+    """
+    Rasterize a display list in horizontal bands
+
+    PyMuPDF holds the GIL for the whole of each call, so a page is
+    rendered as a series of short calls; other threads (the UI) run in
+    between, and the render stops early when superseded() says so.
+
+    Returns:
+        The page image, or None if the render was superseded
+    """
+    irect = (request.display_list.rect * request.matrix).irect
+    target = fitz.Pixmap(fitz.csRGB, irect, False)
+    inverse = ~request.matrix
+    band_height = max(16, BAND_PIXELS // max(1, irect.width))
+    for y in range(irect.y0, irect.y1, band_height):
+        if superseded():
+            return None
+        band = fitz.IRect(irect.x0, y, irect.x1, min(y + band_height, irect.y1))
+        pix = request.display_list.get_pixmap(matrix=request.matrix, alpha=False,
+                                              clip=fitz.Rect(band) * inverse)
+        target.copy(pix, pix.irect)
+    # copy(): the pixmap's sample buffer is freed with target
+    return QImage(target.samples, target.width, target.height, target.stride,
+                  QImage.Format.Format_RGB888).copy()
+
+
+class PageRenderWorker(QThread):
+    """
+    Renders the latest requested zoom of a page in the background
+
+    Only the most recent request is kept: a request made while a render
+    is running cancels it at the next band, and the worker moves on to
+    the new one. The display list is built on the UI thread, so the
+    worker never touches the document itself.
+    """
+    rendered = pyqtSignal(object, object)  # RenderRequest, QImage
+
+    def __init__(self):
+        super().__init__()
+        self.logger = get_logger()
+        self._pending: Optional[RenderRequest] = None
+        self._cancelled = False
+        self._lock = Lock()
+        # A request made while run() was returning is picked up here
+        self.finished.connect(self._restart_if_pending)
+
+    def request(self, request: RenderRequest):
+        """Render request next, dropping any render in progress"""
+        with self._lock:
+            self._pending = request
+        if not self.isRunning():
+            self.start()
+
+    def cancel(self):
+        """Drop the pending request and stop the running render at its next band"""
+        with self._lock:
+            self._pending = None
+            self._cancelled = True
+
+    def _superseded(self) -> bool:
+        with self._lock:
+            return self._pending is not None or self._cancelled or self.isInterruptionRequested()
+
+    def _restart_if_pending(self):
+        with self._lock:
+            pending = self._pending is not None
+        if pending and not self.isInterruptionRequested():
+            self.start()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._lock:
+                request, self._pending = self._pending, None
+                self._cancelled = False
+            if request is None:
+                return
+            try:
+                image = render_bands(request, self._superseded)
+            except Exception as e:
+                self.logger.warning(f"Zoom render of page {request.key[0] + 1} failed: {e}")
+                image = None
+            if image is not None:
+                self.rendered.emit(request, image)
+
+    def stop(self):
+        """Stop after the current band and wait for the thread"""
+        self.requestInterruption()
+        self.wait()
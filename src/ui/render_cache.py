@@ -0,0 +1,126 @@
+"""
+Render Cache - rendered pages of all open documents under one memory budget
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+from PyQt6.QtGui import QPixmap
+from src.utilities.logger import get_logger
+
+
+# Default for the performance.cache_size_mb setting
+DEFAULT_CACHE_SIZE_MB = 200
+
+
+def pixmap_bytes(pixmap: QPixmap) -> int:
+    """Memory held by a pixmap"""
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """
+    Least-recently-used page pixmaps, shared by every open tab
+
+    Entries belong to an owner (a viewer) and are keyed by (page, zoom,
+    rotation). When the cache is over its budget, pixmaps of background
+    owners are evicted before those of the active one, so the tab being
+    read keeps its pages while tabs in the background give up theirs.
+    When an owner moves to the background it is also trimmed to an equal
+    share of the budget.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.logger = get_logger()
+        self.max_bytes = max_bytes
+        self.active_owner: Any = None
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[QPixmap, int]]" = OrderedDict()
+        self._owners: Dict[int, Any] = {}
+        self._owner_bytes: Dict[int, int] = {}
+        self._bytes = 0
+
+    @property
+    def memory_used(self) -> int:
+        """Bytes held by all cached pixmaps"""
+        return self._bytes
+
+    def owner_memory(self, owner) -> int:
+        """Bytes held by one owner's pixmaps"""
+        return self._owner_bytes.get(id(owner), 0)
+
+    def get(self, owner, key: Hashable) -> Optional[QPixmap]:
+        """Cached pixmap, or None"""
+        entry = self._entries.get((id(owner), key))
+        if entry is None:
+            return None
+        self._entries.move_to_end((id(owner), key))
+        return entry[0]
+
+    def put(self, owner, key: Hashable, pixmap: QPixmap):
+        """Cache a pixmap, evicting others if the budget is exceeded"""
+        size = pixmap_bytes(pixmap)
+        if size > self.max_bytes:
+            return
+        self._remove((id(owner), key))
+        self._owners[id(owner)] = owner
+        self._entries[(id(owner), key)] = (pixmap, size)
+        self._owner_bytes[id(owner)] = self._owner_bytes.get(id(owner), 0) + size
+        self._bytes += size
+        self._evict(self.max_bytes)
+
+    def discard(self, owner, pages: Optional[Iterable[int]] = None):
+        """
+        Drop an owner's pixmaps
+
+        Args:
+            owner: Owner of the pixmaps
+            pages: Pages to drop (keys whose first element is the page
+                number), or None for all of them
+        """
+        pages = None if pages is None else set(pages)
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == id(owner)]:
+            if pages is None or entry_key[1][0] in pages:
+                self._remove(entry_key)
+        if pages is None:
+            self._owners.pop(id(owner), None)
+            self._owner_bytes.pop(id(owner), None)
+
+    def set_active(self, owner):
+        """
+        Make owner the tab being shown
+
+        The previously active owner is trimmed to its share of the budget
+        (the budget divided by the number of owners holding pixmaps).
+        """
+        previous, self.active_owner = self.active_owner, owner
+        if previous is None or previous is owner:
+            return
+        share = self.max_bytes // max(1, len(self._owner_bytes))
+        self._trim(id(previous), share)
+
+    def _trim(self, owner_id: int, max_bytes: int):
+        """Evict an owner's least recently used pixmaps down to max_bytes"""
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == owner_id]:
+            if self._owner_bytes.get(owner_id, 0) <= max_bytes:
+                break
+            self._remove(entry_key)
+
+    def _evict(self, max_bytes: int):
+        """Evict down to max_bytes, background owners first"""
+        active_id = id(self.active_owner)
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] != active_id]:
+            if self._bytes <= max_bytes:
+                return
+            self._remove(entry_key)
+        while self._bytes > max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_key: Tuple[int, Hashable]):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        owner_id = entry_key[0]
+        self._owner_bytes[owner_id] -= entry[1]
+        self._bytes -= entry[1]
+        if not self._owner_bytes[owner_id]:
+            del self._owner_bytes[owner_id]
+            self._owners.pop(owner_id, None)
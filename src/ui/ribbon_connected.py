@@ -114,6 +114,15 @@ class ConnectedRibbonBar(RibbonBar):
         comment_btn = self._create_tool_button("Add Comment", "Add comment or annotation")
         comment_btn.clicked.connect(self.actions.add_comment)
         self.tool_layout.addWidget(comment_btn)
+        self.tool_layout.addWidget(self._create_separator())
+
+        undo_btn = self._create_tool_button("Undo", "Undo last action (Ctrl+Z)")
+        undo_btn.clicked.connect(self.actions.undo)
+        redo_btn = self._create_tool_button("Redo", "Redo last action (Ctrl+Y)")
+        redo_btn.clicked.connect(self.actions.redo)
+
+        self.tool_layout.addWidget(undo_btn)
+        self.tool_layout.addWidget(redo_btn)
 
         self.tool_layout.addStretch()
 
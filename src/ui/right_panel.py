@@ -1,21 +1,46 @@
 """
-Right panel for NexPro PDF (Properties, Formatting, Security)
+Right panel for NexPro PDF (Properties, Formatting, Security, Performance)
 """
 
+from functools import partial
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QTabWidget, QFormLayout,
+    QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QFormLayout,
     QLabel, QLineEdit, QPushButton, QGroupBox, QScrollArea,
-    QTextEdit, QCheckBox
+    QTextEdit, QCheckBox, QTreeWidget, QTreeWidgetItem, QFileDialog,
+    QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
+from src.utilities.profiler import get_profiler
+
+
+# Recorded operations listed in the Performance tab (newest first)
+PERFORMANCE_ROWS = 50
+
+
+def _format_bytes(size: int) -> str:
+    """Byte count for display, or a dash for nothing"""
+    if not size:
+        return "—"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
 
 class RightPanel(QWidget):
     """Right sidebar panel with properties and options"""
 
+    # A recorded operation finished (emitted from the thread that ran it)
+    _operation_recorded = pyqtSignal(object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.profiler = get_profiler()
         self._setup_ui()
+        self._operation_recorded.connect(self._refresh_performance)
+        self.profiler.add_listener(self._on_operation_recorded)
+        self.destroyed.connect(partial(self.profiler.remove_listener, self._on_operation_recorded))
 
     def _setup_ui(self):
         """Setup right panel UI"""
@@ -38,6 +63,10 @@ class RightPanel(QWidget):
         self.security_widget = self._create_security_tab()
         self.tab_widget.addTab(self.security_widget, "Security")
 
+        # Performance tab
+        self.performance_widget = self._create_performance_tab()
+        self.tab_widget.addTab(self.performance_widget, "Performance")
+
         layout.addWidget(self.tab_widget)
 
         # Apply styling
@@ -261,6 +290,99 @@ class RightPanel(QWidget):
         scroll.setWidget(widget)
         return scroll
 
+    def _create_performance_tab(self) -> QWidget:
+        """Create performance tab (recent engine operations)"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(10)
+
+        self.record_operations = QCheckBox("Record operations")
+        self.record_operations.setToolTip(
+            "Time compress, convert, redact and other operations "
+            "(wall and CPU time, peak memory, pages/s, bytes in and out)")
+        self.record_operations.setChecked(self.profiler.enabled)
+        self.record_operations.toggled.connect(self._set_recording)
+        layout.addWidget(self.record_operations)
+
+        # One row per operation, with the steps it ran nested under it
+        self.operations_tree = QTreeWidget()
+        self.operations_tree.setHeaderLabels(
+            ["Operation", "Time", "CPU", "Peak Memory", "Pages/s", "In", "Out"])
+        self.operations_tree.setRootIsDecorated(True)
+        self.operations_tree.setAlternatingRowColors(True)
+        layout.addWidget(self.operations_tree, 1)
+
+        buttons = QHBoxLayout()
+        export_json_btn = QPushButton("Export JSON...")
+        export_json_btn.clicked.connect(self._export_json)
+        export_trace_btn = QPushButton("Export Trace...")
+        export_trace_btn.setToolTip("Chrome trace format (chrome://tracing, Perfetto)")
+        export_trace_btn.clicked.connect(self._export_trace)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self._clear_performance)
+        buttons.addWidget(export_json_btn)
+        buttons.addWidget(export_trace_btn)
+        buttons.addWidget(clear_btn)
+        layout.addLayout(buttons)
+
+        self._refresh_performance()
+        return widget
+
+    def _on_operation_recorded(self, span):
+        # Called on the thread that ran the operation; the signal queues
+        # the refresh to the UI thread
+        self._operation_recorded.emit(span)
+
+    def _set_recording(self, enabled: bool):
+        self.profiler.enabled = enabled
+
+    def _refresh_performance(self, *args):
+        """List the most recent top-level operations with their nested steps"""
+        spans = self.profiler.spans()
+        children = {}
+        for span in spans:
+            if span.parent_id is not None:
+                children.setdefault(span.parent_id, []).append(span)
+
+        def add_item(parent, span):
+            item = QTreeWidgetItem(parent, [
+                span.name + (" (failed)" if span.error else ""),
+                f"{span.wall_seconds:.2f} s",
+                f"{span.cpu_seconds:.2f} s",
+                _format_bytes(span.peak_rss),
+                f"{span.pages_per_second:.1f}" if span.pages else "—",
+                _format_bytes(span.bytes_in),
+                _format_bytes(span.bytes_out),
+            ])
+            if span.error:
+                item.setToolTip(0, span.error)
+            for child in sorted(children.get(span.span_id, []), key=lambda s: s.start):
+                add_item(item, child)
+
+        self.operations_tree.clear()
+        top_level = [span for span in spans if span.parent_id is None]
+        for span in reversed(top_level[-PERFORMANCE_ROWS:]):
+            add_item(self.operations_tree, span)
+        for column in range(1, self.operations_tree.columnCount()):
+            self.operations_tree.resizeColumnToContents(column)
+
+    def _clear_performance(self):
+        self.profiler.clear()
+        self._refresh_performance()
+
+    def _export_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Operations", "operations.json", "JSON Files (*.json)")
+        if file_path and not self.profiler.export_json(file_path):
+            QMessageBox.warning(self, "Export Failed", f"Could not write {file_path}")
+
+    def _export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "trace.json", "Trace Files (*.json)")
+        if file_path and not self.profiler.export_chrome_trace(file_path):
+            QMessageBox.warning(self, "Export Failed", f"Could not write {file_path}")
+
     def update_properties(self, pdf_info: dict):
         """Update properties display"""
         self.title_field.setText(pdf_info.get('title', ''))
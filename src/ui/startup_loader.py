@@ -0,0 +1,135 @@
+"""
+Startup Loader - opens PDFs in the background (the launch file while the
+main window is built, and files opened into new tabs)
+"""
+
+import os
+from typing import List, Optional
+import fitz  # PyMuPDF
+from PyQt6.QtCore import QObject, QRunnable, QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+from src.utilities.logger import get_logger
+
+
+# Share of the screen width the viewer gets in a maximized window; the
+# first page is rendered again if the real viewport differs
+FIRST_PAGE_WIDTH_RATIO = 0.6
+
+
+def launch_file(argv: List[str]) -> Optional[str]:
+    """
+    File to open at startup (e.g. a PDF that was double-clicked)
+
+    Args:
+        argv: Command line arguments (sys.argv)
+
+    Returns:
+        Path of the first argument that is an existing file, or None
+    """
+    for argument in argv[1:]:
+        if not argument.startswith('-') and os.path.isfile(argument):
+            return os.path.abspath(argument)
+    return None
+
+
+def open_first_page(loader):
+    """
+    Open loader.file_path and render its first page at loader.target_width
+
+    Sets document, first_page, zoom and error on the loader. Nothing is
+    rendered for a document that needs a password or has no pages.
+    """
+    try:
+        loader.document = fitz.open(loader.file_path)
+        if loader.document.needs_pass or loader.document.page_count == 0:
+            # The window asks for the password and opens it normally
+            return
+        page = loader.document[0]
+        loader.zoom = loader.target_width / page.rect.width
+        pix = page.get_pixmap(matrix=fitz.Matrix(loader.zoom, loader.zoom), alpha=False)
+        # copy(): the pixmap's sample buffer is freed with pix
+        loader.first_page = QImage(pix.samples, pix.width, pix.height, pix.stride,
+                                   QImage.Format.Format_RGB888).copy()
+    except Exception as e:
+        loader.error = str(e)
+        loader.logger.error(f"Error opening {loader.file_path} in the background: {e}")
+
+
+class StartupLoader(QThread):
+    """
+    Parses a PDF and renders its first page on a background thread
+
+    Started before the main window is constructed, so opening the file
+    (and repairing it, for a damaged large file) overlaps with building
+    the ribbon, panels and styling. The window then takes over the open
+    document and shows the rendered page at once.
+    """
+
+    def __init__(self, file_path: str, target_width: int):
+        """
+        Args:
+            file_path: PDF to open
+            target_width: Width in pixels to render the first page at
+        """
+        super().__init__()
+        self.logger = get_logger()
+        self.file_path = file_path
+        self.target_width = target_width
+        self.document = None
+        self.first_page: Optional[QImage] = None
+        self.zoom = 1.0
+        self.error: Optional[str] = None
+        self.taken = False
+
+    def run(self):
+        open_first_page(self)
+
+    def take_document(self):
+        """Hand over the open document (the loader no longer owns it)"""
+        document, self.document = self.document, None
+        self.taken = True
+        return document
+
+
+class _OpenSignals(QObject):
+    finished = pyqtSignal()
+
+
+class BackgroundOpen(QRunnable):
+    """
+    Same as StartupLoader, as a task for the window's shared worker pool
+
+    Used when several files are opened at once: each is parsed (and its
+    first page rendered) on a pool thread while the current tab stays
+    usable, and becomes a tab when it is ready. Every task opens its own
+    document, so no fitz object is shared between threads.
+    """
+
+    def __init__(self, file_path: str, target_width: int):
+        """
+        Args:
+            file_path: PDF to open
+            target_width: Width in pixels to render the first page at
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.logger = get_logger()
+        self.file_path = file_path
+        self.target_width = target_width
+        self.document = None
+        self.first_page: Optional[QImage] = None
+        self.zoom = 1.0
+        self.error: Optional[str] = None
+        self.taken = False
+        self.signals = _OpenSignals()
+        self.finished = self.signals.finished
+
+    def run(self):
+        open_first_page(self)
+        self.finished.emit()
+
+    def take_document(self):
+        """Hand over the open document (the task no longer owns it)"""
+        document, self.document = self.document, None
+        self.taken = True
+        return document
@@ -49,8 +49,19 @@ class ConfigManager:
             },
             'performance': {
                 'max_pages_memory': 500,
+                'max_display_lists': 32,
                 'worker_threads': 4,
-                'cache_size_mb': 200
+                'cache_size_mb': 200,
+                'undo_memory_mb': 64,
+                'profiling': False,
+                'profiler_spans': 1000
+            },
+            'logging': {
+                'level': 'INFO',
+                'max_file_size_mb': 10,
+                'backup_count': 5,
+                'json_lines': False,
+                'rate_limit_per_second': 20
             }
         }
 
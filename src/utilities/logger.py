@@ -1,13 +1,31 @@
 """
 Logging utility for NexPro PDF
+
+Records are handed to a queue by the thread that logs them; a listener
+thread formats them and does the file and console I/O, so worker
+threads never wait on the disk.
 """
 
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
 import sys
+import threading
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# Defaults for the logging.* settings
+DEFAULT_MAX_FILE_SIZE_MB = 10
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_RATE_LIMIT_PER_SECOND = 20
+
+_listener: Optional[QueueListener] = None
 
 
 def _get_log_dir():
@@ -19,18 +37,108 @@ def _get_log_dir():
     return Path(base) / 'NexProPDF' / 'logs'
 
 
-def setup_logger(name="NexProPDF", log_dir=None, level=logging.INFO):
+class JsonLinesFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """QueueHandler that keeps a record's message and traceback apart"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stdlib version merges the traceback into the message; keeping
+        # it in exc_text lets each formatter place it (JSON has its own field)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limits how often one source line can log below WARNING
+
+    Per-item messages in loops (one per page, image or file) pass at most
+    per_second times a second per call site; the rest are dropped before
+    they reach the queue, and their count is added to the next message
+    from that line. Warnings and errors always pass.
+    """
+
+    def __init__(self, per_second: int = DEFAULT_RATE_LIMIT_PER_SECOND):
+        """
+        Args:
+            per_second: Messages per call site and second (0 = no limit)
+        """
+        super().__init__()
+        self.per_second = per_second
+        # (path, line) -> [window start, passed, suppressed]
+        self._windows: Dict[Tuple[str, int], List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.per_second <= 0:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(site)
+            suppressed = 0
+            if window is None or record.created - window[0] >= 1.0:
+                suppressed = window[2] if window else 0
+                window = self._windows[site] = [record.created, 0, 0]
+            if window[1] >= self.per_second:
+                window[2] += 1
+                return False
+            window[1] += 1
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+def setup_logger(name="NexProPDF", log_dir=None, level=logging.INFO, config=None):
     """
     Setup application logger with file and console handlers
 
+    The logger itself only has a QueueHandler; the file and console
+    handlers run on a QueueListener thread, which is stopped (and the
+    queue flushed) at exit.
+
     Args:
         name: Logger name
         log_dir: Directory for log files (defaults to AppData/NexProPDF/logs)
-        level: Logging level
+        level: Logging level (overridden by logging.level in config)
+        config: ConfigManager with the logging.* settings, or None for defaults
 
     Returns:
         Logger instance
     """
+    global _listener
+
+    def setting(key, default):
+        return config.get(f'logging.{key}', default) if config else default
+
+    if config:
+        level = logging.getLevelName(str(setting('level', 'INFO')).upper())
+        if not isinstance(level, int):
+            level = logging.INFO
 
     # Use AppData location to avoid permission issues in Program Files
     log_path = Path(log_dir) if log_dir else _get_log_dir()
@@ -45,38 +153,61 @@ def setup_logger(name="NexProPDF", log_dir=None, level=logging.INFO):
         return logger
 
     # Create formatters
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    json_lines = bool(setting('json_lines', False))
+    if json_lines:
+        file_formatter = JsonLinesFormatter()
+    else:
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
 
     console_formatter = logging.Formatter(
         '%(levelname)s: %(message)s'
     )
 
-    # File handler with rotation (10MB max, 5 backups)
-    log_file = log_path / f"nexpro_pdf_{datetime.now().strftime('%Y%m%d')}.log"
+    # File handler with rotation
+    suffix = 'jsonl' if json_lines else 'log'
+    log_file = log_path / f"nexpro_pdf_{datetime.now().strftime('%Y%m%d')}.{suffix}"
     file_handler = RotatingFileHandler(
         log_file,
-        maxBytes=10 * 1024 * 1024,  # 10MB
-        backupCount=5,
+        maxBytes=int(setting('max_file_size_mb', DEFAULT_MAX_FILE_SIZE_MB)) * 1024 * 1024,
+        backupCount=int(setting('backup_count', DEFAULT_BACKUP_COUNT)),
         encoding='utf-8'
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(detailed_formatter)
+    file_handler.setFormatter(file_formatter)
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(console_formatter)
 
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Logging threads only enqueue; the listener writes
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(
+        int(setting('rate_limit_per_second', DEFAULT_RATE_LIMIT_PER_SECOND))))
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, file_handler, console_handler,
+                              respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logger)
 
     return logger
 
 
+def shutdown_logger():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
 def get_logger(name=None):
     """Get logger instance"""
     return logging.getLogger(name or "NexProPDF")
@@ -0,0 +1,324 @@
+"""
+Profiler - opt-in timing of engine operations
+
+Engine methods are wrapped with @profiled (or run inside span()). While
+the profiler is enabled, each call records its wall and CPU time, peak
+memory, pages and bytes read and written as a span; a span opened while
+another is running on the same thread nests under it. Finished spans are
+kept in a ring buffer and can be exported as JSON or as a Chrome trace
+(chrome://tracing, Perfetto).
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+from src.utilities.logger import get_logger
+
+try:
+    import psutil
+except ImportError:  # Memory is then not recorded
+    psutil = None
+
+
+# Default for the performance.profiler_spans setting
+DEFAULT_MAX_SPANS = 1000
+
+# Interval at which the memory of running spans is sampled
+RSS_SAMPLE_SECONDS = 0.05
+
+
+@dataclass
+class Span:
+    """One recorded operation"""
+    span_id: int
+    name: str
+    start: float  # time.time() when it started
+    thread_id: int
+    thread_name: str
+    parent_id: Optional[int] = None  # Enclosing span on the same thread
+    depth: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0  # CPU time of the process and its finished child processes
+    peak_rss: int = 0  # Highest resident memory seen while it ran, in bytes
+    pages: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    error: Optional[str] = None  # Exception that ended it, if any
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["pages_per_second"] = self.pages_per_second
+        return result
+
+
+def _cpu_time() -> float:
+    """
+    CPU seconds used by all threads of the process, plus child processes
+    that have ended (worker pools; where the OS reports them)
+    """
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class Profiler:
+    """
+    Records spans while enabled; does nothing (beyond a flag check) otherwise
+
+    Listeners are called with every finished top-level span, on the
+    thread that ran it.
+    """
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS):
+        self.logger = get_logger()
+        self.enabled = False
+        self._spans: Deque[Span] = deque(maxlen=max(1, max_spans))
+        self._running: List[Span] = []
+        self._listeners: List[Callable[[Span], None]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._sampler: Optional[threading.Thread] = None
+        self._process = psutil.Process() if psutil else None
+
+    def configure(self, enabled: bool, max_spans: int = DEFAULT_MAX_SPANS):
+        """
+        Apply the performance.profiling / performance.profiler_spans settings
+
+        Args:
+            enabled: Record spans
+            max_spans: Finished spans kept (the oldest are dropped)
+        """
+        with self._lock:
+            self.enabled = enabled
+            if max(1, max_spans) != self._spans.maxlen:
+                self._spans = deque(self._spans, maxlen=max(1, max_spans))
+
+    def add_listener(self, listener: Callable[[Span], None]):
+        """Call listener(span) after every top-level span"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def spans(self) -> List[Span]:
+        """Finished spans, oldest first"""
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        """Forget all finished spans"""
+        with self._lock:
+            self._spans.clear()
+
+    def current(self) -> Optional[Span]:
+        """Innermost span running on this thread"""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Optional[Span]]:
+        """
+        Record the enclosed block as a span
+
+        Yields:
+            The running Span (set its pages or bytes), or None when disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        thread = threading.current_thread()
+        with self._lock:
+            span = Span(span_id=self._next_id, name=name, start=time.time(),
+                        thread_id=thread.ident or 0, thread_name=thread.name,
+                        parent_id=stack[-1].span_id if stack else None,
+                        depth=len(stack), peak_rss=self._rss())
+            self._next_id += 1
+            self._running.append(span)
+            if self._process is not None and self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_rss,
+                                                 name="ProfilerMemory", daemon=True)
+                self._sampler.start()
+        stack.append(span)
+
+        started, cpu_started = time.perf_counter(), _cpu_time()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.wall_seconds = time.perf_counter() - started
+            span.cpu_seconds = _cpu_time() - cpu_started
+            span.peak_rss = max(span.peak_rss, self._rss())
+            stack.pop()
+            with self._lock:
+                self._running.remove(span)
+                self._spans.append(span)
+            if span.depth == 0:
+                for listener in list(self._listeners):
+                    try:
+                        listener(span)
+                    except Exception as e:
+                        self.logger.error(f"Error in profiler listener: {e}")
+
+    def _rss(self) -> int:
+        if self._process is None:
+            return 0
+        try:
+            return self._process.memory_info().rss
+        except Exception:
+            return 0
+
+    def _sample_rss(self):
+        """Track the peak memory of running spans; ends when none is running"""
+        while True:
+            with self._lock:
+                running = list(self._running)
+                if not running:
+                    self._sampler = None
+                    return
+            rss = self._rss()
+            for span in running:
+                span.peak_rss = max(span.peak_rss, rss)
+            time.sleep(RSS_SAMPLE_SECONDS)
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """Finished spans as dictionaries"""
+        return [span.to_dict() for span in self.spans()]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Finished spans in the Chrome trace event format"""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in self.spans():
+            threads[span.thread_id] = span.thread_name
+            events.append({
+                "name": span.name,
+                "cat": "operation",
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.wall_seconds * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {
+                    "cpu_seconds": round(span.cpu_seconds, 6),
+                    "peak_rss_mb": round(span.peak_rss / (1024 * 1024), 1),
+                    "pages": span.pages,
+                    "pages_per_second": round(span.pages_per_second, 2),
+                    "bytes_in": span.bytes_in,
+                    "bytes_out": span.bytes_out,
+                    "error": span.error,
+                },
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_json(self, file_path: str) -> bool:
+        """Write the finished spans to a JSON file"""
+        return self._write(file_path, self.to_json())
+
+    def export_chrome_trace(self, file_path: str) -> bool:
+        """Write the finished spans as a Chrome trace (JSON) file"""
+        return self._write(file_path, self.chrome_trace())
+
+    def _write(self, file_path: str, data) -> bool:
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            self.logger.info(f"Exported {len(self._spans)} profiler spans to {file_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error exporting profiler spans: {e}")
+            return False
+
+
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """The application's profiler"""
+    return _profiler
+
+
+def record_pages(pages: int):
+    """Add pages processed to the innermost running span (no-op when not profiling)"""
+    span = _profiler.current() if _profiler.enabled else None
+    if span is not None:
+        span.pages += pages
+
+
+def _file_bytes(value, since: Optional[float] = None) -> int:
+    """
+    Size of a file path, or the total of a list of paths
+
+    Args:
+        value: Path or list of paths
+        since: Only count files modified at or after this time.time()
+    """
+    if isinstance(value, (list, tuple)):
+        return sum(_file_bytes(item, since) for item in value)
+    try:
+        if not value or not os.path.isfile(value):
+            return 0
+        if since is not None and os.path.getmtime(value) < since - 1:
+            return 0  # Left over from before; the operation did not write it
+        return os.path.getsize(value)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def profiled(name: str, input_arg: Optional[str] = None, output_arg: Optional[str] = None,
+             document_arg: Optional[str] = None):
+    """
+    Record calls of an engine method as spans
+
+    Args:
+        name: Operation name shown in the Performance panel
+        input_arg: Parameter holding the input file path (or list of paths)
+        output_arg: Parameter holding the output file path
+        document_arg: Parameter holding the fitz.Document worked on; its
+            page count is recorded unless the method records pages itself
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            try:
+                arguments = signature.bind(*args, **kwargs).arguments
+            except TypeError:
+                arguments = {}
+            with _profiler.span(name) as span:
+                if span is not None and input_arg:
+                    span.bytes_in = _file_bytes(arguments.get(input_arg))
+                result = func(*args, **kwargs)
+                if span is not None:
+                    if output_arg:
+                        span.bytes_out = _file_bytes(arguments.get(output_arg), since=span.start)
+                    document = arguments.get(document_arg) if document_arg else None
+                    if not span.pages and document is not None:
+                        span.pages = getattr(document, 'page_count', 0)
+                return result
+        return wrapper
+    return decorate
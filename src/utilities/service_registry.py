@@ -0,0 +1,121 @@
+"""
+Service Registry - backends imported and created on first use
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from src.utilities.logger import get_logger
+
+
+def import_object(target: str) -> Any:
+    """
+    Import an object from a "package.module:Name" string
+
+    Args:
+        target: Module path and attribute name separated by ':'
+
+    Returns:
+        The attribute
+    """
+    module_name, _, attribute = target.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class ServiceRegistry:
+    """
+    Named services whose modules load on first use
+
+    Services are registered as "package.module:Class" strings, so
+    registering imports nothing; the module is imported and the class
+    instantiated the first time get() asks for the service. Startup then
+    only pays for the backends the user actually touches (the converter
+    pulls in pytesseract and docx, the signature engine PyKCS11 and
+    cryptography).
+    """
+
+    def __init__(self):
+        self.logger = get_logger()
+        self._factories: Dict[str, Tuple[str, tuple, dict]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, target: str, *args, **kwargs):
+        """
+        Register a service
+
+        Args:
+            name: Service name
+            target: "package.module:Class" (or any callable returning the service)
+            *args, **kwargs: Passed to the class when it is created
+        """
+        with self._lock:
+            self._factories[name] = (target, args, kwargs)
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        Service instance, created on the first call
+
+        Raises:
+            KeyError: If no service of that name is registered
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                target, args, kwargs = self._factories[name]
+                start = time.perf_counter()
+                instance = import_object(target)(*args, **kwargs)
+                self._instances[name] = instance
+                self.logger.debug(f"Loaded service {name} in {(time.perf_counter() - start) * 1000:.1f} ms")
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the service has been created"""
+        return name in self._instances
+
+    def loaded(self) -> List[str]:
+        """Names of the services created so far"""
+        return list(self._instances)
+
+
+class LazyService:
+    """
+    Class attribute that resolves to a registry service on first access
+
+    Usage:
+        class PDFActions:
+            pdf_converter = LazyService()
+
+            def __init__(self):
+                self.services = ServiceRegistry()
+                self.services.register('pdf_converter', 'src.pdf_engine.pdf_converter:PDFConverter')
+
+    The instance must have a `services` ServiceRegistry. The service is
+    stored on the instance after the first access, so later lookups are
+    plain attribute reads.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        """
+        Args:
+            name: Service name (defaults to the attribute name)
+        """
+        self.name = name
+        self.attribute = name
+
+    def __set_name__(self, owner, attribute: str):
+        self.attribute = attribute
+        if self.name is None:
+            self.name = attribute
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        service = instance.services.get(self.name)
+        instance.__dict__[self.attribute] = service
+        return service
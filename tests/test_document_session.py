@@ -0,0 +1,104 @@
+"""
+Tests for DocumentSession undo/redo through the undo journal
+"""
+
+import fitz
+import pytest
+from src.pdf_engine.document_session import DocumentSession
+
+
+@pytest.fixture
+def session(tmp_path):
+    """Session with a three-page file open, one line of text per page"""
+    file_path = tmp_path / "document.pdf"
+    doc = fitz.open()
+    for number in range(3):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1}")
+    doc.set_metadata({"title": "Original"})
+    doc.save(str(file_path))
+    doc.close()
+
+    session = DocumentSession()
+    assert session.open(str(file_path))
+    yield session
+    session.close()
+
+
+def _texts(session):
+    return [session.page(number).get_text().strip() for number in range(session.document.page_count)]
+
+
+def test_undo_redo_text_insertion(session):
+    with session.edit([1], "Add text"):
+        session.page(1).insert_text((72, 144), "Added")
+    assert "Added" in _texts(session)[1]
+
+    assert session.undo() == "Add text"
+    assert _texts(session) == ["Page 1", "Page 2", "Page 3"]
+    assert not session.is_modified
+
+    assert session.redo() == "Add text"
+    assert "Added" in _texts(session)[1]
+    assert session.is_modified
+
+
+def test_undo_redo_annotation(session):
+    with session.edit([0], "Add annotation"):
+        session.page(0).add_rect_annot(fitz.Rect(72, 100, 200, 150))
+    assert len(list(session.page(0).annots())) == 1
+
+    session.undo()
+    assert len(list(session.page(0).annots())) == 0
+
+    session.redo()
+    assert len(list(session.page(0).annots())) == 1
+
+
+def test_undo_redo_metadata(session):
+    with session.edit([], "Metadata"):
+        session.document.set_metadata({"title": "Changed"})
+    assert session.document.metadata["title"] == "Changed"
+
+    session.undo()
+    assert session.document.metadata["title"] == "Original"
+
+    session.redo()
+    assert session.document.metadata["title"] == "Changed"
+
+
+def test_undo_redo_page_delete(session):
+    with session.edit(None, "Delete Pages") as doc:
+        doc.delete_page(1)
+    assert _texts(session) == ["Page 1", "Page 3"]
+
+    session.undo()
+    assert _texts(session) == ["Page 1", "Page 2", "Page 3"]
+
+    session.redo()
+    assert _texts(session) == ["Page 1", "Page 3"]
+
+
+def test_undo_redo_page_insert(session):
+    with session.edit(None, "Insert Pages") as doc:
+        doc.new_page(pno=0).insert_text((72, 72), "Inserted")
+    assert _texts(session) == ["Inserted", "Page 1", "Page 2", "Page 3"]
+
+    session.undo()
+    assert _texts(session) == ["Page 1", "Page 2", "Page 3"]
+
+    session.redo()
+    assert _texts(session) == ["Inserted", "Page 1", "Page 2", "Page 3"]
+
+
+def test_edit_too_large_for_history_cannot_be_undone(session):
+    session.journal.max_bytes = 1
+    with session.edit([0], "Add text"):
+        session.page(0).insert_text((72, 144), "Added")
+
+    assert session.undo() is None
+    assert session.state != 0
+
+    # Reloading from disk is the way back
+    assert session.reload()
+    assert _texts(session) == ["Page 1", "Page 2", "Page 3"]
+    assert not session.is_modified
@@ -0,0 +1,53 @@
+"""
+Tests for image re-encoding
+"""
+
+import io
+import fitz
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from src.pdf_engine.image_recompression import (
+    BILEVEL, PHOTO, choose_codec, load_image, reencode_image, replace_image
+)
+
+
+def _text_scan() -> Image.Image:
+    img = Image.new('L', (1700, 2200), 250)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=28)
+    for y in range(150, 2050, 45):
+        draw.text((150, y), "The quick brown fox jumps over the lazy dog 0123456789",
+                  fill=20, font=font)
+    return img.filter(ImageFilter.GaussianBlur(1))
+
+
+def test_text_scan_is_bilevel():
+    assert choose_codec(_text_scan())[0] == BILEVEL
+
+
+def test_scan_with_photo_is_not_bilevel():
+    scan = _text_scan()
+    photo = Image.blend(Image.linear_gradient('L').resize((400, 400)),
+                        Image.effect_noise((400, 400), 40), 0.4)
+    scan.paste(photo, (200, 300))  # About 4% of the page
+
+    assert choose_codec(scan)[0] == PHOTO
+
+
+def test_decode_array_of_jpeg_is_kept_in_effect():
+    """A grayscale JPEG drawn inverted through /Decode [1 0] stays inverted"""
+    gradient = Image.linear_gradient('L').resize((300, 300))
+    buf = io.BytesIO()
+    gradient.save(buf, format='JPEG', quality=95)
+
+    doc = fitz.open()
+    page = doc.new_page(width=300, height=300)
+    page.insert_image(page.rect, stream=buf.getvalue())
+    xref = page.get_images()[0][0]
+    doc.xref_set_key(xref, "Decode", "[1 0]")
+    before = page.get_pixmap().pixel(150, 10)
+
+    encoded = reencode_image(load_image(doc, xref), 10 ** 9, 50, None)
+    replace_image(doc, xref, encoded)
+
+    after = doc[0].get_pixmap().pixel(150, 10)
+    assert abs(after[0] - before[0]) < 16
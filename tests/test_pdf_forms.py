@@ -0,0 +1,39 @@
+"""
+Tests for the PDFForms field index
+"""
+
+import fitz
+from src.pdf_engine.pdf_forms import PDFForms
+
+
+def _add_text_field(page, name: str, y: float):
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    widget.field_name = name
+    widget.rect = fitz.Rect(72, y, 272, y + 20)
+    page.add_widget(widget)
+
+
+def test_fields_added_to_open_document_are_found():
+    doc = fitz.open()
+    page = doc.new_page()
+    _add_text_field(page, "a", 72)
+    forms = PDFForms()
+    assert [field['name'] for field in forms.get_form_fields(doc)] == ["a"]
+
+    # Same document object, same page count
+    _add_text_field(page, "b", 120)
+
+    assert sorted(field['name'] for field in forms.get_form_fields(doc)) == ["a", "b"]
+
+
+def test_invalidate_index_rebuilds():
+    doc = fitz.open()
+    page = doc.new_page()
+    _add_text_field(page, "a", 72)
+    forms = PDFForms()
+    index = forms.get_index(doc)
+
+    assert forms.get_index(doc) is index
+    forms.invalidate_index()
+    assert forms.get_index(doc) is not index
@@ -0,0 +1,49 @@
+"""
+Tests for PDFMailMerge output file names
+"""
+
+import fitz
+import pytest
+from src.pdf_engine.pdf_mail_merge import PDFMailMerge
+
+
+@pytest.fixture
+def template(tmp_path):
+    file_path = tmp_path / "template.pdf"
+    doc = fitz.open()
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    widget.field_name = "name"
+    widget.rect = fitz.Rect(72, 72, 272, 92)
+    doc.new_page().add_widget(widget)
+    doc.save(str(file_path))
+    doc.close()
+    return str(file_path)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    file_path = tmp_path / "data.csv"
+    file_path.write_text("ID,name\n1,Ann\n,Bob\n1,Cid\n", encoding="utf-8")
+    return str(file_path)
+
+
+def test_blank_cells_and_duplicate_names(tmp_path, template, data_file):
+    output_dir = tmp_path / "out"
+
+    report = PDFMailMerge().merge(template, data_file, str(output_dir),
+                                  filename_pattern="{row[ID]}.pdf", workers=0)
+
+    assert report['written'] == 3 and report['failed'] == []
+    assert sorted(path.name for path in output_dir.iterdir()) == ["1.pdf", "1_2.pdf", "merged_00002.pdf"]
+    with fitz.open(str(output_dir / "1_2.pdf")) as doc:
+        assert next(doc[0].widgets()).field_value == "Cid"
+
+
+def test_invalid_pattern_fails_rows_not_the_merge(tmp_path, template, data_file):
+    report = PDFMailMerge().merge(template, data_file, str(tmp_path / "out"),
+                                  filename_pattern="{row[ID]:d}.pdf", workers=0)
+
+    assert report is not None
+    assert report['written'] == 0
+    assert [row for row, _ in report['failed']] == [1, 2, 3]
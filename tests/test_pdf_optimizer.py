@@ -0,0 +1,154 @@
+"""
+Tests for PDFOptimizer.remove_unused_resources
+"""
+
+import io
+import fitz
+import pytest
+from PIL import Image
+from src.pdf_engine.pdf_optimizer import PDFOptimizer
+
+
+def _new_page(doc):
+    """A page whose Resources are an indirect object with a font and an unused font"""
+    page = doc.new_page()
+    font = doc.get_new_xref()
+    doc.update_object(font, "<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>")
+    unused = doc.get_new_xref()
+    doc.update_object(unused, "<</Type/Font/Subtype/Type1/BaseFont/Courier>>")
+    resources = doc.get_new_xref()
+    doc.update_object(resources, f"<</Font<</F1 {font} 0 R/F2 {unused} 0 R>>>>")
+    doc.xref_set_key(page.xref, "Resources", f"{resources} 0 R")
+    return page, resources
+
+
+def _new_form(doc, resources: str) -> int:
+    form = doc.get_new_xref()
+    doc.update_object(form, f"<</Type/XObject/Subtype/Form/BBox[0 0 595 842]/Resources {resources}>>")
+    doc.update_stream(form, b"BT /F1 24 Tf 72 720 Td (Inside form) Tj ET")
+    return form
+
+
+def _set_contents(doc, page, data: bytes):
+    contents = doc.get_new_xref()
+    doc.update_object(contents, "<<>>")
+    doc.update_stream(contents, data)
+    doc.xref_set_key(page.xref, "Contents", f"{contents} 0 R")
+
+
+def test_resources_shared_with_form_are_kept(tmp_path):
+    """A form drawn by the page shares the page's Resources object"""
+    doc = fitz.open()
+    page, resources = _new_page(doc)
+    form = _new_form(doc, f"{resources} 0 R")
+    font_dict = doc.xref_get_key(resources, "Font")[1]
+    doc.update_object(resources, f"<</Font{font_dict}/XObject<</Fm0 {form} 0 R>>>>")
+    _set_contents(doc, page, b"q /Fm0 Do Q")
+    source = tmp_path / "shared.pdf"
+    doc.save(str(source))
+    doc.close()
+
+    output = tmp_path / "optimized.pdf"
+    report = PDFOptimizer().optimize(str(source), str(output))
+
+    assert report is not None
+    assert all(saved >= 0 for saved in report["saved"].values())
+    with fitz.open(str(output)) as optimized:
+        assert "Inside form" in optimized[0].get_text()
+        assert optimized.xref_get_key(optimized[0].xref, "Resources/Font/F1")[0] == "xref"
+
+
+def test_names_used_by_form_are_kept(tmp_path):
+    """A form with no resources of its own uses the page's font"""
+    doc = fitz.open()
+    page, resources = _new_page(doc)
+    form = _new_form(doc, "<<>>")
+    doc.xref_set_key(form, "Resources", "null")
+    doc.xref_set_key(resources, "XObject", f"<</Fm0 {form} 0 R>>")
+    _set_contents(doc, page, b"q /Fm0 Do Q")
+
+    removed = PDFOptimizer().remove_unused_resources(doc)
+
+    assert removed == 1
+    assert doc.xref_get_key(page.xref, "Resources/Font/F1")[0] == "xref"
+    assert doc.xref_get_key(page.xref, "Resources/Font/F2")[0] == "null"
+
+
+def test_unused_page_resources_are_removed():
+    doc = fitz.open()
+    page, _ = _new_page(doc)
+    _set_contents(doc, page, b"BT /F1 12 Tf 72 720 Td (Text) Tj ET")
+
+    assert PDFOptimizer().remove_unused_resources(doc) == 1
+    assert doc.xref_get_key(page.xref, "Resources/Font/F1")[0] == "xref"
+    assert doc.xref_get_key(page.xref, "Resources/Font/F2")[0] == "null"
+    # Already removed entries are not counted again
+    assert PDFOptimizer().remove_unused_resources(doc) == 0
+
+
+
+def _ccitt_data() -> bytes:
+    from src.pdf_engine.image_recompression import encode_bilevel
+    return encode_bilevel(Image.linear_gradient('L').resize((64, 64)), 127).data
+
+
+def _jpeg_data() -> bytes:
+    buf = io.BytesIO()
+    Image.merge('RGB', [Image.linear_gradient('L').resize((64, 64))] * 3).save(buf, format='JPEG')
+    return buf.getvalue()
+
+
+def _encoded_image(doc, data: bytes, filter_name: str, color_space: str, bits: int,
+                   decode_parms: str) -> int:
+    xref = doc.get_new_xref()
+    doc.update_object(xref, f"<</Type/XObject/Subtype/Image/Width 64/Height 64"
+                            f"/ColorSpace/{color_space}/BitsPerComponent {bits}>>")
+    # update_stream() drops the filter keys, so they are set afterwards
+    doc.update_stream(xref, data, compress=0)
+    doc.xref_set_key(xref, "Filter", f"/{filter_name}")
+    doc.xref_set_key(xref, "DecodeParms", decode_parms)
+    return xref
+
+
+def _globals(doc, segment: int) -> int:
+    """JBIG2 globals stream (one segment header)"""
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, bytes([0, 0, 0, segment, 0x30, 0, 1]))
+    return xref
+
+
+@pytest.mark.parametrize("data, filter_name, color_space, bits, parms, other_parms", [
+    (_ccitt_data, "CCITTFaxDecode", "DeviceGray", 1,
+     "<</K -1/Columns 64/Rows 64/BlackIs1 false>>", "<</K -1/Columns 64/Rows 64/BlackIs1 true>>"),
+    (_jpeg_data, "DCTDecode", "DeviceRGB", 8, "null", "<</ColorTransform 0>>"),
+    # Data MuPDF cannot decode: only the parameters tell the images apart
+    (lambda: b"\x00\x01\x02\x03" * 64, "JBIG2Decode", "DeviceGray", 1,
+     "<</JBIG2Globals {globals} 0 R>>", "<</JBIG2Globals {other_globals} 0 R>>"),
+])
+def test_encoded_images_with_different_parameters_are_not_merged(
+        data, filter_name, color_space, bits, parms, other_parms):
+    doc = fitz.open()
+    image = data()
+    globals_xrefs = {"globals": _globals(doc, 0), "other_globals": _globals(doc, 1)}
+    parms, other_parms = parms.format(**globals_xrefs), other_parms.format(**globals_xrefs)
+    first = _encoded_image(doc, image, filter_name, color_space, bits, parms)
+    other = _encoded_image(doc, image, filter_name, color_space, bits, other_parms)
+    copy = _encoded_image(doc, image, filter_name, color_space, bits, parms)
+    page = doc.new_page()
+    doc.xref_set_key(page.xref, "Resources",
+                     f"<</XObject<</Im0 {first} 0 R/Im1 {other} 0 R/Im2 {copy} 0 R>>>>")
+
+    assert PDFOptimizer().deduplicate(doc)["images"] == 1
+    assert doc.xref_get_key(page.xref, "Resources/XObject/Im1")[1] == f"{other} 0 R"
+    assert doc.xref_get_key(page.xref, "Resources/XObject/Im2")[1] == f"{first} 0 R"
+
+
+def test_images_that_cannot_be_decoded_are_compared_by_their_data():
+    doc = fitz.open()
+    first = _encoded_image(doc, b"\x00\x01" * 128, "JBIG2Decode", "DeviceGray", 1, "null")
+    other = _encoded_image(doc, b"\x02\x03" * 128, "JBIG2Decode", "DeviceGray", 1, "null")
+    page = doc.new_page()
+    doc.xref_set_key(page.xref, "Resources", f"<</XObject<</Im0 {first} 0 R/Im1 {other} 0 R>>>>")
+
+    assert PDFOptimizer().deduplicate(doc)["images"] == 0
@@ -0,0 +1,29 @@
+"""
+Tests for PDFStreamWriter
+"""
+
+import fitz
+from src.pdf_engine.pdf_stream_writer import PDFStreamWriter
+
+
+def test_close_writes_the_output(tmp_path):
+    output = tmp_path / "out.pdf"
+    with PDFStreamWriter(str(output), {"F1": "helv"}) as writer:
+        writer.add_page(200, 200, b"BT /F1 12 Tf 20 100 Td (Hello) Tj ET")
+
+    with fitz.open(str(output)) as doc:
+        assert doc[0].get_text().strip() == "Hello"
+    assert [path.name for path in tmp_path.iterdir()] == ["out.pdf"]
+
+
+def test_abort_leaves_existing_output_untouched(tmp_path):
+    output = tmp_path / "out.pdf"
+    output.write_bytes(b"previous")
+
+    writer = PDFStreamWriter(str(output), {"F1": "helv"})
+    writer.add_page(200, 200, b"BT /F1 12 Tf 20 100 Td (Hello) Tj ET")
+    writer.abort()
+
+    assert output.read_bytes() == b"previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["out.pdf"]
+
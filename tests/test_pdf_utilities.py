@@ -0,0 +1,27 @@
+"""
+Tests for PDFUtilities page numbering
+"""
+
+import fitz
+from src.pdf_engine.pdf_utilities import PDFUtilities
+
+
+def _document(pages: int):
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page()
+    return doc
+
+
+def test_page_numbers_with_format_spec():
+    doc = _document(3)
+
+    assert PDFUtilities().add_page_numbers(doc, format_string="P{page:03d}/{total}")
+    assert [page.get_text().strip() for page in doc] == ["P001/3", "P002/3", "P003/3"]
+
+
+def test_bates_numbers_are_zero_padded():
+    doc = _document(2)
+
+    assert PDFUtilities().add_bates_numbering(doc, prefix="DOC", start_number=7, digits=4)
+    assert [page.get_text().strip() for page in doc] == ["DOC0007", "DOC0008"]